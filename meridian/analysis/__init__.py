@@ -17,5 +17,6 @@
 from meridian.analysis import analyzer
 from meridian.analysis import formatter
 from meridian.analysis import optimizer
+from meridian.analysis import response_cache
 from meridian.analysis import summarizer
 from meridian.analysis import visualizer
@@ -14,8 +14,21 @@
 
 """Methods to compute analysis metrics of the model and the data."""
 
-from collections.abc import Mapping, Sequence
+import collections
+from collections.abc import (
+    Callable,
+    Collection,
+    Hashable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
 import itertools
+import multiprocessing
 from typing import Any, Optional
 import warnings
 
@@ -35,6 +48,20 @@ __all__ = [
     "DistributionTensors",
 ]
 
+# `Analyzer` whose analysis methods are restricted to some of the draws of each
+# chain, and these draws, set by `Analyzer._select_draws()`. The selection is a
+# context variable instead of an attribute of the `Analyzer`, so that it only
+# applies to the call that selected the draws and not to concurrent calls on the
+# same `Analyzer` from other threads.
+_selected_draws: contextvars.ContextVar[
+    tuple["Analyzer", slice | np.ndarray] | None
+] = contextvars.ContextVar("_selected_draws", default=None)
+
+# Keys of the intermediate outcomes of `Analyzer._summary_metrics_impl()`.
+_INCREMENTAL_KPI = "incremental_kpi"
+_MARGINAL_OUTCOME = "marginal_outcome"
+_MARGINAL_EXPECTED_OUTCOME = "marginal_expected_outcome"
+
 
 class DataTensors(tf.experimental.ExtensionType):
   """Container for data variables arguments of Analyzer methods.
@@ -171,6 +198,139 @@ def get_central_tendency_and_ci(
     return np.stack([mean, ci_lo, ci_hi], axis=-1)
 
 
+class _StreamingCentralTendencyAndCI:
+  """Computes `get_central_tendency_and_ci()` over batches of draws.
+
+  The mean is accumulated as a running sum. A quantile only depends on the two
+  order statistics that it interpolates between, so for each quantile only the
+  smallest or the largest values of every cell are kept between batches,
+  whichever are fewer. The result equals `get_central_tendency_and_ci()` of the
+  concatenated batches.
+
+  For the credible interval, the memory held between batches is a fraction
+  `1 - confidence_level` of the samples. The median however is exact, so
+  that with `include_median=True` half of the samples of every cell are kept,
+  and the memory is only halved compared to holding all the samples.
+  """
+
+  def __init__(
+      self,
+      n_samples: int,
+      confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
+      include_median: bool = False,
+      axis: tuple[int, ...] = (0, 1),
+  ):
+    """Initializes the reducer.
+
+    Args:
+      n_samples: Total number of samples of each cell over all batches, for
+        example `n_chains * n_draws`.
+      confidence_level: Confidence level for computing credible intervals,
+        represented as a value between zero and one.
+      include_median: A boolean flag indicating whether to calculate and include
+        the median in the output.
+      axis: Axes of each batch along which the samples are laid out.
+    """
+    self._n_samples = n_samples
+    self._axis = axis
+    self._quantiles = [(1 - confidence_level) / 2, (1 + confidence_level) / 2]
+    if include_median:
+      self._quantiles.insert(0, 0.5)
+    self._n_smallest = 0
+    self._n_largest = 0
+    for lower, upper, _ in self._quantile_indices():
+      if upper + 1 <= n_samples - lower:
+        self._n_smallest = max(self._n_smallest, upper + 1)
+      else:
+        self._n_largest = max(self._n_largest, n_samples - lower)
+    self._n_seen = 0
+    self._dtype = None
+    self._sum = None
+    self._has_nan = None
+    self._smallest = None
+    self._largest = None
+
+  def _quantile_indices(self) -> list[tuple[int, int, float]]:
+    """Returns the order statistics and the weight of each quantile."""
+    indices = []
+    for quantile in self._quantiles:
+      index = quantile * (self._n_samples - 1)
+      lower = int(np.floor(index))
+      upper = min(lower + 1, self._n_samples - 1)
+      indices.append((lower, upper, index - lower))
+    return indices
+
+  def update(self, batch: np.ndarray | tf.Tensor):
+    """Folds a batch of draws into the running statistics."""
+    batch = np.moveaxis(
+        np.asarray(batch), self._axis, tuple(range(len(self._axis)))
+    )
+    batch = batch.reshape((-1,) + batch.shape[len(self._axis) :])
+    batch_sum = np.sum(batch, axis=0, dtype=np.float64)
+    batch_has_nan = np.isnan(batch).any(axis=0)
+    if self._sum is None:
+      self._dtype = batch.dtype
+      self._sum = batch_sum
+      self._has_nan = batch_has_nan
+    else:
+      self._sum += batch_sum
+      self._has_nan |= batch_has_nan
+    self._n_seen += batch.shape[0]
+
+    if self._n_smallest:
+      if self._smallest is not None:
+        batch_smallest = np.concatenate([self._smallest, batch])
+      else:
+        batch_smallest = batch
+      if batch_smallest.shape[0] > self._n_smallest:
+        batch_smallest = np.partition(
+            batch_smallest, self._n_smallest - 1, axis=0
+        )[: self._n_smallest]
+      self._smallest = batch_smallest
+    if self._n_largest:
+      if self._largest is not None:
+        batch_largest = np.concatenate([self._largest, batch])
+      else:
+        batch_largest = batch
+      n_values = batch_largest.shape[0]
+      if n_values > self._n_largest:
+        batch_largest = np.partition(
+            batch_largest, n_values - self._n_largest, axis=0
+        )[n_values - self._n_largest :]
+      self._largest = batch_largest
+
+  def result(self) -> np.ndarray:
+    """Returns the mean, the optional median, and the credible interval.
+
+    Raises:
+      ValueError: If the batches folded so far do not hold `n_samples` samples.
+    """
+    if self._n_seen != self._n_samples:
+      raise ValueError(
+          f"Expected {self._n_samples} samples, but {self._n_seen} were"
+          " provided."
+      )
+    smallest = None if self._smallest is None else np.sort(self._smallest, 0)
+    largest = None if self._largest is None else np.sort(self._largest, 0)
+
+    def order_statistic(index: int) -> np.ndarray:
+      if index < self._n_smallest:
+        return smallest[index]
+      return largest[index - (self._n_samples - self._n_largest)]
+
+    metrics = [(self._sum / self._n_samples).astype(self._dtype)]
+    for lower, upper, weight in self._quantile_indices():
+      # Linear interpolation in double precision, as in `np.quantile`.
+      a = order_statistic(lower).astype(np.float64)
+      b = order_statistic(upper).astype(np.float64)
+      diff = b - a
+      quantile = np.where(
+          weight >= 0.5, b - diff * (1 - weight), a + diff * weight
+      )
+      metrics.append(np.where(self._has_nan, np.nan, quantile))
+    return np.stack(metrics, axis=-1)
+
+
 def _calc_rsquared(expected, actual):
   """Calculates r-squared between actual and expected outcome."""
   return 1 - np.nanmean((expected - actual) ** 2) / np.nanvar(actual)
@@ -290,6 +450,7 @@ def _validate_selected_times(
           f"there are time period coordinates in {comparison_arg_name}."
       )
   elif _is_str_list(selected_times):
+    input_times = set(input_times.values.tolist())
     if any(time not in input_times for time in selected_times):
       raise ValueError(
           f"`{arg_name}` must match the time dimension names from "
@@ -442,21 +603,83 @@ def _central_tendency_and_ci_by_prior_and_posterior(
     An xarray Dataset containing central tendency and confidence intervals for
     prior and posterior data for the metric.
   """
-  metrics = np.stack(
-      [
-          get_central_tendency_and_ci(
-              prior, confidence_level, include_median=include_median
-          ),
-          get_central_tendency_and_ci(
-              posterior, confidence_level, include_median=include_median
-          ),
-      ],
-      axis=-1,
+  return _prior_and_posterior_metrics_dataset(
+      prior_metrics=get_central_tendency_and_ci(
+          prior, confidence_level, include_median=include_median
+      ),
+      posterior_metrics=get_central_tendency_and_ci(
+          posterior, confidence_level, include_median=include_median
+      ),
+      metric_name=metric_name,
+      xr_dims=xr_dims,
+      xr_coords=xr_coords,
   )
+
+
+def _prior_and_posterior_metrics_dataset(
+    prior_metrics: np.ndarray,
+    posterior_metrics: np.ndarray,
+    metric_name: str,
+    xr_dims: Sequence[str],
+    xr_coords: Mapping[str, tuple[Sequence[str], Sequence[str]]],
+) -> xr.Dataset:
+  """Stacks the central tendency and CI of prior and posterior data.
+
+  Args:
+    prior_metrics: The output of `get_central_tendency_and_ci()` for the prior
+      data for the metric.
+    posterior_metrics: The output of `get_central_tendency_and_ci()` for the
+      posterior data for the metric.
+    metric_name: The name of the input metric for the computations.
+    xr_dims: A list of dimensions for the output dataset.
+    xr_coords: A dictionary with the coordinates for the output dataset.
+
+  Returns:
+    An xarray Dataset containing central tendency and confidence intervals for
+    prior and posterior data for the metric.
+  """
+  metrics = np.stack([prior_metrics, posterior_metrics], axis=-1)
   xr_data = {metric_name: (xr_dims, metrics)}
   return xr.Dataset(data_vars=xr_data, coords=xr_coords)
 
 
+def _pct_of_contribution_metrics(
+    incremental_outcome_metrics: np.ndarray,
+    mean_expected_outcome: np.ndarray,
+) -> np.ndarray:
+  """Computes the percentage of contribution metrics from the outcome metrics.
+
+  The percentage of contribution is the incremental outcome divided by the mean
+  expected outcome, which is a constant across draws. Its mean, median and
+  credible interval are therefore the scaled metrics of the incremental
+  outcome, with the interval bounds swapped where the scale is negative.
+
+  Args:
+    incremental_outcome_metrics: The output of `get_central_tendency_and_ci()`
+      for the incremental outcome, including the median.
+    mean_expected_outcome: The mean expected outcome, without the channel
+      dimension.
+
+  Returns:
+    The mean, median and credible interval of the percentage of contribution.
+  """
+  metrics = incremental_outcome_metrics / mean_expected_outcome[..., None, None]
+  metrics = metrics * 100
+  is_negative = (mean_expected_outcome < 0)[..., None]
+  ci_lo = np.where(is_negative, metrics[..., 3], metrics[..., 2])
+  ci_hi = np.where(is_negative, metrics[..., 2], metrics[..., 3])
+  return np.stack([metrics[..., 0], metrics[..., 1], ci_lo, ci_hi], axis=-1)
+
+
+def _move_evaluation_set_axis_last(mean_and_ci: np.ndarray) -> np.ndarray:
+  """Moves the leading evaluation set axis of `mean_and_ci` to the end."""
+  # The shape of the output from `get_central_tendency_and_ci` is,
+  # for example, (n_evaluation_sets(=3), n_geos, n_times, n_metrics(=3)) if no
+  # aggregations. To get the shape of (n_geos, n_times, n_metrics,
+  # n_evaluation_sets), we need to transpose the output.
+  return mean_and_ci.transpose(list(range(1, mean_and_ci.ndim)) + [0])
+
+
 def _compute_non_media_baseline(
     non_media_treatments: tf.Tensor,
     non_media_baseline_values: Sequence[float | str] | None = None,
@@ -530,204 +753,932 @@ def _compute_non_media_baseline(
   return tf.stack(baseline_list, axis=-1)
 
 
-class Analyzer:
-  """Runs calculations to analyze the raw data after fitting the model."""
+def _select_paid_channels(
+    data_tensors: DataTensors,
+    impl: Callable[..., Any],
+    channel_indices: Sequence[int],
+) -> tuple[DataTensors, Callable[..., Any]]:
+  """Restricts a paid incremental outcome kernel to a subset of channels.
 
-  def __init__(self, meridian: model.Meridian):
-    self._meridian = meridian
-    # Make the meridian object ready for methods in this analyzer that create
-    # tf.function computation graphs: it should be frozen for no more internal
-    # states mutation before those graphs execute.
-    self._meridian.populate_cached_properties()
+  Args:
+    data_tensors: `DataTensors` with the scaled `media`, `reach`, `frequency`
+      and `revenue_per_kpi` of all channels. `media` may be `None`.
+    impl: Kernel taking `data_tensors` and `dist_tensors` arguments.
+    channel_indices: Sorted indices of the channels to keep, among the media
+      channels followed by the RF channels of `data_tensors`.
 
-  def _validate_new_data_geo_dims(
-      self,
-      new_data: DataTensors,
-      var_names: Sequence[str],
-  ):
-    """Validates the geo dimension of the chosen variables from `new_data`."""
-    for var_name in var_names:
-      var = getattr(new_data, var_name)
-      if var is not None:
-        if var.shape[0] != self._meridian.n_geos:
-          raise ValueError(
-              f"New `{var_name}` is expected to have"
-              f" {self._meridian.n_geos} geos. Found {var.shape[0]} geos."
-          )
+  Returns:
+    A tuple of the `DataTensors` of the selected channels, and a kernel that
+    selects the parameters of these channels from its `dist_tensors` argument
+    before calling `impl`.
+  """
+  if list(channel_indices) != sorted(channel_indices):
+    raise ValueError("`channel_indices` must be sorted.")
+  n_media_channels = (
+      0 if data_tensors.media is None else data_tensors.media.shape[-1]
+  )
+  media_indices = [i for i in channel_indices if i < n_media_channels]
+  rf_indices = [
+      i - n_media_channels for i in channel_indices if i >= n_media_channels
+  ]
 
-  def _validate_new_data_n_channels(
-      self,
-      new_data: DataTensors,
-      var_names: Sequence[str],
-  ):
-    """Validates number of channels in the chosen variables from `new_data`."""
-    for var_name in var_names:
-      if getattr(new_data, var_name) is not None:
-        new_data_var = getattr(new_data, var_name)
-        input_data_var = getattr(self._meridian.input_data, var_name)
-        if input_data_var is None:
-          raise ValueError(
-              f"`new_data.{var_name}` not allowed because the input data does"
-              f" not have `{var_name}`."
-          )
-        elif new_data_var.shape[-1] != input_data_var.shape[-1]:
-          raise ValueError(
-              f"New `{var_name}` is expected to have"
-              f" {input_data_var.shape[-1]} channels. Found"
-              f" {new_data_var.shape[-1]} channels."
-          )
+  def _gather(
+      tensor: tf.Tensor | None, indices: Sequence[int]
+  ) -> tf.Tensor | None:
+    if tensor is None or not indices:
+      return None
+    return tf.gather(tensor, indices, axis=-1)
+
+  selected_data_tensors = DataTensors(
+      media=_gather(data_tensors.media, media_indices),
+      reach=_gather(data_tensors.reach, rf_indices),
+      frequency=_gather(data_tensors.frequency, rf_indices),
+      revenue_per_kpi=data_tensors.revenue_per_kpi,
+  )
 
-  @tf.function(jit_compile=True)
-  def _get_kpi_means(
-      self,
-      data_tensors: DataTensors,
-      dist_tensors: DistributionTensors,
-  ) -> tf.Tensor:
-    """Computes batched KPI means.
+  def selected_impl(dist_tensors: DistributionTensors, **kwargs) -> Any:
+    return impl(
+        dist_tensors=DistributionTensors(
+            alpha_m=_gather(dist_tensors.alpha_m, media_indices),
+            ec_m=_gather(dist_tensors.ec_m, media_indices),
+            slope_m=_gather(dist_tensors.slope_m, media_indices),
+            beta_gm=_gather(dist_tensors.beta_gm, media_indices),
+            alpha_rf=_gather(dist_tensors.alpha_rf, rf_indices),
+            ec_rf=_gather(dist_tensors.ec_rf, rf_indices),
+            slope_rf=_gather(dist_tensors.slope_rf, rf_indices),
+            beta_grf=_gather(dist_tensors.beta_grf, rf_indices),
+        ),
+        **kwargs,
+    )
 
-    Note that the output array has the same number of time periods as the media
-    data (lagged time periods are included).
+  return selected_data_tensors, selected_impl
 
-    Args:
-      data_tensors: A `DataTensors` container with the following tensors:
-        `media`, `reach`, `frequency`, `organic_media`, `organic_reach`,
-        `organic_frequency`, `non_media_treatments`, `controls`. The `media`,
-        `reach`, `organic_media`, `organic_reach` and `non_media_treatments`
-        tensors are assumed to be scaled by their corresponding transformers.
-      dist_tensors: A `DistributionTensors` container with the distribution
-        tensors for media, RF, organic media, organic RF, non-media treatments,
-        and controls.
 
-    Returns:
-      Tensor representing computed kpi means.
-    """
-    tau_gt = tf.expand_dims(dist_tensors.tau_g, -1) + tf.expand_dims(
-        dist_tensors.mu_t, -2
-    )
-    combined_media_transformed, combined_beta = (
-        self._get_transformed_media_and_beta(
-            data_tensors=data_tensors,
-            dist_tensors=dist_tensors,
-        )
-    )
+def _get_batch_draw_indices(
+    start_index: int, n_batch_draws: int, n_draws: int
+) -> slice | np.ndarray:
+  """Returns the indices of a batch of draws, padded to `n_batch_draws`.
 
-    result = (
-        tau_gt
-        + tf.einsum(
-            "...gtm,...gm->...gt", combined_media_transformed, combined_beta
-        )
-        + tf.einsum(
-            "...gtc,...gc->...gt",
-            data_tensors.controls,
-            dist_tensors.gamma_gc,
-        )
-    )
-    if data_tensors.non_media_treatments is not None:
-      result += tf.einsum(
-          "...gtm,...gm->...gt",
-          data_tensors.non_media_treatments,
-          dist_tensors.gamma_gn,
-      )
-    return result
+  A final batch with fewer draws is padded by repeating the last draw, so that
+  every batch has the same shape and the compiled analysis kernels are only
+  traced once. The outputs of the padded draws must be discarded.
 
-  def _check_revenue_data_exists(self, use_kpi: bool = False):
-    """Checks if the revenue data is available for the analysis.
+  Args:
+    start_index: Index of the first draw of the batch.
+    n_batch_draws: Number of draws of every batch.
+    n_draws: Total number of draws.
 
-    In the `kpi_type=NON_REVENUE` case, `revenue_per_kpi` is required to perform
-    the revenue analysis. If `revenue_per_kpi` is not defined, then the revenue
-    data is not available and the revenue analysis (`use_kpi=False`) is not
-    possible. Only the KPI analysis (`use_kpi=True`) is possible in this case.
+  Returns:
+    A slice of the draws of a full batch, or an array of draw indices for a
+    padded final batch.
+  """
+  stop_index = start_index + n_batch_draws
+  if stop_index <= n_draws:
+    return slice(start_index, stop_index)
+  return np.minimum(np.arange(start_index, stop_index), n_draws - 1)
+
+
+def _get_nbytes(value: Any) -> int:
+  """Returns the total size, in bytes, of the tensors nested in a value."""
+  return sum(
+      x.shape.num_elements() * x.dtype.size
+      for x in tf.nest.flatten(value, expand_composites=True)
+      if isinstance(x, tf.Tensor)
+  )
 
-    In the `kpi_type=REVENUE` case, KPI is equal to revenue and setting
-    `use_kpi=True` has no effect. Therefore, a warning is issued if the default
-    `False` value of `use_kpi` is overridden by the user.
 
-    Args:
-      use_kpi: A boolean flag indicating whether to use KPI instead of revenue.
+class _DataTensorsCache:
+  """Least recently used cache of scaled data tensors.
 
-    Raises:
-      ValueError: If `use_kpi` is `False` and `revenue_per_kpi` is not defined.
-      UserWarning: If `use_kpi` is `True` in the `kpi_type=REVENUE` case.
-    """
-    if self._meridian.input_data.kpi_type == constants.NON_REVENUE:
-      if not use_kpi and self._meridian.revenue_per_kpi is None:
-        raise ValueError(
-            "Revenue analysis is not available when `revenue_per_kpi` is"
-            " unknown. Set `use_kpi=True` to perform KPI analysis instead."
-        )
+  Entries are keyed by the identity of the unscaled input tensors and by the
+  other arguments the scaled tensors depend on. Each entry keeps references to
+  its input tensors, so that their ids can not be reused by other tensors while
+  the entry is cached, and a lookup also checks that the cached inputs are the
+  given objects. Tensors are immutable, so inputs with the same identity always
+  have the same values.
 
-    if self._meridian.input_data.kpi_type == constants.REVENUE:
-      # In the `kpi_type=REVENUE` case, KPI is equal to revenue and
-      # `revenue_per_kpi` is set to a tensor of 1s in the initialization of the
-      # `InputData` object.
-      assert self._meridian.revenue_per_kpi is not None
-      if use_kpi:
-        warnings.warn(
-            "Setting `use_kpi=True` has no effect when `kpi_type=REVENUE`"
-            " since in this case, KPI is equal to revenue."
-        )
+  The cache is bounded by the total size of the cached values: the least
+  recently used entries are evicted once it is exceeded, and values larger than
+  the bound are not cached.
+  """
 
-  def _get_adstock_dataframe(
+  def __init__(self, max_bytes: int):
+    """Initializes the cache.
+
+    Args:
+      max_bytes: Maximum total size, in bytes, of the cached tensors. If `0`,
+        nothing is cached.
+    """
+    if max_bytes < 0:
+      raise ValueError(
+          f"`max_bytes` must be non-negative, but got {max_bytes}."
+      )
+    self._max_bytes = max_bytes
+    self._nbytes = 0
+    self._entries: collections.OrderedDict[
+        Hashable, tuple[tuple[Any, ...], Any, int]
+    ] = collections.OrderedDict()
+
+  def get(
       self,
-      channel_type: str,
-      l_range: np.ndarray,
-      xr_dims: Sequence[str],
-      xr_coords: Mapping[str, tuple[Sequence[str], Sequence[str]]],
-      confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
-  ) -> pd.DataFrame:
-    """Computes decayed effect means and CIs for media or RF channels.
+      inputs: Sequence[Any],
+      args: Hashable,
+      compute_fn: Callable[[], Any],
+  ) -> Any:
+    """Returns the cached value for the inputs, computing it if needed.
 
     Args:
-      channel_type: Specifies `media` or `reach` for computing prior and
-        posterior decayed effects.
-      l_range: The range of time across which the adstock effect is computed.
-      xr_dims: A list of dimensions for the output dataset.
-      xr_coords: A dictionary with the coordinates for the output dataset.
-      confidence_level: Confidence level for computing credible intervals,
-        represented as a value between zero and one.
+      inputs: The tensors the value is computed from, compared by identity.
+      args: Other hashable arguments the value depends on.
+      compute_fn: Function computing the value. It is only called if the value
+        is not cached.
 
     Returns:
-      Pandas DataFrame containing the channel, time_units, distribution, ci_hi,
-      ci_lo, and mean decayed effects for either media or RF channel types.
+      The cached or computed value.
     """
-    if channel_type is constants.MEDIA:
-      prior = self._meridian.inference_data.prior.alpha_m.values[0]
-      posterior = np.reshape(
-          self._meridian.inference_data.posterior.alpha_m.values,
-          (-1, self._meridian.n_media_channels),
-      )
-    else:
-      prior = self._meridian.inference_data.prior.alpha_rf.values[0]
-      posterior = np.reshape(
-          self._meridian.inference_data.posterior.alpha_rf.values,
-          (-1, self._meridian.n_rf_channels),
-      )
+    if not self._max_bytes:
+      return compute_fn()
+    key = (tuple(id(x) for x in inputs), args)
+    entry = self._entries.get(key)
+    if entry is not None and all(
+        cached is x for cached, x in zip(entry[0], inputs)
+    ):
+      self._entries.move_to_end(key)
+      return entry[1]
+    value = compute_fn()
+    nbytes = _get_nbytes(value)
+    if nbytes > self._max_bytes:
+      return value
+    if entry is not None:
+      self._nbytes -= self._entries.pop(key)[2]
+    self._entries[key] = (tuple(inputs), value, nbytes)
+    self._nbytes += nbytes
+    while self._nbytes > self._max_bytes:
+      self._nbytes -= self._entries.popitem(last=False)[1][2]
+    return value
+
+  def clear(self):
+    """Evicts all cached entries."""
+    self._entries.clear()
+    self._nbytes = 0
+
+
+def _has_peaked(values: np.ndarray, patience: int) -> bool:
+  """Returns whether each column of `values` has peaked.
+
+  A column has peaked if its values decreased over its last `patience` rows,
+  after its maximum.
 
-    decayed_effect_prior = (
-        prior[np.newaxis, ...] ** l_range[:, np.newaxis, np.newaxis, np.newaxis]
-    )
-    decayed_effect_posterior = (
-        posterior[np.newaxis, ...]
-        ** l_range[:, np.newaxis, np.newaxis, np.newaxis]
-    )
+  Args:
+    values: Array with dimensions `(n_rows, n_columns)`.
+    patience: Number of decreasing rows after the maximum of each column.
+  """
+  if len(values) <= patience:
+    return False
+  best_idx = np.nanargmax(values, axis=0)
+  decreasing = np.all(np.diff(values[-patience - 1 :], axis=0) <= 0, axis=0)
+  return bool(np.all((len(values) - 1 - best_idx >= patience) & decreasing))
 
-    decayed_effect_prior_transpose = tf.transpose(
-        decayed_effect_prior, perm=[1, 2, 0, 3]
-    )
-    decayed_effect_posterior_transpose = tf.transpose(
-        decayed_effect_posterior, perm=[1, 2, 0, 3]
+
+def _validate_geo_shard_args(
+    geo_shard_size: int | None, n_geo_shard_workers: int
+) -> None:
+  """Validates the `geo_shard_size` and `n_geo_shard_workers` arguments."""
+  if geo_shard_size is not None and geo_shard_size < 1:
+    raise ValueError(
+        f"`geo_shard_size` must be positive, but got {geo_shard_size}."
     )
-    adstock_dataset = _central_tendency_and_ci_by_prior_and_posterior(
-        decayed_effect_prior_transpose,
-        decayed_effect_posterior_transpose,
-        constants.EFFECT,
-        xr_dims,
-        xr_coords,
-        confidence_level,
+  if n_geo_shard_workers < 1:
+    raise ValueError(
+        "`n_geo_shard_workers` must be positive, but got"
+        f" {n_geo_shard_workers}."
     )
-    return (
-        adstock_dataset[constants.EFFECT]
-        .to_dataframe()
+  if n_geo_shard_workers > 1 and geo_shard_size is None:
+    raise ValueError("`n_geo_shard_workers` requires `geo_shard_size`.")
+
+
+def _get_geo_shards(
+    geo_indices: np.ndarray, geo_shard_size: int
+) -> list[tuple[np.ndarray, int]]:
+  """Splits geo indices into shards of `geo_shard_size` geos.
+
+  A final shard with fewer geos is padded by repeating its last geo, so that
+  every shard has the same shape and the compiled analysis kernels are only
+  traced once. The outputs of the padded geos must be discarded.
+
+  Args:
+    geo_indices: Indices of the geos in `InputData.geo` to split.
+    geo_shard_size: Maximum number of geos in each shard.
+
+  Returns:
+    A list of tuples of the geo indices of a shard and the number of geos of the
+    shard that are not padding, which come first.
+  """
+  n_shard_geos = min(geo_shard_size, len(geo_indices))
+  shards = []
+  for start_index in range(0, len(geo_indices), n_shard_geos):
+    shard = geo_indices[start_index : start_index + n_shard_geos]
+    n_valid_geos = len(shard)
+    shard = np.pad(shard, (0, n_shard_geos - n_valid_geos), mode="edge")
+    shards.append((shard, n_valid_geos))
+  return shards
+
+
+def _gather_geos(
+    data_tensors: DataTensors, geo_indices: np.ndarray
+) -> DataTensors:
+  """Returns the data tensors of a shard of geos."""
+  return DataTensors(**{
+      name: tf.gather(getattr(data_tensors, name), geo_indices)
+      for name in DataTensors.__annotations__
+      if getattr(data_tensors, name) is not None
+  })
+
+
+def _data_tensors_to_arrays(
+    data_tensors: DataTensors,
+) -> dict[str, np.ndarray]:
+  """Returns the tensors of a `DataTensors` as NumPy arrays, keyed by name."""
+  return {
+      name: np.asarray(getattr(data_tensors, name))
+      for name in DataTensors.__annotations__
+      if getattr(data_tensors, name) is not None
+  }
+
+
+def _get_non_media_baseline_values(
+    non_media_treatments: tf.Tensor | None,
+    non_media_baseline_values: Sequence[float | str] | None,
+) -> list[float] | None:
+  """Returns the baseline of each non-media treatment channel as floats.
+
+  The `"min"` and `"max"` baselines are global over all geos, so they are
+  resolved before the data is split into geo shards.
+
+  Args:
+    non_media_treatments: The non-media treatment data of all geos.
+    non_media_baseline_values: The `non_media_baseline_values` argument of
+      `Analyzer.incremental_outcome()`.
+
+  Returns:
+    A list of the baseline value of each non-media treatment channel, or `None`
+    if there are no non-media treatments.
+  """
+  if non_media_treatments is None:
+    return None
+  baseline = _compute_non_media_baseline(
+      non_media_treatments=non_media_treatments,
+      non_media_baseline_values=non_media_baseline_values,
+  )
+  return [float(value) for value in np.asarray(baseline[0, 0])]
+
+
+# Analyzer of a geo shard worker process, set by the pool initializer.
+_geo_shard_worker_analyzer: "Analyzer | None" = None
+
+
+def _init_geo_shard_worker(
+    meridian: model.Meridian, batch_memory_bytes: int
+) -> None:
+  """Creates the `Analyzer` of a geo shard worker process."""
+  global _geo_shard_worker_analyzer
+  _geo_shard_worker_analyzer = Analyzer(
+      meridian, batch_memory_bytes=batch_memory_bytes
+  )
+
+
+def _run_geo_shard_in_worker(
+    shard_fn_name: str,
+    data_arrays: Mapping[str, Mapping[str, np.ndarray]],
+    **kwargs,
+) -> np.ndarray:
+  """Runs a geo shard method of the worker `Analyzer` on NumPy data."""
+  data_tensors = {
+      name: DataTensors(**arrays) for name, arrays in data_arrays.items()
+  }
+  shard_fn = getattr(_geo_shard_worker_analyzer, shard_fn_name)
+  return np.asarray(shard_fn(**data_tensors, **kwargs))
+
+
+class Analyzer:
+  """Runs calculations to analyze the raw data after fitting the model."""
+
+  def __init__(
+      self,
+      meridian: model.Meridian,
+      batch_memory_bytes: int = constants.DEFAULT_BATCH_MEMORY_BYTES,
+      data_tensors_cache_bytes: int = constants.DEFAULT_DATA_CACHE_BYTES,
+  ):
+    """Initializes the analyzer.
+
+    Args:
+      meridian: The fitted Meridian model to analyze.
+      batch_memory_bytes: Approximate upper bound, in bytes, on the memory used
+        by the intermediate tensors of a batch of draws when an analysis method
+        is called with `batch_size="auto"`.
+      data_tensors_cache_bytes: Upper bound, in bytes, on the memory used to
+        cache the scaled data tensors of recent analysis calls with the same
+        `new_data` tensors. Set it to `0` to disable the cache.
+    """
+    self._meridian = meridian
+    self._batch_memory_bytes = batch_memory_bytes
+    # Make the meridian object ready for methods in this analyzer that create
+    # tf.function computation graphs: it should be frozen for no more internal
+    # states mutation before those graphs execute.
+    self._meridian.populate_cached_properties()
+    # Scaled data tensors of recent analysis calls, and scaled counterfactual
+    # and treatment data tensors of recent `incremental_outcome()` calls.
+    self._data_tensors_cache = _DataTensorsCache(data_tensors_cache_bytes)
+
+  def _get_draws(self, use_posterior: bool) -> xr.Dataset:
+    """Returns the posterior or prior draws, restricted by `_select_draws()`."""
+    params = (
+        self._meridian.inference_data.posterior
+        if use_posterior
+        else self._meridian.inference_data.prior
+    )
+    selected_draws = _selected_draws.get()
+    if selected_draws is not None and selected_draws[0] is self:
+      params = params.isel({constants.DRAW: selected_draws[1]})
+    return params
+
+  @contextlib.contextmanager
+  def _select_draws(self, draws: slice | np.ndarray) -> Iterator[None]:
+    """Restricts the analysis methods to some of the draws of each chain.
+
+    The draws are only selected in the current context, and the `Analyzer`
+    itself is not modified.
+
+    Args:
+      draws: Indices of the draws of each chain to select.
+
+    Yields:
+      None, while the draws are selected.
+    """
+    token = _selected_draws.set((self, draws))
+    try:
+      yield
+    finally:
+      _selected_draws.reset(token)
+
+  def _resolve_batch_size(
+      self,
+      batch_size: int | str,
+      n_chains: int,
+      n_copies: int,
+      n_geos: int | None = None,
+  ) -> int:
+    """Returns the draws per chain in each batch for a `batch_size` argument.
+
+    Args:
+      batch_size: Integer representing the maximum draws per chain in each
+        batch, or `"auto"` to use the largest batch whose estimated peak memory
+        fits the memory budget of this `Analyzer`.
+      n_chains: Number of chains of the draws.
+      n_copies: Number of copies of the transformed media that the computation
+        holds at once, such as the treatment and counterfactual media.
+      n_geos: Number of geos that the computation holds, such as the geos of a
+        shard. Defaults to all the geos of the model.
+
+    Returns:
+      The maximum draws per chain in each batch.
+
+    Raises:
+      ValueError: If `batch_size` is neither a positive integer nor `"auto"`.
+    """
+    if isinstance(batch_size, str):
+      if batch_size != constants.AUTO_BATCH_SIZE:
+        raise ValueError(
+            "`batch_size` must be a positive integer or"
+            f" '{constants.AUTO_BATCH_SIZE}', but got '{batch_size}'."
+        )
+      bytes_per_draw = self._estimate_bytes_per_draw(
+          n_chains, n_copies, n_geos
+      )
+      return max(1, self._batch_memory_bytes // bytes_per_draw)
+    if batch_size < 1:
+      raise ValueError(f"`batch_size` must be positive, but got {batch_size}.")
+    return batch_size
+
+  def _estimate_bytes_per_draw(
+      self, n_chains: int, n_copies: int, n_geos: int | None = None
+  ) -> int:
+    """Estimates the peak memory of the analysis kernels per draw per chain.
+
+    The estimate is dominated by the Adstock transformation of the media of
+    all channels over `n_media_times`, which stacks `max_lag + 1` lagged
+    copies of the media unless the model uses the memory-optimized Adstock
+    kernel, plus the Adstock output itself.
+
+    Args:
+      n_chains: Number of chains of the draws.
+      n_copies: Number of copies of the transformed media that the computation
+        holds at once.
+      n_geos: Number of geos that the computation holds. Defaults to all the
+        geos of the model.
+
+    Returns:
+      The estimated number of bytes per draw per chain.
+    """
+    mmm = self._meridian
+    if n_geos is None:
+      n_geos = mmm.n_geos
+    n_channels = (
+        mmm.n_media_channels
+        + mmm.n_rf_channels
+        + mmm.n_organic_media_channels
+        + mmm.n_organic_rf_channels
+    )
+    if mmm.model_spec.adstock_memory_optimized:
+      window_size = 1
+    else:
+      window_size = min(mmm.model_spec.max_lag + 1, mmm.n_media_times)
+    n_elements = (
+        n_chains
+        * n_geos
+        * mmm.n_media_times
+        * max(n_channels, 1)
+        * (window_size + 1)
+    )
+    return n_copies * n_elements * tf.float32.size
+
+  def _run_draw_batches(
+      self,
+      batch_fn: Callable[[slice | np.ndarray, int], None],
+      use_posterior: bool,
+      batch_size: int | str,
+      n_copies: int = 1,
+      n_geos: int | None = None,
+  ) -> None:
+    """Calls `batch_fn` on each batch of draws per chain.
+
+    Every batch has `min(batch_size, n_draws)` draws per chain. The final batch
+    is padded by repeating the last draw, so that the compiled kernels are
+    called with the same shapes for every batch and are not traced again.
+
+    With `batch_size="auto"`, a batch that raises `ResourceExhaustedError` is
+    run again with half as many draws, and the remaining batches keep the
+    smaller size. `batch_fn` must therefore not keep any state of a batch
+    until its computation succeeded.
+
+    Args:
+      batch_fn: Function called with the draw indices of a batch, to be passed
+        to `_select_draws()` or used to index the draws, and the number of
+        draws of the batch that are not padding, which come first.
+      use_posterior: Boolean. If `True`, then the posterior distribution is
+        used. Otherwise, the prior distribution is used.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch, or `"auto"`.
+      n_copies: Number of copies of the transformed media that the computation
+        holds at once, used to estimate the memory of `"auto"` batches.
+      n_geos: Number of geos that the computation holds, used to estimate the
+        memory of `"auto"` batches. Defaults to all the geos of the model.
+    """
+    params = self._get_draws(use_posterior)
+    n_draws = params.draw.size
+    n_batch_draws = min(
+        self._resolve_batch_size(
+            batch_size, params.chain.size, n_copies, n_geos
+        ),
+        n_draws,
+    )
+    start_index = 0
+    while start_index < n_draws:
+      try:
+        batch_fn(
+            _get_batch_draw_indices(start_index, n_batch_draws, n_draws),
+            min(n_batch_draws, n_draws - start_index),
+        )
+      except tf.errors.ResourceExhaustedError:
+        if batch_size != constants.AUTO_BATCH_SIZE or n_batch_draws == 1:
+          raise
+        n_batch_draws = (n_batch_draws + 1) // 2
+        warnings.warn(
+            "Ran out of memory with the automatic `batch_size`. Retrying with"
+            f" {n_batch_draws} draws per chain in each batch."
+        )
+        continue
+      start_index += n_batch_draws
+
+  def _map_draw_batches(
+      self,
+      fn: Callable[[DistributionTensors], Any],
+      use_posterior: bool,
+      batch_size: int | str,
+      param_list: Sequence[str],
+      n_copies: int = 1,
+      geo_indices: np.ndarray | None = None,
+  ) -> list[Any]:
+    """Runs `fn` on the distribution tensors of each batch of draws per chain.
+
+    Args:
+      fn: Function taking the `DistributionTensors` of a batch of draws, and
+        returning a tensor or a nested structure of tensors with the draws
+        dimension at axis 1.
+      use_posterior: Boolean. If `True`, then the posterior distribution is
+        used. Otherwise, the prior distribution is used.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch, or `"auto"`.
+      param_list: Names of the parameters in the distribution tensors.
+      n_copies: Number of copies of the transformed media that `fn` holds at
+        once, used to estimate the memory of `"auto"` batches.
+      geo_indices: Optional indices of a shard of geos in `InputData.geo`. If
+        given, the parameters with a geo dimension only hold these geos, and
+        the memory of `"auto"` batches is estimated for these geos.
+
+    Returns:
+      The outputs of `fn` for each batch, without the padded draws.
+    """
+    params = self._get_draws(use_posterior)
+    if geo_indices is not None:
+      params = xr.Dataset({
+          k: (
+              params[k].isel({constants.GEO: geo_indices})
+              if constants.GEO in params[k].dims
+              else params[k]
+          )
+          for k in param_list
+      })
+    outputs = []
+
+    def batch_fn(draw_indices: slice | np.ndarray, n_valid_draws: int):
+      dist_tensors = DistributionTensors(**{
+          k: tf.convert_to_tensor(params[k][:, draw_indices, ...])
+          for k in param_list
+      })
+      outputs.append(
+          tf.nest.map_structure(
+              lambda t: t[:, :n_valid_draws], fn(dist_tensors)
+          )
+      )
+
+    self._run_draw_batches(
+        batch_fn,
+        use_posterior,
+        batch_size,
+        n_copies,
+        n_geos=None if geo_indices is None else len(geo_indices),
+    )
+    return outputs
+
+  def _run_geo_shards(
+      self,
+      shard_fn_name: str,
+      geo_shard_size: int,
+      n_workers: int,
+      selected_geos: Sequence[str] | None,
+      aggregate_geos: bool,
+      data_tensors: Mapping[str, DataTensors],
+      **kwargs,
+  ) -> tf.Tensor:
+    """Runs a geo shard method on shards of the selected geos.
+
+    Args:
+      shard_fn_name: Name of the geo shard method. It is called with the
+        `geo_indices` of a shard, padded to `geo_shard_size`, the number of geos
+        of the shard that are not padding as `n_valid_geos`, the data tensors of
+        the shard, `aggregate_geos` and `kwargs`. It must return a tensor with
+        dimensions `[n_chains, n_draws, ...]`, with the geo dimension at axis 2
+        if `aggregate_geos=False`.
+      geo_shard_size: Maximum number of geos in each shard.
+      n_workers: Number of worker processes running the shards in parallel. With
+        `1`, the shards run serially in the current process.
+      selected_geos: Optional list of the geos to include. By default, all geos
+        are included.
+      aggregate_geos: Boolean. If `True`, the outputs of the shards are summed.
+        Otherwise, they are concatenated along the geo dimension.
+      data_tensors: Mapping of argument names of the shard method to the
+        `DataTensors` of all geos, which are split into shards.
+      **kwargs: Additional keyword arguments passed to the shard method.
+
+    Returns:
+      The outputs of the shard method, summed or concatenated over the shards.
+    """
+    mmm = self._meridian
+    if selected_geos is None:
+      geo_indices = np.arange(mmm.n_geos)
+    else:
+      if any(geo not in mmm.input_data.geo for geo in selected_geos):
+        raise ValueError(
+            "`selected_geos` must match the geo dimension names from "
+            "meridian.InputData."
+        )
+      geo_indices = np.flatnonzero(
+          [geo in selected_geos for geo in mmm.input_data.geo.values]
+      )
+    shards = _get_geo_shards(geo_indices, geo_shard_size)
+    kwargs["aggregate_geos"] = aggregate_geos
+    if n_workers == 1:
+      outputs = [
+          getattr(self, shard_fn_name)(
+              geo_indices=shard,
+              n_valid_geos=n_valid_geos,
+              **{k: _gather_geos(v, shard) for k, v in data_tensors.items()},
+              **kwargs,
+          )
+          for shard, n_valid_geos in shards
+      ]
+    else:
+      # The workers are spawned rather than forked, since a forked TensorFlow
+      # runtime is not safe to use.
+      with concurrent.futures.ProcessPoolExecutor(
+          max_workers=n_workers,
+          mp_context=multiprocessing.get_context("spawn"),
+          initializer=_init_geo_shard_worker,
+          initargs=(mmm, self._batch_memory_bytes),
+      ) as pool:
+        futures = [
+            pool.submit(
+                _run_geo_shard_in_worker,
+                shard_fn_name,
+                data_arrays={
+                    k: _data_tensors_to_arrays(_gather_geos(v, shard))
+                    for k, v in data_tensors.items()
+                },
+                geo_indices=shard,
+                n_valid_geos=n_valid_geos,
+                **kwargs,
+            )
+            for shard, n_valid_geos in shards
+        ]
+        outputs = [tf.convert_to_tensor(f.result()) for f in futures]
+    if aggregate_geos:
+      return tf.add_n(outputs)
+    return tf.concat(outputs, axis=2)
+
+  def _inverse_kpi_geo_shard(
+      self, tensor: tf.Tensor, population: tf.Tensor
+  ) -> tf.Tensor:
+    """Applies `KpiTransformer.inverse()` to a tensor of a shard of geos.
+
+    Args:
+      tensor: Tensor with dimensions `[..., n_shard_geos, n_times]`.
+      population: Tensor with the population of each geo of the shard.
+
+    Returns:
+      The tensor in the original KPI scale.
+    """
+    kpi_transformer = self._meridian.kpi_transformer
+    return (
+        tensor * kpi_transformer.population_scaled_stdev
+        + kpi_transformer.population_scaled_mean
+    ) * population[:, tf.newaxis]
+
+  def _stream_central_tendency_and_ci(
+      self,
+      draws_fn: Callable[[], Mapping[str, tf.Tensor | np.ndarray]],
+      use_posterior: bool,
+      batch_size: int | str,
+      confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
+      include_median: bool = False,
+      axis: tuple[int, ...] = (0, 1),
+      mean_only: Collection[str] = (),
+  ) -> dict[str, np.ndarray]:
+    """Reduces the draws of several metrics one batch of draws at a time.
+
+    `draws_fn` is called once per batch of `batch_size` draws per chain, with
+    the analysis methods restricted to that batch. Its outputs are folded into
+    running statistics and discarded, so the draws of all batches are never
+    held in memory at once.
+
+    Args:
+      draws_fn: Function returning a mapping of metric names to draws of the
+        metric, with the chain and draw dimensions at `axis`.
+      use_posterior: Boolean. If `True`, the posterior draws are reduced.
+        Otherwise, the prior draws are reduced.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch.
+      confidence_level: Confidence level for computing credible intervals,
+        represented as a value between zero and one.
+      include_median: A boolean flag indicating whether to calculate and include
+        the median in the output.
+      axis: Axes of the chain and draw dimensions of the draws.
+      mean_only: Names of the metrics for which only the mean is computed.
+
+    Returns:
+      A mapping of metric names to the output of `get_central_tendency_and_ci()`
+      for the draws of the metric, or to the mean of the draws for the metrics
+      in `mean_only`.
+    """
+    params = self._get_draws(use_posterior)
+    n_chains = params.chain.size
+    n_draws = params.draw.size
+    reducers = {}
+    sums = {}
+
+    def batch_fn(draw_indices: slice | np.ndarray, n_valid_draws: int):
+      with self._select_draws(draw_indices):
+        batch_draws = draws_fn()
+      for name, draws in batch_draws.items():
+        if n_valid_draws < np.shape(draws)[axis[1]]:
+          draws = np.take(draws, np.arange(n_valid_draws), axis=axis[1])
+        if name in mean_only:
+          draws_sum = np.sum(draws, axis=axis, dtype=np.float64)
+          sums[name] = sums[name] + draws_sum if name in sums else draws_sum
+          continue
+        if name not in reducers:
+          reducers[name] = _StreamingCentralTendencyAndCI(
+              n_samples=n_chains * n_draws,
+              confidence_level=confidence_level,
+              include_median=include_median,
+              axis=axis,
+          )
+        reducers[name].update(draws)
+
+    self._run_draw_batches(batch_fn, use_posterior, batch_size, n_copies=2)
+    results = {name: reducer.result() for name, reducer in reducers.items()}
+    for name, draws_sum in sums.items():
+      results[name] = draws_sum / (n_chains * n_draws)
+    return results
+
+  def _validate_new_data_geo_dims(
+      self,
+      new_data: DataTensors,
+      var_names: Sequence[str],
+  ):
+    """Validates the geo dimension of the chosen variables from `new_data`."""
+    for var_name in var_names:
+      var = getattr(new_data, var_name)
+      if var is not None:
+        if var.shape[0] != self._meridian.n_geos:
+          raise ValueError(
+              f"New `{var_name}` is expected to have"
+              f" {self._meridian.n_geos} geos. Found {var.shape[0]} geos."
+          )
+
+  def _validate_new_data_n_channels(
+      self,
+      new_data: DataTensors,
+      var_names: Sequence[str],
+  ):
+    """Validates number of channels in the chosen variables from `new_data`."""
+    for var_name in var_names:
+      if getattr(new_data, var_name) is not None:
+        new_data_var = getattr(new_data, var_name)
+        input_data_var = getattr(self._meridian.input_data, var_name)
+        if input_data_var is None:
+          raise ValueError(
+              f"`new_data.{var_name}` not allowed because the input data does"
+              f" not have `{var_name}`."
+          )
+        elif new_data_var.shape[-1] != input_data_var.shape[-1]:
+          raise ValueError(
+              f"New `{var_name}` is expected to have"
+              f" {input_data_var.shape[-1]} channels. Found"
+              f" {new_data_var.shape[-1]} channels."
+          )
+
+  @tf.function(jit_compile=True)
+  def _get_kpi_means(
+      self,
+      data_tensors: DataTensors,
+      dist_tensors: DistributionTensors,
+  ) -> tf.Tensor:
+    """Computes batched KPI means.
+
+    Note that the output array has the same number of time periods as the media
+    data (lagged time periods are included).
+
+    Args:
+      data_tensors: A `DataTensors` container with the following tensors:
+        `media`, `reach`, `frequency`, `organic_media`, `organic_reach`,
+        `organic_frequency`, `non_media_treatments`, `controls`. The `media`,
+        `reach`, `organic_media`, `organic_reach` and `non_media_treatments`
+        tensors are assumed to be scaled by their corresponding transformers.
+      dist_tensors: A `DistributionTensors` container with the distribution
+        tensors for media, RF, organic media, organic RF, non-media treatments,
+        and controls.
+
+    Returns:
+      Tensor representing computed kpi means.
+    """
+    tau_gt = tf.expand_dims(dist_tensors.tau_g, -1) + tf.expand_dims(
+        dist_tensors.mu_t, -2
+    )
+    combined_media_transformed, combined_beta = (
+        self._get_transformed_media_and_beta(
+            data_tensors=data_tensors,
+            dist_tensors=dist_tensors,
+        )
+    )
+
+    result = (
+        tau_gt
+        + tf.einsum(
+            "...gtm,...gm->...gt", combined_media_transformed, combined_beta
+        )
+        + tf.einsum(
+            "...gtc,...gc->...gt",
+            data_tensors.controls,
+            dist_tensors.gamma_gc,
+        )
+    )
+    if data_tensors.non_media_treatments is not None:
+      result += tf.einsum(
+          "...gtm,...gm->...gt",
+          data_tensors.non_media_treatments,
+          dist_tensors.gamma_gn,
+      )
+    return result
+
+  def _check_revenue_data_exists(self, use_kpi: bool = False):
+    """Checks if the revenue data is available for the analysis.
+
+    In the `kpi_type=NON_REVENUE` case, `revenue_per_kpi` is required to perform
+    the revenue analysis. If `revenue_per_kpi` is not defined, then the revenue
+    data is not available and the revenue analysis (`use_kpi=False`) is not
+    possible. Only the KPI analysis (`use_kpi=True`) is possible in this case.
+
+    In the `kpi_type=REVENUE` case, KPI is equal to revenue and setting
+    `use_kpi=True` has no effect. Therefore, a warning is issued if the default
+    `False` value of `use_kpi` is overridden by the user.
+
+    Args:
+      use_kpi: A boolean flag indicating whether to use KPI instead of revenue.
+
+    Raises:
+      ValueError: If `use_kpi` is `False` and `revenue_per_kpi` is not defined.
+      UserWarning: If `use_kpi` is `True` in the `kpi_type=REVENUE` case.
+    """
+    if self._meridian.input_data.kpi_type == constants.NON_REVENUE:
+      if not use_kpi and self._meridian.revenue_per_kpi is None:
+        raise ValueError(
+            "Revenue analysis is not available when `revenue_per_kpi` is"
+            " unknown. Set `use_kpi=True` to perform KPI analysis instead."
+        )
+
+    if self._meridian.input_data.kpi_type == constants.REVENUE:
+      # In the `kpi_type=REVENUE` case, KPI is equal to revenue and
+      # `revenue_per_kpi` is set to a tensor of 1s in the initialization of the
+      # `InputData` object.
+      assert self._meridian.revenue_per_kpi is not None
+      if use_kpi:
+        warnings.warn(
+            "Setting `use_kpi=True` has no effect when `kpi_type=REVENUE`"
+            " since in this case, KPI is equal to revenue."
+        )
+
+  def _get_adstock_dataframe(
+      self,
+      channel_type: str,
+      l_range: np.ndarray,
+      xr_dims: Sequence[str],
+      xr_coords: Mapping[str, tuple[Sequence[str], Sequence[str]]],
+      confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
+  ) -> pd.DataFrame:
+    """Computes decayed effect means and CIs for media or RF channels.
+
+    Args:
+      channel_type: Specifies `media` or `reach` for computing prior and
+        posterior decayed effects.
+      l_range: The range of time across which the adstock effect is computed.
+      xr_dims: A list of dimensions for the output dataset.
+      xr_coords: A dictionary with the coordinates for the output dataset.
+      confidence_level: Confidence level for computing credible intervals,
+        represented as a value between zero and one.
+
+    Returns:
+      Pandas DataFrame containing the channel, time_units, distribution, ci_hi,
+      ci_lo, and mean decayed effects for either media or RF channel types.
+    """
+    if channel_type is constants.MEDIA:
+      prior = self._meridian.inference_data.prior.alpha_m.values[0]
+      posterior = np.reshape(
+          self._meridian.inference_data.posterior.alpha_m.values,
+          (-1, self._meridian.n_media_channels),
+      )
+    else:
+      prior = self._meridian.inference_data.prior.alpha_rf.values[0]
+      posterior = np.reshape(
+          self._meridian.inference_data.posterior.alpha_rf.values,
+          (-1, self._meridian.n_rf_channels),
+      )
+
+    decayed_effect_prior = (
+        prior[np.newaxis, ...] ** l_range[:, np.newaxis, np.newaxis, np.newaxis]
+    )
+    decayed_effect_posterior = (
+        posterior[np.newaxis, ...]
+        ** l_range[:, np.newaxis, np.newaxis, np.newaxis]
+    )
+
+    decayed_effect_prior_transpose = tf.transpose(
+        decayed_effect_prior, perm=[1, 2, 0, 3]
+    )
+    decayed_effect_posterior_transpose = tf.transpose(
+        decayed_effect_posterior, perm=[1, 2, 0, 3]
+    )
+    adstock_dataset = _central_tendency_and_ci_by_prior_and_posterior(
+        decayed_effect_prior_transpose,
+        decayed_effect_posterior_transpose,
+        constants.EFFECT,
+        xr_dims,
+        xr_coords,
+        confidence_level,
+    )
+    return (
+        adstock_dataset[constants.EFFECT]
+        .to_dataframe()
         .reset_index()
         .pivot(
             index=[
@@ -964,6 +1915,35 @@ class Analyzer:
           revenue_per_kpi=revenue_per_kpi,
       )
 
+  def _get_cached_scaled_data_tensors(
+      self,
+      new_data: DataTensors | None = None,
+      include_non_paid_channels: bool = True,
+  ) -> DataTensors:
+    """Returns `_get_scaled_data_tensors()`, cached by `new_data` identity."""
+    if new_data is None:
+      return self._get_scaled_data_tensors(
+          include_non_paid_channels=include_non_paid_channels
+      )
+    return self._data_tensors_cache.get(
+        inputs=[
+            new_data.media,
+            new_data.reach,
+            new_data.frequency,
+            new_data.organic_media,
+            new_data.organic_reach,
+            new_data.organic_frequency,
+            new_data.non_media_treatments,
+            new_data.controls,
+            new_data.revenue_per_kpi,
+        ],
+        args=("scaled", include_non_paid_channels),
+        compute_fn=lambda: self._get_scaled_data_tensors(
+            new_data=new_data,
+            include_non_paid_channels=include_non_paid_channels,
+        ),
+    )
+
   def _get_causal_param_names(
       self,
       include_non_paid_channels: bool,
@@ -1101,6 +2081,7 @@ class Analyzer:
       aggregate_times: bool = True,
       flexible_time_dim: bool = False,
       has_media_dim: bool = True,
+      geo_indices: Sequence[int] | None = None,
   ) -> tf.Tensor:
     """Filters and/or aggregates geo and time dimensions of a tensor.
 
@@ -1128,11 +2109,19 @@ class Analyzer:
         assumed to have a media dimension following the time dimension. If
         `False`, the last dimension of the tensor is assumed to be the time
         dimension.
+      geo_indices: Optional indices of the geos in `InputData.geo` that the geo
+        dimension of the tensor holds, for a tensor of a shard of the geos. The
+        outputs of the shards with `aggregate_geos=True` add up to the output of
+        the tensor of all geos. By default, the tensor holds all geos.
 
     Returns:
       A tensor with filtered and/or aggregated geo and time dimensions.
     """
     mmm = self._meridian
+    if geo_indices is None:
+      geos = mmm.input_data.geo.values
+    else:
+      geos = mmm.input_data.geo.values[np.asarray(geo_indices)]
 
     # Validate the tensor shape and determine if it has a media dimension.
     if flexible_time_dim:
@@ -1163,10 +2152,10 @@ class Analyzer:
     expected_shapes_w_media = [
         tf.TensorShape(shape)
         for shape in itertools.product(
-            [mmm.n_geos], [n_times], allowed_channel_dim
+            [len(geos)], [n_times], allowed_channel_dim
         )
     ]
-    expected_shape_wo_media = tf.TensorShape([mmm.n_geos, n_times])
+    expected_shape_wo_media = tf.TensorShape([len(geos), n_times])
     if not flexible_time_dim:
       if tensor.shape[-3:] in expected_shapes_w_media:
         has_media_dim = True
@@ -1199,7 +2188,7 @@ class Analyzer:
             "`selected_geos` must match the geo dimension names from "
             "meridian.InputData."
         )
-      geo_mask = [x in selected_geos for x in mmm.input_data.geo]
+      geo_mask = [x in selected_geos for x in geos]
       tensor = tf.boolean_mask(tensor, geo_mask, axis=geo_dim)
 
     if selected_times is not None:
@@ -1211,7 +2200,9 @@ class Analyzer:
           comparison_arg_name="`tensor`",
       )
       if _is_str_list(selected_times):
-        time_mask = [x in selected_times for x in mmm.input_data.time]
+        time_mask = mmm.input_data.time_coordinates.get_time_mask(
+            selected_times
+        )
         tensor = tf.boolean_mask(tensor, time_mask, axis=time_dim)
       elif _is_bool_list(selected_times):
         tensor = tf.boolean_mask(tensor, selected_times, axis=time_dim)
@@ -1234,7 +2225,9 @@ class Analyzer:
       aggregate_times: bool = True,
       inverse_transform_outcome: bool = True,
       use_kpi: bool = False,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      geo_shard_size: int | None = None,
+      n_geo_shard_workers: int = 1,
   ) -> tf.Tensor:
     """Calculates either prior or posterior expected outcome.
 
@@ -1305,6 +2298,18 @@ class Analyzer:
         batch. The calculation is run in batches to avoid memory exhaustion. If
         a memory error occurs, try reducing `batch_size`. The calculation will
         generally be faster with larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
+      geo_shard_size: Optional maximum number of geos in each shard. If set,
+        the expected outcome is computed for one shard of the selected geos at
+        a time, so that the intermediate tensors only hold `geo_shard_size`
+        geos, and an `"auto"` `batch_size` is estimated for a shard. The shards
+        are summed if `aggregate_geos=True`. The result matches the unsharded
+        computation up to floating point rounding.
+      n_geo_shard_workers: Number of worker processes that compute the geo
+        shards in parallel. With the default of `1`, the shards are computed
+        serially in the current process. Requires `geo_shard_size`, and the
+        model must be picklable.
 
     Returns:
       Tensor of expected outcome (either KPI or revenue, depending on the
@@ -1315,10 +2320,13 @@ class Analyzer:
       NotFittedModelError: if `sample_posterior()` (for `use_posterior=True`)
         or `sample_prior()` (for `use_posterior=False`) has not been called
         prior to calling this method.
+      ValueError: If `geo_shard_size` or `n_geo_shard_workers` is not
+        positive, or if `n_geo_shard_workers` is set without `geo_shard_size`.
     """
 
     self._check_revenue_data_exists(use_kpi)
     self._check_kpi_transformation(inverse_transform_outcome, use_kpi)
+    _validate_geo_shard_args(geo_shard_size, n_geo_shard_workers)
     if self._meridian.is_national:
       _warn_if_geo_arg_in_kwargs(
           aggregate_geos=aggregate_geos,
@@ -1331,105 +2339,189 @@ class Analyzer:
           " `expected_outcome()`."
       )
     if new_data is not None:
-      if new_data.revenue_per_kpi is not None:
-        warnings.warn(
-            "A `revenue_per_kpi` value was passed in the `new_data` argument to"
-            " the `expected_outcome()` method. This is currently not supported"
-            " and will be ignored."
-        )
-      _check_shape_matches(
-          new_data.controls, "new_controls", self._meridian.controls, "controls"
-      )
-      _check_shape_matches(
-          new_data.media,
-          "new_media",
-          self._meridian.media_tensors.media,
-          "media",
-      )
-      _check_shape_matches(
-          new_data.reach, "new_reach", self._meridian.rf_tensors.reach, "reach"
-      )
-      _check_shape_matches(
-          new_data.frequency,
-          "new_frequency",
-          self._meridian.rf_tensors.frequency,
-          "frequency",
-      )
-      _check_shape_matches(
-          new_data.organic_media,
-          "new_organic_media",
-          self._meridian.organic_media_tensors.organic_media,
-          "organic_media",
-      )
-      _check_shape_matches(
-          new_data.organic_reach,
-          "new_organic_reach",
-          self._meridian.organic_rf_tensors.organic_reach,
-          "organic_reach",
-      )
-      _check_shape_matches(
-          new_data.organic_frequency,
-          "new_organic_frequency",
-          self._meridian.organic_rf_tensors.organic_frequency,
-          "organic_frequency",
-      )
-      _check_shape_matches(
-          new_data.non_media_treatments,
-          "new_non_media_treatments",
-          self._meridian.non_media_treatments,
-          "non_media_treatments",
-      )
+      self._validate_expected_outcome_new_data(new_data)
 
-    params = (
-        self._meridian.inference_data.posterior
-        if use_posterior
-        else self._meridian.inference_data.prior
-    )
+    params = self._get_draws(use_posterior)
     # We always compute the expected outcome of all channels, including non-paid
     # channels.
-    data_tensors = self._get_scaled_data_tensors(
+    data_tensors = self._get_cached_scaled_data_tensors(
         new_data=new_data,
         include_non_paid_channels=True,
     )
 
-    n_draws = params.draw.size
+    if geo_shard_size is not None:
+      return self._run_geo_shards(
+          "_expected_outcome_geo_shard",
+          geo_shard_size=geo_shard_size,
+          n_workers=n_geo_shard_workers,
+          selected_geos=selected_geos,
+          aggregate_geos=aggregate_geos,
+          data_tensors={"data_tensors": data_tensors},
+          use_posterior=use_posterior,
+          selected_times=selected_times,
+          aggregate_times=aggregate_times,
+          inverse_transform_outcome=inverse_transform_outcome,
+          use_kpi=use_kpi,
+          batch_size=batch_size,
+      )
+
     n_chains = params.chain.size
     outcome_means = tf.zeros(
         (n_chains, 0, self._meridian.n_geos, self._meridian.n_times)
     )
-    batch_starting_indices = np.arange(n_draws, step=batch_size)
-    param_list = [
-        constants.MU_T,
-        constants.TAU_G,
-        constants.GAMMA_GC,
-    ] + self._get_causal_param_names(include_non_paid_channels=True)
-    outcome_means_temps = []
-    for start_index in batch_starting_indices:
-      stop_index = np.min([n_draws, start_index + batch_size])
-      batch_dists = {
-          k: tf.convert_to_tensor(params[k][:, start_index:stop_index, ...])
-          for k in param_list
-      }
-      dist_tensors = DistributionTensors(**batch_dists)
-
-      outcome_means_temps.append(
-          self._get_kpi_means(
-              data_tensors=data_tensors,
-              dist_tensors=dist_tensors,
-          )
-      )
-    outcome_means = tf.concat([outcome_means, *outcome_means_temps], axis=1)
-    if inverse_transform_outcome:
-      outcome_means = self._meridian.kpi_transformer.inverse(outcome_means)
-      if not use_kpi:
-        outcome_means *= self._meridian.revenue_per_kpi
-
-    return self.filter_and_aggregate_geos_and_times(
-        outcome_means,
-        selected_geos=selected_geos,
-        selected_times=selected_times,
-        aggregate_geos=aggregate_geos,
-        aggregate_times=aggregate_times,
+    param_list = self._get_expected_outcome_param_names()
+    outcome_means_temps = self._map_draw_batches(
+        lambda dist_tensors: self._get_kpi_means(
+            data_tensors=data_tensors,
+            dist_tensors=dist_tensors,
+        ),
+        use_posterior,
+        batch_size,
+        param_list,
+    )
+    outcome_means = tf.concat([outcome_means, *outcome_means_temps], axis=1)
+    if inverse_transform_outcome:
+      outcome_means = self._meridian.kpi_transformer.inverse(outcome_means)
+      if not use_kpi:
+        outcome_means *= self._meridian.revenue_per_kpi
+
+    return self.filter_and_aggregate_geos_and_times(
+        outcome_means,
+        selected_geos=selected_geos,
+        selected_times=selected_times,
+        aggregate_geos=aggregate_geos,
+        aggregate_times=aggregate_times,
+    )
+
+  def _get_expected_outcome_param_names(self) -> list[str]:
+    """Returns the names of the parameters used by `_get_kpi_means()`."""
+    return [
+        constants.MU_T,
+        constants.TAU_G,
+        constants.GAMMA_GC,
+    ] + self._get_causal_param_names(include_non_paid_channels=True)
+
+  def _expected_outcome_geo_shard(
+      self,
+      geo_indices: np.ndarray,
+      n_valid_geos: int,
+      data_tensors: DataTensors,
+      use_posterior: bool,
+      selected_times: Sequence[str] | None,
+      aggregate_geos: bool,
+      aggregate_times: bool,
+      inverse_transform_outcome: bool,
+      use_kpi: bool,
+      batch_size: int | str,
+  ) -> tf.Tensor:
+    """Computes the expected outcome of a shard of geos.
+
+    Args:
+      geo_indices: Indices of the geos of the shard in `InputData.geo`.
+      n_valid_geos: Number of geos of the shard that are not padding, which come
+        first.
+      data_tensors: The scaled `DataTensors` of the geos of the shard.
+      use_posterior: See `expected_outcome()`.
+      selected_times: See `expected_outcome()`.
+      aggregate_geos: See `expected_outcome()`.
+      aggregate_times: See `expected_outcome()`.
+      inverse_transform_outcome: See `expected_outcome()`.
+      use_kpi: See `expected_outcome()`.
+      batch_size: See `expected_outcome()`.
+
+    Returns:
+      Tensor of the expected outcome of the valid geos of the shard.
+    """
+    valid_geo_indices = geo_indices[:n_valid_geos]
+
+    def batch_expected_outcome(dist_tensors: DistributionTensors):
+      outcome_means = self._get_kpi_means(
+          data_tensors=data_tensors,
+          dist_tensors=dist_tensors,
+      )[:, :, :n_valid_geos]
+      if inverse_transform_outcome:
+        outcome_means = self._inverse_kpi_geo_shard(
+            outcome_means,
+            tf.gather(self._meridian.population, valid_geo_indices),
+        )
+        if not use_kpi:
+          outcome_means *= tf.gather(
+              self._meridian.revenue_per_kpi, valid_geo_indices
+          )
+      return self.filter_and_aggregate_geos_and_times(
+          outcome_means,
+          selected_times=selected_times,
+          aggregate_geos=aggregate_geos,
+          aggregate_times=aggregate_times,
+          geo_indices=valid_geo_indices,
+      )
+
+    outcome_means = self._map_draw_batches(
+        batch_expected_outcome,
+        use_posterior,
+        batch_size,
+        self._get_expected_outcome_param_names(),
+        geo_indices=geo_indices,
+    )
+    return tf.concat(outcome_means, axis=1)
+
+  def _validate_expected_outcome_new_data(self, new_data: DataTensors):
+    """Validates the `new_data` argument of `expected_outcome()`.
+
+    Args:
+      new_data: A `DataTensors` container with optional new tensors.
+
+    Raises:
+      ValueError: If the shape of a new tensor does not match the shape of the
+        corresponding original tensor.
+    """
+    if new_data.revenue_per_kpi is not None:
+      warnings.warn(
+          "A `revenue_per_kpi` value was passed in the `new_data` argument to"
+          " the `expected_outcome()` method. This is currently not supported"
+          " and will be ignored."
+      )
+    _check_shape_matches(
+        new_data.controls, "new_controls", self._meridian.controls, "controls"
+    )
+    _check_shape_matches(
+        new_data.media,
+        "new_media",
+        self._meridian.media_tensors.media,
+        "media",
+    )
+    _check_shape_matches(
+        new_data.reach, "new_reach", self._meridian.rf_tensors.reach, "reach"
+    )
+    _check_shape_matches(
+        new_data.frequency,
+        "new_frequency",
+        self._meridian.rf_tensors.frequency,
+        "frequency",
+    )
+    _check_shape_matches(
+        new_data.organic_media,
+        "new_organic_media",
+        self._meridian.organic_media_tensors.organic_media,
+        "organic_media",
+    )
+    _check_shape_matches(
+        new_data.organic_reach,
+        "new_organic_reach",
+        self._meridian.organic_rf_tensors.organic_reach,
+        "organic_reach",
+    )
+    _check_shape_matches(
+        new_data.organic_frequency,
+        "new_organic_frequency",
+        self._meridian.organic_rf_tensors.organic_frequency,
+        "organic_frequency",
+    )
+    _check_shape_matches(
+        new_data.non_media_treatments,
+        "new_non_media_treatments",
+        self._meridian.non_media_treatments,
+        "non_media_treatments",
     )
 
   def _check_kpi_transformation(
@@ -1664,7 +2756,9 @@ class Analyzer:
       inverse_transform_outcome: bool = True,
       use_kpi: bool = False,
       include_non_paid_channels: bool = True,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      geo_shard_size: int | None = None,
+      n_geo_shard_workers: int = 1,
   ) -> tf.Tensor:
     """Calculates either the posterior or prior incremental outcome.
 
@@ -1778,6 +2872,16 @@ class Analyzer:
         batch. The calculation is run in batches to avoid memory exhaustion. If
         a memory error occurs, try reducing `batch_size`. The calculation will
         generally be faster with larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
+      geo_shard_size: Optional maximum number of geos in each shard, with the
+        same semantics as in `expected_outcome()`. Sharding bounds the memory
+        of the transformed treatment and counterfactual media, which scales
+        with the number of geos.
+      n_geo_shard_workers: Number of worker processes that compute the geo
+        shards in parallel. With the default of `1`, the shards are computed
+        serially in the current process. Requires `geo_shard_size`, and the
+        model must be picklable.
 
     Returns:
       Tensor of incremental outcome (either KPI or revenue, depending on
@@ -1794,11 +2898,13 @@ class Analyzer:
         prior to calling this method.
       ValueError: If `new_data` argument contains tensors with modified time
         dimension and not all treatment variables are provided in `new_data`
-        with matching time dimensions.
+        with matching time dimensions, or if the geo shard arguments are
+        invalid.
     """
     mmm = self._meridian
     self._check_revenue_data_exists(use_kpi)
     self._check_kpi_transformation(inverse_transform_outcome, use_kpi)
+    _validate_geo_shard_args(geo_shard_size, n_geo_shard_workers)
     if self._meridian.is_national:
       _warn_if_geo_arg_in_kwargs(
           aggregate_geos=aggregate_geos,
@@ -1962,9 +3068,138 @@ class Analyzer:
           comparison_arg_name="the media tensors",
       )
       if all(isinstance(time, str) for time in media_selected_times):
-        media_selected_times = [
-            x in media_selected_times for x in mmm.input_data.media_time
-        ]
+        media_selected_times = (
+            mmm.input_data.media_time_coordinates.get_time_mask(
+                media_selected_times
+            ).tolist()
+        )
+    data_tensors0, data_tensors1 = self._data_tensors_cache.get(
+        inputs=[
+            data_tensors.media,
+            data_tensors.reach,
+            data_tensors.frequency,
+            data_tensors.organic_media,
+            data_tensors.organic_reach,
+            data_tensors.organic_frequency,
+            data_tensors.non_media_treatments,
+            data_tensors.revenue_per_kpi,
+        ],
+        args=(
+            scaling_factor0,
+            scaling_factor1,
+            tuple(media_selected_times),
+            None
+            if non_media_baseline_values is None
+            else tuple(non_media_baseline_values),
+            include_non_paid_channels,
+        ),
+        compute_fn=lambda: self._get_counterfactual_data_tensors(
+            data_tensors=data_tensors,
+            scaling_factor0=scaling_factor0,
+            scaling_factor1=scaling_factor1,
+            media_selected_times=media_selected_times,
+            non_media_baseline_values=non_media_baseline_values,
+            include_non_paid_channels=include_non_paid_channels,
+        ),
+    )
+
+    # Calculate incremental outcome in batches.
+    param_list = self._get_causal_param_names(
+        include_non_paid_channels=include_non_paid_channels
+    )
+    dim_kwargs = {
+        "selected_geos": selected_geos,
+        "selected_times": selected_times,
+        "aggregate_geos": aggregate_geos,
+        "aggregate_times": aggregate_times,
+    }
+    incremental_outcome_kwargs = {
+        "inverse_transform_outcome": inverse_transform_outcome,
+        "use_kpi": use_kpi,
+        "non_media_baseline_values": non_media_baseline_values,
+    }
+    use_counterfactual = scaling_factor0 != 0 or not all(media_selected_times)
+    if geo_shard_size is not None:
+      return self._run_geo_shards(
+          "_incremental_outcome_geo_shard",
+          geo_shard_size=geo_shard_size,
+          n_workers=n_geo_shard_workers,
+          selected_geos=selected_geos,
+          aggregate_geos=aggregate_geos,
+          data_tensors={
+              "data_tensors0": data_tensors0,
+              "data_tensors1": data_tensors1,
+          },
+          use_counterfactual=use_counterfactual,
+          non_media_baseline_values0=_get_non_media_baseline_values(
+              data_tensors0.non_media_treatments, non_media_baseline_values
+          ),
+          non_media_baseline_values1=_get_non_media_baseline_values(
+              data_tensors1.non_media_treatments, non_media_baseline_values
+          ),
+          use_posterior=use_posterior,
+          selected_times=selected_times,
+          aggregate_times=aggregate_times,
+          inverse_transform_outcome=inverse_transform_outcome,
+          use_kpi=use_kpi,
+          include_non_paid_channels=include_non_paid_channels,
+          batch_size=batch_size,
+      )
+
+    def batch_incremental_outcome(dist_tensors: DistributionTensors):
+      incremental_outcome_temp = self._incremental_outcome_impl(
+          data_tensors=data_tensors1,
+          dist_tensors=dist_tensors,
+          **dim_kwargs,
+          **incremental_outcome_kwargs,
+      )
+      # Calculate incremental outcome under counterfactual scenario "Media_0".
+      if use_counterfactual:
+        incremental_outcome_temp -= self._incremental_outcome_impl(
+            data_tensors=data_tensors0,
+            dist_tensors=dist_tensors,
+            **dim_kwargs,
+            **incremental_outcome_kwargs,
+        )
+      return incremental_outcome_temp
+
+    incremental_outcome_temps = self._map_draw_batches(
+        batch_incremental_outcome,
+        use_posterior,
+        batch_size,
+        param_list,
+        n_copies=2 if use_counterfactual else 1,
+    )
+    return tf.concat(incremental_outcome_temps, axis=1)
+
+  def _get_counterfactual_data_tensors(
+      self,
+      data_tensors: DataTensors,
+      scaling_factor0: float,
+      scaling_factor1: float,
+      media_selected_times: Sequence[bool],
+      non_media_baseline_values: Sequence[float | str] | None,
+      include_non_paid_channels: bool,
+  ) -> tuple[DataTensors, DataTensors]:
+    """Returns the scaled counterfactual and treatment data tensors.
+
+    Args:
+      data_tensors: A `DataTensors` container with the unscaled `media`,
+        `reach`, `frequency`, `organic_media`, `organic_reach`,
+        `organic_frequency`, `non_media_treatments` and `revenue_per_kpi`
+        tensors.
+      scaling_factor0: See `incremental_outcome()`.
+      scaling_factor1: See `incremental_outcome()`.
+      media_selected_times: Boolean list with length equal to the number of
+        media time periods of `data_tensors`.
+      non_media_baseline_values: See `incremental_outcome()`.
+      include_non_paid_channels: See `incremental_outcome()`.
+
+    Returns:
+      A tuple of the scaled `DataTensors` of the counterfactual scenario
+      "Media_0" and of the treatment scenario "Media_1".
+    """
+    mmm = self._meridian
     non_media_selected_times = media_selected_times[-mmm.n_times :]
 
     # Set counterfactual media and reach tensors based on the scaling factors
@@ -2018,88 +3253,607 @@ class Analyzer:
         if data_tensors.organic_media is None
         else data_tensors.organic_media * counterfactual1
     )
-    new_organic_reach1 = (
-        None
-        if data_tensors.organic_reach is None
-        else data_tensors.organic_reach * counterfactual1
+    new_organic_reach1 = (
+        None
+        if data_tensors.organic_reach is None
+        else data_tensors.organic_reach * counterfactual1
+    )
+    new_non_media_treatments1 = (
+        None
+        if data_tensors.non_media_treatments is None
+        else data_tensors.non_media_treatments
+    )
+    data_tensors0 = self._get_scaled_data_tensors(
+        new_data=DataTensors(
+            media=new_media0,
+            reach=new_reach0,
+            frequency=data_tensors.frequency,
+            organic_media=new_organic_media0,
+            organic_reach=new_organic_reach0,
+            organic_frequency=data_tensors.organic_frequency,
+            non_media_treatments=new_non_media_treatments0,
+            revenue_per_kpi=data_tensors.revenue_per_kpi,
+        ),
+        include_non_paid_channels=include_non_paid_channels,
+    )
+    data_tensors1 = self._get_scaled_data_tensors(
+        new_data=DataTensors(
+            media=new_media1,
+            reach=new_reach1,
+            frequency=data_tensors.frequency,
+            organic_media=new_organic_media1,
+            organic_reach=new_organic_reach1,
+            organic_frequency=data_tensors.organic_frequency,
+            non_media_treatments=new_non_media_treatments1,
+            revenue_per_kpi=data_tensors.revenue_per_kpi,
+        ),
+        include_non_paid_channels=include_non_paid_channels,
+    )
+    return data_tensors0, data_tensors1
+
+  @tf.function(jit_compile=True)
+  def _incremental_outcome_geo_shard_impl(
+      self,
+      data_tensors: DataTensors,
+      dist_tensors: DistributionTensors,
+      population: tf.Tensor,
+      non_media_baseline_values: Sequence[float] | None,
+      inverse_transform_outcome: bool,
+      use_kpi: bool,
+  ) -> tf.Tensor:
+    """Computes the incremental outcome of a shard of geos on a batch of data.
+
+    Unlike `_incremental_outcome_impl()`, the outcome is neither filtered nor
+    aggregated, and the inverse KPI transformation uses the population of the
+    geos of the shard.
+
+    Args:
+      data_tensors: The `DataTensors` of the geos of the shard, as in
+        `_incremental_outcome_impl()`. The `revenue_per_kpi` tensor is required
+        if `inverse_transform_outcome=True` and `use_kpi=False`.
+      dist_tensors: The `DistributionTensors` of the geos of the shard.
+      population: Tensor with the population of each geo of the shard.
+      non_media_baseline_values: Optional list of the baseline value of each
+        non-media treatment channel, resolved over all geos.
+      inverse_transform_outcome: See `_incremental_outcome_impl()`.
+      use_kpi: See `_incremental_outcome_impl()`.
+
+    Returns:
+      Tensor of the incremental outcome with dimensions `[n_chains, n_draws,
+      n_shard_geos, n_times, n_channels]`.
+    """
+    transformed_outcome = self._get_incremental_kpi(
+        data_tensors=data_tensors,
+        dist_tensors=dist_tensors,
+        non_media_baseline_values=non_media_baseline_values,
+    )
+    if not inverse_transform_outcome:
+      return transformed_outcome
+    t1 = self._inverse_kpi_geo_shard(
+        tf.einsum("...m->m...", transformed_outcome), population
+    )
+    t2 = self._inverse_kpi_geo_shard(tf.zeros_like(t1), population)
+    kpi = tf.einsum("m...->...m", t1 - t2)
+    if use_kpi:
+      return kpi
+    return tf.einsum("gt,...gtm->...gtm", data_tensors.revenue_per_kpi, kpi)
+
+  def _incremental_outcome_geo_shard(
+      self,
+      geo_indices: np.ndarray,
+      n_valid_geos: int,
+      data_tensors0: DataTensors,
+      data_tensors1: DataTensors,
+      use_counterfactual: bool,
+      non_media_baseline_values0: Sequence[float] | None,
+      non_media_baseline_values1: Sequence[float] | None,
+      use_posterior: bool,
+      selected_times: Sequence[str] | Sequence[bool] | None,
+      aggregate_geos: bool,
+      aggregate_times: bool,
+      inverse_transform_outcome: bool,
+      use_kpi: bool,
+      include_non_paid_channels: bool,
+      batch_size: int | str,
+  ) -> tf.Tensor:
+    """Computes the incremental outcome of a shard of geos.
+
+    Args:
+      geo_indices: Indices of the geos of the shard in `InputData.geo`.
+      n_valid_geos: Number of geos of the shard that are not padding, which come
+        first.
+      data_tensors0: The scaled counterfactual `DataTensors` of the geos of the
+        shard.
+      data_tensors1: The scaled treatment `DataTensors` of the geos of the
+        shard.
+      use_counterfactual: Boolean. If `False`, the counterfactual outcome is
+        zero and `data_tensors0` is not used.
+      non_media_baseline_values0: Baseline value of each non-media treatment
+        channel in `data_tensors0`, resolved over all geos.
+      non_media_baseline_values1: Baseline value of each non-media treatment
+        channel in `data_tensors1`, resolved over all geos.
+      use_posterior: See `incremental_outcome()`.
+      selected_times: See `incremental_outcome()`.
+      aggregate_geos: See `incremental_outcome()`.
+      aggregate_times: See `incremental_outcome()`.
+      inverse_transform_outcome: See `incremental_outcome()`.
+      use_kpi: See `incremental_outcome()`.
+      include_non_paid_channels: See `incremental_outcome()`.
+      batch_size: See `incremental_outcome()`.
+
+    Returns:
+      Tensor of the incremental outcome of the valid geos of the shard.
+    """
+    impl_kwargs = {
+        "population": tf.gather(self._meridian.population, geo_indices),
+        "inverse_transform_outcome": inverse_transform_outcome,
+        "use_kpi": use_kpi,
+    }
+
+    def batch_incremental_outcome(dist_tensors: DistributionTensors):
+      incremental_outcome = self._incremental_outcome_geo_shard_impl(
+          data_tensors=data_tensors1,
+          dist_tensors=dist_tensors,
+          non_media_baseline_values=non_media_baseline_values1,
+          **impl_kwargs,
+      )
+      if use_counterfactual:
+        incremental_outcome -= self._incremental_outcome_geo_shard_impl(
+            data_tensors=data_tensors0,
+            dist_tensors=dist_tensors,
+            non_media_baseline_values=non_media_baseline_values0,
+            **impl_kwargs,
+        )
+      return self.filter_and_aggregate_geos_and_times(
+          incremental_outcome[:, :, :n_valid_geos],
+          selected_times=selected_times,
+          aggregate_geos=aggregate_geos,
+          aggregate_times=aggregate_times,
+          flexible_time_dim=True,
+          has_media_dim=True,
+          geo_indices=geo_indices[:n_valid_geos],
+      )
+
+    incremental_outcome = self._map_draw_batches(
+        batch_incremental_outcome,
+        use_posterior,
+        batch_size,
+        self._get_causal_param_names(
+            include_non_paid_channels=include_non_paid_channels
+        ),
+        n_copies=2 if use_counterfactual else 1,
+        geo_indices=geo_indices,
+    )
+    return tf.concat(incremental_outcome, axis=1)
+
+  def _paid_outcome_by_multiplier(
+      self,
+      combined_media_transformed: tf.Tensor,
+      combined_beta: tf.Tensor,
+      use_kpi: bool | None = None,
+      revenue_per_kpi: tf.Tensor | None = None,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | Sequence[bool] | None = None,
+  ) -> tf.Tensor:
+    """Applies coefficients and aggregation to multiplier-batched media.
+
+    Args:
+      combined_media_transformed: Transformed paid media with dimensions `(...,
+        n_multipliers, n_geos, n_times, n_paid_channels)`.
+      combined_beta: Paid media coefficients with dimensions `(..., n_geos,
+        n_paid_channels)`.
+      use_kpi: If True, the incremental KPI is calculated. If False, incremental
+        revenue `(KPI * revenue_per_kpi)` is calculated.
+      revenue_per_kpi: Optional tensor of revenue per kpi.
+      selected_geos: Optional list containing a subset of geos to include.
+      selected_times: Optional list containing a subset of times to include.
+
+    Returns:
+      Tensor with dimensions `(..., n_multipliers, n_paid_channels)`.
+    """
+    combined_media_kpi = tf.einsum(
+        "...kgtm,...gm->...kgtm",
+        combined_media_transformed,
+        combined_beta,
+    )
+    incremental_outcome = self._inverse_outcome(
+        combined_media_kpi,
+        use_kpi=use_kpi,
+        revenue_per_kpi=revenue_per_kpi,
+    )
+    # The channels are moved in front of the geo dimension, so that the media
+    # may be any subset of the paid channels.
+    return self.filter_and_aggregate_geos_and_times(
+        tensor=tf.einsum("...gtm->...mgt", incremental_outcome),
+        selected_geos=selected_geos,
+        selected_times=selected_times,
+        flexible_time_dim=True,
+        has_media_dim=False,
+    )
+
+  @tf.function(jit_compile=True)
+  def _paid_incremental_outcome_by_multiplier_impl(
+      self,
+      data_tensors: DataTensors,
+      dist_tensors: DistributionTensors,
+      n_multipliers: int,
+      use_kpi: bool | None = None,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | Sequence[bool] | None = None,
+  ) -> tf.Tensor:
+    """Computes paid incremental outcome for a block of media scenarios.
+
+    The multiplier dimension is folded into the geo dimension of the scaled
+    media tensors, so that a single pass of the Adstock and Hill kernels
+    evaluates every scenario in the block. It is unfolded again before the
+    geo-level coefficients are applied.
+
+    Args:
+      data_tensors: A `DataTensors` container with the scaled `media`, `reach`
+        and `frequency` tensors with dimensions `(n_multipliers * n_geos,
+        n_media_times, n_channels)` and `revenue_per_kpi`.
+      dist_tensors: A `DistributionTensors` container with the distribution
+        tensors for media and RF channels.
+      n_multipliers: Number of scenarios folded into the geo dimension.
+      use_kpi: If True, the incremental KPI is calculated. If False, incremental
+        revenue `(KPI * revenue_per_kpi)` is calculated.
+      selected_geos: Optional list containing a subset of geos to include. By
+        default, all geos are included.
+      selected_times: An optional string list containing a subset of
+        `InputData.time` to include or a boolean list with length equal to the
+        number of time periods. By default, all time periods are included.
+
+    Returns:
+      Tensor with dimensions `(n_chains, n_draws, n_multipliers,
+      n_paid_channels)`.
+    """
+    self._check_revenue_data_exists(use_kpi)
+    combined_media_transformed, combined_beta = (
+        self._get_transformed_media_and_beta(
+            data_tensors=data_tensors,
+            dist_tensors=dist_tensors,
+        )
+    )
+    combined_media_transformed = tf.reshape(
+        combined_media_transformed,
+        [
+            *combined_media_transformed.shape[:-3],
+            n_multipliers,
+            self._meridian.n_geos,
+            *combined_media_transformed.shape[-2:],
+        ],
+    )
+    return self._paid_outcome_by_multiplier(
+        combined_media_transformed=combined_media_transformed,
+        combined_beta=combined_beta,
+        use_kpi=use_kpi,
+        revenue_per_kpi=data_tensors.revenue_per_kpi,
+        selected_geos=selected_geos,
+        selected_times=selected_times,
+    )
+
+  @tf.function(jit_compile=True)
+  def _scaled_paid_incremental_outcome_impl(
+      self,
+      data_tensors: DataTensors,
+      dist_tensors: DistributionTensors,
+      multipliers: tf.Tensor,
+      use_kpi: bool | None = None,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | Sequence[bool] | None = None,
+  ) -> tf.Tensor:
+    """Computes paid incremental outcome for per-channel media multipliers.
+
+    Adstock is linear, so scaling the media of a channel before Adstock is the
+    same as scaling the Adstock output. When Hill is not applied before
+    Adstock, the Adstock transformation is therefore computed once for the
+    batch of draws, and only the Hill transformation is evaluated for each
+    multiplier. The RF transformation is linear in reach, so the transformed RF
+    is computed once and scaled by each multiplier.
+
+    Args:
+      data_tensors: A `DataTensors` container with the scaled `media`, `reach`
+        and `frequency` tensors with dimensions `(n_geos, n_media_times,
+        n_channels)` and `revenue_per_kpi`.
+      dist_tensors: A `DistributionTensors` container with the distribution
+        tensors for media and RF channels.
+      multipliers: Tensor with dimensions `(n_multipliers, n_paid_channels)`
+        containing the factors by which the media and reach of each channel are
+        scaled.
+      use_kpi: If True, the incremental KPI is calculated. If False, incremental
+        revenue `(KPI * revenue_per_kpi)` is calculated.
+      selected_geos: Optional list containing a subset of geos to include. By
+        default, all geos are included.
+      selected_times: An optional string list containing a subset of
+        `InputData.time` to include or a boolean list with length equal to the
+        number of time periods. By default, all time periods are included.
+
+    Returns:
+      Tensor with dimensions `(n_chains, n_draws, n_multipliers,
+      n_paid_channels)`.
+    """
+    self._check_revenue_data_exists(use_kpi)
+    mmm = self._meridian
+    n_media_channels = (
+        0 if data_tensors.media is None else data_tensors.media.shape[-1]
+    )
+    combined_medias = []
+    combined_betas = []
+    if data_tensors.media is not None:
+      adstocked_media = adstock_hill.AdstockTransformer(
+          alpha=dist_tensors.alpha_m,
+          max_lag=mmm.model_spec.max_lag,
+          n_times_output=mmm.n_times,
+          memory_optimized=mmm.model_spec.adstock_memory_optimized,
+      ).forward(data_tensors.media)
+      scaled_media = tf.einsum(
+          "...gtm,km->...kgtm",
+          adstocked_media,
+          multipliers[:, :n_media_channels],
+      )
+      # Fold the multiplier dimension into the geo dimension, as the Hill
+      # transformation expects the batch dimensions of its parameters.
+      media_transformed = adstock_hill.HillTransformer(
+          ec=dist_tensors.ec_m,
+          slope=dist_tensors.slope_m,
+      ).forward(
+          tf.reshape(
+              scaled_media,
+              [*scaled_media.shape[:-4], -1, *scaled_media.shape[-2:]],
+          )
+      )
+      combined_medias.append(tf.reshape(media_transformed, scaled_media.shape))
+      combined_betas.append(dist_tensors.beta_gm)
+    if data_tensors.reach is not None:
+      rf_transformed = mmm.adstock_hill_rf(
+          reach=data_tensors.reach,
+          frequency=data_tensors.frequency,
+          alpha=dist_tensors.alpha_rf,
+          ec=dist_tensors.ec_rf,
+          slope=dist_tensors.slope_rf,
+      )
+      combined_medias.append(
+          tf.einsum(
+              "...gtm,km->...kgtm",
+              rf_transformed,
+              multipliers[:, n_media_channels:],
+          )
+      )
+      combined_betas.append(dist_tensors.beta_grf)
+    return self._paid_outcome_by_multiplier(
+        combined_media_transformed=tf.concat(combined_medias, axis=-1),
+        combined_beta=tf.concat(combined_betas, axis=-1),
+        use_kpi=use_kpi,
+        revenue_per_kpi=data_tensors.revenue_per_kpi,
+        selected_geos=selected_geos,
+        selected_times=selected_times,
+    )
+
+  def _concat_over_draw_batches(
+      self,
+      impl: Callable[..., Any],
+      use_posterior: bool,
+      batch_size: int | str,
+      param_list: Sequence[str] | None = None,
+      **impl_kwargs,
+  ) -> Any:
+    """Runs a kernel over batches of draws.
+
+    Args:
+      impl: Kernel taking a `dist_tensors` argument with the distribution
+        tensors of a batch of draws, and returning a tensor or a nested
+        structure of tensors.
+      use_posterior: Boolean. If `True`, then the posterior distribution is
+        used. Otherwise, the prior distribution is used.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch.
+      param_list: Names of the parameters passed to `impl`. Defaults to the
+        paid media and RF parameters.
+      **impl_kwargs: Additional keyword arguments passed to `impl`.
+
+    Returns:
+      The outputs of `impl` concatenated along the draws dimension.
+    """
+    if param_list is None:
+      param_list = self._get_causal_param_names(include_non_paid_channels=False)
+    outputs = self._map_draw_batches(
+        lambda dist_tensors: impl(dist_tensors=dist_tensors, **impl_kwargs),
+        use_posterior,
+        batch_size,
+        param_list,
     )
-    new_non_media_treatments1 = (
-        None
-        if data_tensors.non_media_treatments is None
-        else data_tensors.non_media_treatments
+    return tf.nest.map_structure(
+        lambda *batches: tf.concat(batches, axis=1), *outputs
     )
-    data_tensors0 = self._get_scaled_data_tensors(
-        new_data=DataTensors(
-            media=new_media0,
-            reach=new_reach0,
-            frequency=data_tensors.frequency,
-            organic_media=new_organic_media0,
-            organic_reach=new_organic_reach0,
-            organic_frequency=data_tensors.organic_frequency,
-            non_media_treatments=new_non_media_treatments0,
-            revenue_per_kpi=data_tensors.revenue_per_kpi,
+
+  def _paid_incremental_outcome_by_multiplier(
+      self,
+      new_data: DataTensors,
+      use_posterior: bool = True,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | Sequence[bool] | None = None,
+      use_kpi: bool = False,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      include_media: bool = True,
+      channel_indices: Sequence[int] | None = None,
+  ) -> tf.Tensor:
+    """Calculates paid incremental outcome for a batch of media scenarios.
+
+    This is the vectorized counterpart of calling `incremental_outcome()` with
+    `include_non_paid_channels=False` once per scenario. Each scenario is a
+    slice along the leading multiplier dimension of `new_data`, and all of them
+    are evaluated in a single pass per batch of draws.
+
+    Args:
+      new_data: `DataTensors` container with the `media`, `reach` and
+        `frequency` tensors of the scenarios, each with dimensions
+        `(n_multipliers, n_geos, n_media_times, n_channels)`. Tensors that are
+        `None` are taken from the Meridian object and shared by all scenarios.
+      use_posterior: Boolean. If `True`, then the posterior distribution is
+        used. Otherwise, the prior distribution is used.
+      selected_geos: Optional list containing a subset of geos to include. By
+        default, all geos are included.
+      selected_times: Optional list containing either a subset of dates to
+        include or booleans with length equal to the number of time periods.
+        By default, all time periods are included.
+      use_kpi: Boolean. If `True`, the incremental KPI is calculated; otherwise
+        the incremental revenue is calculated.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch.
+      include_media: Boolean. If `False`, the media channels are left out and
+        only the RF channels are evaluated. `new_data.media` must then be
+        `None`.
+      channel_indices: Optional sorted indices of the channels to evaluate,
+        among the paid channels, or among the RF channels if
+        `include_media=False`. Only the data and the parameters of these
+        channels are used. By default, all channels are evaluated.
+
+    Returns:
+      Tensor of incremental outcome with dimensions `(n_chains, n_draws,
+      n_multipliers, n_channels)`, where `n_channels` is the number of paid
+      channels, or the number of RF channels if `include_media=False`, or the
+      number of `channel_indices`.
+    """
+    mmm = self._meridian
+    self._check_revenue_data_exists(use_kpi)
+    n_multipliers = None
+    for var_name in (constants.MEDIA, constants.REACH, constants.FREQUENCY):
+      tensor = getattr(new_data, var_name)
+      if tensor is not None:
+        _check_n_dims(tensor, var_name, 4)
+        n_multipliers = tensor.shape[0]
+    if n_multipliers is None:
+      raise ValueError("At least one of media, reach or frequency is required.")
+
+    def _fold(
+        tensor: tf.Tensor | None,
+        transformer: transformers.TensorTransformer | None = None,
+    ) -> tf.Tensor | None:
+      if tensor is None:
+        return None
+      if tensor.ndim == 3:
+        tensor = tf.broadcast_to(tensor, [n_multipliers, *tensor.shape])
+      if transformer is not None:
+        tensor = transformer.forward(tensor)
+      return tf.reshape(tensor, [-1, *tensor.shape[-2:]])
+
+    data_tensors = DataTensors(
+        media=_fold(
+            new_data.media
+            if new_data.media is not None
+            else mmm.media_tensors.media,
+            mmm.media_tensors.media_transformer,
+        )
+        if include_media
+        else None,
+        reach=_fold(
+            new_data.reach
+            if new_data.reach is not None
+            else mmm.rf_tensors.reach,
+            mmm.rf_tensors.reach_transformer,
         ),
-        include_non_paid_channels=include_non_paid_channels,
-    )
-    data_tensors1 = self._get_scaled_data_tensors(
-        new_data=DataTensors(
-            media=new_media1,
-            reach=new_reach1,
-            frequency=data_tensors.frequency,
-            organic_media=new_organic_media1,
-            organic_reach=new_organic_reach1,
-            organic_frequency=data_tensors.organic_frequency,
-            non_media_treatments=new_non_media_treatments1,
-            revenue_per_kpi=data_tensors.revenue_per_kpi,
+        frequency=_fold(
+            new_data.frequency
+            if new_data.frequency is not None
+            else mmm.rf_tensors.frequency
         ),
-        include_non_paid_channels=include_non_paid_channels,
-    )
-
-    # Calculate incremental outcome in batches.
-    params = (
-        self._meridian.inference_data.posterior
-        if use_posterior
-        else self._meridian.inference_data.prior
+        revenue_per_kpi=mmm.revenue_per_kpi,
     )
-    n_draws = params.draw.size
-    batch_starting_indices = np.arange(n_draws, step=batch_size)
-    param_list = self._get_causal_param_names(
-        include_non_paid_channels=include_non_paid_channels
+    impl = self._paid_incremental_outcome_by_multiplier_impl
+    if channel_indices is not None:
+      data_tensors, impl = _select_paid_channels(
+          data_tensors, impl, channel_indices
+      )
+    return self._concat_over_draw_batches(
+        impl,
+        use_posterior=use_posterior,
+        batch_size=batch_size,
+        data_tensors=data_tensors,
+        n_multipliers=n_multipliers,
+        use_kpi=use_kpi,
+        selected_geos=selected_geos,
+        selected_times=selected_times,
     )
-    incremental_outcome_temps = [None] * len(batch_starting_indices)
-    dim_kwargs = {
-        "selected_geos": selected_geos,
-        "selected_times": selected_times,
-        "aggregate_geos": aggregate_geos,
-        "aggregate_times": aggregate_times,
-    }
-    incremental_outcome_kwargs = {
-        "inverse_transform_outcome": inverse_transform_outcome,
-        "use_kpi": use_kpi,
-        "non_media_baseline_values": non_media_baseline_values,
-    }
-    for i, start_index in enumerate(batch_starting_indices):
-      stop_index = np.min([n_draws, start_index + batch_size])
-      batch_dists = {
-          k: tf.convert_to_tensor(params[k][:, start_index:stop_index, ...])
-          for k in param_list
-      }
-      dist_tensors = DistributionTensors(**batch_dists)
-      incremental_outcome_temps[i] = self._incremental_outcome_impl(
-          data_tensors=data_tensors1,
-          dist_tensors=dist_tensors,
-          **dim_kwargs,
-          **incremental_outcome_kwargs,
+
+  def _scaled_paid_incremental_outcome(
+      self,
+      multipliers: np.ndarray | tf.Tensor,
+      new_data: DataTensors | None = None,
+      use_posterior: bool = True,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | Sequence[bool] | None = None,
+      use_kpi: bool = False,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      channel_indices: Sequence[int] | None = None,
+  ) -> tf.Tensor:
+    """Calculates paid incremental outcome for per-channel media multipliers.
+
+    This gives the same result as `_paid_incremental_outcome_by_multiplier()`
+    with the media and reach of each channel scaled by `multipliers`, but
+    computes the Adstock transformation only once per batch of draws. It
+    requires that Hill is not applied before Adstock.
+
+    Args:
+      multipliers: Array with dimensions `(n_multipliers, n_channels)`
+        containing the factors by which the media and reach of each channel are
+        scaled, where `n_channels` is the number of paid channels, or the number
+        of `channel_indices`. The frequency is held fixed.
+      new_data: Optional `DataTensors` container with the base `media`, `reach`
+        and `frequency` tensors to scale. Tensors that are `None` are taken from
+        the Meridian object.
+      use_posterior: Boolean. If `True`, then the posterior distribution is
+        used. Otherwise, the prior distribution is used.
+      selected_geos: Optional list containing a subset of geos to include. By
+        default, all geos are included.
+      selected_times: Optional list containing either a subset of dates to
+        include or booleans with length equal to the number of time periods.
+        By default, all time periods are included.
+      use_kpi: Boolean. If `True`, the incremental KPI is calculated; otherwise
+        the incremental revenue is calculated.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch.
+      channel_indices: Optional sorted indices of the paid channels to
+        evaluate. Only the data and the parameters of these channels are used.
+        By default, all paid channels are evaluated.
+
+    Returns:
+      Tensor of incremental outcome with dimensions `(n_chains, n_draws,
+      n_multipliers, n_channels)`.
+
+    Raises:
+      ValueError: If the model applies Hill before Adstock.
+    """
+    if self._meridian.model_spec.hill_before_adstock:
+      raise ValueError(
+          "Scaling the Adstock output is only supported when"
+          " `hill_before_adstock=False`."
       )
-      # Calculate incremental outcome under counterfactual scenario "Media_0".
-      if scaling_factor0 != 0 or not all(media_selected_times):
-        incremental_outcome_temps[i] -= self._incremental_outcome_impl(
-            data_tensors=data_tensors0,
-            dist_tensors=dist_tensors,
-            **dim_kwargs,
-            **incremental_outcome_kwargs,
-        )
-    return tf.concat(incremental_outcome_temps, axis=1)
+    self._check_revenue_data_exists(use_kpi)
+    data_tensors = self._get_cached_scaled_data_tensors(
+        new_data=new_data,
+        include_non_paid_channels=False,
+    )
+    data_tensors = DataTensors(
+        media=data_tensors.media,
+        reach=data_tensors.reach,
+        frequency=data_tensors.frequency,
+        revenue_per_kpi=data_tensors.revenue_per_kpi,
+    )
+    impl = self._scaled_paid_incremental_outcome_impl
+    if channel_indices is not None:
+      data_tensors, impl = _select_paid_channels(
+          data_tensors, impl, channel_indices
+      )
+    return self._concat_over_draw_batches(
+        impl,
+        use_posterior=use_posterior,
+        batch_size=batch_size,
+        data_tensors=data_tensors,
+        multipliers=tf.convert_to_tensor(multipliers, dtype=tf.float32),
+        use_kpi=use_kpi,
+        selected_geos=selected_geos,
+        selected_times=selected_times,
+    )
 
   def _validate_and_fill_roi_analysis_arguments(
       self,
@@ -2265,7 +4019,8 @@ class Analyzer:
       aggregate_geos: bool = True,
       by_reach: bool = True,
       use_kpi: bool = False,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      use_gradient: bool = False,
   ) -> tf.Tensor | None:
     """Calculates the marginal ROI prior or posterior distribution.
 
@@ -2274,6 +4029,13 @@ class Analyzer:
     fraction. The mROI denominator is the corresponding small fraction of the
     channel's total spend.
 
+    With `use_gradient=True`, the mROI is instead the derivative of the
+    incremental outcome of each channel with respect to a multiplier of its
+    spend, divided by the channel's total spend. This is the limit of the
+    above as the fraction goes to zero. It is computed by forward-mode
+    automatic differentiation in a single pass over the draws, instead of two
+    passes of `incremental_outcome()`, and has no finite-difference error.
+
     If `new_data=None`, this method calculates marginal ROI conditional on the
     values of the paid media variables that the Meridian object was initialized
     with. The user can also override this historical data through the `new_data`
@@ -2294,8 +4056,8 @@ class Analyzer:
     Args:
       incremental_increase: Small fraction by which each channel's spend is
         increased when calculating its mROI numerator. The mROI denominator is
-        this fraction of the channel's total spend. Only used if marginal is
-        `True`.
+        this fraction of the channel's total spend. Ignored if
+        `use_gradient=True`.
       use_posterior: If `True` then the posterior distribution is calculated.
         Otherwise, the prior distribution is calculated.
       new_data: Optional. DataTensors containing `media`, `media_spend`,
@@ -2321,6 +4083,11 @@ class Analyzer:
         in batches to avoid memory exhaustion. If a memory error occurs, try
         reducing `batch_size`. The calculation will generally be faster with
         larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
+      use_gradient: If `True`, the mROI is computed as the derivative of the
+        incremental outcome with respect to spend, instead of a finite
+        difference over `incremental_increase`.
 
     Returns:
       Tensor of mROI values with dimensions `(n_chains, n_draws, n_geos,
@@ -2345,6 +4112,18 @@ class Analyzer:
         new_data=new_data or DataTensors(),
         **dim_kwargs,
     )
+    if use_gradient:
+      return tf.math.divide_no_nan(
+          self._marginal_incremental_outcome(
+              filled_data=filled_data,
+              use_posterior=use_posterior,
+              by_reach=by_reach,
+              use_kpi=use_kpi,
+              batch_size=batch_size,
+              **dim_kwargs,
+          ),
+          self._get_roi_denominator(filled_data, **dim_kwargs),
+      )
     incremental_outcome = self.incremental_outcome(
         new_data=filled_data,
         **incremental_outcome_kwargs,
@@ -2359,23 +4138,232 @@ class Analyzer:
         new_data=incremented_data, **dim_kwargs, **incremental_outcome_kwargs
     )
     numerator = incremental_outcome_with_multiplier - incremental_outcome
+    denominator = self._get_marginal_roi_denominator(
+        filled_data=filled_data,
+        incremental_increase=incremental_increase,
+        **dim_kwargs,
+    )
+    return tf.math.divide_no_nan(numerator, denominator)
+
+  @tf.function(jit_compile=True)
+  def _marginal_incremental_outcome_impl(
+      self,
+      data_tensors: DataTensors,
+      dist_tensors: DistributionTensors,
+      by_reach: bool = True,
+      use_kpi: bool = False,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | None = None,
+      aggregate_geos: bool = True,
+      aggregate_times: bool = True,
+      include_incremental_outcome: bool = False,
+  ) -> tf.Tensor | tuple[tf.Tensor, tf.Tensor]:
+    """Computes the derivative of paid incremental outcome on a batch of draws.
+
+    The media of each paid channel, and the reach or frequency of each RF
+    channel, is scaled by a per-channel multiplier, and the incremental outcome
+    is differentiated in forward mode at multipliers of one. The contributions
+    of the channels are additive, so the directional derivative along a vector
+    of ones is, for each channel, the derivative of its own incremental outcome
+    with respect to its own multiplier.
+
+    Args:
+      data_tensors: A `DataTensors` container with the scaled `media`, `reach`
+        and `frequency` tensors and `revenue_per_kpi`.
+      dist_tensors: A `DistributionTensors` container with the distribution
+        tensors for media and RF channels.
+      by_reach: If `True`, the reach of RF channels is scaled. Otherwise, their
+        frequency is scaled.
+      use_kpi: If `True`, the incremental KPI is differentiated. Otherwise, the
+        incremental revenue is differentiated.
+      selected_geos: Optional list containing a subset of geos to include.
+      selected_times: Optional list containing a subset of times to include.
+      aggregate_geos: If `True`, the derivative is summed over all geos.
+      aggregate_times: If `True`, the derivative is summed over all time
+        periods.
+      include_incremental_outcome: If `True`, the incremental outcome, which is
+        the primal of the forward-mode pass, is returned with the derivative.
+
+    Returns:
+      Tensor of the derivative of the incremental outcome of each paid channel
+      with dimensions `(n_chains, n_draws, n_geos, n_paid_channels)`. The
+      `n_geos` dimension is dropped if `aggregate_geos=True`. If
+      `include_incremental_outcome=True`, a tuple of the incremental outcome
+      and its derivative, with the same dimensions.
+    """
+    n_media_channels = self._meridian.n_media_channels
+    multipliers = tf.ones(
+        [n_media_channels + self._meridian.n_rf_channels], dtype=tf.float32
+    )
+    with tf.autodiff.ForwardAccumulator(
+        primals=multipliers, tangents=tf.ones_like(multipliers)
+    ) as accumulator:
+      media = data_tensors.media
+      reach = data_tensors.reach
+      frequency = data_tensors.frequency
+      if media is not None:
+        media = media * multipliers[:n_media_channels]
+      if reach is not None and by_reach:
+        reach = reach * multipliers[n_media_channels:]
+      elif reach is not None:
+        frequency = frequency * multipliers[n_media_channels:]
+      incremental_outcome = self._incremental_outcome_impl(
+          data_tensors=DataTensors(
+              media=media,
+              reach=reach,
+              frequency=frequency,
+              revenue_per_kpi=data_tensors.revenue_per_kpi,
+          ),
+          dist_tensors=dist_tensors,
+          inverse_transform_outcome=True,
+          use_kpi=use_kpi,
+          selected_geos=selected_geos,
+          selected_times=selected_times,
+          aggregate_geos=aggregate_geos,
+          aggregate_times=aggregate_times,
+      )
+    if include_incremental_outcome:
+      return incremental_outcome, accumulator.jvp(incremental_outcome)
+    return accumulator.jvp(incremental_outcome)
+
+  def _marginal_incremental_outcome(
+      self,
+      filled_data: DataTensors,
+      use_posterior: bool = True,
+      by_reach: bool = True,
+      use_kpi: bool = False,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      include_incremental_outcome: bool = False,
+      **dim_kwargs,
+  ) -> tf.Tensor | tuple[tf.Tensor, tf.Tensor]:
+    """Calculates the derivative of paid incremental outcome w.r.t. spend.
+
+    Args:
+      filled_data: `DataTensors` with the `media`, `reach`, `frequency` and
+        `revenue_per_kpi` tensors, as returned by
+        `_validate_and_fill_roi_analysis_arguments()`.
+      use_posterior: If `True`, the posterior distribution is used. Otherwise,
+        the prior distribution is used.
+      by_reach: If `True`, the reach of RF channels is scaled. Otherwise, their
+        frequency is scaled.
+      use_kpi: If `True`, the incremental KPI is differentiated. Otherwise, the
+        incremental revenue is differentiated.
+      batch_size: Maximum draws per chain in each batch.
+      include_incremental_outcome: If `True`, the incremental outcome is
+        computed in the same pass and returned with the derivative.
+      **dim_kwargs: `selected_geos`, `selected_times`, `aggregate_geos` and
+        `aggregate_times` used to aggregate the derivative.
+
+    Returns:
+      Tensor of the derivative of the incremental outcome of each paid channel
+      with respect to a multiplier of its spend, with dimensions `(n_chains,
+      n_draws, n_geos, n_paid_channels)`. The `n_geos` dimension is dropped if
+      `aggregate_geos=True`. If `include_incremental_outcome=True`, a tuple of
+      the incremental outcome and its derivative, with the same dimensions.
+    """
+    self._check_revenue_data_exists(use_kpi)
+    data_tensors = self._get_cached_scaled_data_tensors(
+        new_data=filled_data, include_non_paid_channels=False
+    )
+    return self._concat_over_draw_batches(
+        self._marginal_incremental_outcome_impl,
+        use_posterior=use_posterior,
+        batch_size=batch_size,
+        data_tensors=DataTensors(
+            media=data_tensors.media,
+            reach=data_tensors.reach,
+            frequency=data_tensors.frequency,
+            revenue_per_kpi=data_tensors.revenue_per_kpi,
+        ),
+        by_reach=by_reach,
+        use_kpi=use_kpi,
+        include_incremental_outcome=include_incremental_outcome,
+        **dim_kwargs,
+    )
+
+  def _incremental_outcome_and_marginal_roi(
+      self,
+      new_data: DataTensors,
+      use_posterior: bool = True,
+      selected_times: Sequence[str] | None = None,
+      use_kpi: bool = False,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+  ) -> tuple[tf.Tensor, tf.Tensor]:
+    """Computes the paid incremental outcome and its mROI in a single pass.
+
+    The incremental outcome is the primal of the forward-mode pass of
+    `marginal_roi(use_gradient=True)`, so both are computed from a single sweep
+    over the draws.
+
+    Args:
+      new_data: `DataTensors` with the `media`, `reach`, `frequency`,
+        `media_spend` and `rf_spend` tensors, as in `marginal_roi()`.
+      use_posterior: If `True`, the posterior distribution is used. Otherwise,
+        the prior distribution is used.
+      selected_times: Optional list containing a subset of times to include.
+      use_kpi: If `True`, the incremental KPI is computed. Otherwise, the
+        incremental revenue is computed.
+      batch_size: Maximum draws per chain in each batch.
+
+    Returns:
+      A tuple of the incremental outcome and the mROI of each paid channel,
+      with dimensions `(n_chains, n_draws, n_paid_channels)`, summed over all
+      geos and the selected times.
+    """
+    self._check_revenue_data_exists(use_kpi)
+    dim_kwargs = {
+        "selected_geos": None,
+        "selected_times": selected_times,
+        "aggregate_geos": True,
+        "aggregate_times": True,
+    }
+    filled_data = self._validate_and_fill_roi_analysis_arguments(
+        new_data=new_data, **dim_kwargs
+    )
+    incremental_outcome, marginal_outcome = self._marginal_incremental_outcome(
+        filled_data=filled_data,
+        use_posterior=use_posterior,
+        use_kpi=use_kpi,
+        batch_size=batch_size,
+        include_incremental_outcome=True,
+        **dim_kwargs,
+    )
+    return incremental_outcome, tf.math.divide_no_nan(
+        marginal_outcome, self._get_roi_denominator(filled_data, **dim_kwargs)
+    )
+
+  def _get_marginal_roi_denominator(
+      self,
+      filled_data: DataTensors,
+      incremental_increase: float,
+      **dim_kwargs,
+  ) -> tf.Tensor:
+    """Computes the incremental spend in the mROI denominator.
+
+    Args:
+      filled_data: `DataTensors` with the `media_spend` and `rf_spend` tensors,
+        as returned by `_validate_and_fill_roi_analysis_arguments()`.
+      incremental_increase: Small fraction by which each channel's spend is
+        increased.
+      **dim_kwargs: `selected_geos`, `selected_times`, `aggregate_geos` and
+        `aggregate_times` used to aggregate the spend.
+
+    Returns:
+      Tensor of the incremental spend of each paid channel.
+    """
     spend_inc = filled_data.total_spend() * incremental_increase
     if spend_inc is not None and spend_inc.ndim == 3:
-      denominator = self.filter_and_aggregate_geos_and_times(
-          spend_inc, **dim_kwargs
+      return self.filter_and_aggregate_geos_and_times(spend_inc, **dim_kwargs)
+    if not dim_kwargs.get("aggregate_geos", True):
+      # This check should not be reachable. It is here to protect against
+      # future changes to self._validate_and_fill_roi_analysis_arguments. If
+      # spend_inc.ndim is not 3 and `aggregate_geos` is `False`, then
+      # self._validate_and_fill_roi_analysis_arguments should raise an error.
+      raise ValueError(
+          "aggregate_geos must be True if spend does not have a geo "
+          "dimension."
       )
-    else:
-      if not aggregate_geos:
-        # This check should not be reachable. It is here to protect against
-        # future changes to self._validate_and_fill_roi_analysis_arguments. If
-        # spend_inc.ndim is not 3 and `aggregate_geos` is `False`, then
-        # self._validate_and_fill_roi_analysis_arguments should raise an error.
-        raise ValueError(
-            "aggregate_geos must be True if spend does not have a geo "
-            "dimension."
-        )
-      denominator = spend_inc
-    return tf.math.divide_no_nan(numerator, denominator)
+    return spend_inc
 
   def roi(
       self,
@@ -2385,7 +4373,7 @@ class Analyzer:
       selected_times: Sequence[str] | None = None,
       aggregate_geos: bool = True,
       use_kpi: bool = False,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
   ) -> tf.Tensor:
     """Calculates ROI prior or posterior distribution for each media channel.
 
@@ -2433,6 +4421,8 @@ class Analyzer:
         batch. The calculation is run in batches to avoid memory exhaustion. If
         a memory error occurs, try reducing `batch_size`. The calculation will
         generally be faster with larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
 
     Returns:
       Tensor of ROI values with dimensions `(n_chains, n_draws, n_geos,
@@ -2462,25 +4452,51 @@ class Analyzer:
         **incremental_outcome_kwargs,
         **dim_kwargs,
     )
+    denominator = self._get_roi_denominator(filled_data, **dim_kwargs)
+    return tf.math.divide_no_nan(incremental_outcome, denominator)
+
+  def _get_roi_denominator(
+      self,
+      filled_data: DataTensors,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | None = None,
+      aggregate_geos: bool = True,
+      aggregate_times: bool = True,
+  ) -> tf.Tensor:
+    """Returns the total spend of each paid channel used as ROI denominator.
 
+    Args:
+      filled_data: `DataTensors` returned by
+        `_validate_and_fill_roi_analysis_arguments()`.
+      selected_geos: Optional list containing a subset of geos to include.
+      selected_times: Optional list containing a subset of times to include.
+      aggregate_geos: Boolean. If `True`, the spend is summed over all geos.
+      aggregate_times: Boolean. If `True`, the spend is summed over all time
+        periods.
+
+    Returns:
+      Tensor of spend with dimensions `(n_paid_channels,)`, preceded by the geo
+      and time dimensions that are not aggregated.
+    """
     spend = filled_data.total_spend()
     if spend is not None and spend.ndim == 3:
-      denominator = self.filter_and_aggregate_geos_and_times(
-          spend, **dim_kwargs
+      return self.filter_and_aggregate_geos_and_times(
+          spend,
+          selected_geos=selected_geos,
+          selected_times=selected_times,
+          aggregate_geos=aggregate_geos,
+          aggregate_times=aggregate_times,
       )
-    else:
-      if not aggregate_geos:
-        # This check should not be reachable. It is here to protect against
-        # future changes to self._validate_and_fill_roi_analysis_arguments. If
-        # spend_inc.ndim is not 3 and either of `aggregate_geos` or
-        # `aggregate_times` is `False`, then
-        # self._validate_and_fill_roi_analysis_arguments should raise an error.
-        raise ValueError(
-            "aggregate_geos must be True if spend does not have a geo "
-            "dimension."
-        )
-      denominator = spend
-    return tf.math.divide_no_nan(incremental_outcome, denominator)
+    if not aggregate_geos:
+      # This check should not be reachable. It is here to protect against
+      # future changes to self._validate_and_fill_roi_analysis_arguments. If
+      # spend_inc.ndim is not 3 and either of `aggregate_geos` or
+      # `aggregate_times` is `False`, then
+      # self._validate_and_fill_roi_analysis_arguments should raise an error.
+      raise ValueError(
+          "aggregate_geos must be True if spend does not have a geo dimension."
+      )
+    return spend
 
   def cpik(
       self,
@@ -2489,7 +4505,7 @@ class Analyzer:
       selected_geos: Sequence[str] | None = None,
       selected_times: Sequence[str] | None = None,
       aggregate_geos: bool = True,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
   ) -> tf.Tensor:
     """Calculates the cost per incremental KPI distribution for each channel.
 
@@ -2538,6 +4554,8 @@ class Analyzer:
         batch. The calculation is run in batches to avoid memory exhaustion. If
         a memory error occurs, try reducing `batch_size`. The calculation will
         generally be faster with larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
 
     Returns:
       Tensor of CPIK values with dimensions `(n_chains, n_draws, n_geos,
@@ -2587,34 +4605,56 @@ class Analyzer:
         `aggregate_times=True`.
     """
 
+    draws = self._aggregate_draws_by_eval_set(
+        draws, split_by_holdout, aggregate_geos, aggregate_times
+    )
     if not split_by_holdout:
-      draws = self.filter_and_aggregate_geos_and_times(
-          draws, aggregate_geos=aggregate_geos, aggregate_times=aggregate_times
-      )
       return get_central_tendency_and_ci(
           draws, confidence_level=confidence_level
       )
 
+    mean_and_ci = get_central_tendency_and_ci(
+        draws, confidence_level=confidence_level, axis=(1, 2)
+    )
+    return _move_evaluation_set_axis_last(mean_and_ci)
+
+  def _aggregate_draws_by_eval_set(
+      self,
+      draws: tf.Tensor,
+      split_by_holdout: bool,
+      aggregate_geos: bool = True,
+      aggregate_times: bool = True,
+  ) -> tf.Tensor:
+    """Aggregates `draws`, split by `holdout_id` if needed.
+
+    Args:
+      draws: A tensor of a set of draws with dimensions `(n_chains, n_draws,
+        n_geos, n_times)`.
+      split_by_holdout: Boolean. If `True` and `holdout_id` exists, the data is
+        split into `'Train'`, `'Test'`, and `'All Data'` subsections.
+      aggregate_geos: If `True`, the draws tensor is summed over all regions.
+      aggregate_times: If `True`, the draws tensor is summed over all times.
+
+    Returns:
+      The aggregated draws, with a leading `n_evaluation_sets` dimension if
+      `split_by_holdout=True`.
+    """
+    if not split_by_holdout:
+      return self.filter_and_aggregate_geos_and_times(
+          draws, aggregate_geos=aggregate_geos, aggregate_times=aggregate_times
+      )
+
     train_draws = np.where(self._meridian.model_spec.holdout_id, np.nan, draws)
     test_draws = np.where(self._meridian.model_spec.holdout_id, draws, np.nan)
     draws_by_evaluation_set = np.stack(
         [train_draws, test_draws, draws], axis=0
     )  # shape (n_evaluation_sets(=3), n_chains, n_draws, n_geos, n_times)
-    draws_by_evaluation_set = self.filter_and_aggregate_geos_and_times(
+    return self.filter_and_aggregate_geos_and_times(
         draws_by_evaluation_set,
         aggregate_geos=aggregate_geos,
         aggregate_times=aggregate_times,
     )  # shape (n_evaluation_sets(=3), n_chains, n_draws, ...)
 
-    # The shape of the output from `get_central_tendency_and_ci` is,
-    # for example, (n_evaluation_sets(=3), n_geos, n_times, n_metrics(=3)) if no
-    # aggregations. To get the shape of (n_geos, n_times, n_metrics,
-    # n_evaluation_sets), we need to transpose the output.
-    mean_and_ci = get_central_tendency_and_ci(
-        draws_by_evaluation_set, confidence_level=confidence_level, axis=(1, 2)
-    )
-    return mean_and_ci.transpose(list(range(1, mean_and_ci.ndim)) + [0])
-
   def _can_split_by_holdout_id(self, split_by_holdout_id: bool) -> bool:
     """Returns whether the data can be split by holdout_id."""
     if split_by_holdout_id and self._meridian.model_spec.holdout_id is None:
@@ -2633,6 +4673,8 @@ class Analyzer:
       split_by_holdout_id: bool = False,
       non_media_baseline_values: Sequence[str | float] | None = None,
       confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
+      stream_draws: bool = False,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
   ) -> xr.Dataset:
     """Calculates the data for the expected versus actual outcome over time.
 
@@ -2652,6 +4694,17 @@ class Analyzer:
         channel.
       confidence_level: Confidence level for expected outcome credible
         intervals, represented as a value between zero and one. Default: `0.9`.
+      stream_draws: Boolean. If `True`, each batch of draws is folded into the
+        mean and credible intervals and then discarded, instead of first
+        collecting the expected and baseline outcome of all draws. The result
+        is the same, but the peak memory no longer grows with the number of
+        draws.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch. The calculation is run in batches to avoid memory exhaustion. If
+        a memory error occurs, try reducing `batch_size`. With
+        `stream_draws=True`, this is also the number of draws per chain folded
+        at a time. Use `"auto"` to select the largest batch that fits the
+        memory budget of the `Analyzer`.
 
     Returns:
       A dataset with the expected, baseline, and actual outcome metrics.
@@ -2659,31 +4712,80 @@ class Analyzer:
     mmm = self._meridian
     use_kpi = self._meridian.input_data.revenue_per_kpi is None
     can_split_by_holdout = self._can_split_by_holdout_id(split_by_holdout_id)
-    expected_outcome = self.expected_outcome(
-        aggregate_geos=False, aggregate_times=False, use_kpi=use_kpi
-    )
+    if stream_draws:
 
-    expected = self._mean_and_ci_by_eval_set(
-        expected_outcome,
-        can_split_by_holdout,
-        aggregate_geos,
-        aggregate_times,
-        confidence_level,
-    )
+      def get_expected_and_baseline_draws() -> dict[str, tf.Tensor]:
+        expected_outcome = self.expected_outcome(
+            aggregate_geos=False,
+            aggregate_times=False,
+            use_kpi=use_kpi,
+            batch_size=batch_size,
+        )
+        baseline_expected_outcome = self._calculate_baseline_expected_outcome(
+            aggregate_geos=False,
+            aggregate_times=False,
+            use_kpi=use_kpi,
+            non_media_baseline_values=non_media_baseline_values,
+            batch_size=batch_size,
+        )
+        return {
+            constants.EXPECTED: self._aggregate_draws_by_eval_set(
+                expected_outcome,
+                can_split_by_holdout,
+                aggregate_geos,
+                aggregate_times,
+            ),
+            constants.BASELINE: self._aggregate_draws_by_eval_set(
+                baseline_expected_outcome,
+                can_split_by_holdout,
+                aggregate_geos,
+                aggregate_times,
+            ),
+        }
 
-    baseline_expected_outcome = self._calculate_baseline_expected_outcome(
-        aggregate_geos=False,
-        aggregate_times=False,
-        use_kpi=use_kpi,
-        non_media_baseline_values=non_media_baseline_values,
-    )
-    baseline = self._mean_and_ci_by_eval_set(
-        baseline_expected_outcome,
-        can_split_by_holdout,
-        aggregate_geos,
-        aggregate_times,
-        confidence_level,
-    )
+      metrics = self._stream_central_tendency_and_ci(
+          get_expected_and_baseline_draws,
+          use_posterior=True,
+          batch_size=batch_size,
+          confidence_level=confidence_level,
+          axis=(1, 2) if can_split_by_holdout else (0, 1),
+      )
+      if can_split_by_holdout:
+        metrics = {
+            k: _move_evaluation_set_axis_last(v) for k, v in metrics.items()
+        }
+      expected = metrics[constants.EXPECTED]
+      baseline = metrics[constants.BASELINE]
+    else:
+      expected_outcome = self.expected_outcome(
+          aggregate_geos=False,
+          aggregate_times=False,
+          use_kpi=use_kpi,
+          batch_size=batch_size,
+      )
+
+      expected = self._mean_and_ci_by_eval_set(
+          expected_outcome,
+          can_split_by_holdout,
+          aggregate_geos,
+          aggregate_times,
+          confidence_level,
+      )
+
+      baseline_expected_outcome = self._calculate_baseline_expected_outcome(
+          aggregate_geos=False,
+          aggregate_times=False,
+          use_kpi=use_kpi,
+          non_media_baseline_values=non_media_baseline_values,
+          batch_size=batch_size,
+      )
+      baseline = self._mean_and_ci_by_eval_set(
+          baseline_expected_outcome,
+          can_split_by_holdout,
+          aggregate_geos,
+          aggregate_times,
+          confidence_level,
+      )
     actual = np.asarray(
         self.filter_and_aggregate_geos_and_times(
             mmm.kpi if use_kpi else mmm.kpi * mmm.revenue_per_kpi,
@@ -2875,6 +4977,337 @@ class Analyzer:
         axis=-1,
     )
 
+  @tf.function(jit_compile=True)
+  def _summary_metrics_impl(
+      self,
+      data_tensors: DataTensors,
+      dist_tensors: DistributionTensors,
+      incremented_data_tensors: DataTensors | None = None,
+      non_media_scaled_baseline: tf.Tensor | None = None,
+      use_kpi: bool = False,
+      include_non_paid_channels: bool = True,
+      selected_geos: Sequence[str] | None = None,
+      selected_times: Sequence[str] | None = None,
+      aggregate_geos: bool = True,
+      aggregate_times: bool = True,
+  ) -> dict[str, tf.Tensor]:
+    """Evaluates the summary metric outcomes on a batch of draws.
+
+    The media of all channels is transformed once, and the per-channel
+    contributions are shared by the expected outcome, the incremental outcome
+    and KPI, and the baseline of the mROI scenario. Only the incremented paid
+    media of the mROI scenario is transformed a second time.
+
+    Args:
+      data_tensors: A `DataTensors` container with the scaled data tensors of
+        all channels, the `controls` and the `revenue_per_kpi` used for the
+        incremental outcome.
+      dist_tensors: A `DistributionTensors` container with the distribution
+        tensors of all channels, `mu_t`, `tau_g` and `gamma_gc`.
+      incremented_data_tensors: Optional `DataTensors` container with the
+        scaled `media`, `reach` and `frequency` tensors of the mROI scenario.
+        If `None`, the mROI and CPIK outcomes are not computed.
+      non_media_scaled_baseline: Baseline of the scaled non-media treatments.
+      use_kpi: If `True`, the KPI is calculated. If `False`, the revenue is
+        calculated.
+      include_non_paid_channels: If `True`, the incremental outcome includes
+        the non-paid channels.
+      selected_geos: Optional list containing a subset of geos to include.
+      selected_times: Optional list containing a subset of times to include.
+      aggregate_geos: If `True`, the outcomes are summed over all geos.
+      aggregate_times: If `True`, the outcomes are summed over all time
+        periods. The mROI outcomes are always summed over time.
+
+    Returns:
+      A dictionary with the expected outcome and the incremental outcome of
+      each channel. If `incremented_data_tensors` is provided, it also contains
+      the incremental KPI of each paid channel, and the changes of the
+      incremental outcome of each paid channel and of the expected outcome in
+      the mROI scenario.
+    """
+    mmm = self._meridian
+    n_paid_channels = mmm.n_media_channels + mmm.n_rf_channels
+    dim_kwargs = {
+        "selected_geos": selected_geos,
+        "selected_times": selected_times,
+        "aggregate_geos": aggregate_geos,
+        "aggregate_times": aggregate_times,
+    }
+    marginal_dim_kwargs = {
+        "selected_geos": selected_geos,
+        "selected_times": selected_times,
+        "aggregate_geos": aggregate_geos,
+    }
+
+    combined_media_transformed, combined_beta = (
+        self._get_transformed_media_and_beta(
+            data_tensors=data_tensors,
+            dist_tensors=dist_tensors,
+        )
+    )
+    media_kpi = tf.einsum(
+        "...gtm,...gm->...gtm", combined_media_transformed, combined_beta
+    )
+    kpi_means = (
+        tf.expand_dims(dist_tensors.tau_g, -1)
+        + tf.expand_dims(dist_tensors.mu_t, -2)
+        + tf.reduce_sum(media_kpi, axis=-1)
+        + tf.einsum(
+            "...gtc,...gc->...gt",
+            data_tensors.controls,
+            dist_tensors.gamma_gc,
+        )
+    )
+    if include_non_paid_channels:
+      incremental_kpi = media_kpi
+    else:
+      incremental_kpi = media_kpi[..., :n_paid_channels]
+    if data_tensors.non_media_treatments is not None:
+      kpi_means += tf.einsum(
+          "...gtm,...gm->...gt",
+          data_tensors.non_media_treatments,
+          dist_tensors.gamma_gn,
+      )
+      if include_non_paid_channels:
+        non_media_kpi = tf.einsum(
+            "gtn,...gn->...gtn",
+            data_tensors.non_media_treatments - non_media_scaled_baseline,
+            dist_tensors.gamma_gn,
+        )
+        incremental_kpi = tf.concat([incremental_kpi, non_media_kpi], axis=-1)
+
+    expected_outcome = mmm.kpi_transformer.inverse(kpi_means)
+    if not use_kpi:
+      expected_outcome *= mmm.revenue_per_kpi
+    outputs = {
+        constants.INCREMENTAL_OUTCOME: self.filter_and_aggregate_geos_and_times(
+            tensor=self._inverse_outcome(
+                incremental_kpi,
+                use_kpi=use_kpi,
+                revenue_per_kpi=data_tensors.revenue_per_kpi,
+            ),
+            flexible_time_dim=True,
+            has_media_dim=True,
+            **dim_kwargs,
+        ),
+        constants.EXPECTED: self.filter_and_aggregate_geos_and_times(
+            expected_outcome, **dim_kwargs
+        ),
+    }
+    if incremented_data_tensors is None:
+      return outputs
+
+    paid_media_kpi = media_kpi[..., :n_paid_channels]
+    incremented_media_transformed, paid_beta = (
+        self._get_transformed_media_and_beta(
+            data_tensors=incremented_data_tensors,
+            dist_tensors=dist_tensors,
+        )
+    )
+    marginal_kpi = (
+        tf.einsum(
+            "...gtm,...gm->...gtm", incremented_media_transformed, paid_beta
+        )
+        - paid_media_kpi
+    )
+    incremented_expected_outcome = mmm.kpi_transformer.inverse(
+        kpi_means + tf.reduce_sum(marginal_kpi, axis=-1)
+    )
+    if not use_kpi:
+      incremented_expected_outcome *= mmm.revenue_per_kpi
+    outputs[_INCREMENTAL_KPI] = self.filter_and_aggregate_geos_and_times(
+        tensor=self._inverse_outcome(
+            paid_media_kpi,
+            use_kpi=True,
+            revenue_per_kpi=data_tensors.revenue_per_kpi,
+        ),
+        flexible_time_dim=True,
+        has_media_dim=True,
+        **dim_kwargs,
+    )
+    # As in `marginal_roi()`, the mROI scenario uses the original revenue per
+    # KPI.
+    outputs[_MARGINAL_OUTCOME] = self.filter_and_aggregate_geos_and_times(
+        tensor=self._inverse_outcome(
+            marginal_kpi, use_kpi=use_kpi, revenue_per_kpi=None
+        ),
+        flexible_time_dim=True,
+        has_media_dim=True,
+        **marginal_dim_kwargs,
+    )
+    outputs[_MARGINAL_EXPECTED_OUTCOME] = (
+        self.filter_and_aggregate_geos_and_times(
+            incremented_expected_outcome - expected_outcome,
+            **marginal_dim_kwargs,
+        )
+    )
+    return outputs
+
+  def _get_fused_summary_metrics_draws_fn(
+      self,
+      new_data: DataTensors | None = None,
+      marginal_roi_by_reach: bool = True,
+      marginal_roi_incremental_increase: float = 0.01,
+      use_kpi: bool = False,
+      include_non_paid_channels: bool = True,
+      non_media_baseline_values: Sequence[str | float] | None = None,
+      spend_with_total: tf.Tensor | None = None,
+      impressions_with_total: tf.Tensor | None = None,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      **dim_kwargs,
+  ) -> Callable[[bool], dict[str, tf.Tensor]]:
+    """Returns a function computing the draws of the summary metrics.
+
+    The data tensors are validated, filled, and scaled once, and are shared by
+    the prior and the posterior. The returned function evaluates every metric
+    on each batch of draws in a single pass of `_summary_metrics_impl()`,
+    instead of separate passes for the incremental outcome, the expected
+    outcome, the mROI and the CPIK.
+
+    Args:
+      new_data: Optional `DataTensors` container with new data tensors.
+      marginal_roi_by_reach: Boolean. If `True`, the mROI of RF channels is
+        calculated by reach. Otherwise, by frequency.
+      marginal_roi_incremental_increase: Small fraction by which each channel's
+        spend is increased when calculating its mROI numerator.
+      use_kpi: If `True`, the metrics are calculated using KPI. If `False`, the
+        metrics are calculated using revenue.
+      include_non_paid_channels: If `True`, the non-paid channels are included.
+      non_media_baseline_values: Optional baseline values of the non-media
+        treatments.
+      spend_with_total: Spend of each paid channel and of all paid channels.
+        If provided, together with `aggregate_times=True`, the ROI, mROI and
+        CPIK draws are computed.
+      impressions_with_total: Impressions of each channel and of all channels.
+        Used for the effectiveness if `aggregate_times=True`.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch.
+      **dim_kwargs: `selected_geos`, `selected_times`, `aggregate_geos` and
+        `aggregate_times`.
+
+    Returns:
+      A function of `use_posterior` returning a dictionary of the draws of the
+      incremental outcome, the expected outcome, and, depending on the
+      arguments, the effectiveness, ROI, mROI and CPIK.
+    """
+    mmm = self._meridian
+    self._check_revenue_data_exists(use_kpi)
+    use_kpi = use_kpi or mmm.input_data.revenue_per_kpi is None
+    if mmm.is_national:
+      _warn_if_geo_arg_in_kwargs(
+          aggregate_geos=dim_kwargs.get("aggregate_geos"),
+          selected_geos=dim_kwargs.get("selected_geos"),
+      )
+    if new_data is not None:
+      self._validate_expected_outcome_new_data(new_data)
+
+    aggregate_times = dim_kwargs.get("aggregate_times", True)
+    data_tensors = self._get_cached_scaled_data_tensors(
+        new_data=new_data,
+        include_non_paid_channels=True,
+    )
+    non_media_scaled_baseline = None
+    if data_tensors.non_media_treatments is not None:
+      non_media_scaled_baseline = _compute_non_media_baseline(
+          non_media_treatments=data_tensors.non_media_treatments,
+          non_media_baseline_values=non_media_baseline_values,
+      )
+    incremented_data_tensors = None
+    marginal_roi_denominator = None
+    if spend_with_total is not None and aggregate_times:
+      marginal_dim_kwargs = {
+          "selected_geos": dim_kwargs.get("selected_geos"),
+          "selected_times": dim_kwargs.get("selected_times"),
+          "aggregate_geos": dim_kwargs.get("aggregate_geos", True),
+          "aggregate_times": True,
+      }
+      # As in `marginal_roi()`, the mROI denominator uses the original spend.
+      filled_data = self._validate_and_fill_roi_analysis_arguments(
+          new_data=self._fill_missing_data_tensors(
+              new_data, [constants.MEDIA, constants.REACH, constants.FREQUENCY]
+          ),
+          **marginal_dim_kwargs,
+      )
+      incremented_data = self._get_scaled_data_tensors(
+          new_data=_scale_tensors_by_multiplier(
+              data=filled_data,
+              multiplier=1 + marginal_roi_incremental_increase,
+              by_reach=marginal_roi_by_reach,
+          ),
+          include_non_paid_channels=False,
+      )
+      incremented_data_tensors = DataTensors(
+          media=incremented_data.media,
+          reach=incremented_data.reach,
+          frequency=incremented_data.frequency,
+      )
+      marginal_roi_denominator = self._get_marginal_roi_denominator(
+          filled_data=filled_data,
+          incremental_increase=marginal_roi_incremental_increase,
+          **marginal_dim_kwargs,
+      )
+
+    def get_summary_metrics_draws(use_posterior: bool) -> dict[str, tf.Tensor]:
+      dist_type = constants.POSTERIOR if use_posterior else constants.PRIOR
+      if dist_type not in mmm.inference_data.groups():
+        raise model.NotFittedModelError(
+            f"sample_{dist_type}() must be called prior to calling this"
+            " method."
+        )
+      outputs = self._concat_over_draw_batches(
+          self._summary_metrics_impl,
+          use_posterior=use_posterior,
+          batch_size=batch_size,
+          param_list=[
+              constants.MU_T,
+              constants.TAU_G,
+              constants.GAMMA_GC,
+          ]
+          + self._get_causal_param_names(include_non_paid_channels=True),
+          data_tensors=data_tensors,
+          incremented_data_tensors=incremented_data_tensors,
+          non_media_scaled_baseline=non_media_scaled_baseline,
+          use_kpi=use_kpi,
+          include_non_paid_channels=include_non_paid_channels,
+          **dim_kwargs,
+      )
+      incremental_outcome = outputs[constants.INCREMENTAL_OUTCOME]
+      incremental_outcome = tf.concat(
+          [
+              incremental_outcome,
+              tf.reduce_sum(incremental_outcome, -1, keepdims=True),
+          ],
+          axis=-1,
+      )
+      draws = {
+          constants.INCREMENTAL_OUTCOME: incremental_outcome,
+          constants.EXPECTED: outputs[constants.EXPECTED],
+      }
+      if aggregate_times:
+        draws[constants.EFFECTIVENESS] = (
+            incremental_outcome / impressions_with_total
+        )
+      if incremented_data_tensors is not None:
+        draws[constants.ROI] = incremental_outcome / spend_with_total
+        mroi = tf.math.divide_no_nan(
+            outputs[_MARGINAL_OUTCOME], marginal_roi_denominator
+        )
+        mroi_total = outputs[_MARGINAL_EXPECTED_OUTCOME] / (
+            marginal_roi_incremental_increase * spend_with_total[..., -1]
+        )
+        draws[constants.MROI] = tf.concat([mroi, mroi_total[..., None]], -1)
+        incremental_kpi = outputs[_INCREMENTAL_KPI]
+        draws[constants.CPIK] = spend_with_total / tf.concat(
+            [
+                incremental_kpi,
+                tf.reduce_sum(incremental_kpi, -1, keepdims=True),
+            ],
+            axis=-1,
+        )
+      return draws
+
+    return get_summary_metrics_draws
+
   def summary_metrics(
       self,
       new_data: DataTensors | None = None,
@@ -2887,9 +5320,12 @@ class Analyzer:
       optimal_frequency: Sequence[float] | None = None,
       use_kpi: bool = False,
       confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
       include_non_paid_channels: bool = False,
       non_media_baseline_values: Sequence[str | float] | None = None,
+      stream_draws: bool = False,
+      fused_evaluation: bool = False,
+      marginal_roi_use_gradient: bool = False,
   ) -> xr.Dataset:
     """Returns summary metrics.
 
@@ -2950,6 +5386,8 @@ class Analyzer:
         batch. The calculation is run in batches to avoid memory exhaustion. If
         a memory error occurs, try reducing `batch_size`. The calculation will
         generally be faster with larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
       include_non_paid_channels: Boolean. If `True`, non-paid channels (organic
         media, organic reach and frequency, and non-media treatments) are
         included in the summary but only the metrics independent of spend are
@@ -2963,6 +5401,25 @@ class Analyzer:
         as baseline for the values of the given non_media treatment channel). If
         None, the minimum value is used as baseline for each non_media treatment
         channel.
+      stream_draws: Boolean. If `True`, all metrics are computed for one batch
+        of `batch_size` draws at a time, and each batch is folded into the
+        mean, median and credible intervals and then discarded. The result is
+        the same, and the intermediate tensors are only held for one batch,
+        which matters with `aggregate_geos=False` or `aggregate_times=False`.
+        The exact median still keeps half of the draws of every metric
+        between batches, so that the memory of the metric draws is only
+        halved.
+      fused_evaluation: Boolean. If `True`, the data tensors are scaled once and
+        shared by the prior and the posterior, and all metrics are evaluated on
+        each batch of draws in a single pass that transforms the media once,
+        instead of separate passes for the incremental outcome, the expected
+        outcome, the mROI and the CPIK. The result is the same up to floating
+        point rounding.
+      marginal_roi_use_gradient: Boolean. If `True`, the mROI is the derivative
+        of the incremental outcome with respect to spend, computed in a single
+        pass as in `marginal_roi(use_gradient=True)`, and
+        `marginal_roi_incremental_increase` is ignored. Not supported together
+        with `fused_evaluation`.
 
     Returns:
       An `xr.Dataset` with coordinates: `channel`, `metric` (`mean`, `median`,
@@ -2975,7 +5432,16 @@ class Analyzer:
       `roi`, `mroi`, `cpik`, and `effectiveness` metrics are not reported
       when `aggregate_times=False` because they do not have a clear
       interpretation by time period.
+
+    Raises:
+      ValueError: If both `fused_evaluation` and `marginal_roi_use_gradient`
+        are `True`.
     """
+    if fused_evaluation and marginal_roi_use_gradient:
+      raise ValueError(
+          "`marginal_roi_use_gradient` is not supported together with"
+          " `fused_evaluation`."
+      )
     dim_kwargs = {
         "selected_geos": selected_geos,
         "selected_times": selected_times,
@@ -2986,53 +5452,20 @@ class Analyzer:
         "selected_geos": selected_geos,
         "selected_times": selected_times,
         "aggregate_geos": aggregate_geos,
-    }
-    batched_kwargs = {"batch_size": batch_size}
-    aggregated_impressions = self.get_aggregated_impressions(
-        new_data=new_data,
-        optimal_frequency=optimal_frequency,
-        include_non_paid_channels=include_non_paid_channels,
-        **dim_kwargs,
-    )
-    impressions_with_total = tf.concat(
-        [
-            aggregated_impressions,
-            tf.reduce_sum(aggregated_impressions, -1, keepdims=True),
-        ],
-        axis=-1,
-    )
-
-    incremental_outcome_prior = self.compute_incremental_outcome_aggregate(
-        use_posterior=False,
-        new_data=new_data,
-        use_kpi=use_kpi,
-        include_non_paid_channels=include_non_paid_channels,
-        non_media_baseline_values=non_media_baseline_values,
-        **dim_kwargs,
-        **batched_kwargs,
-    )
-    incremental_outcome_posterior = self.compute_incremental_outcome_aggregate(
-        use_posterior=True,
-        new_data=new_data,
-        use_kpi=use_kpi,
-        include_non_paid_channels=include_non_paid_channels,
-        non_media_baseline_values=non_media_baseline_values,
-        **dim_kwargs,
-        **batched_kwargs,
-    )
-    expected_outcome_prior = self.expected_outcome(
-        use_posterior=False,
-        new_data=new_data,
-        use_kpi=use_kpi,
-        **dim_kwargs,
-        **batched_kwargs,
-    )
-    expected_outcome_posterior = self.expected_outcome(
-        use_posterior=True,
+    }
+    batched_kwargs = {"batch_size": batch_size}
+    aggregated_impressions = self.get_aggregated_impressions(
         new_data=new_data,
-        use_kpi=use_kpi,
+        optimal_frequency=optimal_frequency,
+        include_non_paid_channels=include_non_paid_channels,
         **dim_kwargs,
-        **batched_kwargs,
+    )
+    impressions_with_total = tf.concat(
+        [
+            aggregated_impressions,
+            tf.reduce_sum(aggregated_impressions, -1, keepdims=True),
+        ],
+        axis=-1,
     )
 
     xr_dims = (
@@ -3085,37 +5518,295 @@ class Analyzer:
         ),
         **xr_coords,
     }
-    incremental_outcome = _central_tendency_and_ci_by_prior_and_posterior(
-        prior=incremental_outcome_prior,
-        posterior=incremental_outcome_posterior,
-        metric_name=constants.INCREMENTAL_OUTCOME,
-        xr_dims=xr_dims_with_ci_and_distribution,
-        xr_coords=xr_coords_with_ci_and_distribution,
-        confidence_level=confidence_level,
-        include_median=True,
-    )
-    pct_of_contribution = self._compute_pct_of_contribution(
-        incremental_outcome_prior=incremental_outcome_prior,
-        incremental_outcome_posterior=incremental_outcome_posterior,
-        expected_outcome_prior=expected_outcome_prior,
-        expected_outcome_posterior=expected_outcome_posterior,
-        xr_dims=xr_dims_with_ci_and_distribution,
-        xr_coords=xr_coords_with_ci_and_distribution,
-        confidence_level=confidence_level,
-    )
-    effectiveness = self._compute_effectiveness_aggregate(
-        incremental_outcome_prior=incremental_outcome_prior,
-        incremental_outcome_posterior=incremental_outcome_posterior,
-        impressions_with_total=impressions_with_total,
-        xr_dims=xr_dims_with_ci_and_distribution,
-        xr_coords=xr_coords_with_ci_and_distribution,
-        confidence_level=confidence_level,
-        # Drop effectiveness metric values in the Dataset's data_vars for the
-        # aggregated "All Paid Channels" channel dimension value. The
-        # "Effectiveness" metric has no meaningful interpretation in this case
-        # because the media execution metric is generally not consistent across
-        # channels.
-    ).where(lambda ds: ds.channel != constants.ALL_CHANNELS)
+
+    spend_with_total = None
+    if not include_non_paid_channels:
+      spend_list = []
+      new_spend_tensors = self._fill_missing_data_tensors(
+          new_data, [constants.MEDIA_SPEND, constants.RF_SPEND]
+      )
+      if self._meridian.n_media_channels > 0:
+        spend_list.append(new_spend_tensors.media_spend)
+      if self._meridian.n_rf_channels > 0:
+        spend_list.append(new_spend_tensors.rf_spend)
+      # TODO Add support for 1-dimensional spend.
+      aggregated_spend = self.filter_and_aggregate_geos_and_times(
+          tensor=tf.concat(spend_list, axis=-1), **dim_kwargs
+      )
+      spend_with_total = tf.concat(
+          [
+              aggregated_spend,
+              tf.reduce_sum(aggregated_spend, -1, keepdims=True),
+          ],
+          axis=-1,
+      )
+    # ROI, mROI, and CPIK are only reported for paid channels, and together with
+    # Effectiveness only if `aggregate_times=True`.
+    include_spend_metrics = not include_non_paid_channels and aggregate_times
+
+    def get_summary_metrics_draws(use_posterior: bool) -> dict[str, Any]:
+      incremental_outcome = self.compute_incremental_outcome_aggregate(
+          use_posterior=use_posterior,
+          new_data=new_data,
+          use_kpi=use_kpi,
+          include_non_paid_channels=include_non_paid_channels,
+          non_media_baseline_values=non_media_baseline_values,
+          **dim_kwargs,
+          **batched_kwargs,
+      )
+      expected_outcome = self.expected_outcome(
+          use_posterior=use_posterior,
+          new_data=new_data,
+          use_kpi=use_kpi,
+          **dim_kwargs,
+          **batched_kwargs,
+      )
+      draws = {
+          constants.INCREMENTAL_OUTCOME: incremental_outcome,
+          constants.EXPECTED: expected_outcome,
+      }
+      if aggregate_times:
+        draws[constants.EFFECTIVENESS] = (
+            incremental_outcome / impressions_with_total
+        )
+      if include_spend_metrics:
+        draws[constants.ROI] = incremental_outcome / spend_with_total
+        draws[constants.MROI] = self._compute_marginal_roi_draws(
+            use_posterior=use_posterior,
+            marginal_roi_by_reach=marginal_roi_by_reach,
+            marginal_roi_incremental_increase=marginal_roi_incremental_increase,
+            expected_revenue=expected_outcome,
+            spend_with_total=spend_with_total,
+            new_data=new_data,
+            use_kpi=use_kpi,
+            marginal_roi_use_gradient=marginal_roi_use_gradient,
+            **dim_kwargs_wo_agg_times,
+            **batched_kwargs,
+        )
+        draws[constants.CPIK] = (
+            spend_with_total
+            / self.compute_incremental_outcome_aggregate(
+                use_posterior=use_posterior,
+                new_data=new_data,
+                use_kpi=True,
+                include_non_paid_channels=False,
+                **dim_kwargs,
+                **batched_kwargs,
+            )
+        )
+      return draws
+
+    if fused_evaluation:
+      draws_fn = self._get_fused_summary_metrics_draws_fn(
+          new_data=new_data,
+          marginal_roi_by_reach=marginal_roi_by_reach,
+          marginal_roi_incremental_increase=marginal_roi_incremental_increase,
+          use_kpi=use_kpi,
+          include_non_paid_channels=include_non_paid_channels,
+          non_media_baseline_values=non_media_baseline_values,
+          spend_with_total=spend_with_total,
+          impressions_with_total=impressions_with_total,
+          batch_size=batch_size,
+          **dim_kwargs,
+      )
+    else:
+      draws_fn = get_summary_metrics_draws
+
+    if stream_draws:
+      prior_metrics, posterior_metrics = [
+          self._stream_central_tendency_and_ci(
+              functools.partial(draws_fn, use_posterior=use_posterior),
+              use_posterior=use_posterior,
+              batch_size=batch_size,
+              confidence_level=confidence_level,
+              include_median=True,
+              mean_only=[constants.EXPECTED],
+          )
+          for use_posterior in (False, True)
+      ]
+      prior_metrics[constants.PCT_OF_CONTRIBUTION] = (
+          _pct_of_contribution_metrics(
+              prior_metrics[constants.INCREMENTAL_OUTCOME],
+              prior_metrics[constants.EXPECTED],
+          )
+      )
+      posterior_metrics[constants.PCT_OF_CONTRIBUTION] = (
+          _pct_of_contribution_metrics(
+              posterior_metrics[constants.INCREMENTAL_OUTCOME],
+              posterior_metrics[constants.EXPECTED],
+          )
+      )
+      metrics = {
+          metric_name: _prior_and_posterior_metrics_dataset(
+              prior_metrics=prior_metrics[metric_name],
+              posterior_metrics=posterior_metrics[metric_name],
+              metric_name=metric_name,
+              xr_dims=xr_dims_with_ci_and_distribution,
+              xr_coords=xr_coords_with_ci_and_distribution,
+          )
+          for metric_name in posterior_metrics
+          if metric_name != constants.EXPECTED
+      }
+    elif fused_evaluation:
+      prior_draws, posterior_draws = draws_fn(False), draws_fn(True)
+      metrics = {
+          metric_name: _central_tendency_and_ci_by_prior_and_posterior(
+              prior=prior_draws[metric_name],
+              posterior=posterior_draws[metric_name],
+              metric_name=metric_name,
+              xr_dims=xr_dims_with_ci_and_distribution,
+              xr_coords=xr_coords_with_ci_and_distribution,
+              confidence_level=confidence_level,
+              include_median=True,
+          )
+          for metric_name in posterior_draws
+          if metric_name != constants.EXPECTED
+      }
+      metrics[constants.PCT_OF_CONTRIBUTION] = (
+          self._compute_pct_of_contribution(
+              incremental_outcome_prior=prior_draws[
+                  constants.INCREMENTAL_OUTCOME
+              ],
+              incremental_outcome_posterior=posterior_draws[
+                  constants.INCREMENTAL_OUTCOME
+              ],
+              expected_outcome_prior=prior_draws[constants.EXPECTED],
+              expected_outcome_posterior=posterior_draws[constants.EXPECTED],
+              xr_dims=xr_dims_with_ci_and_distribution,
+              xr_coords=xr_coords_with_ci_and_distribution,
+              confidence_level=confidence_level,
+          )
+      )
+    else:
+      incremental_outcome_prior = self.compute_incremental_outcome_aggregate(
+          use_posterior=False,
+          new_data=new_data,
+          use_kpi=use_kpi,
+          include_non_paid_channels=include_non_paid_channels,
+          non_media_baseline_values=non_media_baseline_values,
+          **dim_kwargs,
+          **batched_kwargs,
+      )
+      incremental_outcome_posterior = (
+          self.compute_incremental_outcome_aggregate(
+              use_posterior=True,
+              new_data=new_data,
+              use_kpi=use_kpi,
+              include_non_paid_channels=include_non_paid_channels,
+              non_media_baseline_values=non_media_baseline_values,
+              **dim_kwargs,
+              **batched_kwargs,
+          )
+      )
+      expected_outcome_prior = self.expected_outcome(
+          use_posterior=False,
+          new_data=new_data,
+          use_kpi=use_kpi,
+          **dim_kwargs,
+          **batched_kwargs,
+      )
+      expected_outcome_posterior = self.expected_outcome(
+          use_posterior=True,
+          new_data=new_data,
+          use_kpi=use_kpi,
+          **dim_kwargs,
+          **batched_kwargs,
+      )
+
+      metrics = {}
+      metrics[constants.INCREMENTAL_OUTCOME] = (
+          _central_tendency_and_ci_by_prior_and_posterior(
+              prior=incremental_outcome_prior,
+              posterior=incremental_outcome_posterior,
+              metric_name=constants.INCREMENTAL_OUTCOME,
+              xr_dims=xr_dims_with_ci_and_distribution,
+              xr_coords=xr_coords_with_ci_and_distribution,
+              confidence_level=confidence_level,
+              include_median=True,
+          )
+      )
+      metrics[constants.PCT_OF_CONTRIBUTION] = (
+          self._compute_pct_of_contribution(
+              incremental_outcome_prior=incremental_outcome_prior,
+              incremental_outcome_posterior=incremental_outcome_posterior,
+              expected_outcome_prior=expected_outcome_prior,
+              expected_outcome_posterior=expected_outcome_posterior,
+              xr_dims=xr_dims_with_ci_and_distribution,
+              xr_coords=xr_coords_with_ci_and_distribution,
+              confidence_level=confidence_level,
+          )
+      )
+      if aggregate_times:
+        metrics[constants.EFFECTIVENESS] = (
+            self._compute_effectiveness_aggregate(
+                incremental_outcome_prior=incremental_outcome_prior,
+                incremental_outcome_posterior=incremental_outcome_posterior,
+                impressions_with_total=impressions_with_total,
+                xr_dims=xr_dims_with_ci_and_distribution,
+                xr_coords=xr_coords_with_ci_and_distribution,
+                confidence_level=confidence_level,
+            )
+        )
+      if include_spend_metrics:
+        metrics[constants.ROI] = self._compute_roi_aggregate(
+            incremental_outcome_prior=incremental_outcome_prior,
+            incremental_outcome_posterior=incremental_outcome_posterior,
+            xr_dims=xr_dims_with_ci_and_distribution,
+            xr_coords=xr_coords_with_ci_and_distribution,
+            confidence_level=confidence_level,
+            spend_with_total=spend_with_total,
+        )
+        metrics[constants.MROI] = self._compute_marginal_roi_aggregate(
+            marginal_roi_by_reach=marginal_roi_by_reach,
+            marginal_roi_incremental_increase=marginal_roi_incremental_increase,
+            expected_revenue_prior=expected_outcome_prior,
+            expected_revenue_posterior=expected_outcome_posterior,
+            xr_dims=xr_dims_with_ci_and_distribution,
+            xr_coords=xr_coords_with_ci_and_distribution,
+            confidence_level=confidence_level,
+            spend_with_total=spend_with_total,
+            new_data=new_data,
+            use_kpi=use_kpi,
+            marginal_roi_use_gradient=marginal_roi_use_gradient,
+            **dim_kwargs_wo_agg_times,
+            **batched_kwargs,
+        )
+        metrics[constants.CPIK] = self._compute_cpik_aggregate(
+            incremental_kpi_prior=self.compute_incremental_outcome_aggregate(
+                use_posterior=False,
+                new_data=new_data,
+                use_kpi=True,
+                include_non_paid_channels=False,
+                **dim_kwargs,
+                **batched_kwargs,
+            ),
+            incremental_kpi_posterior=(
+                self.compute_incremental_outcome_aggregate(
+                    use_posterior=True,
+                    new_data=new_data,
+                    use_kpi=True,
+                    include_non_paid_channels=False,
+                    **dim_kwargs,
+                    **batched_kwargs,
+                )
+            ),
+            spend_with_total=spend_with_total,
+            xr_dims=xr_dims_with_ci_and_distribution,
+            xr_coords=xr_coords_with_ci_and_distribution,
+            confidence_level=confidence_level,
+        )
+
+    incremental_outcome = metrics[constants.INCREMENTAL_OUTCOME]
+    pct_of_contribution = metrics[constants.PCT_OF_CONTRIBUTION]
+    if aggregate_times:
+      # Drop effectiveness metric values in the Dataset's data_vars for the
+      # aggregated "All Paid Channels" channel dimension value. The
+      # "Effectiveness" metric has no meaningful interpretation in this case
+      # because the media execution metric is generally not consistent across
+      # channels.
+      effectiveness = metrics[constants.EFFECTIVENESS].where(
+          lambda ds: ds.channel != constants.ALL_CHANNELS
+      )
 
     if include_non_paid_channels:
       # If non-paid channels are included, return only the non-paid metrics.
@@ -3140,22 +5831,6 @@ class Analyzer:
 
     # If non-paid channels are not included, return all metrics, paid and
     # non-paid.
-    spend_list = []
-    new_spend_tensors = self._fill_missing_data_tensors(
-        new_data, [constants.MEDIA_SPEND, constants.RF_SPEND]
-    )
-    if self._meridian.n_media_channels > 0:
-      spend_list.append(new_spend_tensors.media_spend)
-    if self._meridian.n_rf_channels > 0:
-      spend_list.append(new_spend_tensors.rf_spend)
-    # TODO Add support for 1-dimensional spend.
-    aggregated_spend = self.filter_and_aggregate_geos_and_times(
-        tensor=tf.concat(spend_list, axis=-1), **dim_kwargs
-    )
-    spend_with_total = tf.concat(
-        [aggregated_spend, tf.reduce_sum(aggregated_spend, -1, keepdims=True)],
-        axis=-1,
-    )
     spend_data = self._compute_spend_data_aggregate(
         spend_with_total=spend_with_total,
         impressions_with_total=impressions_with_total,
@@ -3177,56 +5852,16 @@ class Analyzer:
           pct_of_contribution,
       ])
     else:
-      roi = self._compute_roi_aggregate(
-          incremental_outcome_prior=incremental_outcome_prior,
-          incremental_outcome_posterior=incremental_outcome_posterior,
-          xr_dims=xr_dims_with_ci_and_distribution,
-          xr_coords=xr_coords_with_ci_and_distribution,
-          confidence_level=confidence_level,
-          spend_with_total=spend_with_total,
-      )
-      mroi = self._compute_marginal_roi_aggregate(
-          marginal_roi_by_reach=marginal_roi_by_reach,
-          marginal_roi_incremental_increase=marginal_roi_incremental_increase,
-          expected_revenue_prior=expected_outcome_prior,
-          expected_revenue_posterior=expected_outcome_posterior,
-          xr_dims=xr_dims_with_ci_and_distribution,
-          xr_coords=xr_coords_with_ci_and_distribution,
-          confidence_level=confidence_level,
-          spend_with_total=spend_with_total,
-          new_data=new_data,
-          use_kpi=use_kpi,
-          **dim_kwargs_wo_agg_times,
-          **batched_kwargs,
-          # Drop mROI metric values in the Dataset's data_vars for the
-          # aggregated "All Paid Channels" channel dimension value.
-          # "Marginal ROI" calculation must arbitrarily assume how the
-          # "next dollar" of spend is allocated across "All Paid Channels" in
-          # this case, which may cause confusion in Meridian model and does not
-          # have much practical usefulness, anyway.
-      ).where(lambda ds: ds.channel != constants.ALL_CHANNELS)
-      cpik = self._compute_cpik_aggregate(
-          incremental_kpi_prior=self.compute_incremental_outcome_aggregate(
-              use_posterior=False,
-              new_data=new_data,
-              use_kpi=True,
-              include_non_paid_channels=False,
-              **dim_kwargs,
-              **batched_kwargs,
-          ),
-          incremental_kpi_posterior=self.compute_incremental_outcome_aggregate(
-              use_posterior=True,
-              new_data=new_data,
-              use_kpi=True,
-              include_non_paid_channels=False,
-              **dim_kwargs,
-              **batched_kwargs,
-          ),
-          spend_with_total=spend_with_total,
-          xr_dims=xr_dims_with_ci_and_distribution,
-          xr_coords=xr_coords_with_ci_and_distribution,
-          confidence_level=confidence_level,
+      roi = metrics[constants.ROI]
+      # Drop mROI metric values in the Dataset's data_vars for the aggregated
+      # "All Paid Channels" channel dimension value. "Marginal ROI" calculation
+      # must arbitrarily assume how the "next dollar" of spend is allocated
+      # across "All Paid Channels" in this case, which may cause confusion in
+      # Meridian model and does not have much practical usefulness, anyway.
+      mroi = metrics[constants.MROI].where(
+          lambda ds: ds.channel != constants.ALL_CHANNELS
       )
+      cpik = metrics[constants.CPIK]
       return xr.merge([
           spend_data,
           incremental_outcome,
@@ -3343,7 +5978,7 @@ class Analyzer:
       aggregate_times: bool = True,
       non_media_baseline_values: Sequence[float | str] | None = None,
       confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
   ) -> xr.Dataset:
     """Returns baseline summary metrics.
 
@@ -3369,6 +6004,8 @@ class Analyzer:
         batch. The calculation is run in batches to avoid memory exhaustion. If
         a memory error occurs, try reducing `batch_size`. The calculation will
         generally be faster with larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
 
     Returns:
       An `xr.Dataset` with coordinates: `metric` (`mean`, `median`,
@@ -3488,6 +6125,9 @@ class Analyzer:
       selected_geos: Sequence[str | int] | None = None,
       selected_times: Sequence[str | int] | None = None,
       confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      freq_batch_size: int = constants.DEFAULT_FREQ_BATCH_SIZE,
+      early_stopping_patience: int | None = None,
   ) -> xr.Dataset:
     """Calculates the optimal frequency that maximizes posterior mean ROI.
 
@@ -3500,6 +6140,10 @@ class Analyzer:
     Note: The ROI numerator is revenue if `use_kpi` is `False`, otherwise, the
     ROI numerator is KPI units.
 
+    The frequency values are evaluated in blocks of `freq_batch_size`, with the
+    frequency as an extra dimension of the reach and frequency tensors, so that
+    each block takes a single pass of the RF transformation per batch of draws.
+
     Args:
       freq_grid: List of frequency values. The ROI of each channel is calculated
         for each frequency value in the list. By default, the list includes
@@ -3515,6 +6159,20 @@ class Analyzer:
         default, all time periods are included.
       confidence_level: Confidence level for prior and posterior credible
         intervals, represented as a value between zero and one.
+      batch_size: Integer representing the maximum draws per chain in each
+        batch. If a memory error occurs, try reducing `batch_size`.
+      freq_batch_size: Integer representing the maximum number of frequency
+        values evaluated together. If a memory error occurs, try reducing
+        `freq_batch_size`.
+      early_stopping_patience: Optional number of frequency values. If set, the
+        evaluation of `freq_grid` stops once the mean ROI of every channel has
+        decreased over the last `early_stopping_patience` frequency values
+        after its best value so far. This assumes that the mean ROI of each
+        channel is unimodal along `freq_grid`: a higher peak that follows a
+        local peak and `early_stopping_patience` decreasing values is missed.
+        The frequency values that are not evaluated are dropped from the
+        `frequency` coordinate of the result. By default, all of `freq_grid`
+        is evaluated.
 
     Returns:
       An xarray Dataset which contains:
@@ -3540,13 +6198,23 @@ class Analyzer:
       NotFittedModelError: If `sample_posterior()` (for `use_posterior=True`)
         or `sample_prior()` (for `use_posterior=False`) has not been called
         prior to calling this method.
-      ValueError: If there are no channels with reach and frequency data.
+      ValueError: If there are no channels with reach and frequency data, or if
+        `freq_batch_size` or `early_stopping_patience` is not positive.
     """
     dist_type = constants.POSTERIOR if use_posterior else constants.PRIOR
     if self._meridian.n_rf_channels == 0:
       raise ValueError(
           "Must have at least one channel with reach and frequency data."
       )
+    if freq_batch_size < 1:
+      raise ValueError(
+          f"`freq_batch_size` must be positive, but got {freq_batch_size}."
+      )
+    if early_stopping_patience is not None and early_stopping_patience < 1:
+      raise ValueError(
+          "`early_stopping_patience` must be positive, but got"
+          f" {early_stopping_patience}."
+      )
     if dist_type not in self._meridian.inference_data.groups():
       raise model.NotFittedModelError(
           f"sample_{dist_type}() must be called prior to calling this method."
@@ -3558,27 +6226,59 @@ class Analyzer:
 
     # Create a frequency grid for shape (len(freq_grid), n_rf_channels, 4) where
     # the last argument is for the mean, median, lower and upper confidence
-    # intervals.
-    metric_grid = np.zeros((len(freq_grid), self._meridian.n_rf_channels, 4))
+    # intervals. Frequency values skipped by early stopping are dropped after
+    # the evaluation.
+    metric_grid = np.full(
+        (len(freq_grid), self._meridian.n_rf_channels, 4), np.nan
+    )
+    dim_kwargs = {
+        "selected_geos": selected_geos,
+        "selected_times": selected_times,
+        "aggregate_geos": True,
+        "aggregate_times": True,
+    }
+    filled_data = self._validate_and_fill_roi_analysis_arguments(
+        new_data=DataTensors(), **dim_kwargs
+    )
+    rf_spend = self._get_roi_denominator(filled_data, **dim_kwargs)[
+        ..., -self._meridian.n_rf_channels :
+    ]
+    impressions = (
+        self._meridian.rf_tensors.frequency * self._meridian.rf_tensors.reach
+    )
 
-    for i, freq in enumerate(freq_grid):
-      new_frequency = tf.ones_like(self._meridian.rf_tensors.frequency) * freq
-      new_reach = (
-          self._meridian.rf_tensors.frequency
-          * self._meridian.rf_tensors.reach
-          / new_frequency
+    for start_index in range(0, len(freq_grid), freq_batch_size):
+      stop_index = min(len(freq_grid), start_index + freq_batch_size)
+      # Frequency values of the block with dimensions (n_freqs, 1, 1, 1).
+      freqs = tf.reshape(
+          tf.constant(freq_grid[start_index:stop_index], dtype=tf.float32),
+          [-1, 1, 1, 1],
+      )
+      new_frequency = (
+          tf.ones_like(self._meridian.rf_tensors.frequency)[tf.newaxis] * freqs
       )
-      metric_grid_temp = self.roi(
-          new_data=DataTensors(reach=new_reach, frequency=new_frequency),
+      incremental_outcome = self._paid_incremental_outcome_by_multiplier(
+          new_data=DataTensors(
+              reach=impressions / new_frequency, frequency=new_frequency
+          ),
           use_posterior=use_posterior,
           selected_geos=selected_geos,
           selected_times=selected_times,
-          aggregate_geos=True,
           use_kpi=use_kpi,
-      )[..., -self._meridian.n_rf_channels :]
-      metric_grid[i, :] = get_central_tendency_and_ci(
-          metric_grid_temp, confidence_level, include_median=True
+          batch_size=batch_size,
+          include_media=False,
       )
+      metric_grid[start_index:stop_index] = get_central_tendency_and_ci(
+          tf.math.divide_no_nan(incremental_outcome, rf_spend),
+          confidence_level,
+          include_median=True,
+      )
+      if early_stopping_patience is not None and _has_peaked(
+          metric_grid[:stop_index, :, 0], early_stopping_patience
+      ):
+        break
+    freq_grid = freq_grid[:stop_index]
+    metric_grid = metric_grid[:stop_index]
 
     optimal_freq_idx = np.nanargmax(metric_grid[:, :, 0], axis=0)
     rf_channel_values = (
@@ -3688,7 +6388,7 @@ class Analyzer:
       self,
       selected_geos: Sequence[str] | None = None,
       selected_times: Sequence[str] | None = None,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
   ) -> xr.Dataset:
     """Calculates `R-Squared`, `MAPE`, and `wMAPE` goodness of fit metrics.
 
@@ -3723,6 +6423,8 @@ class Analyzer:
         batches to avoid memory exhaustion. If a memory error occurs, try
         reducing `batch_size`. The calculation will generally be faster with
         larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
 
     Returns:
       An xarray Dataset containing the computed `R_Squared`, `MAPE`, and `wMAPE`
@@ -3862,7 +6564,7 @@ class Analyzer:
       holdout_id = holdout_id[geo_mask]
 
     if selected_times is not None:
-      time_mask = [x in selected_times for x in self._meridian.input_data.time]
+      time_mask = np.isin(self._meridian.input_data.time.values, selected_times)
       # If model is national, holdout_id will have only 1 dimension.
       if self._meridian.is_national:
         holdout_id = holdout_id[time_mask]
@@ -3982,7 +6684,9 @@ class Analyzer:
       by_reach: bool = True,
       use_optimal_frequency: bool = False,
       confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
-      batch_size: int = constants.DEFAULT_BATCH_SIZE,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      vectorize_multipliers: bool = False,
+      stream_draws: bool = False,
   ) -> xr.Dataset:
     """Method to generate a response curves xarray.Dataset.
 
@@ -4014,6 +6718,18 @@ class Analyzer:
         batch. The calculation is run in batches to avoid memory exhaustion. If
         a memory error occurs, try reducing `batch_size`. The calculation will
         generally be faster with larger `batch_size` values.
+        Use `"auto"` to select the largest batch that fits the memory budget of
+        the `Analyzer`.
+      vectorize_multipliers: Boolean. If `True`, all spend multipliers are
+        evaluated in a single pass per batch of draws instead of one at a time.
+        When Hill is not applied before Adstock and `by_reach=True`, the Adstock
+        transformation is then computed only once per batch of draws. This is
+        faster, but the memory used per batch grows with the number of spend
+        multipliers, so a smaller `batch_size` may be needed.
+      stream_draws: Boolean. If `True`, each batch of draws is folded into the
+        mean and credible intervals and then discarded, instead of first
+        collecting the incremental outcome of all draws. The result is the
+        same, but the peak memory no longer grows with the number of draws.
 
     Returns:
         An `xarray.Dataset` containing the data needed to visualize response
@@ -4055,33 +6771,97 @@ class Analyzer:
         len(self._meridian.input_data.get_all_paid_channels()),
         3,
     ))
-    for i, multiplier in enumerate(spend_multipliers):
-      if multiplier == 0:
-        incremental_outcome[i, :, :] = tf.zeros(
-            (len(self._meridian.input_data.get_all_paid_channels()), 3)
-        )  # Last dimension = 3 for the mean, ci_lo and ci_hi.
-        continue
-      new_data = _scale_tensors_by_multiplier(
-          data=DataTensors(
-              media=self._meridian.media_tensors.media,
-              reach=reach,
-              frequency=frequency,
-          ),
-          multiplier=multiplier,
-          by_reach=by_reach,
-      )
-      inc_outcome_temp = self.incremental_outcome(
+
+    def get_incremental_outcome_by_multiplier() -> dict[int, tf.Tensor]:
+      """Returns the incremental outcome draws of each non-zero multiplier."""
+      if not vectorize_multipliers:
+        return {
+            i: self.incremental_outcome(
+                use_posterior=use_posterior,
+                new_data=_scale_tensors_by_multiplier(
+                    data=DataTensors(
+                        media=self._meridian.media_tensors.media,
+                        reach=reach,
+                        frequency=frequency,
+                    ),
+                    multiplier=multiplier,
+                    by_reach=by_reach,
+                ),
+                inverse_transform_outcome=True,
+                batch_size=batch_size,
+                use_kpi=use_kpi,
+                include_non_paid_channels=False,
+                **dim_kwargs,
+            )
+            for i, multiplier in enumerate(spend_multipliers)
+            if multiplier != 0
+        }
+      if not self._meridian.model_spec.hill_before_adstock and (
+          by_reach or self._meridian.n_rf_channels == 0
+      ):
+        multipliers = np.broadcast_to(
+            np.array(spend_multipliers)[:, np.newaxis],
+            (len(spend_multipliers), incremental_outcome.shape[1]),
+        )
+        inc_outcome_temp = self._scaled_paid_incremental_outcome(
+            multipliers=multipliers,
+            new_data=DataTensors(reach=reach, frequency=frequency),
+            use_posterior=use_posterior,
+            selected_geos=selected_geos,
+            selected_times=selected_times,
+            use_kpi=use_kpi,
+            batch_size=batch_size,
+        )
+      else:
+        scaled_data = [
+            _scale_tensors_by_multiplier(
+                data=DataTensors(
+                    media=self._meridian.media_tensors.media,
+                    reach=reach,
+                    frequency=frequency,
+                ),
+                multiplier=multiplier,
+                by_reach=by_reach,
+            )
+            for multiplier in spend_multipliers
+        ]
+        inc_outcome_temp = self._paid_incremental_outcome_by_multiplier(
+            new_data=DataTensors(**{
+                var_name: tf.stack([getattr(d, var_name) for d in scaled_data])
+                for var_name in (
+                    constants.MEDIA,
+                    constants.REACH,
+                    constants.FREQUENCY,
+                )
+                if getattr(scaled_data[0], var_name) is not None
+            }),
+            use_posterior=use_posterior,
+            selected_geos=selected_geos,
+            selected_times=selected_times,
+            use_kpi=use_kpi,
+            batch_size=batch_size,
+        )
+      return {
+          i: inc_outcome_temp[:, :, i, :]
+          for i, multiplier in enumerate(spend_multipliers)
+          if multiplier != 0
+      }
+
+    if stream_draws:
+      metrics = self._stream_central_tendency_and_ci(
+          get_incremental_outcome_by_multiplier,
           use_posterior=use_posterior,
-          new_data=new_data,
-          inverse_transform_outcome=True,
           batch_size=batch_size,
-          use_kpi=use_kpi,
-          include_non_paid_channels=False,
-          **dim_kwargs,
-      )
-      incremental_outcome[i, :] = get_central_tendency_and_ci(
-          inc_outcome_temp, confidence_level
+          confidence_level=confidence_level,
       )
+    else:
+      metrics = {
+          i: get_central_tendency_and_ci(draws, confidence_level)
+          for i, draws in get_incremental_outcome_by_multiplier().items()
+      }
+    # The incremental outcome of a zero multiplier is zero.
+    for i, metric in metrics.items():
+      incremental_outcome[i, :] = metric
 
     if self._meridian.n_media_channels > 0 and self._meridian.n_rf_channels > 0:
       spend = tf.concat(
@@ -4568,25 +7348,88 @@ class Analyzer:
       new_data: DataTensors | None = None,
       use_kpi: bool = False,
       confidence_level: float = constants.DEFAULT_CONFIDENCE_LEVEL,
+      marginal_roi_use_gradient: bool = False,
       **roi_kwargs,
   ) -> xr.Dataset:
-    data_tensors = self._fill_missing_data_tensors(
-        new_data, [constants.MEDIA, constants.REACH, constants.FREQUENCY]
-    )
-    mroi_prior = self.marginal_roi(
+    mroi_prior_concat = self._compute_marginal_roi_draws(
         use_posterior=False,
-        new_data=data_tensors,
-        by_reach=marginal_roi_by_reach,
-        incremental_increase=marginal_roi_incremental_increase,
+        marginal_roi_by_reach=marginal_roi_by_reach,
+        marginal_roi_incremental_increase=marginal_roi_incremental_increase,
+        expected_revenue=expected_revenue_prior,
+        spend_with_total=spend_with_total,
+        new_data=new_data,
         use_kpi=use_kpi,
+        marginal_roi_use_gradient=marginal_roi_use_gradient,
         **roi_kwargs,
     )
-    mroi_posterior = self.marginal_roi(
+    mroi_posterior_concat = self._compute_marginal_roi_draws(
         use_posterior=True,
+        marginal_roi_by_reach=marginal_roi_by_reach,
+        marginal_roi_incremental_increase=marginal_roi_incremental_increase,
+        expected_revenue=expected_revenue_posterior,
+        spend_with_total=spend_with_total,
+        new_data=new_data,
+        use_kpi=use_kpi,
+        marginal_roi_use_gradient=marginal_roi_use_gradient,
+        **roi_kwargs,
+    )
+    return _central_tendency_and_ci_by_prior_and_posterior(
+        prior=mroi_prior_concat,
+        posterior=mroi_posterior_concat,
+        metric_name=constants.MROI,
+        xr_dims=xr_dims,
+        xr_coords=xr_coords,
+        confidence_level=confidence_level,
+        include_median=True,
+    )
+
+  def _compute_marginal_roi_draws(
+      self,
+      use_posterior: bool,
+      marginal_roi_by_reach: bool,
+      marginal_roi_incremental_increase: float,
+      expected_revenue: tf.Tensor,
+      spend_with_total: tf.Tensor,
+      new_data: DataTensors | None = None,
+      use_kpi: bool = False,
+      marginal_roi_use_gradient: bool = False,
+      batch_size: int | str = constants.DEFAULT_BATCH_SIZE,
+      **roi_kwargs,
+  ) -> tf.Tensor:
+    """Computes the mROI draws of each channel and of all channels combined."""
+    data_tensors = self._fill_missing_data_tensors(
+        new_data, [constants.MEDIA, constants.REACH, constants.FREQUENCY]
+    )
+    if marginal_roi_use_gradient:
+      filled_data = self._validate_and_fill_roi_analysis_arguments(
+          new_data=data_tensors, **roi_kwargs
+      )
+      marginal_outcome = self._marginal_incremental_outcome(
+          filled_data=filled_data,
+          use_posterior=use_posterior,
+          by_reach=marginal_roi_by_reach,
+          use_kpi=use_kpi,
+          batch_size=batch_size,
+          aggregate_times=True,
+          **roi_kwargs,
+      )
+      mroi = tf.math.divide_no_nan(
+          marginal_outcome,
+          self._get_roi_denominator(filled_data, **roi_kwargs),
+      )
+      # Scaling the spend of all channels together changes the expected outcome
+      # by the sum of the changes of the incremental outcome of each channel.
+      mroi_total = tf.reduce_sum(marginal_outcome, -1) / (
+          spend_with_total[..., -1]
+      )
+      return tf.concat([mroi, mroi_total[..., None]], axis=-1)
+    mroi = self.marginal_roi(
+        use_posterior=use_posterior,
         new_data=data_tensors,
         by_reach=marginal_roi_by_reach,
         incremental_increase=marginal_roi_incremental_increase,
         use_kpi=use_kpi,
+        batch_size=batch_size,
         **roi_kwargs,
     )
     incremented_data = _scale_tensors_by_multiplier(
@@ -4594,40 +7437,17 @@ class Analyzer:
         multiplier=(1 + marginal_roi_incremental_increase),
         by_reach=marginal_roi_by_reach,
     )
-
-    mroi_prior_total = (
-        self.expected_outcome(
-            use_posterior=False,
-            new_data=incremented_data,
-            use_kpi=use_kpi,
-            **roi_kwargs,
-        )
-        - expected_revenue_prior
-    ) / (marginal_roi_incremental_increase * spend_with_total[..., -1])
-    mroi_posterior_total = (
+    mroi_total = (
         self.expected_outcome(
-            use_posterior=True,
+            use_posterior=use_posterior,
             new_data=incremented_data,
             use_kpi=use_kpi,
+            batch_size=batch_size,
             **roi_kwargs,
         )
-        - expected_revenue_posterior
+        - expected_revenue
     ) / (marginal_roi_incremental_increase * spend_with_total[..., -1])
-    mroi_prior_concat = tf.concat(
-        [mroi_prior, mroi_prior_total[..., None]], axis=-1
-    )
-    mroi_posterior_concat = tf.concat(
-        [mroi_posterior, mroi_posterior_total[..., None]], axis=-1
-    )
-    return _central_tendency_and_ci_by_prior_and_posterior(
-        prior=mroi_prior_concat,
-        posterior=mroi_posterior_concat,
-        metric_name=constants.MROI,
-        xr_dims=xr_dims,
-        xr_coords=xr_coords,
-        confidence_level=confidence_level,
-        include_median=True,
-    )
+    return tf.concat([mroi, mroi_total[..., None]], axis=-1)
 
   def _compute_spend_data_aggregate(
       self,
@@ -13,10 +13,12 @@
 # limitations under the License.
 
 from collections.abc import Sequence
+import concurrent.futures
 import os
 from unittest import mock
 import warnings
 
+from absl import flags
 from absl.testing import absltest
 from absl.testing import parameterized
 import arviz as az
@@ -24,6 +26,7 @@ from meridian import constants
 from meridian.analysis import analyzer
 from meridian.analysis import test_utils
 from meridian.data import test_utils as data_test_utils
+from meridian.model import inference_data_cache
 from meridian.model import model
 from meridian.model import prior_distribution
 from meridian.model import spec
@@ -767,6 +770,39 @@ class AnalyzerTest(tf.test.TestCase, parameterized.TestCase):
         atol=1e-3,
     )
 
+  @parameterized.product(
+      use_posterior=[False, True],
+      by_reach=[False, True],
+      selected_geos=[None, ["geo_1", "geo_3"]],
+      aggregate_geos=[False, True],
+  )
+  def test_marginal_roi_use_gradient_matches_central_difference(
+      self,
+      use_posterior: bool,
+      by_reach: bool,
+      selected_geos: Sequence[str] | None,
+      aggregate_geos: bool,
+  ):
+    kwargs = {
+        "use_posterior": use_posterior,
+        "by_reach": by_reach,
+        "selected_geos": selected_geos,
+        "aggregate_geos": aggregate_geos,
+    }
+    # The central difference has an error of second order in the increment.
+    central_difference = (
+        self.analyzer_media_and_rf.marginal_roi(
+            incremental_increase=0.01, **kwargs
+        )
+        + self.analyzer_media_and_rf.marginal_roi(
+            incremental_increase=-0.01, **kwargs
+        )
+    ) / 2
+
+    mroi = self.analyzer_media_and_rf.marginal_roi(use_gradient=True, **kwargs)
+
+    self.assertAllClose(mroi, central_difference, rtol=1e-3, atol=1e-3)
+
   def test_roi_wrong_media_raises_exception(self):
     with self.assertRaisesRegex(
         ValueError,
@@ -862,6 +898,43 @@ class AnalyzerTest(tf.test.TestCase, parameterized.TestCase):
     )
     self.assertAllClose(expected_roi, roi)
 
+  def test_roi_reads_only_causal_params_from_lazy_inference_data(self):
+    flags.FLAGS.mark_as_parsed()
+    file_path = os.path.join(
+        self.create_tempdir().full_path, "inference_data.nc"
+    )
+    self.inference_data_media_and_rf.to_netcdf(file_path)
+    cache = inference_data_cache.ParameterCache()
+    lazy_inference_data = inference_data_cache.open_inference_data(
+        file_path, cache=cache
+    )
+    expected_roi = self.analyzer_media_and_rf.roi()
+
+    with mock.patch.object(
+        model.Meridian,
+        "inference_data",
+        new=property(lambda unused_self: lazy_inference_data),
+    ):
+      roi = analyzer.Analyzer(self.meridian_media_and_rf).roi()
+
+    self.assertAllClose(roi, expected_roi)
+    self.assertCountEqual(
+        cache.keys,
+        [
+            (constants.POSTERIOR, param)
+            for param in [
+                constants.EC_M,
+                constants.SLOPE_M,
+                constants.ALPHA_M,
+                constants.BETA_GM,
+                constants.EC_RF,
+                constants.SLOPE_RF,
+                constants.ALPHA_RF,
+                constants.BETA_GRF,
+            ]
+        ],
+    )
+
   @parameterized.product(
       use_posterior=[False, True],
       aggregate_geos=[False, True],
@@ -1449,6 +1522,112 @@ class AnalyzerTest(tf.test.TestCase, parameterized.TestCase):
     self.assertEqual(actual.confidence_level, expected.confidence_level)
     self.assertEqual(actual.use_posterior, expected.use_posterior)
 
+  @parameterized.product(
+      freq_batch_size=[1, 2, 10],
+      selected_geos=[None, ["geo_1", "geo_3"]],
+      selected_times=[None, ["2021-04-19", "2021-09-13", "2021-12-13"]],
+  )
+  def test_optimal_frequency_roi_matches_roi_per_frequency(
+      self,
+      freq_batch_size: int,
+      selected_geos: Sequence[str] | None,
+      selected_times: Sequence[str] | None,
+  ):
+    freq_grid = [1.0, 1.5, 2.0, 3.0]
+    mmm = self.meridian_media_and_rf
+    expected_roi = []
+    for freq in freq_grid:
+      new_frequency = tf.ones_like(mmm.rf_tensors.frequency) * freq
+      new_reach = (
+          mmm.rf_tensors.frequency * mmm.rf_tensors.reach / new_frequency
+      )
+      roi = self.analyzer_media_and_rf.roi(
+          new_data=analyzer.DataTensors(
+              reach=new_reach, frequency=new_frequency
+          ),
+          selected_geos=selected_geos,
+          selected_times=selected_times,
+      )[..., -mmm.n_rf_channels :]
+      expected_roi.append(
+          analyzer.get_central_tendency_and_ci(roi, include_median=True)
+      )
+
+    actual = self.analyzer_media_and_rf.optimal_freq(
+        freq_grid=freq_grid,
+        selected_geos=selected_geos,
+        selected_times=selected_times,
+        freq_batch_size=freq_batch_size,
+    )
+
+    self.assertAllClose(actual.roi, np.stack(expected_roi), rtol=1e-4)
+
+  def test_optimal_frequency_early_stopping_skips_rest_of_grid(self):
+    freq_grid = [1.0, 2.0, 3.0, 4.0, 5.0]
+    with mock.patch.object(
+        analyzer.Analyzer,
+        "_paid_incremental_outcome_by_multiplier",
+        autospec=True,
+        side_effect=analyzer.Analyzer._paid_incremental_outcome_by_multiplier,
+    ) as mock_incremental_outcome:
+      actual = self.analyzer_media_and_rf.optimal_freq(
+          freq_grid=freq_grid,
+          freq_batch_size=1,
+          early_stopping_patience=1,
+      )
+    expected = self.analyzer_media_and_rf.optimal_freq(freq_grid=freq_grid)
+
+    # The ROI of both channels peaks at the first frequency, so the evaluation
+    # stops after the second one.
+    self.assertEqual(mock_incremental_outcome.call_count, 2)
+    self.assertAllClose(actual.frequency, freq_grid[:2])
+    self.assertAllClose(actual.roi, expected.roi[:2])
+    self.assertAllClose(
+        actual.optimal_frequency, expected.optimal_frequency
+    )
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="decreasing",
+          values=[[3.0, 2.0], [2.0, 1.0], [1.0, 0.0]],
+          expected=True,
+      ),
+      dict(
+          testcase_name="rises_again",
+          values=[[3.0, 2.0], [1.0, 1.0], [2.0, 0.0]],
+          expected=False,
+      ),
+      dict(
+          testcase_name="one_channel_increasing",
+          values=[[3.0, 0.0], [2.0, 1.0], [1.0, 2.0]],
+          expected=False,
+      ),
+      dict(
+          testcase_name="too_few_values",
+          values=[[3.0, 2.0], [2.0, 1.0]],
+          expected=False,
+      ),
+  )
+  def test_has_peaked(self, values, expected):
+    self.assertEqual(analyzer._has_peaked(np.array(values), 2), expected)
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="freq_batch_size",
+          kwargs={"freq_batch_size": 0},
+          error_message="`freq_batch_size` must be positive",
+      ),
+      dict(
+          testcase_name="early_stopping_patience",
+          kwargs={"early_stopping_patience": 0},
+          error_message="`early_stopping_patience` must be positive",
+      ),
+  )
+  def test_optimal_frequency_invalid_argument_raises_exception(
+      self, kwargs, error_message
+  ):
+    with self.assertRaisesRegex(ValueError, error_message):
+      self.analyzer_media_and_rf.optimal_freq(**kwargs)
+
   def test_rhat_media_and_rf_correct(self):
     rhat = self.analyzer_media_and_rf.get_rhat()
     self.assertSetEqual(
@@ -1701,6 +1880,637 @@ class AnalyzerTest(tf.test.TestCase, parameterized.TestCase):
         response_data_spend[-1],
     )
 
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="by_reach_adstock_once",
+          by_reach=True,
+          selected_geos=None,
+      ),
+      dict(
+          testcase_name="by_reach_adstock_once_selected_geos",
+          by_reach=True,
+          selected_geos=["geo_1", "geo_3"],
+      ),
+      dict(
+          testcase_name="by_frequency_stacked_multipliers",
+          by_reach=False,
+          selected_geos=None,
+      ),
+  )
+  def test_response_curves_vectorized_matches_per_multiplier(
+      self, by_reach, selected_geos
+  ):
+    expected = self.analyzer_media_and_rf.response_curves(
+        by_reach=by_reach, selected_geos=selected_geos
+    )
+    actual = self.analyzer_media_and_rf.response_curves(
+        by_reach=by_reach,
+        selected_geos=selected_geos,
+        vectorize_multipliers=True,
+    )
+    xr.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-3)
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="aggregated",
+          aggregate_geos=True,
+          aggregate_times=True,
+          include_non_paid_channels=False,
+      ),
+      dict(
+          testcase_name="by_geo_and_time",
+          aggregate_geos=False,
+          aggregate_times=False,
+          include_non_paid_channels=False,
+      ),
+      dict(
+          testcase_name="with_non_paid_channels",
+          aggregate_geos=True,
+          aggregate_times=True,
+          include_non_paid_channels=True,
+      ),
+  )
+  def test_summary_metrics_stream_draws_matches_default(
+      self, aggregate_geos, aggregate_times, include_non_paid_channels
+  ):
+    kwargs = dict(
+        aggregate_geos=aggregate_geos,
+        aggregate_times=aggregate_times,
+        include_non_paid_channels=include_non_paid_channels,
+        batch_size=3,
+    )
+    expected = self.analyzer_media_and_rf.summary_metrics(**kwargs)
+    actual = self.analyzer_media_and_rf.summary_metrics(
+        stream_draws=True, **kwargs
+    )
+    xr.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-4)
+
+  def test_incremental_outcome_pads_final_batch_of_draws(self):
+    meridian_analyzer = analyzer.Analyzer(self.meridian_media_and_rf)
+    expected = meridian_analyzer.incremental_outcome(batch_size=_N_DRAWS)
+    meridian_analyzer = analyzer.Analyzer(self.meridian_media_and_rf)
+
+    # The final batch of one draw is padded to three draws.
+    actual = meridian_analyzer.incremental_outcome(batch_size=3)
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+    impl = meridian_analyzer._incremental_outcome_impl
+    self.assertEqual(impl.experimental_get_tracing_count(), 1)
+
+  def test_expected_outcome_pads_final_batch_of_draws(self):
+    expected = self.analyzer_media_and_rf.expected_outcome(batch_size=_N_DRAWS)
+
+    actual = self.analyzer_media_and_rf.expected_outcome(batch_size=4)
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+
+  @parameterized.named_parameters(
+      dict(testcase_name="one_draw", batch_memory_bytes=1),
+      dict(testcase_name="all_draws", batch_memory_bytes=2**40),
+  )
+  def test_incremental_outcome_auto_batch_size(self, batch_memory_bytes):
+    expected = self.analyzer_media_and_rf.incremental_outcome(
+        batch_size=_N_DRAWS
+    )
+    meridian_analyzer = analyzer.Analyzer(
+        self.meridian_media_and_rf, batch_memory_bytes=batch_memory_bytes
+    )
+
+    actual = meridian_analyzer.incremental_outcome(
+        batch_size=constants.AUTO_BATCH_SIZE
+    )
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+
+  def test_expected_outcome_auto_batch_size_retries_smaller_batch(self):
+    expected = self.analyzer_media_and_rf.expected_outcome(batch_size=_N_DRAWS)
+    meridian_analyzer = analyzer.Analyzer(
+        self.meridian_media_and_rf, batch_memory_bytes=2**40
+    )
+    get_kpi_means = meridian_analyzer._get_kpi_means
+    n_batch_draws = []
+
+    def get_kpi_means_with_oom(**kwargs):
+      n_batch_draws.append(kwargs["dist_tensors"].mu_t.shape[1])
+      if len(n_batch_draws) == 1:
+        raise tf.errors.ResourceExhaustedError(None, None, "OOM")
+      return get_kpi_means(**kwargs)
+
+    with (
+        mock.patch.object(
+            meridian_analyzer,
+            "_get_kpi_means",
+            side_effect=get_kpi_means_with_oom,
+        ),
+        self.assertWarnsRegex(UserWarning, "Ran out of memory"),
+    ):
+      actual = meridian_analyzer.expected_outcome(
+          batch_size=constants.AUTO_BATCH_SIZE
+      )
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+    half = (_N_DRAWS + 1) // 2
+    self.assertEqual(n_batch_draws, [_N_DRAWS, half, half])
+
+  def test_incremental_outcome_invalid_batch_size_raises(self):
+    with self.assertRaisesRegex(ValueError, "`batch_size` must be a positive"):
+      self.analyzer_media_and_rf.incremental_outcome(batch_size="max")
+
+  def test_incremental_outcome_reuses_scaled_data_tensors(self):
+    meridian_analyzer = analyzer.Analyzer(self.meridian_media_and_rf)
+    expected = meridian_analyzer.incremental_outcome()
+
+    with mock.patch.object(
+        meridian_analyzer,
+        "_get_scaled_data_tensors",
+        wraps=meridian_analyzer._get_scaled_data_tensors,
+    ) as mock_get_scaled_data_tensors:
+      actual = meridian_analyzer.incremental_outcome()
+      mock_get_scaled_data_tensors.assert_not_called()
+      meridian_analyzer.incremental_outcome(scaling_factor0=0.5)
+      self.assertEqual(mock_get_scaled_data_tensors.call_count, 2)
+
+    self.assertAllClose(actual, expected)
+
+  def test_expected_outcome_reuses_scaled_new_data(self):
+    meridian_analyzer = analyzer.Analyzer(self.meridian_media_and_rf)
+    new_data = analyzer.DataTensors(
+        media=self.meridian_media_and_rf.media_tensors.media * 2
+    )
+    expected = meridian_analyzer.expected_outcome(new_data=new_data)
+
+    with mock.patch.object(
+        meridian_analyzer,
+        "_get_scaled_data_tensors",
+        wraps=meridian_analyzer._get_scaled_data_tensors,
+    ) as mock_get_scaled_data_tensors:
+      actual = meridian_analyzer.expected_outcome(new_data=new_data)
+      mock_get_scaled_data_tensors.assert_not_called()
+
+    self.assertAllClose(actual, expected)
+
+  def test_incremental_outcome_data_tensors_cache_disabled(self):
+    meridian_analyzer = analyzer.Analyzer(
+        self.meridian_media_and_rf, data_tensors_cache_bytes=0
+    )
+    meridian_analyzer.incremental_outcome()
+
+    with mock.patch.object(
+        meridian_analyzer,
+        "_get_scaled_data_tensors",
+        wraps=meridian_analyzer._get_scaled_data_tensors,
+    ) as mock_get_scaled_data_tensors:
+      meridian_analyzer.incremental_outcome()
+      self.assertEqual(mock_get_scaled_data_tensors.call_count, 2)
+
+  @parameterized.product(
+      aggregate_geos=[False, True],
+      selected_geos=[None, ["geo_1", "geo_3", "geo_4"]],
+  )
+  def test_incremental_outcome_geo_shards(self, aggregate_geos, selected_geos):
+    kwargs = dict(
+        aggregate_geos=aggregate_geos,
+        aggregate_times=False,
+        selected_geos=selected_geos,
+    )
+    expected = self.analyzer_media_and_rf.incremental_outcome(**kwargs)
+    meridian_analyzer = analyzer.Analyzer(self.meridian_media_and_rf)
+
+    # The final shard is padded to two geos.
+    actual = meridian_analyzer.incremental_outcome(geo_shard_size=2, **kwargs)
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+    impl = meridian_analyzer._incremental_outcome_geo_shard_impl
+    self.assertEqual(impl.experimental_get_tracing_count(), 1)
+
+  def test_incremental_outcome_geo_shards_in_worker_processes(self):
+    # The spawned workers do not inherit the patched `inference_data` property,
+    # so the pickled model holds its own inference data.
+    mmm = model.Meridian(
+        input_data=self.input_data_media_and_rf,
+        model_spec=spec.ModelSpec(max_lag=15),
+        inference_data=az.InferenceData(
+            prior=xr.load_dataset(_TEST_SAMPLE_PRIOR_MEDIA_AND_RF_PATH),
+            posterior=xr.load_dataset(_TEST_SAMPLE_POSTERIOR_MEDIA_AND_RF_PATH),
+        ),
+    )
+    kwargs = dict(
+        aggregate_geos=False,
+        aggregate_times=False,
+        selected_geos=["geo_0", "geo_2", "geo_3"],
+    )
+    expected = self.analyzer_media_and_rf.incremental_outcome(**kwargs)
+
+    actual = analyzer.Analyzer(mmm).incremental_outcome(
+        geo_shard_size=2, n_geo_shard_workers=2, **kwargs
+    )
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+
+  def test_incremental_outcome_geo_shards_auto_batch_size(self):
+    meridian_analyzer = analyzer.Analyzer(self.meridian_media_and_rf)
+
+    with mock.patch.object(
+        meridian_analyzer,
+        "_estimate_bytes_per_draw",
+        wraps=meridian_analyzer._estimate_bytes_per_draw,
+    ) as mock_estimate_bytes_per_draw:
+      meridian_analyzer.incremental_outcome(
+          geo_shard_size=2, batch_size=constants.AUTO_BATCH_SIZE
+      )
+
+    # The memory of a batch is estimated for the geos of a shard.
+    self.assertNotEmpty(mock_estimate_bytes_per_draw.call_args_list)
+    for call in mock_estimate_bytes_per_draw.call_args_list:
+      self.assertEqual(call.args[2], 2)
+
+  @parameterized.product(
+      aggregate_geos=[False, True],
+      use_kpi=[False, True],
+  )
+  def test_expected_outcome_geo_shards(self, aggregate_geos, use_kpi):
+    kwargs = dict(
+        aggregate_geos=aggregate_geos,
+        selected_geos=["geo_0", "geo_2", "geo_3"],
+        use_kpi=use_kpi,
+    )
+    expected = self.analyzer_media_and_rf.expected_outcome(**kwargs)
+
+    actual = self.analyzer_media_and_rf.expected_outcome(
+        geo_shard_size=2, **kwargs
+    )
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="zero_shard_size",
+          kwargs=dict(geo_shard_size=0),
+          error_message="`geo_shard_size` must be positive",
+      ),
+      dict(
+          testcase_name="zero_workers",
+          kwargs=dict(geo_shard_size=2, n_geo_shard_workers=0),
+          error_message="`n_geo_shard_workers` must be positive",
+      ),
+      dict(
+          testcase_name="workers_without_shards",
+          kwargs=dict(n_geo_shard_workers=2),
+          error_message="`n_geo_shard_workers` requires `geo_shard_size`",
+      ),
+  )
+  def test_incremental_outcome_invalid_geo_shard_args_raises(
+      self, kwargs, error_message
+  ):
+    with self.assertRaisesRegex(ValueError, error_message):
+      self.analyzer_media_and_rf.incremental_outcome(**kwargs)
+
+  @parameterized.named_parameters(
+      dict(testcase_name="by_reach", marginal_roi_by_reach=True),
+      dict(testcase_name="by_frequency", marginal_roi_by_reach=False),
+  )
+  def test_summary_metrics_marginal_roi_use_gradient(
+      self, marginal_roi_by_reach: bool
+  ):
+    summary = self.analyzer_media_and_rf.summary_metrics(
+        marginal_roi_by_reach=marginal_roi_by_reach,
+        marginal_roi_use_gradient=True,
+    )
+
+    expected_mroi = [
+        analyzer.get_central_tendency_and_ci(
+            self.analyzer_media_and_rf.marginal_roi(
+                use_posterior=use_posterior,
+                by_reach=marginal_roi_by_reach,
+                use_gradient=True,
+            ),
+            include_median=True,
+        )
+        for use_posterior in (False, True)
+    ]
+    channels = self.input_data_media_and_rf.get_all_paid_channels()
+    self.assertAllClose(
+        summary.mroi.sel(channel=channels),
+        np.stack(expected_mroi, axis=-1),
+        rtol=1e-4,
+    )
+    # The mROI of all channels is close to the default finite difference.
+    default_summary = self.analyzer_media_and_rf.summary_metrics(
+        marginal_roi_by_reach=marginal_roi_by_reach,
+    )
+    self.assertAllClose(
+        summary.mroi.sel(channel=constants.ALL_CHANNELS),
+        default_summary.mroi.sel(channel=constants.ALL_CHANNELS),
+        rtol=2e-2,
+    )
+
+  def test_summary_metrics_marginal_roi_use_gradient_fused_raises(self):
+    with self.assertRaisesRegex(
+        ValueError,
+        "`marginal_roi_use_gradient` is not supported together with"
+        " `fused_evaluation`",
+    ):
+      self.analyzer_media_and_rf.summary_metrics(
+          fused_evaluation=True, marginal_roi_use_gradient=True
+      )
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="aggregated",
+          aggregate_geos=True,
+          aggregate_times=True,
+          include_non_paid_channels=False,
+          marginal_roi_by_reach=True,
+          stream_draws=False,
+      ),
+      dict(
+          testcase_name="mroi_by_frequency",
+          aggregate_geos=True,
+          aggregate_times=True,
+          include_non_paid_channels=False,
+          marginal_roi_by_reach=False,
+          stream_draws=False,
+      ),
+      dict(
+          testcase_name="by_geo",
+          aggregate_geos=False,
+          aggregate_times=True,
+          include_non_paid_channels=False,
+          marginal_roi_by_reach=True,
+          stream_draws=False,
+      ),
+      dict(
+          testcase_name="by_geo_and_time",
+          aggregate_geos=False,
+          aggregate_times=False,
+          include_non_paid_channels=False,
+          marginal_roi_by_reach=True,
+          stream_draws=False,
+      ),
+      dict(
+          testcase_name="with_non_paid_channels",
+          aggregate_geos=True,
+          aggregate_times=True,
+          include_non_paid_channels=True,
+          marginal_roi_by_reach=True,
+          stream_draws=False,
+      ),
+      dict(
+          testcase_name="stream_draws",
+          aggregate_geos=True,
+          aggregate_times=True,
+          include_non_paid_channels=False,
+          marginal_roi_by_reach=True,
+          stream_draws=True,
+      ),
+  )
+  def test_summary_metrics_fused_evaluation_matches_default(
+      self,
+      aggregate_geos,
+      aggregate_times,
+      include_non_paid_channels,
+      marginal_roi_by_reach,
+      stream_draws,
+  ):
+    kwargs = dict(
+        aggregate_geos=aggregate_geos,
+        aggregate_times=aggregate_times,
+        include_non_paid_channels=include_non_paid_channels,
+        marginal_roi_by_reach=marginal_roi_by_reach,
+        batch_size=3,
+    )
+    expected = self.analyzer_media_and_rf.summary_metrics(**kwargs)
+    actual = self.analyzer_media_and_rf.summary_metrics(
+        fused_evaluation=True, stream_draws=stream_draws, **kwargs
+    )
+    # The fused mROI subtracts the outcomes before aggregating them, which
+    # changes the float32 rounding of the small mROI differences.
+    xr.testing.assert_allclose(actual, expected, rtol=1e-3, atol=1e-3)
+
+  def test_summary_metrics_fused_evaluation_new_data_matches_default(self):
+    new_data = analyzer.DataTensors(
+        media=self.meridian_media_and_rf.media_tensors.media * 1.2,
+        reach=self.meridian_media_and_rf.rf_tensors.reach * 0.8,
+        media_spend=self.meridian_media_and_rf.media_tensors.media_spend * 1.2,
+    )
+    expected = self.analyzer_media_and_rf.summary_metrics(new_data=new_data)
+    actual = self.analyzer_media_and_rf.summary_metrics(
+        new_data=new_data, fused_evaluation=True
+    )
+    xr.testing.assert_allclose(actual, expected, rtol=1e-3, atol=1e-4)
+
+  def test_summary_metrics_fused_evaluation_skips_separate_passes(self):
+    mock_incremental_outcome = self.enter_context(
+        mock.patch.object(
+            self.analyzer_media_and_rf,
+            "incremental_outcome",
+            wraps=self.analyzer_media_and_rf.incremental_outcome,
+        )
+    )
+    mock_expected_outcome = self.enter_context(
+        mock.patch.object(
+            self.analyzer_media_and_rf,
+            "expected_outcome",
+            wraps=self.analyzer_media_and_rf.expected_outcome,
+        )
+    )
+    self.analyzer_media_and_rf.summary_metrics(fused_evaluation=True)
+    mock_incremental_outcome.assert_not_called()
+    mock_expected_outcome.assert_not_called()
+
+  @parameterized.named_parameters(
+      dict(testcase_name="by_geo_and_time", aggregate_geos=False),
+      dict(testcase_name="aggregate_geos", aggregate_geos=True),
+  )
+  def test_expected_vs_actual_stream_draws_matches_default(
+      self, aggregate_geos
+  ):
+    meridian = model.Meridian(
+        model_spec=spec.ModelSpec(
+            holdout_id=np.random.choice([True, False], size=(_N_GEOS, _N_TIMES))
+        ),
+        input_data=self.input_data_media_and_rf,
+    )
+    meridian_analyzer = analyzer.Analyzer(meridian)
+    expected = meridian_analyzer.expected_vs_actual_data(
+        aggregate_geos=aggregate_geos, split_by_holdout_id=True
+    )
+    actual = meridian_analyzer.expected_vs_actual_data(
+        aggregate_geos=aggregate_geos,
+        split_by_holdout_id=True,
+        stream_draws=True,
+        batch_size=3,
+    )
+    xr.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-3)
+
+  def test_select_draws_does_not_apply_to_other_threads(self):
+    meridian_analyzer = analyzer.Analyzer(self.meridian_media_and_rf)
+
+    with meridian_analyzer._select_draws(slice(0, 1)):
+      n_selected_draws = meridian_analyzer._get_draws(True).draw.size
+      with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        n_other_thread_draws = pool.submit(
+            lambda: meridian_analyzer._get_draws(True).draw.size
+        ).result()
+
+    self.assertEqual(n_selected_draws, 1)
+    self.assertEqual(n_other_thread_draws, _N_DRAWS)
+    self.assertEqual(meridian_analyzer._get_draws(True).draw.size, _N_DRAWS)
+
+  @parameterized.named_parameters(
+      dict(testcase_name="per_multiplier", vectorize_multipliers=False),
+      dict(testcase_name="vectorized", vectorize_multipliers=True),
+  )
+  def test_response_curves_stream_draws_matches_default(
+      self, vectorize_multipliers
+  ):
+    expected = self.analyzer_media_and_rf.response_curves(
+        vectorize_multipliers=vectorize_multipliers
+    )
+    actual = self.analyzer_media_and_rf.response_curves(
+        vectorize_multipliers=vectorize_multipliers,
+        batch_size=3,
+        stream_draws=True,
+    )
+    xr.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-3)
+
+  def test_streaming_central_tendency_and_ci_matches_in_memory(self):
+    data = np.random.default_rng(0).normal(size=(2, 10, 4, 3))
+    data[0, 3, 1, 2] = np.nan
+    reducer = analyzer._StreamingCentralTendencyAndCI(
+        n_samples=20, confidence_level=0.9, include_median=True
+    )
+    for start in range(0, 10, 3):
+      reducer.update(data[:, start : start + 3])
+    np.testing.assert_allclose(
+        reducer.result(),
+        analyzer.get_central_tendency_and_ci(
+            data, confidence_level=0.9, include_median=True
+        ),
+    )
+
+  def test_streaming_central_tendency_and_ci_wrong_sample_count_raises(self):
+    reducer = analyzer._StreamingCentralTendencyAndCI(
+        n_samples=20, confidence_level=0.9
+    )
+    reducer.update(np.ones((2, 3, 4)))
+    with self.assertRaisesRegex(ValueError, "samples"):
+      reducer.result()
+
+  def test_data_tensors_cache_evicts_least_recently_used(self):
+    # Each value is 40 bytes, so two of them fit in the cache.
+    cache = analyzer._DataTensorsCache(max_bytes=80)
+    tensors = [tf.constant(i) for i in range(3)]
+    compute_fn = mock.Mock(side_effect=lambda: (tf.zeros(10), None))
+
+    first = cache.get([tensors[0]], (), compute_fn)
+    cache.get([tensors[1]], (), compute_fn)
+    self.assertIs(cache.get([tensors[0]], (), compute_fn), first)
+    cache.get([tensors[2]], (), compute_fn)
+    cache.get([tensors[0]], (), compute_fn)
+    cache.get([tensors[1]], (), compute_fn)
+
+    # The entry of `tensors[1]` was evicted by the one of `tensors[2]`.
+    self.assertEqual(compute_fn.call_count, 4)
+
+  def test_data_tensors_cache_does_not_cache_values_over_max_bytes(self):
+    cache = analyzer._DataTensorsCache(max_bytes=80)
+    tensor = tf.constant(0)
+    small_fn = mock.Mock(side_effect=lambda: tf.zeros(10))
+    large_fn = mock.Mock(side_effect=lambda: tf.zeros(21))
+
+    small = cache.get([tensor], ("small",), small_fn)
+    cache.get([tensor], ("large",), large_fn)
+    cache.get([tensor], ("large",), large_fn)
+
+    self.assertEqual(large_fn.call_count, 2)
+    self.assertIs(cache.get([tensor], ("small",), small_fn), small)
+
+  def test_data_tensors_cache_disabled(self):
+    cache = analyzer._DataTensorsCache(max_bytes=0)
+    tensor = tf.constant(0)
+    compute_fn = mock.Mock(side_effect=lambda: tf.zeros(1))
+
+    cache.get([tensor], (), compute_fn)
+    cache.get([tensor], (), compute_fn)
+
+    self.assertEqual(compute_fn.call_count, 2)
+
+  def test_data_tensors_cache_checks_input_identity(self):
+    cache = analyzer._DataTensorsCache(max_bytes=80)
+    tensor = tf.constant(0)
+    other_tensor = tf.constant(0)
+    compute_fn = mock.Mock(side_effect=lambda: tf.zeros(1))
+    cache.get([tensor], (), compute_fn)
+    # Simulates an entry whose input id was reused by another object.
+    (key,) = cache._entries
+    cache._entries[((id(other_tensor),), ())] = cache._entries.pop(key)
+
+    cache.get([other_tensor], (), compute_fn)
+
+    self.assertEqual(compute_fn.call_count, 2)
+
+  def test_data_tensors_cache_negative_max_bytes_raises(self):
+    with self.assertRaisesRegex(ValueError, "`max_bytes` must be non-neg"):
+      analyzer._DataTensorsCache(max_bytes=-1)
+
+  def test_scaled_paid_incremental_outcome_hill_before_adstock_raises(self):
+    meridian = model.Meridian(
+        input_data=self.input_data_media_and_rf,
+        model_spec=spec.ModelSpec(hill_before_adstock=True),
+    )
+    with self.assertRaisesRegex(
+        ValueError,
+        "Scaling the Adstock output is only supported when",
+    ):
+      analyzer.Analyzer(meridian)._scaled_paid_incremental_outcome(
+          multipliers=np.ones((2, _N_MEDIA_CHANNELS + _N_RF_CHANNELS))
+      )
+
+  @parameterized.named_parameters(
+      dict(testcase_name="adstock_before_hill", hill_before_adstock=False),
+      dict(testcase_name="hill_before_adstock", hill_before_adstock=True),
+  )
+  def test_paid_incremental_outcome_channel_indices_matches_all_channels(
+      self, hill_before_adstock: bool
+  ):
+    meridian = model.Meridian(
+        input_data=self.input_data_media_and_rf,
+        model_spec=spec.ModelSpec(hill_before_adstock=hill_before_adstock),
+    )
+    meridian_analyzer = analyzer.Analyzer(meridian)
+    multipliers = np.array(
+        [[0.5, 1.0, 1.5, 2.0, 0.8], [1.2, 0.3, 1.0, 1.1, 0.0]],
+        dtype=np.float32,
+    )
+    channel_indices = [1, 3]
+
+    if hill_before_adstock:
+      new_data = analyzer.DataTensors(
+          media=multipliers[:, None, None, :_N_MEDIA_CHANNELS]
+          * meridian.media_tensors.media,
+          reach=multipliers[:, None, None, _N_MEDIA_CHANNELS:]
+          * meridian.rf_tensors.reach,
+      )
+      expected = meridian_analyzer._paid_incremental_outcome_by_multiplier(
+          new_data=new_data
+      )
+      actual = meridian_analyzer._paid_incremental_outcome_by_multiplier(
+          new_data=new_data, channel_indices=channel_indices
+      )
+    else:
+      expected = meridian_analyzer._scaled_paid_incremental_outcome(
+          multipliers=multipliers
+      )
+      actual = meridian_analyzer._scaled_paid_incremental_outcome(
+          multipliers=multipliers[:, channel_indices],
+          channel_indices=channel_indices,
+      )
+
+    self.assertAllClose(
+        actual, tf.gather(expected, channel_indices, axis=-1), rtol=1e-5
+    )
+
   @parameterized.named_parameters(
       dict(
           testcase_name="default",
@@ -2325,6 +3135,24 @@ class AnalyzerMediaOnlyTest(tf.test.TestCase, parameterized.TestCase):
     )
     self.assertAllEqual(modified_tensor, tf.zeros([3]))
 
+  def test_filter_and_aggregate_geos_and_times_geo_indices(self):
+    tensor = tf.convert_to_tensor(self.input_data_media_only.media_spend)
+    selected_geos = ["geo_0", "geo_2", "geo_3"]
+    expected = self.analyzer_media_only.filter_and_aggregate_geos_and_times(
+        tensor, selected_geos=selected_geos
+    )
+
+    actual = sum(
+        self.analyzer_media_only.filter_and_aggregate_geos_and_times(
+            tf.gather(tensor, geo_indices),
+            selected_geos=selected_geos,
+            geo_indices=geo_indices,
+        )
+        for geo_indices in ([0, 1], [2, 3], [4])
+    )
+
+    self.assertAllClose(actual, expected)
+
   def test_filter_and_aggregate_geos_and_times_incorrect_geos(self):
     with self.assertRaisesRegex(
         ValueError,
@@ -3981,6 +4809,32 @@ class AnalyzerNonMediaTest(tf.test.TestCase, parameterized.TestCase):
         atol=1e-2,
     )
 
+  @parameterized.named_parameters(
+      dict(testcase_name="default", non_media_baseline_values=None),
+      dict(
+          testcase_name="mix",
+          non_media_baseline_values=["min", "max", 2.448, "min"],
+      ),
+  )
+  def test_incremental_outcome_non_media_geo_shards(
+      self, non_media_baseline_values
+  ):
+    model.Meridian.inference_data = mock.PropertyMock(
+        return_value=self.inference_data_non_media
+    )
+    expected = self.analyzer_non_media.incremental_outcome(
+        non_media_baseline_values=non_media_baseline_values,
+        aggregate_geos=False,
+    )
+
+    actual = self.analyzer_non_media.incremental_outcome(
+        non_media_baseline_values=non_media_baseline_values,
+        aggregate_geos=False,
+        geo_shard_size=3,
+    )
+
+    self.assertAllClose(actual, expected, rtol=1e-4, atol=1e-4)
+
   def test_incremental_outcome_wrong_non_media_raises_exception(self):
     with self.assertRaisesWithLiteralMatch(
         ValueError,
@@ -4079,6 +4933,19 @@ class AnalyzerNonMediaTest(tf.test.TestCase, parameterized.TestCase):
           kwargs["non_media_baseline_values"], [0.0, "max", 1.0, "min"]
       )
 
+  def test_summary_metrics_fused_evaluation_with_non_media_baseline_values(
+      self,
+  ):
+    kwargs = dict(
+        include_non_paid_channels=True,
+        non_media_baseline_values=[0.0, "max", 1.0, "min"],
+    )
+    expected = self.analyzer_non_media.summary_metrics(**kwargs)
+    actual = self.analyzer_non_media.summary_metrics(
+        fused_evaluation=True, **kwargs
+    )
+    xr.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-4)
+
   def test_expected_vs_actual_with_non_media_baseline_values(self):
     # Call expected_vs_actual with non-default value of
     # non_media_baseline_values argument.
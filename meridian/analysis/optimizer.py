@@ -14,22 +14,26 @@
 
 """Module to output budget optimization scenarios based on the model."""
 
-from collections.abc import Mapping, Sequence
+from collections.abc import Hashable, Mapping, Sequence
 import dataclasses
 import functools
+import heapq
 import math
 import os
 from typing import Any, TypeAlias
+import warnings
 
 import altair as alt
 import jinja2
 from meridian import constants as c
 from meridian.analysis import analyzer
 from meridian.analysis import formatter
+from meridian.analysis import response_cache as response_cache_lib
 from meridian.analysis import summary_text
 from meridian.model import model
 import numpy as np
 import pandas as pd
+from scipy import optimize as scipy_optimize
 import tensorflow as tf
 import xarray as xr
 
@@ -37,6 +41,7 @@ import xarray as xr
 __all__ = [
     'BudgetOptimizer',
     'OptimizationResults',
+    'OptimizationScenario',
 ]
 
 # Disable max row limitations in Altair.
@@ -44,6 +49,43 @@ alt.data_transformers.disable_max_rows()
 
 _SpendConstraint: TypeAlias = float | Sequence[float]
 
+# Fraction of the historical spend at which the derivative of the incremental
+# outcome is computed for channels with zero spend.
+_MIN_GRADIENT_SPEND_RATIO = 1e-6
+
+
+@dataclasses.dataclass(frozen=True)
+class OptimizationScenario:
+  """Budget and constraints of a scenario of `optimize_scenarios()`.
+
+  The attributes have the same meaning and defaults as the arguments of the
+  same name of `BudgetOptimizer.optimize()`.
+
+  Attributes:
+    fixed_budget: Whether it's a fixed budget optimization or flexible budget
+      optimization. If `False`, must specify either `target_roi` or
+      `target_mroi`.
+    budget: Total budget for the fixed budget scenario. Defaults to the
+      historical budget.
+    pct_of_spend: Optional percentage allocation of spend for all media and RF
+      channels. By default, the historical allocation is used.
+    spend_constraint_lower: Optional lower bound of media-level spend, as a
+      float or a list of size `n_paid_channels`.
+    spend_constraint_upper: Optional upper bound of media-level spend, as a
+      float or a list of size `n_paid_channels`.
+    target_roi: Optional target ROI constraint of flexible budget scenarios.
+    target_mroi: Optional target marginal ROI constraint of flexible budget
+      scenarios.
+  """
+
+  fixed_budget: bool = True
+  budget: float | None = None
+  pct_of_spend: Sequence[float] | None = None
+  spend_constraint_lower: _SpendConstraint | None = None
+  spend_constraint_upper: _SpendConstraint | None = None
+  target_roi: float | None = None
+  target_mroi: float | None = None
+
 
 @dataclasses.dataclass(frozen=True)
 class OptimizationGrid:
@@ -929,9 +971,37 @@ class BudgetOptimizer:
   results can be viewed as plots and as an HTML summary output page.
   """
 
-  def __init__(self, meridian: model.Meridian):
+  def __init__(
+      self,
+      meridian: model.Meridian,
+      response_cache: response_cache_lib.ResponseCache | None = None,
+  ):
+    """Initializes the budget optimizer.
+
+    Args:
+      meridian: The fitted Meridian model.
+      response_cache: Optional cache of the incremental outcome of the paid
+        channels at the points of the optimization grid. If provided, grid
+        points computed by earlier scenarios with the same `selected_times`,
+        `use_kpi`, `use_posterior` and frequency are reused, and only the rows
+        of the grid with missing points are evaluated. The cache must have
+        been filled with this model, as identified by
+        `response_cache.get_model_fingerprint()`.
+
+    Raises:
+      ValueError: If `response_cache` was filled with another model.
+    """
     self._meridian = meridian
     self._analyzer = analyzer.Analyzer(self._meridian)
+    if response_cache is not None:
+      response_cache.check_model_fingerprint(
+          response_cache_lib.get_model_fingerprint(self._meridian)
+      )
+    self._response_cache = response_cache
+
+  @property
+  def response_cache(self) -> response_cache_lib.ResponseCache | None:
+    return self._response_cache
 
   def _validate_model_fit(self, use_posterior: bool):
     """Validates that the model is fit."""
@@ -957,6 +1027,10 @@ class BudgetOptimizer:
       use_kpi: bool = False,
       confidence_level: float = c.DEFAULT_CONFIDENCE_LEVEL,
       batch_size: int = c.DEFAULT_BATCH_SIZE,
+      max_grid_memory_bytes: int | None = None,
+      marginal_roi_use_gradient: bool = False,
+      method: str = c.GRID_SEARCH,
+      ftol: float = 1e-6,
   ) -> OptimizationResults:
     """Finds the optimal budget allocation that maximizes outcome.
 
@@ -1025,6 +1099,29 @@ class BudgetOptimizer:
         in batches to avoid memory exhaustion. If a memory error occurs, try
         reducing `batch_size`. The calculation will generally be faster with
         larger `batch_size` values.
+      max_grid_memory_bytes: Optional approximate upper bound, in bytes, on the
+        memory used by the intermediate tensors when evaluating the
+        optimization grid. If provided, the grid of each channel is evaluated
+        over its own spend range, in vectorized blocks of points, which is
+        typically much faster than evaluating one row at a time. The block size
+        is chosen to respect this bound. If `None`, the grid rows are evaluated
+        one at a time.
+      marginal_roi_use_gradient: If `True`, the marginal ROI of the budget
+        allocations is computed as the derivative of the incremental outcome
+        with respect to spend in a single pass, as in
+        `Analyzer.marginal_roi(use_gradient=True)`, instead of a finite
+        difference.
+      method: The optimization method. `'grid_search'` runs a hill-climbing
+        search over a grid of spend with step size determined by `gtol`.
+        `'slsqp'` instead treats the posterior mean incremental outcome as a
+        differentiable function of the spend of each channel, and solves the
+        same problem within the same spend bounds with sequential least
+        squares programming. Its cost does not depend on the size of the grid,
+        but the optimization grid of the results only holds the optimal spend,
+        which is rounded to the step size determined by `gtol`.
+      ftol: Float indicating the tolerance of the objective of the `'slsqp'`
+        method, which is the total incremental outcome divided by the total
+        upper bound spend. Ignored by the `'grid_search'` method.
 
     Returns:
       An `OptimizationResults` object containing optimized budget allocation
@@ -1036,37 +1133,26 @@ class BudgetOptimizer:
         target_roi=target_roi,
         target_mroi=target_mroi,
     )
-
-    if selected_times is not None:
-      start_date, end_date = selected_times
-      selected_time_dims = self._meridian.expand_selected_time_dims(
-          start_date=start_date,
-          end_date=end_date,
+    if method not in c.OPTIMIZATION_METHODS:
+      raise ValueError(
+          f'`method` must be one of {c.OPTIMIZATION_METHODS}, but got'
+          f' {method!r}.'
       )
-    else:
-      selected_time_dims = None
-    hist_spend = self._analyzer.get_historical_spend(
-        selected_time_dims,
-        include_media=self._meridian.n_media_channels > 0,
-        include_rf=self._meridian.n_rf_channels > 0,
-    ).data
+
+    selected_time_dims = self._get_selected_time_dims(selected_times)
+    hist_spend = self._get_historical_spend(selected_time_dims)
 
     budget = budget or np.sum(hist_spend)
     pct_of_spend = self._validate_pct_of_spend(hist_spend, pct_of_spend)
     spend = budget * pct_of_spend
     round_factor = _get_round_factor(budget, gtol)
     rounded_spend = np.round(spend, round_factor).astype(int)
-    if self._meridian.n_rf_channels > 0 and use_optimal_frequency:
-      optimal_frequency = tf.convert_to_tensor(
-          self._analyzer.optimal_freq(
-              use_posterior=use_posterior,
-              selected_times=selected_time_dims,
-              use_kpi=use_kpi,
-          ).optimal_frequency,
-          dtype=tf.float32,
-      )
-    else:
-      optimal_frequency = None
+    optimal_frequency = self._get_optimal_frequency(
+        use_posterior=use_posterior,
+        selected_times=selected_time_dims,
+        use_kpi=use_kpi,
+        use_optimal_frequency=use_optimal_frequency,
+    )
 
     (optimization_lower_bound, optimization_upper_bound, spend_bounds) = (
         self._get_optimization_bounds(
@@ -1077,50 +1163,389 @@ class BudgetOptimizer:
             fixed_budget=fixed_budget,
         )
     )
-    optimization_grid = self.create_optimization_grid(
-        spend=hist_spend,
-        spend_bound_lower=optimization_lower_bound,
-        spend_bound_upper=optimization_upper_bound,
+    if method == c.SLSQP:
+      optimization_grid = self._create_continuous_optimization_grid(
+          hist_spend=hist_spend,
+          spend=rounded_spend,
+          spend_bound_lower=optimization_lower_bound,
+          spend_bound_upper=optimization_upper_bound,
+          budget=np.sum(rounded_spend),
+          fixed_budget=fixed_budget,
+          target_mroi=target_mroi,
+          target_roi=target_roi,
+          selected_times=selected_time_dims,
+          round_factor=round_factor,
+          ftol=ftol,
+          use_posterior=use_posterior,
+          use_kpi=use_kpi,
+          use_optimal_frequency=use_optimal_frequency,
+          optimal_frequency=optimal_frequency,
+          batch_size=batch_size,
+      )
+      optimal_spend = optimization_grid.spend_grid[0, :].values
+    else:
+      optimization_grid = self.create_optimization_grid(
+          spend=hist_spend,
+          spend_bound_lower=optimization_lower_bound,
+          spend_bound_upper=optimization_upper_bound,
+          selected_times=selected_time_dims,
+          round_factor=round_factor,
+          use_posterior=use_posterior,
+          use_kpi=use_kpi,
+          use_optimal_frequency=use_optimal_frequency,
+          optimal_frequency=optimal_frequency,
+          batch_size=batch_size,
+          max_grid_memory_bytes=max_grid_memory_bytes,
+      )
+      # TODO: b/375644691) - Move grid search to a OptimizationGrid class.
+      optimal_spend = self._grid_search(
+          spend_grid=optimization_grid.spend_grid,
+          incremental_outcome_grid=optimization_grid.incremental_outcome_grid,
+          budget=np.sum(rounded_spend),
+          fixed_budget=fixed_budget,
+          target_mroi=target_mroi,
+          target_roi=target_roi,
+      )
+    use_historical_budget = budget is None or round(budget) == round(
+        np.sum(hist_spend)
+    )
+    return self._create_optimization_results(
+        hist_spend=hist_spend,
+        spend=spend,
+        rounded_spend=rounded_spend,
+        optimal_spend=optimal_spend,
+        spend_bounds=spend_bounds,
+        optimization_grid=optimization_grid,
         selected_times=selected_time_dims,
-        round_factor=round_factor,
-        use_posterior=use_posterior,
-        use_kpi=use_kpi,
-        use_optimal_frequency=use_optimal_frequency,
         optimal_frequency=optimal_frequency,
-        batch_size=batch_size,
-    )
-    # TODO: b/375644691) - Move grid search to a OptimizationGrid class.
-    optimal_spend = self._grid_search(
-        spend_grid=optimization_grid.spend_grid,
-        incremental_outcome_grid=optimization_grid.incremental_outcome_grid,
-        budget=np.sum(rounded_spend),
         fixed_budget=fixed_budget,
-        target_mroi=target_mroi,
         target_roi=target_roi,
-    )
-    use_historical_budget = budget is None or round(budget) == round(
-        np.sum(hist_spend)
-    )
-    nonoptimized_data = self._create_budget_dataset(
+        target_mroi=target_mroi,
         use_posterior=use_posterior,
         use_kpi=use_kpi,
-        hist_spend=hist_spend,
-        spend=rounded_spend,
-        selected_times=selected_time_dims,
+        use_historical_budget=use_historical_budget,
         confidence_level=confidence_level,
         batch_size=batch_size,
-        use_historical_budget=use_historical_budget,
+        marginal_roi_use_gradient=marginal_roi_use_gradient,
     )
-    nonoptimized_data_with_optimal_freq = self._create_budget_dataset(
+
+  def optimize_scenarios(
+      self,
+      scenarios: Sequence[OptimizationScenario],
+      use_posterior: bool = True,
+      selected_times: tuple[str | None, str | None] | None = None,
+      gtol: float = 0.0001,
+      use_optimal_frequency: bool = True,
+      use_kpi: bool = False,
+      confidence_level: float = c.DEFAULT_CONFIDENCE_LEVEL,
+      batch_size: int = c.DEFAULT_BATCH_SIZE,
+      max_grid_memory_bytes: int | None = None,
+      marginal_roi_use_gradient: bool = False,
+  ) -> list[OptimizationResults]:
+    """Finds the optimal budget allocation of several scenarios.
+
+    This is equivalent to calling `optimize()` once per scenario, for example
+    to sweep the budget and trace the efficient frontier, but the incremental
+    outcome grid is only evaluated once. A single grid spanning the union of
+    the spend bounds of all scenarios is created, and the grid search of each
+    scenario runs on the part of the grid within its own spend bounds.
+
+    The step size of the shared grid is determined by `gtol` and the smallest
+    budget among the scenarios, so scenarios with a larger budget may be
+    optimized on a finer grid than with `optimize()`.
+
+    The budget datasets of the results are not batched: each distinct spend
+    allocation still takes one sweep over the draws for its incremental
+    outcome and marginal ROI. Scenarios with the same non-optimized or optimal
+    allocation share its dataset, so a scenario takes between zero and three
+    sweeps, and a budget sweep of `n` scenarios up to `3 * n`.
+
+    Args:
+      scenarios: Sequence of `OptimizationScenario` with the budget and
+        constraints of each scenario.
+      use_posterior: Boolean. If `True`, then the budget is optimized based on
+        the posterior distribution of the model. Otherwise, the prior
+        distribution is used.
+      selected_times: Tuple containing the start and end time dimension
+        coordinates for the duration to run the optimization on. By default,
+        all times periods are used.
+      gtol: Float indicating the acceptable relative error for the budget used
+        in the grid setup. `gtol` must be less than 1.
+      use_optimal_frequency: If `True`, uses `optimal_frequency` calculated by
+        trained Meridian model for optimization. If `False`, uses historical
+        frequency.
+      use_kpi: If `True`, runs the optimization on KPI. Defaults to revenue.
+      confidence_level: The threshold for computing the confidence intervals.
+      batch_size: Maximum draws per chain in each batch. The calculation is run
+        in batches to avoid memory exhaustion.
+      max_grid_memory_bytes: Optional approximate upper bound, in bytes, on the
+        memory used by the intermediate tensors when evaluating the
+        optimization grid. See `optimize()`.
+      marginal_roi_use_gradient: If `True`, the marginal ROI of the budget
+        allocations is computed as the derivative of the incremental outcome
+        with respect to spend. See `optimize()`.
+
+    Returns:
+      A list with the `OptimizationResults` of each scenario, in the order of
+      `scenarios`. The `optimization_grid` of each result is the part of the
+      shared grid used by the scenario.
+    """
+    if not scenarios:
+      raise ValueError('`scenarios` must not be empty.')
+    for scenario in scenarios:
+      _validate_budget(
+          fixed_budget=scenario.fixed_budget,
+          budget=scenario.budget,
+          target_roi=scenario.target_roi,
+          target_mroi=scenario.target_mroi,
+      )
+    self._validate_model_fit(use_posterior)
+
+    selected_time_dims = self._get_selected_time_dims(selected_times)
+    hist_spend = self._get_historical_spend(selected_time_dims)
+    budgets = [scenario.budget or np.sum(hist_spend) for scenario in scenarios]
+    round_factor = max(_get_round_factor(budget, gtol) for budget in budgets)
+    optimal_frequency = self._get_optimal_frequency(
         use_posterior=use_posterior,
+        selected_times=selected_time_dims,
         use_kpi=use_kpi,
-        hist_spend=hist_spend,
-        spend=rounded_spend,
+        use_optimal_frequency=use_optimal_frequency,
+    )
+
+    spends = []
+    rounded_spends = []
+    bounds = []
+    for scenario, budget in zip(scenarios, budgets):
+      pct_of_spend = self._validate_pct_of_spend(
+          hist_spend, scenario.pct_of_spend
+      )
+      spend = budget * pct_of_spend
+      rounded_spend = np.round(spend, round_factor).astype(int)
+      spends.append(spend)
+      rounded_spends.append(rounded_spend)
+      bounds.append(
+          self._get_optimization_bounds(
+              spend=rounded_spend,
+              spend_constraint_lower=scenario.spend_constraint_lower,
+              spend_constraint_upper=scenario.spend_constraint_upper,
+              round_factor=round_factor,
+              fixed_budget=scenario.fixed_budget,
+          )
+      )
+
+    shared_grid = self.create_optimization_grid(
+        spend=hist_spend,
+        spend_bound_lower=np.min([lower for lower, _, _ in bounds], axis=0),
+        spend_bound_upper=np.max([upper for _, upper, _ in bounds], axis=0),
         selected_times=selected_time_dims,
+        round_factor=round_factor,
+        use_posterior=use_posterior,
+        use_kpi=use_kpi,
+        use_optimal_frequency=use_optimal_frequency,
         optimal_frequency=optimal_frequency,
-        confidence_level=confidence_level,
         batch_size=batch_size,
-        use_historical_budget=use_historical_budget,
+        max_grid_memory_bytes=max_grid_memory_bytes,
+    )
+
+    budget_datasets = {}
+    results = []
+    for scenario, budget, spend, rounded_spend, scenario_bounds in zip(
+        scenarios, budgets, spends, rounded_spends, bounds
+    ):
+      (lower_bound, upper_bound, spend_bounds) = scenario_bounds
+      optimization_grid = self._get_scenario_optimization_grid(
+          optimization_grid=shared_grid,
+          spend_bound_lower=lower_bound,
+          spend_bound_upper=upper_bound,
+      )
+      optimal_spend = self._grid_search(
+          spend_grid=optimization_grid.spend_grid.values,
+          incremental_outcome_grid=(
+              optimization_grid.incremental_outcome_grid.values
+          ),
+          budget=np.sum(rounded_spend),
+          fixed_budget=scenario.fixed_budget,
+          target_mroi=scenario.target_mroi,
+          target_roi=scenario.target_roi,
+      )
+      results.append(
+          self._create_optimization_results(
+              hist_spend=hist_spend,
+              spend=spend,
+              rounded_spend=rounded_spend,
+              optimal_spend=optimal_spend,
+              spend_bounds=spend_bounds,
+              optimization_grid=optimization_grid,
+              selected_times=selected_time_dims,
+              optimal_frequency=optimal_frequency,
+              fixed_budget=scenario.fixed_budget,
+              target_roi=scenario.target_roi,
+              target_mroi=scenario.target_mroi,
+              use_posterior=use_posterior,
+              use_kpi=use_kpi,
+              use_historical_budget=(
+                  round(budget) == round(np.sum(hist_spend))
+              ),
+              confidence_level=confidence_level,
+              batch_size=batch_size,
+              marginal_roi_use_gradient=marginal_roi_use_gradient,
+              budget_datasets=budget_datasets,
+          )
+      )
+    return results
+
+  def _get_selected_time_dims(
+      self, selected_times: tuple[str | None, str | None] | None
+  ) -> Sequence[str] | None:
+    """Expands the start and end of `selected_times` to time coordinates."""
+    if selected_times is None:
+      return None
+    start_date, end_date = selected_times
+    return self._meridian.expand_selected_time_dims(
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+  def _get_historical_spend(
+      self, selected_times: Sequence[str] | None
+  ) -> np.ndarray:
+    """Returns the historical spend of each paid channel."""
+    return self._analyzer.get_historical_spend(
+        selected_times,
+        include_media=self._meridian.n_media_channels > 0,
+        include_rf=self._meridian.n_rf_channels > 0,
+    ).data
+
+  def _get_optimal_frequency(
+      self,
+      use_posterior: bool,
+      selected_times: Sequence[str] | None,
+      use_kpi: bool,
+      use_optimal_frequency: bool,
+  ) -> tf.Tensor | None:
+    """Returns the optimal frequency of the RF channels, if it is used."""
+    if self._meridian.n_rf_channels == 0 or not use_optimal_frequency:
+      return None
+    return tf.convert_to_tensor(
+        self._analyzer.optimal_freq(
+            use_posterior=use_posterior,
+            selected_times=selected_times,
+            use_kpi=use_kpi,
+        ).optimal_frequency,
+        dtype=tf.float32,
+    )
+
+  def _get_scenario_optimization_grid(
+      self,
+      optimization_grid: OptimizationGrid,
+      spend_bound_lower: np.ndarray,
+      spend_bound_upper: np.ndarray,
+  ) -> OptimizationGrid:
+    """Returns the part of an optimization grid within narrower spend bounds.
+
+    Args:
+      optimization_grid: The optimization grid, whose spend bounds contain
+        `spend_bound_lower` and `spend_bound_upper`.
+      spend_bound_lower: ndarray of dimension `(n_total_channels,)` containing
+        the lower constraint spend for each channel.
+      spend_bound_upper: ndarray of dimension `(n_total_channels,)` containing
+        the upper constraint spend for each channel.
+
+    Returns:
+      An `OptimizationGrid` with the rows of each channel of
+      `optimization_grid` from `spend_bound_lower` to `spend_bound_upper`,
+      starting at the first row.
+    """
+    step_size = optimization_grid.spend_step_size
+    spend_grid = optimization_grid.spend_grid.values
+    incremental_outcome_grid = optimization_grid.incremental_outcome_grid.values
+    offsets = (spend_bound_lower - spend_grid[0]) / step_size
+    starts = np.round(offsets).astype(int)
+    lengths = [
+        len(np.arange(lower, upper + step_size, step_size))
+        for lower, upper in zip(spend_bound_lower, spend_bound_upper)
+    ]
+    scenario_spend_grid = np.full([max(lengths), len(lengths)], np.nan)
+    scenario_incremental_outcome_grid = np.full(
+        scenario_spend_grid.shape, np.nan
+    )
+    for i, (start, length) in enumerate(zip(starts, lengths)):
+      rows = slice(start, start + length)
+      n_rows = len(spend_grid[rows, i])
+      scenario_spend_grid[:n_rows, i] = spend_grid[rows, i]
+      scenario_incremental_outcome_grid[:n_rows, i] = incremental_outcome_grid[
+          rows, i
+      ]
+    return dataclasses.replace(
+        optimization_grid,
+        _grid_dataset=self._create_grid_dataset(
+            spend_grid=scenario_spend_grid,
+            spend_step_size=step_size,
+            incremental_outcome_grid=scenario_incremental_outcome_grid,
+        ),
+    )
+
+  def _create_optimization_results(
+      self,
+      hist_spend: np.ndarray,
+      spend: np.ndarray,
+      rounded_spend: np.ndarray,
+      optimal_spend: np.ndarray,
+      spend_bounds: tuple[np.ndarray, np.ndarray],
+      optimization_grid: OptimizationGrid,
+      selected_times: Sequence[str] | None,
+      optimal_frequency: tf.Tensor | None,
+      fixed_budget: bool,
+      target_roi: float | None,
+      target_mroi: float | None,
+      use_posterior: bool,
+      use_kpi: bool,
+      use_historical_budget: bool,
+      confidence_level: float,
+      batch_size: int,
+      marginal_roi_use_gradient: bool,
+      budget_datasets: dict[Hashable, xr.Dataset] | None = None,
+  ) -> OptimizationResults:
+    """Creates the budget datasets of an optimal allocation.
+
+    Each budget dataset takes a sweep over the draws, so equal datasets are
+    only created once: the non-optimized datasets with and without the optimal
+    frequency are the same without RF channels, and `budget_datasets` shares
+    the datasets of the same allocations across the calls of
+    `optimize_scenarios()`. It maps the spend allocation, whether the optimal
+    frequency is used and `use_historical_budget` to the budget dataset without
+    constraint attributes, and is updated with the datasets created by this
+    call.
+    """
+    if budget_datasets is None:
+      budget_datasets = {}
+
+    def get_budget_dataset(
+        spend: np.ndarray, optimal_frequency: tf.Tensor | None
+    ) -> xr.Dataset:
+      key = (
+          np.asarray(spend, dtype=np.float32).tobytes(),
+          optimal_frequency is not None,
+          use_historical_budget,
+      )
+      if key not in budget_datasets:
+        budget_datasets[key] = self._create_budget_dataset(
+            use_posterior=use_posterior,
+            use_kpi=use_kpi,
+            hist_spend=hist_spend,
+            spend=spend,
+            selected_times=selected_times,
+            optimal_frequency=optimal_frequency,
+            confidence_level=confidence_level,
+            batch_size=batch_size,
+            use_historical_budget=use_historical_budget,
+            marginal_roi_use_gradient=marginal_roi_use_gradient,
+        )
+      return budget_datasets[key]
+
+    nonoptimized_data = get_budget_dataset(rounded_spend, None)
+    nonoptimized_data_with_optimal_freq = get_budget_dataset(
+        rounded_spend, optimal_frequency
     )
     constraints = {
         c.FIXED_BUDGET: fixed_budget,
@@ -1129,18 +1554,9 @@ class BudgetOptimizer:
       constraints[c.TARGET_ROI] = target_roi
     elif target_mroi:
       constraints[c.TARGET_MROI] = target_mroi
-    optimized_data = self._create_budget_dataset(
-        use_posterior=use_posterior,
-        use_kpi=use_kpi,
-        hist_spend=hist_spend,
-        spend=optimal_spend,
-        selected_times=selected_time_dims,
-        optimal_frequency=optimal_frequency,
-        attrs=constraints,
-        confidence_level=confidence_level,
-        batch_size=batch_size,
-        use_historical_budget=use_historical_budget,
-    )
+    optimized_data = get_budget_dataset(
+        optimal_spend, optimal_frequency
+    ).assign_attrs(constraints)
     spend_ratio = np.divide(
         spend,
         hist_spend,
@@ -1171,6 +1587,7 @@ class BudgetOptimizer:
       use_optimal_frequency: bool = True,
       optimal_frequency: xr.DataArray | None = None,
       batch_size: int = c.DEFAULT_BATCH_SIZE,
+      max_grid_memory_bytes: int | None = None,
   ) -> OptimizationGrid:
     """Creates a OptimizationGrid for optimization.
 
@@ -1200,11 +1617,19 @@ class BudgetOptimizer:
         batches to avoid memory exhaustion. If a memory error occurs, try
         reducing `batch_size`. The calculation will generally be faster with
         larger `batch_size` values.
+      max_grid_memory_bytes: Optional approximate upper bound, in bytes, on the
+        memory used by the intermediate tensors when evaluating the
+        incremental outcome grid. If provided, the grid of each channel is
+        evaluated over its own spend range, in blocks of points of the channels
+        with the same number of points, with the block size chosen to respect
+        this bound. If `None`, the grid rows are evaluated one at a time.
 
     Returns:
       An OptimizationGrid object containing the grid data for optimization.
     """
     self._validate_model_fit(use_posterior)
+    if max_grid_memory_bytes is not None and max_grid_memory_bytes <= 0:
+      raise ValueError('`max_grid_memory_bytes` must be positive.')
 
     step_size = 10 ** (-round_factor)
     (spend_grid, incremental_outcome_grid) = self._create_grids(
@@ -1217,6 +1642,7 @@ class BudgetOptimizer:
         use_kpi=use_kpi,
         optimal_frequency=optimal_frequency,
         batch_size=batch_size,
+        max_grid_memory_bytes=max_grid_memory_bytes,
     )
     grid_dataset = self._create_grid_dataset(
         spend_grid=spend_grid,
@@ -1281,6 +1707,237 @@ class BudgetOptimizer:
         attrs={c.SPEND_STEP_SIZE: spend_step_size},
     )
 
+  def _create_continuous_optimization_grid(
+      self,
+      hist_spend: np.ndarray,
+      spend: np.ndarray,
+      spend_bound_lower: np.ndarray,
+      spend_bound_upper: np.ndarray,
+      budget: float,
+      fixed_budget: bool,
+      selected_times: Sequence[str] | None,
+      round_factor: int,
+      ftol: float,
+      target_mroi: float | None = None,
+      target_roi: float | None = None,
+      use_posterior: bool = True,
+      use_kpi: bool = False,
+      use_optimal_frequency: bool = True,
+      optimal_frequency: tf.Tensor | None = None,
+      batch_size: int = c.DEFAULT_BATCH_SIZE,
+  ) -> OptimizationGrid:
+    """Solves the budget optimization with sequential least squares programming.
+
+    The mean incremental outcome of each channel is treated as a smooth function
+    of its spend, whose derivative is computed in a single forward-mode pass as
+    in `Analyzer.marginal_roi(use_gradient=True)`. The fixed budget scenario
+    maximizes the total incremental outcome subject to the total spend being
+    equal to `budget`. The target ROI scenario maximizes it subject to the total
+    ROI being at least `target_roi`. The target mROI scenario maximizes the
+    total incremental outcome minus `target_mroi` times the total spend, so
+    that the marginal ROI of each channel is equal to `target_mroi` unless its
+    spend is at a bound.
+
+    Args:
+      hist_spend: ndarray of shape `(n_paid_channels,)` with the historical
+        spend per paid channel.
+      spend: ndarray of shape `(n_paid_channels,)` with the non-optimized spend
+        per paid channel, used as the starting point.
+      spend_bound_lower: ndarray of dimension `(n_total_channels,)` containing
+        the lower constraint spend for each channel.
+      spend_bound_upper: ndarray of dimension `(n_total_channels,)` containing
+        the upper constraint spend for each channel.
+      budget: Number indicating the total budget.
+      fixed_budget: Boolean indicating whether it's a fixed budget optimization
+        or flexible budget optimization.
+      selected_times: Sequence of strings representing the time dimensions in
+        `meridian.input_data.time` to use for optimization.
+      round_factor: The number of digits the optimal spend is rounded to.
+      ftol: Float indicating the tolerance of the objective, which is the total
+        incremental outcome divided by the total upper bound spend.
+      target_mroi: Optional float indicating the target marginal ROI
+        constraint.
+      target_roi: Optional float indicating the target ROI constraint.
+      use_posterior: Boolean. If `True`, then the incremental outcome is derived
+        from the posterior distribution of the model. Otherwise, the prior
+        distribution is used.
+      use_kpi: Boolean. If `True`, then the incremental outcome is derived from
+        the KPI impact. Otherwise, the incremental outcome is derived from the
+        revenue impact.
+      use_optimal_frequency: Boolean. Whether optimal frequency was used.
+      optimal_frequency: Tensor with dimension `n_rf_channels`, containing the
+        optimal frequency per channel. Value is `None` if the model does not
+        contain reach and frequency data, or if historical frequency is used
+        for the optimization scenario.
+      batch_size: Max draws per chain in each batch. The calculation is run in
+        batches to avoid memory exhaustion. If a memory error occurs, try
+        reducing `batch_size`. The calculation will generally be faster with
+        larger `batch_size` values.
+
+    Returns:
+      An `OptimizationGrid` whose grid has a single row containing the optimal
+      spend, rounded to `round_factor` digits within the spend bounds, and its
+      incremental outcome. In the fixed budget scenario, the rounded spend sums
+      to `budget`.
+    """
+    self._validate_model_fit(use_posterior)
+    # The problem is solved in units of the total upper bound spend, so that
+    # the objective and its gradient are of the order of the ROI.
+    scale = max(float(np.sum(spend_bound_upper)), 1.0)
+
+    # SLSQP evaluates the objective and the constraints at the same points, but
+    # not always in the same order, so that a few recent points are cached.
+    @functools.lru_cache(maxsize=8)
+    def evaluate(x: tuple[float, ...]) -> tuple[np.ndarray, np.ndarray]:
+      return self._get_incremental_outcome_and_gradient(
+          hist_spend=hist_spend,
+          spend=np.asarray(x) * scale,
+          selected_times=selected_times,
+          use_posterior=use_posterior,
+          use_kpi=use_kpi,
+          optimal_frequency=optimal_frequency,
+          batch_size=batch_size,
+      )
+
+    def objective(x: np.ndarray) -> tuple[float, np.ndarray]:
+      incremental_outcome, gradient = evaluate(tuple(x))
+      value = np.sum(incremental_outcome) / scale
+      if target_mroi is not None:
+        value -= target_mroi * np.sum(x)
+        gradient = gradient - target_mroi
+      return -value, -gradient
+
+    if fixed_budget:
+      constraints = [{
+          'type': 'eq',
+          'fun': lambda x: np.sum(x) - budget / scale,
+          'jac': np.ones_like,
+      }]
+    elif target_roi is not None:
+      constraints = [{
+          'type': 'ineq',
+          'fun': lambda x: (
+              np.sum(evaluate(tuple(x))[0]) / scale - target_roi * np.sum(x)
+          ),
+          'jac': lambda x: evaluate(tuple(x))[1] - target_roi,
+      }]
+    else:
+      constraints = []
+
+    result = scipy_optimize.minimize(
+        objective,
+        x0=np.clip(spend, spend_bound_lower, spend_bound_upper) / scale,
+        jac=True,
+        method='SLSQP',
+        bounds=scipy_optimize.Bounds(
+            spend_bound_lower / scale, spend_bound_upper / scale
+        ),
+        constraints=constraints,
+        options={'ftol': ftol},
+    )
+    if not result.success:
+      warnings.warn(
+          f'The budget optimization did not converge: {result.message}'
+      )
+    optimal_spend = _round_spend_to_grid(
+        result.x * scale,
+        spend_bound_lower=spend_bound_lower,
+        spend_bound_upper=spend_bound_upper,
+        step_size=10 ** (-round_factor),
+        budget=budget if fixed_budget else None,
+    )
+    (incremental_outcome, _) = evaluate(tuple(optimal_spend / scale))
+
+    grid_dataset = self._create_grid_dataset(
+        spend_grid=optimal_spend[np.newaxis, :],
+        spend_step_size=10 ** (-round_factor),
+        incremental_outcome_grid=incremental_outcome[np.newaxis, :],
+    )
+    return OptimizationGrid(
+        _grid_dataset=grid_dataset,
+        spend=hist_spend,
+        use_kpi=use_kpi,
+        use_posterior=use_posterior,
+        use_optimal_frequency=use_optimal_frequency,
+        round_factor=round_factor,
+        optimal_frequency=optimal_frequency,
+        selected_times=selected_times,
+    )
+
+  def _get_incremental_outcome_and_gradient(
+      self,
+      hist_spend: np.ndarray,
+      spend: np.ndarray,
+      selected_times: Sequence[str] | None = None,
+      use_posterior: bool = True,
+      use_kpi: bool = False,
+      optimal_frequency: tf.Tensor | None = None,
+      batch_size: int = c.DEFAULT_BATCH_SIZE,
+  ) -> tuple[np.ndarray, np.ndarray]:
+    """Computes the mean incremental outcome of each channel and its gradient.
+
+    Args:
+      hist_spend: ndarray of shape `(n_paid_channels,)` with the historical
+        spend per paid channel.
+      spend: ndarray of shape `(n_paid_channels,)` with the spend per paid
+        channel at which the incremental outcome is computed.
+      selected_times: Sequence of strings representing the time dimensions in
+        `meridian.input_data.time` to use for optimization.
+      use_posterior: Boolean. If `True`, then the posterior distribution is
+        used. Otherwise, the prior distribution is used.
+      use_kpi: Boolean. If `True`, then the incremental KPI is computed.
+        Otherwise, the incremental revenue is computed.
+      optimal_frequency: Tensor with dimension `n_rf_channels`, containing the
+        optimal frequency per channel, or `None` if historical frequency is
+        used.
+      batch_size: Max draws per chain in each batch.
+
+    Returns:
+      A tuple of ndarrays of shape `(n_paid_channels,)` containing the mean
+      incremental outcome of each channel, and its derivative with respect to
+      the spend of the channel.
+    """
+    # The derivative with respect to spend is the marginal ROI at an
+    # infinitesimal increase, which is undefined at zero spend. It is computed
+    # at a spend slightly above zero instead.
+    gradient_spend = np.maximum(spend, _MIN_GRADIENT_SPEND_RATIO * hist_spend)
+    (new_media, new_media_spend, new_reach, new_frequency, new_rf_spend) = (
+        self._get_incremental_outcome_tensors(
+            tf.convert_to_tensor(hist_spend, dtype=tf.float32),
+            tf.convert_to_tensor(gradient_spend, dtype=tf.float32),
+            optimal_frequency,
+        )
+    )
+    # The incremental outcome is the primal of the forward-mode pass that
+    # computes the marginal ROI, so both come from a single sweep of the draws.
+    (incremental_outcome, marginal_roi) = (
+        self._analyzer._incremental_outcome_and_marginal_roi(  # pylint: disable=protected-access
+            new_data=analyzer.DataTensors(
+                media=new_media,
+                reach=new_reach,
+                frequency=new_frequency,
+                media_spend=new_media_spend,
+                rf_spend=new_rf_spend,
+            ),
+            use_posterior=use_posterior,
+            selected_times=selected_times,
+            use_kpi=use_kpi,
+            batch_size=batch_size,
+        )
+    )
+    gradient = np.mean(
+        marginal_roi, (c.CHAINS_DIMENSION, c.DRAWS_DIMENSION), dtype=np.float64
+    )
+    incremental_outcome = np.mean(
+        incremental_outcome,
+        (c.CHAINS_DIMENSION, c.DRAWS_DIMENSION),
+        dtype=np.float64,
+    )
+    # A first-order correction moves the incremental outcome of the channels
+    # with zero spend back from `gradient_spend` to `spend`.
+    incremental_outcome -= gradient * (gradient_spend - spend)
+    return incremental_outcome, gradient
+
   def _validate_pct_of_spend(
       self, hist_spend: np.ndarray, pct_of_spend: Sequence[float] | None
   ) -> np.ndarray:
@@ -1433,6 +2090,7 @@ class BudgetOptimizer:
       confidence_level: float = c.DEFAULT_CONFIDENCE_LEVEL,
       batch_size: int = c.DEFAULT_BATCH_SIZE,
       use_historical_budget: bool = True,
+      marginal_roi_use_gradient: bool = False,
   ) -> xr.Dataset:
     """Creates the budget dataset."""
     spend = tf.convert_to_tensor(spend, dtype=tf.float32)
@@ -1510,6 +2168,7 @@ class BudgetOptimizer:
             batch_size=batch_size,
             by_reach=True,
             use_kpi=use_kpi,
+            use_gradient=marginal_roi_use_gradient,
         ),
         confidence_level=confidence_level,
         include_median=True,
@@ -1708,6 +2367,220 @@ class BudgetOptimizer:
         dtype=np.float64,
     )
 
+  def _update_incremental_outcome_grid_block(
+      self,
+      rows: np.ndarray,
+      channel_indices: np.ndarray,
+      incremental_outcome_grid: np.ndarray,
+      multipliers_grid: tf.Tensor,
+      selected_times: Sequence[str],
+      use_posterior: bool = True,
+      use_kpi: bool = False,
+      optimal_frequency: xr.DataArray | None = None,
+      batch_size: int = c.DEFAULT_BATCH_SIZE,
+  ):
+    """Updates a block of incremental_outcome_grid points in a single pass.
+
+    This is the vectorized counterpart of `_update_incremental_outcome_grid`.
+    The incremental outcome of a channel only depends on its own multiplier, so
+    the block holds the same number of points of each of a subset of channels,
+    which need not be in the same rows of the grid. Their multipliers are
+    stacked along a leading multiplier dimension, and only the data and
+    parameters of these channels are used to compute the incremental outcome
+    of all of them in one pass per batch of draws. When Hill is not applied
+    before Adstock, the Adstock transformation is shared by all points of the
+    block.
+
+    Args:
+      rows: Array with dimensions `(n_block_points, n_block_channels)`
+        containing the grid rows of the points of each channel.
+      channel_indices: Sorted indices of the channels of the block, with
+        dimension `n_block_channels`.
+      incremental_outcome_grid: Discrete two-dimensional grid with the number of
+        rows determined by the `spend_constraints` and `step_size`, and the
+        number of columns is equal to the number of total channels, containing
+        incremental outcome by channel.
+      multipliers_grid: A grid derived from spend.
+      selected_times: Sequence of strings representing the time dimensions in
+        `meridian.input_data.time` to use for optimization.
+      use_posterior: Boolean. If `True`, then the incremental outcome is derived
+        from the posterior distribution of the model. Otherwise, the prior
+        distribution is used.
+      use_kpi: Boolean. If `True`, then the incremental outcome is derived from
+        the KPI impact. Otherwise, the incremental outcome is derived from the
+        revenue impact.
+      optimal_frequency: xr.DataArray with dimension `n_rf_channels`, containing
+        the optimal frequency per channel, that maximizes posterior mean roi.
+        Value is `None` if the model does not contain reach and frequency data,
+        or if the model does contain reach and frequency data, but historical
+        frequency is used for the optimization scenario.
+      batch_size: Max draws per chain in each batch. The calculation is run in
+        batches to avoid memory exhaustion. If a memory error occurs, try
+        reducing `batch_size`. The calculation will generally be faster with
+        larger `batch_size` values.
+    """
+    multipliers = multipliers_grid[rows, channel_indices]
+    if not self._meridian.model_spec.hill_before_adstock:
+      # Adstock is linear, so the Adstock transformation is computed once and
+      # scaled by the multipliers of each row.
+      if self._meridian.n_rf_channels > 0 and optimal_frequency is not None:
+        frequency = (
+            tf.ones_like(self._meridian.rf_tensors.frequency)
+            * optimal_frequency
+        )
+        base_data = analyzer.DataTensors(
+            reach=tf.math.divide_no_nan(
+                self._meridian.rf_tensors.reach
+                * self._meridian.rf_tensors.frequency,
+                frequency,
+            ),
+            frequency=frequency,
+        )
+      else:
+        base_data = None
+      incremental_outcome = (
+          self._analyzer._scaled_paid_incremental_outcome(  # pylint: disable=protected-access
+              multipliers=multipliers,
+              new_data=base_data,
+              use_posterior=use_posterior,
+              selected_times=selected_times,
+              use_kpi=use_kpi,
+              batch_size=batch_size,
+              channel_indices=channel_indices,
+          )
+      )
+    else:
+      # The data tensors are built for all channels, and the other channels
+      # are dropped before the Adstock and Hill transformations.
+      all_multipliers = np.zeros(
+          (len(rows), multipliers_grid.shape[1]), dtype=np.float32
+      )
+      all_multipliers[:, channel_indices] = multipliers
+      incremental_outcome = (
+          self._analyzer._paid_incremental_outcome_by_multiplier(  # pylint: disable=protected-access
+              new_data=self._get_grid_block_data_tensors(
+                  multipliers=all_multipliers,
+                  optimal_frequency=optimal_frequency,
+              ),
+              use_posterior=use_posterior,
+              selected_times=selected_times,
+              use_kpi=use_kpi,
+              batch_size=batch_size,
+              channel_indices=channel_indices,
+          )
+      )
+
+    # incremental_outcome has dims (n_chains x n_draws x n_block_points x
+    # n_block_channels).
+    incremental_outcome_grid[rows, channel_indices] = np.mean(
+        incremental_outcome,
+        (c.CHAINS_DIMENSION, c.DRAWS_DIMENSION),
+        dtype=np.float64,
+    )
+
+  def _get_grid_block_data_tensors(
+      self,
+      multipliers: np.ndarray,
+      optimal_frequency: xr.DataArray | None = None,
+  ) -> analyzer.DataTensors:
+    """Returns the media, reach and frequency for a block of grid rows.
+
+    Args:
+      multipliers: Array with dimensions `(n_block_rows, n_total_channels)`
+        containing the spend multipliers of the block of grid rows.
+      optimal_frequency: xr.DataArray with dimension `n_rf_channels`, containing
+        the optimal frequency per channel. Value is `None` if historical
+        frequency is used.
+
+    Returns:
+      A `DataTensors` container with the `media`, `reach` and `frequency`
+      tensors with dimensions `(n_block_rows, n_geos, n_media_times,
+      n_channels)`.
+    """
+    # Multipliers with dimensions (n_block_rows, 1, 1, n_channels), broadcast
+    # against the (n_geos, n_media_times, n_channels) data tensors.
+    multipliers = tf.convert_to_tensor(
+        multipliers[:, tf.newaxis, tf.newaxis, :], dtype=tf.float32
+    )
+    if self._meridian.n_media_channels > 0:
+      new_media = (
+          multipliers[..., : self._meridian.n_media_channels]
+          * self._meridian.media_tensors.media
+      )
+    else:
+      new_media = None
+
+    if self._meridian.n_rf_channels == 0:
+      new_frequency = None
+      new_reach = None
+    elif optimal_frequency is not None:
+      frequency = (
+          tf.ones_like(self._meridian.rf_tensors.frequency) * optimal_frequency
+      )
+      new_reach = tf.math.divide_no_nan(
+          multipliers[..., -self._meridian.n_rf_channels :]
+          * self._meridian.rf_tensors.reach
+          * self._meridian.rf_tensors.frequency,
+          frequency,
+      )
+      new_frequency = tf.broadcast_to(frequency, new_reach.shape)
+    else:
+      new_frequency = None
+      new_reach = (
+          multipliers[..., -self._meridian.n_rf_channels :]
+          * self._meridian.rf_tensors.reach
+      )
+    return analyzer.DataTensors(
+        media=new_media, reach=new_reach, frequency=new_frequency
+    )
+
+  def _get_grid_block_size(
+      self,
+      n_grid_rows: int,
+      use_posterior: bool,
+      batch_size: int,
+      max_grid_memory_bytes: int,
+      n_channels: int | None = None,
+  ) -> int:
+    """Returns the number of grid rows to evaluate in a single pass.
+
+    The estimate is based on the largest intermediate tensor of one grid row,
+    which is the stacked Adstock window over a batch of draws with dimensions
+    `(window_size, n_chains, batch_size, n_geos, n_times, n_channels)`.
+
+    Args:
+      n_grid_rows: Number of rows in the optimization grid.
+      use_posterior: Boolean. Whether the posterior or prior draws are used.
+      batch_size: Max draws per chain in each batch.
+      max_grid_memory_bytes: Approximate upper bound, in bytes, on the memory
+        used by the intermediate tensors of a block of grid rows.
+      n_channels: Number of channels evaluated in each row. Defaults to the
+        number of paid channels.
+
+    Returns:
+      The block size, between 1 and `n_grid_rows`.
+    """
+    params = (
+        self._meridian.inference_data.posterior
+        if use_posterior
+        else self._meridian.inference_data.prior
+    )
+    if n_channels is None:
+      n_channels = len(self._meridian.input_data.get_all_paid_channels())
+    window_size = min(
+        self._meridian.model_spec.max_lag + 1, self._meridian.n_media_times
+    )
+    bytes_per_row = (
+        tf.float32.size
+        * (window_size + 1)
+        * params.chain.size
+        * min(batch_size, params.draw.size)
+        * self._meridian.n_geos
+        * self._meridian.n_times
+        * n_channels
+    )
+    return int(np.clip(max_grid_memory_bytes // bytes_per_row, 1, n_grid_rows))
+
   def _create_grids(
       self,
       spend: np.ndarray,
@@ -1719,6 +2592,7 @@ class BudgetOptimizer:
       use_kpi: bool = False,
       optimal_frequency: xr.DataArray | None = None,
       batch_size: int = c.DEFAULT_BATCH_SIZE,
+      max_grid_memory_bytes: int | None = None,
   ) -> tuple[np.ndarray, np.ndarray]:
     """Creates spend and incremental outcome grids for optimization algorithm.
 
@@ -1748,6 +2622,12 @@ class BudgetOptimizer:
         batches to avoid memory exhaustion. If a memory error occurs, try
         reducing `batch_size`. The calculation will generally be faster with
         larger `batch_size` values.
+      max_grid_memory_bytes: Optional approximate upper bound, in bytes, on the
+        memory used by the intermediate tensors when evaluating the
+        incremental outcome grid. If provided, the grid of each channel is
+        evaluated over its own spend range, in blocks of points of the channels
+        with the same number of points, with the block size chosen to respect
+        this bound. If `None`, the grid rows are evaluated one at a time.
 
     Returns:
       spend_grid: Discrete two-dimensional grid with the number of rows
@@ -1779,16 +2659,64 @@ class BudgetOptimizer:
     multipliers_grid = np.where(
         np.isnan(spend_grid), np.nan, multipliers_grid_base
     )
-    for i in range(n_grid_rows):
-      self._update_incremental_outcome_grid(
-          i=i,
-          incremental_outcome_grid=incremental_outcome_grid,
-          multipliers_grid=multipliers_grid,
+    if self._response_cache is not None:
+      scenario = _get_response_cache_scenario(
           selected_times=selected_times,
           use_posterior=use_posterior,
           use_kpi=use_kpi,
           optimal_frequency=optimal_frequency,
-          batch_size=batch_size,
+      )
+      channels = self._meridian.input_data.get_all_paid_channels()
+      incremental_outcome_grid = self._response_cache.get(
+          scenario, channels, multipliers_grid
+      )
+    # Only the points missing from the cache are evaluated.
+    missing = np.isnan(incremental_outcome_grid) & ~np.isnan(multipliers_grid)
+    if max_grid_memory_bytes is None:
+      for i in np.flatnonzero(np.any(missing, axis=1)):
+        self._update_incremental_outcome_grid(
+            i=i,
+            incremental_outcome_grid=incremental_outcome_grid,
+            multipliers_grid=multipliers_grid,
+            selected_times=selected_times,
+            use_posterior=use_posterior,
+            use_kpi=use_kpi,
+            optimal_frequency=optimal_frequency,
+            batch_size=batch_size,
+        )
+    else:
+      # Each column of the grid is evaluated over its own spend range, so that
+      # the work scales with the total number of points rather than the
+      # longest column times the number of channels. Channels with the same
+      # number of points are evaluated together.
+      n_points = np.sum(missing, axis=0)
+      for n_channel_points in np.unique(n_points[n_points > 0]):
+        channel_indices = np.flatnonzero(n_points == n_channel_points)
+        rows = np.stack(
+            [np.flatnonzero(missing[:, j]) for j in channel_indices], axis=1
+        )
+        block_size = self._get_grid_block_size(
+            n_grid_rows=n_channel_points,
+            use_posterior=use_posterior,
+            batch_size=batch_size,
+            max_grid_memory_bytes=max_grid_memory_bytes,
+            n_channels=len(channel_indices),
+        )
+        for start in range(0, n_channel_points, block_size):
+          self._update_incremental_outcome_grid_block(
+              rows=rows[start : start + block_size],
+              channel_indices=channel_indices,
+              incremental_outcome_grid=incremental_outcome_grid,
+              multipliers_grid=multipliers_grid,
+              selected_times=selected_times,
+              use_posterior=use_posterior,
+              use_kpi=use_kpi,
+              optimal_frequency=optimal_frequency,
+              batch_size=batch_size,
+          )
+    if self._response_cache is not None:
+      self._response_cache.put(
+          scenario, channels, multipliers_grid, incremental_outcome_grid
       )
     # In theory, for RF channels, incremental_outcome/spend should always be
     # same despite of spend, But given the level of precision,
@@ -1854,28 +2782,35 @@ class BudgetOptimizer:
     incremental_outcome = incremental_outcome_grid[0, :].copy()
     spend_grid = spend_grid[1:, :]
     incremental_outcome_grid = incremental_outcome_grid[1:, :]
-    iterative_roi_grid = np.round(
-        tf.math.divide_no_nan(
-            incremental_outcome_grid - incremental_outcome, spend_grid - spend
-        ),
-        decimals=8,
-    )
+    iterative_roi_grid = _get_step_roi(
+        incremental_outcome_grid - incremental_outcome, spend_grid - spend
+    )
+    # Each step only changes the column of the chosen channel, so the best step
+    # of each channel is kept in a heap. Entries are ordered by decreasing ROI,
+    # then by row and channel, which is the order in which `np.nanargmax`
+    # breaks ties over the whole grid.
+    heap = []
+
+    def push_best_step(media_idx: int):
+      column = iterative_roi_grid[:, media_idx]
+      if not np.isnan(column).all():
+        row_idx = np.nanargmax(column)
+        heapq.heappush(heap, (-column[row_idx], row_idx, media_idx))
+
+    for media_idx in range(iterative_roi_grid.shape[1]):
+      push_best_step(media_idx)
     while True:
       spend_optimal = spend.astype(int)
       # If none of the exit criteria are met roi_grid will eventually be filled
       # with all nans.
-      if np.isnan(iterative_roi_grid).all():
+      if not heap:
         break
-      point = np.unravel_index(
-          np.nanargmax(iterative_roi_grid), iterative_roi_grid.shape
-      )
-      row_idx = point[0]
-      media_idx = point[1]
+      (negative_roi, row_idx, media_idx) = heapq.heappop(heap)
       spend[media_idx] = spend_grid[row_idx, media_idx]
       incremental_outcome[media_idx] = incremental_outcome_grid[
           row_idx, media_idx
       ]
-      roi_grid_point = iterative_roi_grid[row_idx, media_idx]
+      roi_grid_point = -negative_roi
       if _exceeds_optimization_constraints(
           fixed_budget,
           budget,
@@ -1888,15 +2823,13 @@ class BudgetOptimizer:
         break
 
       iterative_roi_grid[0 : row_idx + 1, media_idx] = np.nan
-      iterative_roi_grid[row_idx + 1 :, media_idx] = np.round(
-          tf.math.divide_no_nan(
-              incremental_outcome_grid[row_idx + 1 :, media_idx]
-              - incremental_outcome_grid[row_idx, media_idx],
-              spend_grid[row_idx + 1 :, media_idx]
-              - spend_grid[row_idx, media_idx],
-          ),
-          decimals=8,
+      iterative_roi_grid[row_idx + 1 :, media_idx] = _get_step_roi(
+          incremental_outcome_grid[row_idx + 1 :, media_idx]
+          - incremental_outcome_grid[row_idx, media_idx],
+          spend_grid[row_idx + 1 :, media_idx]
+          - spend_grid[row_idx, media_idx],
       )
+      push_best_step(media_idx)
     return spend_optimal
 
 
@@ -1933,6 +2866,23 @@ def _validate_budget(
       )
 
 
+def _get_response_cache_scenario(
+    selected_times: Sequence[str] | None,
+    use_posterior: bool,
+    use_kpi: bool,
+    optimal_frequency: xr.DataArray | tf.Tensor | None,
+) -> Hashable:
+  """Returns the key of the response cache scenario of an optimization grid."""
+  return (
+      None if selected_times is None else tuple(map(str, selected_times)),
+      bool(use_posterior),
+      bool(use_kpi),
+      None
+      if optimal_frequency is None
+      else tuple(float(f) for f in np.asarray(optimal_frequency)),
+  )
+
+
 def _get_round_factor(budget: float, gtol: float) -> int:
   """Function for obtaining number of integer digits to round off of budget.
 
@@ -1957,6 +2907,68 @@ def _get_round_factor(budget: float, gtol: float) -> int:
     return -int(math.log10(tolerance)) - 1
 
 
+def _round_spend_to_grid(
+    spend: np.ndarray,
+    spend_bound_lower: np.ndarray,
+    spend_bound_upper: np.ndarray,
+    step_size: int,
+    budget: float | None = None,
+) -> np.ndarray:
+  """Rounds spend to multiples of `step_size` within the spend bounds.
+
+  With a `budget`, the spend of every channel is rounded down, and the remaining
+  steps of the budget are given to the channels with the largest remainders
+  that are below their upper bound, so that the rounded spend sums to `budget`.
+
+  Args:
+    spend: ndarray of shape `(n_paid_channels,)` with the spend to round.
+    spend_bound_lower: ndarray of shape `(n_paid_channels,)` with the lower
+      bound spend of each channel, which is a multiple of `step_size`.
+    spend_bound_upper: ndarray of shape `(n_paid_channels,)` with the upper
+      bound spend of each channel, which is a multiple of `step_size`.
+    step_size: The step size of the spend grid.
+    budget: Optional total spend, which is a multiple of `step_size` between
+      the sums of the lower and upper bounds.
+
+  Returns:
+    An integer ndarray of shape `(n_paid_channels,)` with the rounded spend.
+  """
+  lower = np.round(np.asarray(spend_bound_lower) / step_size)
+  upper = np.round(np.asarray(spend_bound_upper) / step_size)
+  steps = np.clip(np.asarray(spend) / step_size, lower, upper)
+  if budget is None:
+    return (np.round(steps) * step_size).astype(int)
+
+  rounded_steps = np.floor(steps)
+  # Channels by decreasing remainder, to receive the missing steps first.
+  order = np.argsort(rounded_steps - steps, kind='stable')
+  n_missing_steps = int(np.round(budget / step_size - np.sum(rounded_steps)))
+  while n_missing_steps > 0 and np.any(rounded_steps < upper):
+    channels = order[rounded_steps[order] < upper][:n_missing_steps]
+    rounded_steps[channels] += 1
+    n_missing_steps -= len(channels)
+  while n_missing_steps < 0 and np.any(rounded_steps > lower):
+    channels = order[::-1][rounded_steps[order[::-1]] > lower]
+    channels = channels[:-n_missing_steps]
+    rounded_steps[channels] -= 1
+    n_missing_steps += len(channels)
+  return (rounded_steps * step_size).astype(int)
+
+
+def _get_step_roi(
+    incremental_outcome_delta: np.ndarray, spend_delta: np.ndarray
+) -> np.ndarray:
+  """Returns the ROI of spend steps rounded to 8 decimals, or 0 for no spend."""
+  roi = np.zeros(
+      np.shape(spend_delta),
+      dtype=np.result_type(incremental_outcome_delta, spend_delta, 1.0),
+  )
+  np.divide(
+      incremental_outcome_delta, spend_delta, out=roi, where=spend_delta != 0
+  )
+  return np.round(roi, decimals=8)
+
+
 def _exceeds_optimization_constraints(
     fixed_budget: bool,
     budget: float,
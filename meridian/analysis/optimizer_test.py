@@ -30,6 +30,7 @@ import tempfile
 from typing import Any
 from xml.etree import ElementTree as ET
 
+from absl import flags
 from absl.testing import absltest
 from absl.testing import parameterized
 import altair as alt
@@ -38,10 +39,12 @@ from meridian import constants as c
 from meridian.analysis import analyzer
 from meridian.analysis import formatter
 from meridian.analysis import optimizer
+from meridian.analysis import response_cache
 from meridian.analysis import summary_text
 from meridian.analysis import test_utils as analysis_test_utils
 from meridian.data import input_data
 from meridian.data import test_utils as data_test_utils
+from meridian.model import inference_data_cache
 from meridian.model import model
 from meridian.model import prior_distribution
 from meridian.model import spec
@@ -914,6 +917,33 @@ class OptimizerAlgorithmTest(parameterized.TestCase):
     actual_data = optimization_results.nonoptimized_data
     _verify_actual_vs_expected_budget_data(actual_data, expected_data)
 
+  @mock.patch.object(analyzer.Analyzer, 'marginal_roi', autospec=True)
+  @mock.patch.object(
+      analyzer.Analyzer, 'get_aggregated_impressions', autospec=True
+  )
+  @mock.patch.object(analyzer.Analyzer, 'incremental_outcome', autospec=True)
+  def test_optimize_marginal_roi_use_gradient(
+      self,
+      mock_incremental_outcome,
+      mock_get_aggregated_impressions,
+      mock_marginal_roi,
+  ):
+    mock_incremental_outcome.return_value = tf.convert_to_tensor(
+        [[_NONOPTIMIZED_INCREMENTAL_OUTCOME]], tf.float32
+    )
+    mock_get_aggregated_impressions.return_value = tf.convert_to_tensor(
+        [[_AGGREGATED_IMPRESSIONS]], tf.float32
+    )
+    mock_marginal_roi.return_value = tf.ones(
+        (1, 1, len(_NONOPTIMIZED_INCREMENTAL_OUTCOME)), tf.float32
+    )
+
+    self.budget_optimizer_media_and_rf.optimize(marginal_roi_use_gradient=True)
+
+    self.assertLen(mock_marginal_roi.call_args_list, 3)
+    for call in mock_marginal_roi.call_args_list:
+      self.assertTrue(call.kwargs['use_gradient'])
+
   @mock.patch.object(
       analyzer.Analyzer, 'get_aggregated_impressions', autospec=True
   )
@@ -1826,6 +1856,226 @@ class OptimizerAlgorithmTest(parameterized.TestCase):
         np.isnan(opt_results.optimization_grid.incremental_outcome_grid),
     )
 
+  @parameterized.named_parameters(
+      dict(
+          testcase_name='historical_frequency_single_row_blocks',
+          optimal_frequency=None,
+          max_grid_memory_bytes=1,
+      ),
+      dict(
+          testcase_name='historical_frequency_multi_row_blocks',
+          optimal_frequency=None,
+          max_grid_memory_bytes=2_000_000,
+      ),
+      dict(
+          testcase_name='optimal_frequency_multi_row_blocks',
+          optimal_frequency=np.array([2.0, 3.0], dtype=np.float32),
+          max_grid_memory_bytes=2_000_000,
+      ),
+      dict(
+          testcase_name='optimal_frequency_whole_grid',
+          optimal_frequency=np.array([2.0, 3.0], dtype=np.float32),
+          max_grid_memory_bytes=10**12,
+      ),
+      dict(
+          testcase_name='hill_before_adstock_historical_frequency',
+          optimal_frequency=None,
+          max_grid_memory_bytes=2_000_000,
+          hill_before_adstock=True,
+      ),
+      dict(
+          testcase_name='hill_before_adstock_optimal_frequency',
+          optimal_frequency=np.array([2.0, 3.0], dtype=np.float32),
+          max_grid_memory_bytes=10**12,
+          hill_before_adstock=True,
+      ),
+  )
+  def test_create_grids_vectorized_matches_per_row(
+      self, optimal_frequency, max_grid_memory_bytes, hill_before_adstock=False
+  ):
+    budget_optimizer = optimizer.BudgetOptimizer(
+        model.Meridian(
+            input_data=self.input_data_media_and_rf,
+            model_spec=spec.ModelSpec(hill_before_adstock=hill_before_adstock),
+        )
+    )
+    selected_times = budget_optimizer._meridian.expand_selected_time_dims()
+    grid_kwargs = dict(
+        spend=np.array([1000, 1000, 1000, 1000, 1000]),
+        spend_bound_lower=np.array([500, 600, 700, 800, 900]),
+        spend_bound_upper=np.array([1500, 1400, 1300, 1200, 1100]),
+        step_size=100,
+        selected_times=selected_times,
+        optimal_frequency=optimal_frequency,
+    )
+    expected_spend_grid, expected_incremental_outcome_grid = (
+        budget_optimizer._create_grids(**grid_kwargs)
+    )
+    spend_grid, incremental_outcome_grid = budget_optimizer._create_grids(
+        **grid_kwargs, max_grid_memory_bytes=max_grid_memory_bytes
+    )
+    np.testing.assert_array_equal(spend_grid, expected_spend_grid)
+    np.testing.assert_allclose(
+        incremental_outcome_grid,
+        expected_incremental_outcome_grid,
+        rtol=1e-6,
+        equal_nan=True,
+    )
+
+  def test_create_grids_vectorized_evaluates_each_point_once(self):
+    budget_optimizer = self.budget_optimizer_media_and_rf
+    with mock.patch.object(
+        budget_optimizer,
+        '_update_incremental_outcome_grid_block',
+        wraps=budget_optimizer._update_incremental_outcome_grid_block,
+    ) as mock_update:
+      budget_optimizer._create_grids(
+          spend=np.array([1000, 1000, 1000, 1000, 1000]),
+          spend_bound_lower=np.array([500, 600, 700, 800, 900]),
+          spend_bound_upper=np.array([1500, 1400, 1300, 1200, 1100]),
+          step_size=100,
+          selected_times=None,
+          max_grid_memory_bytes=10**12,
+      )
+
+    # One block per channel, as all channels have a different number of
+    # points.
+    self.assertEqual(mock_update.call_count, 5)
+    self.assertEqual(
+        sum(call.kwargs['rows'].size for call in mock_update.call_args_list),
+        11 + 9 + 7 + 5 + 3,
+    )
+
+  @parameterized.named_parameters(
+      dict(testcase_name='per_row', max_grid_memory_bytes=None),
+      dict(testcase_name='vectorized', max_grid_memory_bytes=10**12),
+  )
+  def test_create_grids_with_response_cache_matches_uncached(
+      self, max_grid_memory_bytes
+  ):
+    budget_optimizer = optimizer.BudgetOptimizer(
+        self.meridian_media_and_rf,
+        response_cache=response_cache.ResponseCache(),
+    )
+    grid_kwargs = dict(
+        spend=np.array([1000, 1000, 1000, 1000, 1000]),
+        step_size=100,
+        selected_times=None,
+        max_grid_memory_bytes=max_grid_memory_bytes,
+    )
+    budget_optimizer._create_grids(
+        spend_bound_lower=np.array([500, 500, 500, 500, 500]),
+        spend_bound_upper=np.array([1000, 1000, 1000, 1000, 1000]),
+        **grid_kwargs,
+    )
+    spend_grid, incremental_outcome_grid = budget_optimizer._create_grids(
+        spend_bound_lower=np.array([800, 800, 800, 800, 800]),
+        spend_bound_upper=np.array([1500, 1400, 1300, 1200, 1100]),
+        **grid_kwargs,
+    )
+
+    expected_spend_grid, expected_incremental_outcome_grid = (
+        optimizer.BudgetOptimizer(self.meridian_media_and_rf)._create_grids(
+            spend_bound_lower=np.array([800, 800, 800, 800, 800]),
+            spend_bound_upper=np.array([1500, 1400, 1300, 1200, 1100]),
+            **grid_kwargs,
+        )
+    )
+    np.testing.assert_array_equal(spend_grid, expected_spend_grid)
+    np.testing.assert_allclose(
+        incremental_outcome_grid,
+        expected_incremental_outcome_grid,
+        rtol=1e-6,
+        equal_nan=True,
+    )
+
+  def test_response_cache_of_another_model_raises(self):
+    cache = response_cache.ResponseCache()
+    optimizer.BudgetOptimizer(self.meridian_media_and_rf, response_cache=cache)
+
+    self.assertEqual(
+        cache.model_fingerprint,
+        response_cache.get_model_fingerprint(self.meridian_media_and_rf),
+    )
+    with self.assertRaisesRegex(ValueError, "does not match the model"):
+      optimizer.BudgetOptimizer(self.meridian_media_only, response_cache=cache)
+
+  def test_create_grids_evaluates_only_rows_missing_from_response_cache(self):
+    budget_optimizer = optimizer.BudgetOptimizer(
+        self.meridian_media_and_rf,
+        response_cache=response_cache.ResponseCache(),
+    )
+    grid_kwargs = dict(
+        spend=np.array([1000, 1000, 1000, 1000, 1000]),
+        spend_bound_upper=np.array([1000, 1000, 1000, 1000, 1000]),
+        step_size=100,
+        selected_times=None,
+    )
+    budget_optimizer._create_grids(
+        spend_bound_lower=np.array([500, 500, 500, 500, 500]), **grid_kwargs
+    )
+
+    with mock.patch.object(
+        budget_optimizer,
+        '_update_incremental_outcome_grid',
+        wraps=budget_optimizer._update_incremental_outcome_grid,
+    ) as mock_update:
+      budget_optimizer._create_grids(
+          spend_bound_lower=np.array([300, 300, 300, 300, 300]),
+          **grid_kwargs,
+      )
+      budget_optimizer._create_grids(
+          spend_bound_lower=np.array([300, 300, 300, 300, 300]),
+          use_kpi=True,
+          **grid_kwargs,
+      )
+
+    # The rows at 300 and 400 are evaluated in the first scenario, and all 8
+    # rows of the KPI scenario are evaluated.
+    self.assertEqual(mock_update.call_count, 10)
+    self.assertLen(budget_optimizer.response_cache, 6 * 5 + 2 * 5 + 8 * 5)
+
+  @parameterized.named_parameters(
+      dict(testcase_name='at_least_one', max_grid_memory_bytes=1, expected=1),
+      dict(
+          testcase_name='at_most_n_grid_rows',
+          max_grid_memory_bytes=10**12,
+          expected=11,
+      ),
+      dict(
+          testcase_name='from_memory_bound',
+          # 4 bytes * (max_lag + 2) * 2 chains * 10 draws * 5 geos * 49 times *
+          # 5 channels = 980_000 bytes per grid row.
+          max_grid_memory_bytes=3 * 980_000 + 1,
+          expected=3,
+      ),
+  )
+  def test_get_grid_block_size(self, max_grid_memory_bytes, expected):
+    self.assertEqual(
+        self.budget_optimizer_media_and_rf._get_grid_block_size(
+            n_grid_rows=11,
+            use_posterior=True,
+            batch_size=c.DEFAULT_BATCH_SIZE,
+            max_grid_memory_bytes=max_grid_memory_bytes,
+        ),
+        expected,
+    )
+
+  def test_create_optimization_grid_non_positive_memory_raises_exception(
+      self,
+  ):
+    with self.assertRaisesWithLiteralMatch(
+        ValueError, '`max_grid_memory_bytes` must be positive.'
+    ):
+      self.budget_optimizer_media_and_rf.create_optimization_grid(
+          spend=np.array([1000, 1000, 1000, 1000, 1000]),
+          spend_bound_lower=np.array([500, 600, 700, 800, 900]),
+          spend_bound_upper=np.array([1500, 1400, 1300, 1200, 1100]),
+          selected_times=None,
+          round_factor=-2,
+          max_grid_memory_bytes=0,
+      )
+
   def test_grid_search_with_target_mroi_correct(self):
     spend_grid = np.array([
         [0, 0, 0, 0, 65900000, 40300000],
@@ -1865,6 +2115,214 @@ class OptimizerAlgorithmTest(parameterized.TestCase):
 
     np.testing.assert_array_equal(optimal_spend, expected_optimal_spend)
 
+  @parameterized.named_parameters(
+      dict(testcase_name='fixed_budget', optimize_kwargs={}),
+      dict(
+          testcase_name='target_roi',
+          optimize_kwargs={'fixed_budget': False, 'target_roi': 1.0},
+      ),
+      dict(
+          testcase_name='target_mroi',
+          optimize_kwargs={'fixed_budget': False, 'target_mroi': 1.0},
+      ),
+  )
+  def test_optimize_slsqp_matches_grid_search(self, optimize_kwargs):
+    grid_results = self.budget_optimizer_media_and_rf.optimize(
+        **optimize_kwargs
+    )
+    slsqp_results = self.budget_optimizer_media_and_rf.optimize(
+        method=c.SLSQP, **optimize_kwargs
+    )
+
+    grid_data = grid_results.optimized_data
+    slsqp_data = slsqp_results.optimized_data
+    np.testing.assert_allclose(
+        slsqp_data.spend, grid_data.spend, atol=0.05 * grid_data.budget
+    )
+    self.assertGreaterEqual(
+        slsqp_data.total_incremental_outcome,
+        0.999 * grid_data.total_incremental_outcome,
+    )
+    optimization_grid = slsqp_results.optimization_grid
+    self.assertEqual(optimization_grid.spend_grid.shape, (1, 5))
+    np.testing.assert_array_equal(
+        optimization_grid.spend_grid[0], slsqp_data.spend
+    )
+
+  def test_optimize_slsqp_fixed_budget_spends_budget(self):
+    results = self.budget_optimizer_media_and_rf.optimize(
+        method=c.SLSQP, budget=2000, gtol=0.001
+    )
+
+    self.assertAlmostEqual(
+        results.optimized_data.budget,
+        results.nonoptimized_data.budget,
+        delta=10,
+    )
+    # The optimal spend is on the grid of the step size determined by `gtol`.
+    np.testing.assert_array_equal(results.optimized_data.spend % 10, 0)
+
+  def test_optimize_slsqp_ftol(self):
+    with mock.patch.object(
+        optimizer.scipy_optimize,
+        'minimize',
+        wraps=optimizer.scipy_optimize.minimize,
+    ) as mock_minimize:
+      self.budget_optimizer_media_and_rf.optimize(method=c.SLSQP, ftol=1e-4)
+
+    self.assertEqual(mock_minimize.call_args.kwargs['options'], {'ftol': 1e-4})
+
+  def test_optimize_invalid_method_raises_exception(self):
+    with self.assertRaisesRegex(ValueError, '`method` must be one of'):
+      self.budget_optimizer_media_and_rf.optimize(method='newton')
+
+  def test_optimize_scenarios_matches_optimize(self):
+    budget_optimizer = self.budget_optimizer_media_only
+    hist_budget = np.sum(budget_optimizer._get_historical_spend(None))
+    optimize_kwargs = [
+        {},
+        {
+            'budget': 1.1 * hist_budget,
+            'pct_of_spend': [0.2, 0.3, 0.5],
+            'spend_constraint_upper': 0.5,
+        },
+        {'fixed_budget': False, 'target_roi': 1.0},
+        {'fixed_budget': False, 'target_mroi': 1.0},
+    ]
+
+    with mock.patch.object(
+        budget_optimizer,
+        'create_optimization_grid',
+        wraps=budget_optimizer.create_optimization_grid,
+    ) as mock_create_optimization_grid:
+      scenario_results = budget_optimizer.optimize_scenarios([
+          optimizer.OptimizationScenario(**kwargs)
+          for kwargs in optimize_kwargs
+      ])
+
+    mock_create_optimization_grid.assert_called_once()
+    self.assertLen(scenario_results, len(optimize_kwargs))
+    for kwargs, results in zip(optimize_kwargs, scenario_results):
+      expected_results = budget_optimizer.optimize(**kwargs)
+      xr.testing.assert_allclose(
+          results.optimized_data, expected_results.optimized_data
+      )
+      xr.testing.assert_allclose(
+          results.nonoptimized_data, expected_results.nonoptimized_data
+      )
+      np.testing.assert_allclose(
+          results.spend_bounds, expected_results.spend_bounds
+      )
+      xr.testing.assert_allclose(
+          results.optimization_grid.grid_dataset,
+          expected_results.optimization_grid.grid_dataset,
+      )
+
+  def test_optimize_scenarios_shares_budget_datasets(self):
+    budget_optimizer = self.budget_optimizer_media_only
+    with mock.patch.object(
+        budget_optimizer,
+        '_create_budget_dataset',
+        wraps=budget_optimizer._create_budget_dataset,
+    ) as mock_create_budget_dataset:
+      budget_optimizer.optimize_scenarios([optimizer.OptimizationScenario()])
+      n_datasets = mock_create_budget_dataset.call_count
+      mock_create_budget_dataset.reset_mock()
+      scenario_results = budget_optimizer.optimize_scenarios(
+          [optimizer.OptimizationScenario()] * 3
+      )
+
+    # Without RF channels, both non-optimized datasets are the same.
+    self.assertBetween(n_datasets, 1, 2)
+    self.assertEqual(mock_create_budget_dataset.call_count, n_datasets)
+    for results in scenario_results:
+      self.assertTrue(results.optimized_data.attrs[c.FIXED_BUDGET])
+      self.assertNotIn(c.FIXED_BUDGET, results.nonoptimized_data.attrs)
+
+  def test_optimize_scenarios_empty_raises_exception(self):
+    with self.assertRaisesRegex(ValueError, '`scenarios` must not be empty'):
+      self.budget_optimizer_media_only.optimize_scenarios([])
+
+  def test_optimize_scenarios_invalid_scenario_raises_exception(self):
+    with self.assertRaisesRegex(
+        ValueError, '`budget` is only used for fixed budget scenarios'
+    ):
+      self.budget_optimizer_media_only.optimize_scenarios([
+          optimizer.OptimizationScenario(),
+          optimizer.OptimizationScenario(
+              fixed_budget=False, budget=1000, target_roi=1.0
+          ),
+      ])
+
+  @parameterized.product(
+      seed=[0, 1, 2],
+      constraint=[
+          {'fixed_budget': True},
+          {'fixed_budget': False, 'target_roi': 1.5},
+          {'fixed_budget': False, 'target_mroi': 1.2},
+      ],
+  )
+  def test_grid_search_matches_full_grid_argmax(self, seed, constraint):
+    rng = np.random.default_rng(seed)
+    n_rows, n_channels = 30, 12
+    lengths = rng.integers(2, n_rows + 1, n_channels)
+    spend_grid = np.full((n_rows, n_channels), np.nan)
+    incremental_outcome_grid = np.full((n_rows, n_channels), np.nan)
+    for i, length in enumerate(lengths):
+      start = rng.integers(0, 5) * 100
+      spend_grid[:length, i] = start + 100 * np.arange(length)
+      # Concave curves with rounded values, so that many steps tie.
+      incremental_outcome_grid[:length, i] = np.round(
+          rng.uniform(1, 4) * 100 * np.sqrt(spend_grid[:length, i] / 100), -1
+      )
+    budget = np.nansum(spend_grid[0]) + 100 * n_rows * n_channels // 4
+
+    # The previous implementation, which searches the whole grid at each step.
+    spend = spend_grid[0].copy()
+    incremental_outcome = incremental_outcome_grid[0].copy()
+    roi_grid = np.round(
+        tf.math.divide_no_nan(
+            incremental_outcome_grid[1:] - incremental_outcome,
+            spend_grid[1:] - spend,
+        ).numpy(),
+        decimals=8,
+    )
+    while True:
+      expected_spend = spend.astype(int)
+      if np.isnan(roi_grid).all():
+        break
+      row, col = np.unravel_index(np.nanargmax(roi_grid), roi_grid.shape)
+      spend[col] = spend_grid[row + 1, col]
+      incremental_outcome[col] = incremental_outcome_grid[row + 1, col]
+      if optimizer._exceeds_optimization_constraints(
+          budget=budget,
+          spend=spend,
+          incremental_outcome=incremental_outcome,
+          roi_grid_point=roi_grid[row, col],
+          target_roi=constraint.get('target_roi'),
+          target_mroi=constraint.get('target_mroi'),
+          fixed_budget=constraint['fixed_budget'],
+      ):
+        break
+      roi_grid[: row + 1, col] = np.nan
+      roi_grid[row + 1 :, col] = np.round(
+          tf.math.divide_no_nan(
+              incremental_outcome_grid[row + 2 :, col]
+              - incremental_outcome_grid[row + 1, col],
+              spend_grid[row + 2 :, col] - spend_grid[row + 1, col],
+          ).numpy(),
+          decimals=8,
+      )
+
+    optimal_spend = self.budget_optimizer_media_and_rf._grid_search(
+        spend_grid=spend_grid,
+        incremental_outcome_grid=incremental_outcome_grid,
+        budget=budget,
+        **constraint,
+    )
+
+    np.testing.assert_array_equal(optimal_spend, expected_spend)
+
   @mock.patch.object(analyzer.Analyzer, 'incremental_outcome', autospec=True)
   def test_optimizer_budget_with_specified_budget(
       self, mock_incremental_outcome
@@ -3266,6 +3724,29 @@ class OptimizerHelperTest(parameterized.TestCase):
     )
     self.assertEqual(exceeds, expected_output)
 
+  @parameterized.named_parameters(
+      dict(
+          testcase_name='fixed_budget',
+          budget=1000,
+          expected_spend=[110, 190, 300, 400],
+      ),
+      dict(
+          testcase_name='flexible_budget',
+          budget=None,
+          expected_spend=[100, 190, 300, 400],
+      ),
+  )
+  def test_round_spend_to_grid(self, budget, expected_spend):
+    spend = optimizer._round_spend_to_grid(
+        np.array([104.0, 196.0, 300.4, 399.6]),
+        spend_bound_lower=np.zeros(4),
+        spend_bound_upper=np.array([1000, 190, 1000, 1000]),
+        step_size=10,
+        budget=budget,
+    )
+
+    np.testing.assert_array_equal(spend, expected_spend)
+
 
 class OptimizerKPITest(parameterized.TestCase):
 
@@ -3436,5 +3917,40 @@ class OptimizerKPITest(parameterized.TestCase):
       self.budget_optimizer_media_and_rf_kpi.optimize(use_kpi=False)
 
 
+class OptimizerResponseCacheTest(absltest.TestCase):
+
+  def test_lazily_loaded_model_parameters_are_not_read(self):
+    flags.FLAGS.mark_as_parsed()
+    dir_path = os.path.join(self.create_tempdir().full_path, 'mmm')
+    data = data_test_utils.sample_input_data_non_revenue_revenue_per_kpi(
+        n_geos=_N_GEOS,
+        n_times=_N_TIMES,
+        n_media_times=_N_MEDIA_TIMES,
+        n_media_channels=_N_MEDIA_CHANNELS,
+        n_controls=_N_CONTROLS,
+        seed=0,
+    )
+    mmm = model.Meridian(input_data=data)
+    mmm.sample_prior(n_draws=2, seed=1)
+    # Reuse the prior draws as posterior draws to avoid running MCMC.
+    mmm.inference_data.add_groups({c.POSTERIOR: mmm.inference_data.prior})
+    model.save_mmm_to_dir(mmm, dir_path)
+    loaded_mmm = model.load_mmm_from_dir(dir_path, max_cache_bytes=10**9)
+    cache = response_cache.ResponseCache()
+
+    with mock.patch.object(
+        inference_data_cache.ParameterCache,
+        'get',
+        autospec=True,
+        side_effect=inference_data_cache.ParameterCache.get,
+    ) as mock_get:
+      optimizer.BudgetOptimizer(loaded_mmm, response_cache=cache)
+      mock_get.assert_not_called()
+
+    self.assertEqual(
+        cache.model_fingerprint, response_cache.get_model_fingerprint(mmm)
+    )
+
+
 if __name__ == '__main__':
   absltest.main()
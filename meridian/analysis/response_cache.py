@@ -0,0 +1,292 @@
+# Copyright 2024 The Meridian Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of the incremental outcome of paid channels at spend multipliers."""
+
+import collections
+from collections.abc import Hashable, Sequence
+import hashlib
+import json
+from typing import Any, TYPE_CHECKING
+
+from meridian import constants
+from meridian.model import inference_data_cache
+import numpy as np
+import xarray as xr
+
+if TYPE_CHECKING:
+  from meridian.model import model  # pylint: disable=g-bad-import-order,g-import-not-at-top
+
+
+__all__ = [
+    "ResponseCache",
+    "get_model_fingerprint",
+]
+
+_POINT = "point"
+_SCENARIO = "scenario"
+_CHANNEL = "channel"
+_MULTIPLIER = "multiplier"
+_INCREMENTAL_OUTCOME = "incremental_outcome"
+_SCENARIOS = "scenarios"
+_MAX_POINTS = "max_points"
+_MODEL_FINGERPRINT = "model_fingerprint"
+_NETCDF_ENGINE = "h5netcdf"
+
+
+def get_model_fingerprint(mmm: "model.Meridian") -> str:
+  """Returns a hash identifying the data and the draws of a fitted model.
+
+  The hash covers the input data and the prior and posterior draws, so it
+  changes whenever the model is refit or fit on other data. The draws are
+  identified by their `inference_data_cache.get_draws_fingerprint()`, which is
+  computed when the model is sampled or saved, and by the shapes of their
+  parameters, so the parameter arrays of a lazily loaded model are not read.
+
+  Args:
+    mmm: The fitted Meridian model.
+
+  Returns:
+    The hexadecimal SHA-256 hash of the input data and the draws.
+  """
+  hasher = hashlib.sha256(mmm.input_data.fingerprint().encode())
+  for group in (constants.PRIOR, constants.POSTERIOR):
+    if group not in mmm.inference_data.groups():
+      continue
+    draws = getattr(mmm.inference_data, group)
+    hasher.update(
+        f"{group}/{inference_data_cache.get_draws_fingerprint(draws)}".encode()
+    )
+    for name in sorted(draws.data_vars):
+      variable = draws[name]
+      hasher.update(
+          f"{group}/{name}/{variable.dtype.str}/{variable.shape}".encode()
+      )
+  return hasher.hexdigest()
+
+
+def _to_hashable(value: Any) -> Hashable:
+  """Converts the lists of a JSON-decoded scenario key to tuples."""
+  if isinstance(value, list):
+    return tuple(_to_hashable(v) for v in value)
+  return value
+
+
+class ResponseCache:
+  """Least recently used cache of mean incremental outcome points.
+
+  The mean incremental outcome of a paid channel only depends on its own spend,
+  so each point of an optimization grid is cached by the scenario it was
+  computed in, the channel and the spend multiplier of the channel. Scenarios
+  that share `selected_times`, `use_kpi`, `use_posterior` and the frequency of
+  the RF channels reuse each other's points, and only the missing points are
+  evaluated. When the number of cached points exceeds `max_points`, the least
+  recently used points are evicted.
+
+  The cache is only valid for the model it was filled with. It records the
+  `get_model_fingerprint()` of that model, which is saved with the points, and
+  `BudgetOptimizer` refuses a cache filled with another model.
+  """
+
+  def __init__(
+      self,
+      max_points: int | None = None,
+      model_fingerprint: str | None = None,
+  ):
+    """Initializes the cache.
+
+    Args:
+      max_points: Maximum number of cached points. If `None`, points are never
+        evicted.
+      model_fingerprint: The `get_model_fingerprint()` of the model the points
+        are computed with. If `None`, it is set by the first
+        `check_model_fingerprint()` call.
+
+    Raises:
+      ValueError: If `max_points` is negative.
+    """
+    if max_points is not None and max_points < 0:
+      raise ValueError(
+          f"`max_points` must be non-negative, but got {max_points}."
+      )
+    self._max_points = max_points
+    self._model_fingerprint = model_fingerprint
+    self._points: collections.OrderedDict[
+        tuple[Hashable, str, float], float
+    ] = collections.OrderedDict()
+
+  @property
+  def max_points(self) -> int | None:
+    return self._max_points
+
+  @property
+  def model_fingerprint(self) -> str | None:
+    return self._model_fingerprint
+
+  def __len__(self) -> int:
+    return len(self._points)
+
+  def check_model_fingerprint(self, model_fingerprint: str):
+    """Checks that the cached points were computed with the given model.
+
+    Args:
+      model_fingerprint: The `get_model_fingerprint()` of the model that uses
+        the cache. It is recorded if the cache has no fingerprint yet.
+
+    Raises:
+      ValueError: If the cache was filled with a model with another
+        fingerprint.
+    """
+    if self._model_fingerprint is None:
+      self._model_fingerprint = model_fingerprint
+    elif self._model_fingerprint != model_fingerprint:
+      raise ValueError(
+          "The response cache was filled with a model with fingerprint"
+          f" {self._model_fingerprint}, which does not match the model"
+          f" fingerprint {model_fingerprint}. Use a new `ResponseCache` for a"
+          " refit model or a model fit on other data."
+      )
+
+  def get(
+      self,
+      scenario: Hashable,
+      channels: Sequence[str],
+      multipliers: np.ndarray,
+  ) -> np.ndarray:
+    """Returns the cached incremental outcome at a grid of multipliers.
+
+    Args:
+      scenario: Key of the scenario, made of JSON-serializable values.
+      channels: Names of the channels of the columns of `multipliers`.
+      multipliers: Array with dimensions `(n_rows, n_channels)` containing the
+        spend multiplier of each channel. NaN multipliers are skipped.
+
+    Returns:
+      Array with the same dimensions as `multipliers` containing the cached
+      incremental outcome, and NaN where it is not cached.
+    """
+    incremental_outcome = np.full(multipliers.shape, np.nan)
+    for (row, column), multiplier in np.ndenumerate(multipliers):
+      key = (scenario, channels[column], float(multiplier))
+      if key in self._points:
+        self._points.move_to_end(key)
+        incremental_outcome[row, column] = self._points[key]
+    return incremental_outcome
+
+  def put(
+      self,
+      scenario: Hashable,
+      channels: Sequence[str],
+      multipliers: np.ndarray,
+      incremental_outcome: np.ndarray,
+  ):
+    """Caches the incremental outcome at a grid of multipliers.
+
+    Args:
+      scenario: Key of the scenario, made of JSON-serializable values.
+      channels: Names of the channels of the columns of `multipliers`.
+      multipliers: Array with dimensions `(n_rows, n_channels)` containing the
+        spend multiplier of each channel. NaN multipliers are skipped.
+      incremental_outcome: Array with the same dimensions as `multipliers`
+        containing the incremental outcome at each multiplier.
+    """
+    for (row, column), multiplier in np.ndenumerate(multipliers):
+      if np.isnan(multiplier) or np.isnan(incremental_outcome[row, column]):
+        continue
+      key = (scenario, channels[column], float(multiplier))
+      self._points[key] = float(incremental_outcome[row, column])
+      self._points.move_to_end(key)
+    while self._max_points is not None and len(self._points) > self._max_points:
+      self._points.popitem(last=False)
+
+  def clear(self):
+    """Evicts all cached points."""
+    self._points.clear()
+
+  def save(self, file_path: str):
+    """Saves the cached points to a NetCDF file.
+
+    The points are saved from least to most recently used, so that the eviction
+    order is kept when the cache is loaded.
+
+    Args:
+      file_path: Path of the file, for example next to the directory of the
+        model saved with `save_mmm_to_dir()`.
+    """
+    scenarios = list(dict.fromkeys(key[0] for key in self._points))
+    scenario_index = {scenario: i for i, scenario in enumerate(scenarios)}
+    keys = list(self._points)
+    dataset = xr.Dataset(
+        data_vars={
+            _SCENARIO: (
+                [_POINT],
+                np.array([scenario_index[k[0]] for k in keys], dtype=np.int64),
+            ),
+            _CHANNEL: ([_POINT], np.array([k[1] for k in keys], dtype=str)),
+            _MULTIPLIER: (
+                [_POINT],
+                np.array([k[2] for k in keys], dtype=np.float64),
+            ),
+            _INCREMENTAL_OUTCOME: (
+                [_POINT],
+                np.array(list(self._points.values()), dtype=np.float64),
+            ),
+        },
+        attrs={
+            _SCENARIOS: json.dumps(scenarios),
+            _MAX_POINTS: -1 if self._max_points is None else self._max_points,
+            _MODEL_FINGERPRINT: self._model_fingerprint or "",
+        },
+    )
+    dataset.to_netcdf(file_path, engine=_NETCDF_ENGINE)
+
+  @classmethod
+  def load(
+      cls, file_path: str, model_fingerprint: str | None = None
+  ) -> "ResponseCache":
+    """Loads the cached points saved by `save()`.
+
+    Args:
+      file_path: Path of the file written by `save()`.
+      model_fingerprint: Optional `get_model_fingerprint()` of the model that
+        will use the cache. If provided, it must match the saved fingerprint.
+
+    Returns:
+      A `ResponseCache` with the saved points, memory budget and model
+      fingerprint.
+
+    Raises:
+      ValueError: If `model_fingerprint` does not match the fingerprint of the
+        model the saved points were computed with.
+    """
+    with xr.open_dataset(file_path, engine=_NETCDF_ENGINE) as dataset:
+      dataset = dataset.load()
+    max_points = int(dataset.attrs[_MAX_POINTS])
+    cache = cls(
+        max_points=None if max_points < 0 else max_points,
+        model_fingerprint=dataset.attrs.get(_MODEL_FINGERPRINT) or None,
+    )
+    if model_fingerprint is not None:
+      cache.check_model_fingerprint(model_fingerprint)
+    scenarios = [_to_hashable(s) for s in json.loads(dataset.attrs[_SCENARIOS])]
+    for scenario, channel, multiplier, incremental_outcome in zip(
+        dataset[_SCENARIO].values,
+        dataset[_CHANNEL].values,
+        dataset[_MULTIPLIER].values,
+        dataset[_INCREMENTAL_OUTCOME].values,
+    ):
+      cache._points[(scenarios[scenario], str(channel), float(multiplier))] = (
+          float(incremental_outcome)
+      )
+    return cache
@@ -0,0 +1,141 @@
+# Copyright 2024 The Meridian Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from absl import flags
+from absl.testing import absltest
+from meridian.analysis import response_cache
+import numpy as np
+
+
+_CHANNELS = ("ch_0", "ch_1")
+_SCENARIO = (("2021-01-04", "2021-01-11"), True, False, None)
+_MULTIPLIERS = np.array([[0.5, 0.5], [1.0, 1.0], [1.5, np.nan]])
+_INCREMENTAL_OUTCOME = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, np.nan]])
+
+
+class ResponseCacheTest(absltest.TestCase):
+
+  def test_negative_max_points_raises(self):
+    with self.assertRaisesRegex(ValueError, "must be non-negative"):
+      response_cache.ResponseCache(max_points=-1)
+
+  def test_get_returns_cached_points(self):
+    cache = response_cache.ResponseCache()
+    cache.put(_SCENARIO, _CHANNELS, _MULTIPLIERS, _INCREMENTAL_OUTCOME)
+
+    incremental_outcome = cache.get(
+        _SCENARIO, _CHANNELS, np.array([[1.0, 2.0], [1.5, 0.5]])
+    )
+
+    np.testing.assert_array_equal(
+        incremental_outcome, np.array([[3.0, np.nan], [5.0, 2.0]])
+    )
+    self.assertLen(cache, 5)
+
+  def test_get_does_not_share_points_across_scenarios(self):
+    cache = response_cache.ResponseCache()
+    cache.put(_SCENARIO, _CHANNELS, _MULTIPLIERS, _INCREMENTAL_OUTCOME)
+
+    incremental_outcome = cache.get(
+        (None, True, False, None), _CHANNELS, _MULTIPLIERS
+    )
+
+    self.assertTrue(np.isnan(incremental_outcome).all())
+
+  def test_put_evicts_least_recently_used(self):
+    cache = response_cache.ResponseCache(max_points=2)
+    cache.put(_SCENARIO, _CHANNELS, np.array([[0.5, 0.5]]), np.ones((1, 2)))
+    cache.get(_SCENARIO, _CHANNELS, np.array([[0.5, np.nan]]))
+
+    cache.put(_SCENARIO, _CHANNELS, np.array([[1.0, np.nan]]), np.ones((1, 2)))
+
+    incremental_outcome = cache.get(
+        _SCENARIO, _CHANNELS, np.array([[0.5, 0.5], [1.0, np.nan]])
+    )
+    np.testing.assert_array_equal(
+        incremental_outcome, np.array([[1.0, np.nan], [1.0, np.nan]])
+    )
+
+  def test_clear(self):
+    cache = response_cache.ResponseCache()
+    cache.put(_SCENARIO, _CHANNELS, _MULTIPLIERS, _INCREMENTAL_OUTCOME)
+
+    cache.clear()
+
+    self.assertEmpty(cache)
+
+  def test_save_and_load(self):
+    flags.FLAGS.mark_as_parsed()
+    file_path = os.path.join(self.create_tempdir().full_path, "cache.nc")
+    cache = response_cache.ResponseCache(max_points=10)
+    cache.put(_SCENARIO, _CHANNELS, _MULTIPLIERS, _INCREMENTAL_OUTCOME)
+    cache.put(
+        (None, True, True, (2.0, 3.5)),
+        _CHANNELS,
+        np.array([[0.1, 0.2]], dtype=np.float32),
+        np.array([[6.0, 7.0]]),
+    )
+
+    cache.save(file_path)
+    loaded_cache = response_cache.ResponseCache.load(file_path)
+
+    self.assertEqual(loaded_cache.max_points, 10)
+    self.assertIsNone(loaded_cache.model_fingerprint)
+    self.assertLen(loaded_cache, 7)
+    np.testing.assert_array_equal(
+        loaded_cache.get(_SCENARIO, _CHANNELS, _MULTIPLIERS),
+        _INCREMENTAL_OUTCOME,
+    )
+    np.testing.assert_array_equal(
+        loaded_cache.get(
+            (None, True, True, (2.0, 3.5)),
+            _CHANNELS,
+            np.array([[0.1, 0.2]], dtype=np.float32),
+        ),
+        np.array([[6.0, 7.0]]),
+    )
+
+  def test_check_model_fingerprint_records_first_fingerprint(self):
+    cache = response_cache.ResponseCache()
+
+    cache.check_model_fingerprint("abc")
+    cache.check_model_fingerprint("abc")
+
+    self.assertEqual(cache.model_fingerprint, "abc")
+
+  def test_check_model_fingerprint_mismatch_raises(self):
+    cache = response_cache.ResponseCache(model_fingerprint="abc")
+    with self.assertRaisesRegex(ValueError, "does not match the model"):
+      cache.check_model_fingerprint("def")
+
+  def test_load_checks_model_fingerprint(self):
+    flags.FLAGS.mark_as_parsed()
+    file_path = os.path.join(self.create_tempdir().full_path, "cache.nc")
+    cache = response_cache.ResponseCache(model_fingerprint="abc")
+    cache.put(_SCENARIO, _CHANNELS, _MULTIPLIERS, _INCREMENTAL_OUTCOME)
+    cache.save(file_path)
+
+    loaded_cache = response_cache.ResponseCache.load(
+        file_path, model_fingerprint="abc"
+    )
+
+    self.assertEqual(loaded_cache.model_fingerprint, "abc")
+    with self.assertRaisesRegex(ValueError, "does not match the model"):
+      response_cache.ResponseCache.load(file_path, model_fingerprint="def")
+
+
+if __name__ == "__main__":
+  absltest.main()
@@ -97,21 +97,22 @@ class Summarizer:
       end_date: tc.Date | None = None,
   ) -> str:
     """Generate HTML results summary output (as sanitized content str)."""
-    all_dates = self._meridian.input_data.time_coordinates.all_dates
+    time_coordinates = self._meridian.input_data.time_coordinates
+    all_dates = time_coordinates.all_dates
     start_date = (
         tc.normalize_date(start_date)
         if start_date is not None
-        else min(all_dates)
+        else all_dates[0]
     )
     end_date = (
-        tc.normalize_date(end_date) if end_date is not None else max(all_dates)
+        tc.normalize_date(end_date) if end_date is not None else all_dates[-1]
     )
 
-    if start_date not in all_dates:
+    if time_coordinates.get_date_position(start_date) is None:
       raise ValueError(
           f'start_date ({start_date}) must be in the time coordinates!'
       )
-    if end_date not in all_dates:
+    if time_coordinates.get_date_position(end_date) is None:
       raise ValueError(
           f'end_date ({end_date}) must be in the time coordinates!'
       )
@@ -545,6 +545,12 @@ SPEND_CONSTRAINT_DEFAULT_FIXED_BUDGET = 0.3
 SPEND_CONSTRAINT_DEFAULT_FLEXIBLE_BUDGET = 1.0
 
 
+# Optimization methods.
+GRID_SEARCH = 'grid_search'
+SLSQP = 'slsqp'
+OPTIMIZATION_METHODS = (GRID_SEARCH, SLSQP)
+
+
 # Plot constants.
 BAR_SIZE = 42
 PADDING_10 = 10
@@ -570,6 +576,21 @@ DEFAULT_CONFIDENCE_LEVEL = 0.9
 # Default number of max draws per chain in Analyzer.expected_outcome()
 DEFAULT_BATCH_SIZE = 100
 
+# `batch_size` value selecting the largest batch of draws that fits the memory
+# budget of the Analyzer.
+AUTO_BATCH_SIZE = 'auto'
+
+# Default memory budget, in bytes, of a batch of draws with AUTO_BATCH_SIZE.
+DEFAULT_BATCH_MEMORY_BYTES = 2 * 1024**3
+
+# Default memory budget, in bytes, of the scaled data tensors cached by the
+# Analyzer.
+DEFAULT_DATA_CACHE_BYTES = 256 * 1024**2
+
+# Default number of frequency values evaluated together in
+# Analyzer.optimal_freq()
+DEFAULT_FREQ_BATCH_SIZE = 10
+
 
 # Optimization constants.
 CHAINS_DIMENSION = 0
@@ -21,6 +21,7 @@ from collections import abc
 import dataclasses
 import datetime as dt
 import functools
+import hashlib
 import warnings
 
 from meridian import constants
@@ -645,6 +646,34 @@ class InputData:
 
     return xr.combine_by_coords(data)
 
+  def fingerprint(self) -> str:
+    """Returns a hash identifying the data.
+
+    Two `InputData` objects have the same fingerprint if their `kpi_type`,
+    arrays and coordinates are equal, so the fingerprint can be stored with
+    results computed from the data to check that they are used with the same
+    data.
+
+    Returns:
+      The hexadecimal SHA-256 hash of the data.
+    """
+    hasher = hashlib.sha256(self.kpi_type.encode())
+    dataset = self.as_dataset()
+    for name in sorted(dataset.variables):
+      variable = dataset.variables[name]
+      values = variable.values
+      if values.dtype.kind in "OSU":
+        # Strings are hashed by value, since the width of their dtype depends
+        # on how the data was built or loaded.
+        dtype = "str"
+        data = "\0".join(str(v) for v in values.ravel()).encode()
+      else:
+        dtype = values.dtype.str
+        data = np.ascontiguousarray(values).tobytes()
+      hasher.update(f"{name}/{variable.dims}/{dtype}/{values.shape}".encode())
+      hasher.update(data)
+    return hasher.hexdigest()
+
   def get_n_top_largest_geos(self, num_geos: int) -> list[str]:
     """Finds the specified number of the largest geos by population.
 
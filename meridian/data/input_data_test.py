@@ -812,6 +812,39 @@ class InputDataTest(parameterized.TestCase):
     self.assertNotIn(constants.FREQUENCY, dataset)
     self.assertNotIn(constants.RF_SPEND, dataset)
 
+  def test_fingerprint_is_equal_for_equal_data(self):
+    kwargs = dict(
+        controls=self.not_lagged_controls,
+        kpi=self.not_lagged_kpi,
+        kpi_type=constants.NON_REVENUE,
+        revenue_per_kpi=self.revenue_per_kpi,
+        population=self.population,
+        media=self.not_lagged_media,
+        media_spend=self.media_spend,
+    )
+    fingerprint = input_data.InputData(**kwargs).fingerprint()
+    copied_kpi = kwargs | {"kpi": self.not_lagged_kpi.copy()}
+    object_geos = kwargs | {
+        "kpi": self.not_lagged_kpi.assign_coords(
+            geo=self.not_lagged_kpi.geo.values.astype(object)
+        )
+    }
+    changed_kpi = kwargs | {"kpi": self.not_lagged_kpi * 2}
+    changed_kpi_type = kwargs | {"kpi_type": constants.REVENUE}
+
+    self.assertEqual(
+        input_data.InputData(**copied_kpi).fingerprint(), fingerprint
+    )
+    self.assertEqual(
+        input_data.InputData(**object_geos).fingerprint(), fingerprint
+    )
+    self.assertNotEqual(
+        input_data.InputData(**changed_kpi).fingerprint(), fingerprint
+    )
+    self.assertNotEqual(
+        input_data.InputData(**changed_kpi_type).fingerprint(), fingerprint
+    )
+
   def test_as_dataset_rf_only(self):
     data = input_data.InputData(
         controls=self.not_lagged_controls,
@@ -20,7 +20,7 @@ object.
 """
 
 import abc
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterator, Mapping, Sequence
 import dataclasses
 import datetime as dt
 import warnings
@@ -37,6 +37,10 @@ __all__ = [
     'InputDataLoader',
     'XrDatasetDataLoader',
     'DataFrameDataLoader',
+    'CsvDataLoader',
+    'ParquetDataLoader',
+    'ArrowDataLoader',
+    'StreamingCsvDataLoader',
 ]
 
 
@@ -320,100 +324,50 @@ class XrDatasetDataLoader(InputDataLoader):
     analogous mechanism to determine the lagged period is used in
     `DataFrameDataLoader` and `CsvDataLoader`.
     """
-    # Check if there are no NAs in media.
-    if constants.MEDIA in self.dataset.data_vars.keys():
-      if self.dataset.media.isnull().any(axis=None):
-        raise ValueError('NA values found in the media array.')
-
-    # Check if there are no NAs in reach & frequency.
-    if constants.REACH in self.dataset.data_vars.keys():
-      if self.dataset.reach.isnull().any(axis=None):
-        raise ValueError('NA values found in the reach array.')
-    if constants.FREQUENCY in self.dataset.data_vars.keys():
-      if self.dataset.frequency.isnull().any(axis=None):
-        raise ValueError('NA values found in the frequency array.')
-
-    # Check if there are no NAs in organic media.
-    if constants.ORGANIC_MEDIA in self.dataset.data_vars.keys():
-      if self.dataset.organic_media.isnull().any(axis=None):
-        raise ValueError('NA values found in the organic media array.')
-
-    # Check if there are no NAs in organic reach & frequency.
-    if constants.ORGANIC_REACH in self.dataset.data_vars.keys():
-      if self.dataset.organic_reach.isnull().any(axis=None):
-        raise ValueError('NA values found in the organic reach array.')
-    if constants.ORGANIC_FREQUENCY in self.dataset.data_vars.keys():
-      if self.dataset.organic_frequency.isnull().any(axis=None):
-        raise ValueError('NA values found in the organic frequency array.')
+    times, time_codes = np.unique(
+        self.dataset[constants.TIME].values, return_inverse=True
+    )
+    validator = _LaggedPeriodValidator(len(times), lagged_if_any_na=True)
+
+    # Check if there are no NAs in media, reach, frequency and their organic
+    # counterparts.
+    for array, label in (
+        (constants.MEDIA, 'media'),
+        (constants.REACH, 'reach'),
+        (constants.FREQUENCY, 'frequency'),
+        (constants.ORGANIC_MEDIA, 'organic media'),
+        (constants.ORGANIC_REACH, 'organic reach'),
+        (constants.ORGANIC_FREQUENCY, 'organic frequency'),
+    ):
+      if array in self.dataset.data_vars.keys():
+        validator.check_no_nas(
+            self.dataset[array].isnull().values,
+            f'NA values found in the {label} array.',
+        )
 
     # Arrays in which NAs are expected in the lagged-media period.
     na_arrays = [
-        constants.KPI,
-        constants.CONTROLS,
+        array
+        for array in (
+            constants.KPI,
+            constants.CONTROLS,
+            constants.NON_MEDIA_TREATMENTS,
+            constants.REVENUE_PER_KPI,
+            constants.MEDIA_SPEND,
+            constants.RF_SPEND,
+        )
+        if array in self.dataset.data_vars.keys()
     ]
-
-    na_mask = self.dataset[constants.KPI].isnull().any(
-        dim=constants.GEO
-    ) | self.dataset[constants.CONTROLS].isnull().any(
-        dim=[constants.GEO, constants.CONTROL_VARIABLE]
-    )
-
-    if constants.NON_MEDIA_TREATMENTS in self.dataset.data_vars.keys():
-      na_arrays.append(constants.NON_MEDIA_TREATMENTS)
-      na_mask |= (
-          self.dataset[constants.NON_MEDIA_TREATMENTS]
-          .isnull()
-          .any(dim=[constants.GEO, constants.NON_MEDIA_CHANNEL])
-      )
-
-    if constants.REVENUE_PER_KPI in self.dataset.data_vars.keys():
-      na_arrays.append(constants.REVENUE_PER_KPI)
-      na_mask |= (
-          self.dataset[constants.REVENUE_PER_KPI]
-          .isnull()
-          .any(dim=constants.GEO)
-      )
-    if constants.MEDIA_SPEND in self.dataset.data_vars.keys():
-      na_arrays.append(constants.MEDIA_SPEND)
-      na_mask |= (
-          self.dataset[constants.MEDIA_SPEND]
-          .isnull()
-          .any(dim=[constants.GEO, constants.MEDIA_CHANNEL])
-      )
-    if constants.RF_SPEND in self.dataset.data_vars.keys():
-      na_arrays.append(constants.RF_SPEND)
-      na_mask |= (
-          self.dataset[constants.RF_SPEND]
-          .isnull()
-          .any(dim=[constants.GEO, constants.RF_CHANNEL])
-      )
-
-    # Dates with at least one non-NA value in non-media columns
-    no_na_period = self.dataset[constants.TIME].isel(time=~na_mask).values
-
-    # Dates with 100% NA values in all non-media columns.
-    na_period = self.dataset[constants.TIME].isel(time=na_mask).values
-
-    # Check if na_period is a continuous window starting from the earliest time
-    # period.
-    if not np.all(
-        np.sort(na_period)
-        == np.sort(np.unique(self.dataset[constants.TIME]))[: len(na_period)]
-    ):
-      raise ValueError(
-          "The 'lagged media' period (period with 100% NA values in all"
-          f' non-media columns) {na_period} is not a continuous window starting'
-          ' from the earliest time period.'
+    for array in na_arrays:
+      validator.update(
+          time_codes,
+          self.dataset[array].isnull().transpose(constants.TIME, ...).values,
       )
 
-    # Check if for the non-lagged period, there are no NAs in non-media data
-    for array in na_arrays:
-      if np.any(np.isnan(self.dataset[array].isel(time=~na_mask))):
-        raise ValueError(
-            'NA values found in other than media columns outside the'
-            f' lagged-media period {na_period} (continuous window of 100% NA'
-            ' values in all other than media columns).'
-        )
+    # The lagged-media period is made of the dates with NA values in any of the
+    # non-media arrays.
+    is_lagged = validator.validate(times, na_period_as_list=False)[time_codes]
+    no_na_period = self.dataset[constants.TIME].values[~is_lagged]
 
     # Create new `time` and `media_time` coordinates.
     new_time = 'new_time'
@@ -421,42 +375,10 @@ class XrDatasetDataLoader(InputDataLoader):
     new_dataset = self.dataset.assign_coords(
         new_time=(new_time, no_na_period),
     )
-
-    new_dataset[constants.KPI] = (
-        new_dataset[constants.KPI]
-        .dropna(dim=constants.TIME)
-        .rename({constants.TIME: new_time})
-    )
-    new_dataset[constants.CONTROLS] = (
-        new_dataset[constants.CONTROLS]
-        .dropna(dim=constants.TIME)
-        .rename({constants.TIME: new_time})
-    )
-    if constants.NON_MEDIA_TREATMENTS in new_dataset.data_vars.keys():
-      new_dataset[constants.NON_MEDIA_TREATMENTS] = (
-          new_dataset[constants.NON_MEDIA_TREATMENTS]
-          .dropna(dim=constants.TIME)
-          .rename({constants.TIME: new_time})
-      )
-
-    if constants.REVENUE_PER_KPI in new_dataset.data_vars.keys():
-      new_dataset[constants.REVENUE_PER_KPI] = (
-          new_dataset[constants.REVENUE_PER_KPI]
-          .dropna(dim=constants.TIME)
-          .rename({constants.TIME: new_time})
-      )
-
-    if constants.MEDIA_SPEND in new_dataset.data_vars.keys():
-      new_dataset[constants.MEDIA_SPEND] = (
-          new_dataset[constants.MEDIA_SPEND]
-          .dropna(dim=constants.TIME)
-          .rename({constants.TIME: new_time})
-      )
-
-    if constants.RF_SPEND in new_dataset.data_vars.keys():
-      new_dataset[constants.RF_SPEND] = (
-          new_dataset[constants.RF_SPEND]
-          .dropna(dim=constants.TIME)
+    for array in na_arrays:
+      new_dataset[array] = (
+          new_dataset[array]
+          .isel({constants.TIME: ~is_lagged})
           .rename({constants.TIME: new_time})
       )
 
@@ -598,6 +520,330 @@ class CoordToColumns:
       )
 
 
+def _get_column_names(coord_to_columns: CoordToColumns) -> list[str]:
+  """Returns the names of the columns referenced by `coord_to_columns`."""
+  column_names = []
+  for field in dataclasses.fields(coord_to_columns):
+    value = getattr(coord_to_columns, field.name)
+    if isinstance(value, str):
+      column_names.append(value)
+    elif isinstance(value, Sequence):
+      column_names.extend(value)
+  return column_names
+
+
+def _get_column_dtypes(coord_to_columns: CoordToColumns) -> dict[str, str]:
+  """Returns the dtypes to parse the columns of `coord_to_columns` with.
+
+  Time values are kept as strings, which `DataFrameDataLoader` validates as
+  dates, and all data columns are parsed as floats. The dtype of the geo column
+  is inferred, so that geo names are the same as with a default parse.
+
+  Args:
+    coord_to_columns: The `CoordToColumns` object of the loader.
+
+  Returns:
+    A dictionary from column names to dtypes.
+  """
+  dtypes = {
+      column: 'float64'
+      for column in _get_column_names(coord_to_columns)
+      if column not in (coord_to_columns.geo, coord_to_columns.time)
+  }
+  dtypes[coord_to_columns.time] = 'str'
+  return dtypes
+
+
+@dataclasses.dataclass(frozen=True)
+class _ArraySpec:
+  """The columns of a long-format table that make up an `InputData` array.
+
+  Attributes:
+    name: Name of the array.
+    columns: Column or list of columns holding the values of the array.
+    time_dim: Time dimension of the array, `time` or `media_time`.
+    channel_dim: Channel dimension of the array, if it has one.
+    channels: Channel coordinate values, in the order of `columns`.
+  """
+
+  name: str
+  columns: str | Sequence[str]
+  time_dim: str
+  channel_dim: str | None = None
+  channels: Sequence[str] | None = None
+
+
+def _get_array_specs(
+    coord_to_columns: CoordToColumns,
+    media_to_channel: Mapping[str, str] | None = None,
+    media_spend_to_channel: Mapping[str, str] | None = None,
+    reach_to_channel: Mapping[str, str] | None = None,
+    frequency_to_channel: Mapping[str, str] | None = None,
+    rf_spend_to_channel: Mapping[str, str] | None = None,
+    organic_reach_to_channel: Mapping[str, str] | None = None,
+    organic_frequency_to_channel: Mapping[str, str] | None = None,
+) -> list[_ArraySpec]:
+  """Returns the specs of the arrays, other than `population`, to load.
+
+  Channel names are mapped from the column names through the `*_to_channel`
+  mappings. Arrays without a mapping use the column names as channel names.
+  """
+  specs = [_ArraySpec(constants.KPI, coord_to_columns.kpi, constants.TIME)]
+  if coord_to_columns.revenue_per_kpi is not None:
+    specs.append(
+        _ArraySpec(
+            constants.REVENUE_PER_KPI,
+            coord_to_columns.revenue_per_kpi,
+            constants.TIME,
+        )
+    )
+  # Array name, columns, time dimension, channel dimension and mapping from
+  # column names to channel names of the arrays with a channel dimension.
+  channel_arrays = [
+      (
+          constants.CONTROLS,
+          coord_to_columns.controls,
+          constants.TIME,
+          constants.CONTROL_VARIABLE,
+          None,
+      ),
+      (
+          constants.NON_MEDIA_TREATMENTS,
+          coord_to_columns.non_media_treatments,
+          constants.TIME,
+          constants.NON_MEDIA_CHANNEL,
+          None,
+      ),
+      (
+          constants.MEDIA,
+          coord_to_columns.media,
+          constants.MEDIA_TIME,
+          constants.MEDIA_CHANNEL,
+          media_to_channel,
+      ),
+      (
+          constants.MEDIA_SPEND,
+          coord_to_columns.media_spend,
+          constants.TIME,
+          constants.MEDIA_CHANNEL,
+          media_spend_to_channel,
+      ),
+      (
+          constants.REACH,
+          coord_to_columns.reach,
+          constants.MEDIA_TIME,
+          constants.RF_CHANNEL,
+          reach_to_channel,
+      ),
+      (
+          constants.FREQUENCY,
+          coord_to_columns.frequency,
+          constants.MEDIA_TIME,
+          constants.RF_CHANNEL,
+          frequency_to_channel,
+      ),
+      (
+          constants.RF_SPEND,
+          coord_to_columns.rf_spend,
+          constants.TIME,
+          constants.RF_CHANNEL,
+          rf_spend_to_channel,
+      ),
+      (
+          constants.ORGANIC_MEDIA,
+          coord_to_columns.organic_media,
+          constants.MEDIA_TIME,
+          constants.ORGANIC_MEDIA_CHANNEL,
+          None,
+      ),
+      (
+          constants.ORGANIC_REACH,
+          coord_to_columns.organic_reach,
+          constants.MEDIA_TIME,
+          constants.ORGANIC_RF_CHANNEL,
+          organic_reach_to_channel,
+      ),
+      (
+          constants.ORGANIC_FREQUENCY,
+          coord_to_columns.organic_frequency,
+          constants.MEDIA_TIME,
+          constants.ORGANIC_RF_CHANNEL,
+          organic_frequency_to_channel,
+      ),
+  ]
+  for name, columns, time_dim, channel_dim, to_channel in channel_arrays:
+    if columns is None:
+      continue
+    columns = list(columns)
+    channels = (
+        columns if to_channel is None else [to_channel[c] for c in columns]
+    )
+    specs.append(_ArraySpec(name, columns, time_dim, channel_dim, channels))
+  return specs
+
+
+def _get_na_columns(
+    coord_to_columns: CoordToColumns, include_population: bool = True
+) -> list[str]:
+  """Returns the columns in which NAs are expected in the lagged period."""
+  coords = [constants.KPI, constants.CONTROLS]
+  if include_population:
+    coords.append(constants.POPULATION)
+  if coord_to_columns.revenue_per_kpi is not None:
+    coords.append(constants.REVENUE_PER_KPI)
+  if coord_to_columns.media_spend is not None:
+    coords.append(constants.MEDIA_SPEND)
+  if coord_to_columns.rf_spend is not None:
+    coords.append(constants.RF_SPEND)
+  if coord_to_columns.non_media_treatments is not None:
+    coords.append(constants.NON_MEDIA_TREATMENTS)
+  na_columns = []
+  for coord in coords:
+    columns = getattr(coord_to_columns, coord)
+    columns = [columns] if isinstance(columns, str) else columns
+    na_columns.extend(columns)
+  return na_columns
+
+
+class _LaggedPeriodValidator:
+  """Validates the NAs of the arrays of a table in a single pass.
+
+  Media arrays (`media`, `reach`, `frequency`, `organic_media`, `organic_reach`
+  and `organic_frequency`) must not have NAs. The other arrays must be NA in a
+  lagged-media period of initial times, and must not have NAs after it. The
+  validator is updated with the NA masks of the table, possibly one chunk of
+  rows at a time, and only keeps whether each time has any value and any NA in
+  the non-media arrays. All violations are reported at once by `validate`.
+  """
+
+  def __init__(self, n_times: int, lagged_if_any_na: bool = False):
+    """Initializes the validator.
+
+    Args:
+      n_times: Number of distinct times in the table.
+      lagged_if_any_na: Whether the lagged-media period is made of the times
+        with any NA in the non-media arrays, instead of the times with only NAs
+        in them.
+    """
+    self._lagged_if_any_na = lagged_if_any_na
+    self._has_value = np.zeros(n_times, dtype=bool)
+    self._has_na = np.zeros(n_times, dtype=bool)
+    self._errors = []
+
+  def check_no_nas(self, is_na: np.ndarray, message: str):
+    """Records `message` as a violation if `is_na` has any NA."""
+    if is_na.any() and message not in self._errors:
+      self._errors.append(message)
+
+  def update(self, time_codes: np.ndarray, is_na: np.ndarray):
+    """Records the NAs of the non-media arrays at the given times.
+
+    Args:
+      time_codes: Position in the sorted times of the time of each row.
+      is_na: Boolean array whose first dimension matches `time_codes`, and
+        whose other dimensions are reduced.
+    """
+    is_na = is_na.reshape(len(time_codes), -1)
+    self._has_value[time_codes[~is_na.all(axis=1)]] = True
+    self._has_na[time_codes[is_na.any(axis=1)]] = True
+
+  def validate(
+      self,
+      times: np.ndarray,
+      na_period_as_list: bool = True,
+      message_order: np.ndarray | None = None,
+  ) -> np.ndarray:
+    """Validates all the NAs recorded so far.
+
+    Args:
+      times: The sorted times of the table.
+      na_period_as_list: Whether the times of the lagged-media period are
+        formatted as a list in the error messages.
+      message_order: Positions in `times` of the times in the order in which
+        they are listed in the error messages. Defaults to the sorted order.
+
+    Returns:
+      A boolean mask of the times in the lagged-media period.
+
+    Raises:
+      ValueError: If there are NAs in the media arrays, if the lagged-media
+        period is not a continuous window starting from the earliest time, or
+        if there are NAs in the non-media arrays outside of it. The message
+        lists every violation.
+    """
+    is_lagged = self._has_na if self._lagged_if_any_na else ~self._has_value
+    if message_order is None:
+      na_period = times[is_lagged]
+    else:
+      na_period = times[message_order][is_lagged[message_order]]
+    if na_period_as_list:
+      na_period = na_period.tolist()
+    n_lagged = np.count_nonzero(is_lagged)
+
+    errors = list(self._errors)
+    if is_lagged[n_lagged:].any():
+      errors.append(
+          "The 'lagged media' period (period with 100% NA values in all"
+          f' non-media columns) {na_period} is not a continuous window starting'
+          ' from the earliest time period.'
+      )
+    if (self._has_na & ~is_lagged).any():
+      errors.append(
+          'NA values found in non-media columns outside the lagged-media'
+          f' period {na_period} (continuous window of 100% NA values in all'
+          ' non-media columns).'
+      )
+    if errors:
+      raise ValueError('\n'.join(errors))
+    return is_lagged
+
+
+def _update_lagged_period_validator(
+    validator: _LaggedPeriodValidator,
+    df: pd.DataFrame,
+    time_codes: np.ndarray,
+    coord_to_columns: CoordToColumns,
+    include_population: bool = True,
+):
+  """Updates `validator` with the NAs of rows of a long-format table.
+
+  The NA mask of all the referenced columns is computed in a single pass over
+  the rows.
+
+  Args:
+    validator: The validator to update.
+    df: The rows of the table.
+    time_codes: Position in the sorted times of the time of each row of `df`.
+    coord_to_columns: The `CoordToColumns` object of the table.
+    include_population: Whether the population column is expected to be NA in
+      the lagged-media period.
+  """
+  media_columns = [
+      (coord, list(getattr(coord_to_columns, coord)))
+      for coord in (
+          constants.MEDIA,
+          constants.REACH,
+          constants.FREQUENCY,
+          constants.ORGANIC_MEDIA,
+          constants.ORGANIC_REACH,
+          constants.ORGANIC_FREQUENCY,
+      )
+      if getattr(coord_to_columns, coord) is not None
+  ]
+  na_columns = _get_na_columns(coord_to_columns, include_population)
+  columns = [c for _, group in media_columns for c in group] + na_columns
+  is_na = df[columns].isna().to_numpy()
+
+  start = 0
+  for coord, group in media_columns:
+    validator.check_no_nas(
+        is_na[:, start : start + len(group)],
+        f'NA values found in the {coord} columns.',
+    )
+    start += len(group)
+  validator.update(time_codes, is_na[:, start:])
+
+
 @dataclasses.dataclass
 class DataFrameDataLoader(InputDataLoader):
   """Reads data from a Pandas `DataFrame`.
@@ -923,293 +1169,89 @@ class DataFrameDataLoader(InputDataLoader):
 
   def _validate_nas(self):
     """Validates that the only NAs are in the lagged-media period."""
-    # Check if there are no NAs in media.
-    if self.coord_to_columns.media is not None:
-      if self.df[self.coord_to_columns.media].isna().any(axis=None):
-        raise ValueError('NA values found in the media columns.')
-
-    # Check if there are no NAs in reach & frequency.
-    if self.coord_to_columns.reach is not None:
-      if self.df[self.coord_to_columns.reach].isna().any(axis=None):
-        raise ValueError('NA values found in the reach columns.')
-    if self.coord_to_columns.frequency is not None:
-      if self.df[self.coord_to_columns.frequency].isna().any(axis=None):
-        raise ValueError('NA values found in the frequency columns.')
-
-    # Check if ther are no NAs in organic_media.
-    if self.coord_to_columns.organic_media is not None:
-      if self.df[self.coord_to_columns.organic_media].isna().any(axis=None):
-        raise ValueError('NA values found in the organic_media columns.')
-
-    # Check if there are no NAs in organic_reach & organic_frequency.
-    if self.coord_to_columns.organic_reach is not None:
-      if self.df[self.coord_to_columns.organic_reach].isna().any(axis=None):
-        raise ValueError('NA values found in the organic_reach columns.')
-    if self.coord_to_columns.organic_frequency is not None:
-      if self.df[self.coord_to_columns.organic_frequency].isna().any(axis=None):
-        raise ValueError('NA values found in the organic_frequency columns.')
-
-    # Determine columns in which NAs are expected in the lagged-media period.
-    na_columns = []
-    coords = [
-        constants.KPI,
-        constants.CONTROLS,
-        constants.POPULATION,
-    ]
-    if self.coord_to_columns.revenue_per_kpi is not None:
-      coords.append(constants.REVENUE_PER_KPI)
-    if self.coord_to_columns.media_spend is not None:
-      coords.append(constants.MEDIA_SPEND)
-    if self.coord_to_columns.rf_spend is not None:
-      coords.append(constants.RF_SPEND)
-    if self.coord_to_columns.non_media_treatments is not None:
-      coords.append(constants.NON_MEDIA_TREATMENTS)
-    for coord in coords:
-      columns = getattr(self.coord_to_columns, coord)
-      columns = [columns] if isinstance(columns, str) else columns
-      na_columns.extend(columns)
-
-    # Dates with at least one non-NA value in columns different from media,
-    # reach, frequency, organic_media, organic_reach, and organic_frequency.
-    time_column_name = self.coord_to_columns.time
-    no_na_period = self.df[(~self.df[na_columns].isna()).any(axis=1)][
-        time_column_name
-    ].unique()
-
-    # Dates with 100% NA values in all columns different from media, reach,
-    # frequency, organic_media, organic_reach, and organic_frequency.
-    na_period = [
-        t for t in self.df[time_column_name].unique() if t not in no_na_period
-    ]
-
-    # Check if na_period is a continuous window starting from the earliest time
-    # period.
-    if not np.all(
-        np.sort(na_period)
-        == np.sort(self.df[time_column_name].unique())[: len(na_period)]
-    ):
-      raise ValueError(
-          "The 'lagged media' period (period with 100% NA values in all"
-          f' non-media columns) {na_period} is not a continuous window starting'
-          ' from the earliest time period.'
-      )
-
-    # Check if for the non-lagged period, there are no NAs in data different
-    # from media, reach, frequency, organic_media, organic_reach, and
-    # organic_frequency.
-    not_lagged_data = self.df.loc[
-        self.df[time_column_name].isin(no_na_period),
-        na_columns,
-    ]
-    if not_lagged_data.isna().any(axis=None):
-      raise ValueError(
-          'NA values found in non-media columns outside the lagged-media'
-          f' period {na_period} (continuous window of 100% NA values in all'
-          ' non-media columns).'
-      )
+    # The times are factorized in order of first appearance, which is the
+    # order of the lagged-media period in the error messages, and the codes
+    # are then mapped to the positions of the sorted times.
+    frame_codes, frame_times = pd.factorize(self.df[self.coord_to_columns.time])
+    frame_times = np.asarray(frame_times)
+    sort_order = np.argsort(frame_times, kind='stable')
+    frame_to_sorted = np.empty_like(sort_order)
+    frame_to_sorted[sort_order] = np.arange(len(sort_order))
+    validator = _LaggedPeriodValidator(len(frame_times))
+    _update_lagged_period_validator(
+        validator,
+        self.df,
+        frame_to_sorted[frame_codes],
+        self.coord_to_columns,
+    )
+    validator.validate(frame_times[sort_order], message_order=frame_to_sorted)
 
   def load(self) -> input_data.InputData:
     """Reads data from a dataframe and returns an InputData object."""
 
-    # Change geo strings to numbers to keep the order of geos. The .to_xarray()
-    # method from Pandas sorts lexicographically by the key columns, so if the
-    # geos were unsorted strings, it would change their order.
-    geo_column_name = self.coord_to_columns.geo
-    time_column_name = self.coord_to_columns.time
-    geo_names = self.df[geo_column_name].unique()
-    self.df[geo_column_name] = self.df[geo_column_name].replace(
-        dict(zip(geo_names, np.arange(len(geo_names))))
-    )
-    df_indexed = self.df.set_index([geo_column_name, time_column_name])
-
-    kpi_xr = (
-        df_indexed[self.coord_to_columns.kpi]
-        .dropna()
-        .rename(constants.KPI)
-        .rename_axis([constants.GEO, constants.TIME])
-        .to_frame()
-        .to_xarray()
-    )
-    population_xr = (
-        df_indexed[self.coord_to_columns.population]
-        .groupby(geo_column_name)
-        .mean()
-        .rename(constants.POPULATION)
-        .rename_axis([constants.GEO])
-        .to_frame()
-        .to_xarray()
-    )
-    controls_xr = (
-        df_indexed[self.coord_to_columns.controls]
-        .stack()
-        .rename(constants.CONTROLS)
-        .rename_axis(
-            [constants.GEO, constants.TIME, constants.CONTROL_VARIABLE]
-        )
-        .to_frame()
-        .to_xarray()
+    # Geos keep their order of first appearance and times are sorted. The geo
+    # and time columns are factorized once, and every column group is scattered
+    # into a dense `[geo, time, channel]` array by the integer codes of its
+    # rows. This fills every cell, since `_validate_geo_and_time` guarantees
+    # that every geo has every time exactly once.
+    geo_codes, geo_names = pd.factorize(self.df[self.coord_to_columns.geo])
+    time_codes, media_times = pd.factorize(
+        self.df[self.coord_to_columns.time], sort=True
     )
-    dataset = xr.combine_by_coords([kpi_xr, population_xr, controls_xr])
-
-    if self.coord_to_columns.non_media_treatments is not None:
-      non_media_xr = (
-          df_indexed[self.coord_to_columns.non_media_treatments]
-          .stack()
-          .rename(constants.NON_MEDIA_TREATMENTS)
-          .rename_axis(
-              [constants.GEO, constants.TIME, constants.NON_MEDIA_CHANNEL]
-          )
-          .to_frame()
-          .to_xarray()
-      )
-      dataset = xr.combine_by_coords([dataset, non_media_xr])
-
-    if self.coord_to_columns.revenue_per_kpi is not None:
-      revenue_per_kpi_xr = (
-          df_indexed[self.coord_to_columns.revenue_per_kpi]
-          .dropna()
-          .rename(constants.REVENUE_PER_KPI)
-          .rename_axis([constants.GEO, constants.TIME])
-          .to_frame()
-          .to_xarray()
-      )
-      dataset = xr.combine_by_coords([dataset, revenue_per_kpi_xr])
-    if self.coord_to_columns.media is not None:
-      media_xr = (
-          df_indexed[self.coord_to_columns.media]
-          .stack()
-          .rename(constants.MEDIA)
-          .rename_axis(
-              [constants.GEO, constants.MEDIA_TIME, constants.MEDIA_CHANNEL]
-          )
-          .to_frame()
-          .to_xarray()
+    geo_names = np.asarray(geo_names)
+    media_times = np.asarray(media_times)
+
+    # The `time` coordinate excludes the lagged-media period, in which all of
+    # the non-media columns, including `kpi`, are NA.
+    has_kpi = self.df[self.coord_to_columns.kpi].notna().to_numpy()
+    is_time = np.zeros(len(media_times), dtype=bool)
+    is_time[time_codes[has_kpi]] = True
+    is_time_row = is_time[time_codes]
+    time_positions = np.cumsum(is_time) - 1
+
+    def to_data_array(spec: _ArraySpec) -> xr.DataArray:
+      values = self.df[spec.columns].to_numpy()
+      if spec.time_dim == constants.MEDIA_TIME:
+        rows_geo_codes, rows_time_codes = geo_codes, time_codes
+        times = media_times
+      else:
+        values = values[is_time_row]
+        rows_geo_codes = geo_codes[is_time_row]
+        rows_time_codes = time_positions[time_codes[is_time_row]]
+        times = media_times[is_time]
+      array = np.empty(
+          (len(geo_names), len(times)) + values.shape[1:], dtype=values.dtype
       )
-      media_xr.coords[constants.MEDIA_CHANNEL] = [
-          self.media_to_channel[x]
-          for x in media_xr.coords[constants.MEDIA_CHANNEL].values
-      ]
-
-      media_spend_xr = (
-          df_indexed[self.coord_to_columns.media_spend]
-          .stack()
-          .rename(constants.MEDIA_SPEND)
-          .rename_axis([constants.GEO, constants.TIME, constants.MEDIA_CHANNEL])
-          .to_frame()
-          .to_xarray()
-      )
-      media_spend_xr.coords[constants.MEDIA_CHANNEL] = [
-          self.media_spend_to_channel[x]
-          for x in media_spend_xr.coords[constants.MEDIA_CHANNEL].values
-      ]
-      dataset = xr.combine_by_coords([dataset, media_xr, media_spend_xr])
-
-    if self.coord_to_columns.reach is not None:
-      reach_xr = (
-          df_indexed[self.coord_to_columns.reach]
-          .stack()
-          .rename(constants.REACH)
-          .rename_axis(
-              [constants.GEO, constants.MEDIA_TIME, constants.RF_CHANNEL]
-          )
-          .to_frame()
-          .to_xarray()
-      )
-      reach_xr.coords[constants.RF_CHANNEL] = [
-          self.reach_to_channel[x]
-          for x in reach_xr.coords[constants.RF_CHANNEL].values
-      ]
-
-      frequency_xr = (
-          df_indexed[self.coord_to_columns.frequency]
-          .stack()
-          .rename(constants.FREQUENCY)
-          .rename_axis(
-              [constants.GEO, constants.MEDIA_TIME, constants.RF_CHANNEL]
-          )
-          .to_frame()
-          .to_xarray()
-      )
-      frequency_xr.coords[constants.RF_CHANNEL] = [
-          self.frequency_to_channel[x]
-          for x in frequency_xr.coords[constants.RF_CHANNEL].values
-      ]
-
-      rf_spend_xr = (
-          df_indexed[self.coord_to_columns.rf_spend]
-          .stack()
-          .rename(constants.RF_SPEND)
-          .rename_axis([constants.GEO, constants.TIME, constants.RF_CHANNEL])
-          .to_frame()
-          .to_xarray()
-      )
-      rf_spend_xr.coords[constants.RF_CHANNEL] = [
-          self.rf_spend_to_channel[x]
-          for x in rf_spend_xr.coords[constants.RF_CHANNEL].values
-      ]
-      dataset = xr.combine_by_coords(
-          [dataset, reach_xr, frequency_xr, rf_spend_xr]
-      )
-
-    if self.coord_to_columns.organic_media is not None:
-      organic_media_xr = (
-          df_indexed[self.coord_to_columns.organic_media]
-          .stack()
-          .rename(constants.ORGANIC_MEDIA)
-          .rename_axis([
-              constants.GEO,
-              constants.MEDIA_TIME,
-              constants.ORGANIC_MEDIA_CHANNEL,
-          ])
-          .to_frame()
-          .to_xarray()
-      )
-      dataset = xr.combine_by_coords([dataset, organic_media_xr])
-
-    if self.coord_to_columns.organic_reach is not None:
-      organic_reach_xr = (
-          df_indexed[self.coord_to_columns.organic_reach]
-          .stack()
-          .rename(constants.ORGANIC_REACH)
-          .rename_axis([
-              constants.GEO,
-              constants.MEDIA_TIME,
-              constants.ORGANIC_RF_CHANNEL,
-          ])
-          .to_frame()
-          .to_xarray()
-      )
-      organic_reach_xr.coords[constants.ORGANIC_RF_CHANNEL] = [
-          self.organic_reach_to_channel[x]
-          for x in organic_reach_xr.coords[constants.ORGANIC_RF_CHANNEL].values
-      ]
-      organic_frequency_xr = (
-          df_indexed[self.coord_to_columns.organic_frequency]
-          .stack()
-          .rename(constants.ORGANIC_FREQUENCY)
-          .rename_axis([
-              constants.GEO,
-              constants.MEDIA_TIME,
-              constants.ORGANIC_RF_CHANNEL,
-          ])
-          .to_frame()
-          .to_xarray()
-      )
-      organic_frequency_xr.coords[constants.ORGANIC_RF_CHANNEL] = [
-          self.organic_frequency_to_channel[x]
-          for x in organic_frequency_xr.coords[
-              constants.ORGANIC_RF_CHANNEL
-          ].values
-      ]
-      dataset = xr.combine_by_coords(
-          [dataset, organic_reach_xr, organic_frequency_xr]
-      )
-
-    # Change back to geo names
-    self.df[geo_column_name] = self.df[geo_column_name].replace(
-        dict(zip(np.arange(len(geo_names)), geo_names))
+      array[rows_geo_codes, rows_time_codes] = values
+      coords = {constants.GEO: geo_names, spec.time_dim: times}
+      if spec.channel_dim is not None:
+        coords[spec.channel_dim] = spec.channels
+      return xr.DataArray(array, coords=coords, dims=list(coords))
+
+    population = (
+        self.df[self.coord_to_columns.population].groupby(geo_codes).mean()
     )
-    dataset.coords[constants.GEO] = geo_names
+    data_vars = {
+        constants.POPULATION: xr.DataArray(
+            population.to_numpy(),
+            coords={constants.GEO: geo_names},
+            dims=[constants.GEO],
+        ),
+    }
+    for spec in _get_array_specs(
+        self.coord_to_columns,
+        media_to_channel=self.media_to_channel,
+        media_spend_to_channel=self.media_spend_to_channel,
+        reach_to_channel=self.reach_to_channel,
+        frequency_to_channel=self.frequency_to_channel,
+        rf_spend_to_channel=self.rf_spend_to_channel,
+        organic_reach_to_channel=self.organic_reach_to_channel,
+        organic_frequency_to_channel=self.organic_frequency_to_channel,
+    ):
+      data_vars[spec.name] = to_data_array(spec)
+
+    # Arrays sharing a channel dimension are aligned by channel name.
+    dataset = xr.Dataset(data_vars)
     return XrDatasetDataLoader(dataset, kpi_type=self.kpi_type).load()
 
 
@@ -1233,8 +1275,9 @@ class CsvDataLoader(InputDataLoader):
 
   Note: Time column values must be formatted using the _yyyy-mm-dd_ date format.
 
-  Internally, this class reads the CSV file into a Pandas DataFrame and then
-  loads the data using `DataFrameDataLoader`.
+  Internally, this class reads the columns referenced by `coord_to_columns`
+  from the CSV file into a Pandas DataFrame and then loads the data using
+  `DataFrameDataLoader`. Other columns of the file are not parsed.
 
   Note: In a national model, `geo` and `population` are optional. If
   `population` is provided, it is reset to a default value of `1.0`.
@@ -1378,7 +1421,13 @@ class CsvDataLoader(InputDataLoader):
     provided, then `reach_to_channel`, `frequency_to_channel`, and
     `rf_spend_to_channel` are required.
     """  # pyformat: disable
-    df = pd.read_csv(csv_path)
+    # Only the columns referenced by `coord_to_columns` are parsed.
+    column_names = set(_get_column_names(coord_to_columns))
+    df = pd.read_csv(
+        csv_path,
+        usecols=lambda column: column in column_names,
+        dtype=_get_column_dtypes(coord_to_columns),
+    )
     self._df_loader = DataFrameDataLoader(
         df=df,
         coord_to_columns=coord_to_columns,
@@ -1396,3 +1445,398 @@ class CsvDataLoader(InputDataLoader):
     """Reads data from a CSV file and returns an `InputData` object."""
 
     return self._df_loader.load()
+
+
+class _ColumnarFileDataLoader(InputDataLoader, metaclass=abc.ABCMeta):
+  """Reads data from a columnar file.
+
+  Only the columns referenced by `coord_to_columns` are read from the file, with
+  the types stored in the file, and loaded using `DataFrameDataLoader`.
+  """
+
+  def __init__(
+      self,
+      path: str,
+      coord_to_columns: CoordToColumns,
+      kpi_type: str,
+      media_to_channel: Mapping[str, str] | None = None,
+      media_spend_to_channel: Mapping[str, str] | None = None,
+      reach_to_channel: Mapping[str, str] | None = None,
+      frequency_to_channel: Mapping[str, str] | None = None,
+      rf_spend_to_channel: Mapping[str, str] | None = None,
+      organic_reach_to_channel: Mapping[str, str] | None = None,
+      organic_frequency_to_channel: Mapping[str, str] | None = None,
+  ):
+    """Constructor.
+
+    Args:
+      path: The path to the file to read from.
+      coord_to_columns: A `CoordToColumns` object whose fields are the desired
+        coordinates of the `InputData` and the values are the current names of
+        columns (or lists of columns) in the file. Columns that are not
+        referenced are not read.
+      kpi_type: A string denoting whether the KPI is of a `'revenue'` or
+        `'non-revenue'` type.
+      media_to_channel: See `CsvDataLoader`.
+      media_spend_to_channel: See `CsvDataLoader`.
+      reach_to_channel: See `CsvDataLoader`.
+      frequency_to_channel: See `CsvDataLoader`.
+      rf_spend_to_channel: See `CsvDataLoader`.
+      organic_reach_to_channel: See `CsvDataLoader`.
+      organic_frequency_to_channel: See `CsvDataLoader`.
+    """
+    # The geo and population columns are optional in a national model, so only
+    # the referenced columns present in the file are read.
+    file_column_names = set(self._read_column_names(path))
+    column_names = [
+        column
+        for column in dict.fromkeys(_get_column_names(coord_to_columns))
+        if column in file_column_names
+    ]
+    df = self._read_columns(path, column_names)
+
+    time_column_name = coord_to_columns.time
+    if not pd.api.types.is_string_dtype(df[time_column_name]):
+      df[time_column_name] = pd.to_datetime(df[time_column_name]).dt.strftime(
+          constants.DATE_FORMAT
+      )
+
+    self._df_loader = DataFrameDataLoader(
+        df=df,
+        coord_to_columns=coord_to_columns,
+        kpi_type=kpi_type,
+        media_to_channel=media_to_channel,
+        media_spend_to_channel=media_spend_to_channel,
+        reach_to_channel=reach_to_channel,
+        frequency_to_channel=frequency_to_channel,
+        rf_spend_to_channel=rf_spend_to_channel,
+        organic_reach_to_channel=organic_reach_to_channel,
+        organic_frequency_to_channel=organic_frequency_to_channel,
+    )
+
+  @abc.abstractmethod
+  def _read_column_names(self, path: str) -> Sequence[str]:
+    """Returns the names of the columns in the file, without reading them."""
+    raise NotImplementedError()
+
+  @abc.abstractmethod
+  def _read_columns(self, path: str, columns: Sequence[str]) -> pd.DataFrame:
+    """Reads the given columns of the file into a DataFrame."""
+    raise NotImplementedError()
+
+  def load(self) -> input_data.InputData:
+    """Reads data from the file and returns an `InputData` object."""
+    return self._df_loader.load()
+
+
+class ParquetDataLoader(_ColumnarFileDataLoader):
+  """Reads data from a Parquet file.
+
+  The file is read in the same long format as `CsvDataLoader`: one row per geo
+  and time, with the columns named by `coord_to_columns`. Only these columns
+  are read from the file, so the time and memory spent reading it scale with
+  the columns the model uses. Time values are either strings formatted as
+  _yyyy-mm-dd_ or date or timestamp columns.
+
+  Reading Parquet files requires `pyarrow`, which is installed with the
+  `google-meridian[arrow]` extra.
+
+  Example:
+
+  ```python
+  data = ParquetDataLoader(
+      path='data.parquet',
+      coord_to_columns=coord_to_columns,
+      kpi_type='non-revenue',
+      media_to_channel=media_to_channel,
+      media_spend_to_channel=media_spend_to_channel,
+  ).load()
+  ```
+  """
+
+  def _read_column_names(self, path: str) -> Sequence[str]:
+    import pyarrow.parquet as pq  # pylint: disable=g-import-not-at-top
+
+    return pq.read_schema(path).names
+
+  def _read_columns(self, path: str, columns: Sequence[str]) -> pd.DataFrame:
+    return pd.read_parquet(path, columns=list(columns))
+
+
+class ArrowDataLoader(_ColumnarFileDataLoader):
+  """Reads data from an Arrow IPC (Feather V2) file.
+
+  The file is read in the same long format as `CsvDataLoader`: one row per geo
+  and time, with the columns named by `coord_to_columns`. Only these columns
+  are read from the file, so the time and memory spent reading it scale with
+  the columns the model uses. Time values are either strings formatted as
+  _yyyy-mm-dd_ or date or timestamp columns.
+
+  Reading Arrow files requires `pyarrow`, which is installed with the
+  `google-meridian[arrow]` extra.
+  """
+
+  def _read_column_names(self, path: str) -> Sequence[str]:
+    import pyarrow.ipc as ipc  # pylint: disable=g-import-not-at-top
+
+    with ipc.open_file(path) as reader:
+      return reader.schema.names
+
+  def _read_columns(self, path: str, columns: Sequence[str]) -> pd.DataFrame:
+    return pd.read_feather(path, columns=list(columns))
+
+
+class StreamingCsvDataLoader(InputDataLoader):
+  """Reads data from a CSV file in chunks of rows.
+
+  This class reads the same CSV files as `CsvDataLoader`, but never holds the
+  whole file in memory. The file is read twice, only parsing the columns
+  referenced by `coord_to_columns`:
+
+  1.  The `geo` and `time` columns are read to find the geos, in their order of
+      first appearance, and the sorted times.
+  2.  Chunks of `chunksize` rows are validated and scattered into dense
+      `[geo, time, channel]` arrays, so memory scales with the output arrays
+      and the size of a chunk.
+
+  The validations are the same as those of `DataFrameDataLoader`: every geo
+  must have every time exactly once, the media columns must not have NAs, and
+  the other columns must only have NAs in the lagged-media period. The NAs are
+  validated with per-time masks that are updated for each chunk.
+
+  Example:
+
+  ```python
+  data = StreamingCsvDataLoader(
+      csv_path='zip_level_data.csv',
+      coord_to_columns=coord_to_columns,
+      kpi_type='non-revenue',
+      media_to_channel=media_to_channel,
+      media_spend_to_channel=media_spend_to_channel,
+      chunksize=500_000,
+  ).load()
+  ```
+  """
+
+  def __init__(
+      self,
+      csv_path: str,
+      coord_to_columns: CoordToColumns,
+      kpi_type: str,
+      media_to_channel: Mapping[str, str] | None = None,
+      media_spend_to_channel: Mapping[str, str] | None = None,
+      reach_to_channel: Mapping[str, str] | None = None,
+      frequency_to_channel: Mapping[str, str] | None = None,
+      rf_spend_to_channel: Mapping[str, str] | None = None,
+      organic_reach_to_channel: Mapping[str, str] | None = None,
+      organic_frequency_to_channel: Mapping[str, str] | None = None,
+      chunksize: int = 100_000,
+  ):
+    """Constructor.
+
+    Args:
+      csv_path: The path to the CSV file to read from. See `CsvDataLoader`.
+      coord_to_columns: A `CoordToColumns` object whose fields are the desired
+        coordinates of the `InputData` and the values are the current names of
+        columns (or lists of columns) in the CSV file.
+      kpi_type: A string denoting whether the KPI is of a `'revenue'` or
+        `'non-revenue'` type.
+      media_to_channel: See `CsvDataLoader`.
+      media_spend_to_channel: See `CsvDataLoader`.
+      reach_to_channel: See `CsvDataLoader`.
+      frequency_to_channel: See `CsvDataLoader`.
+      rf_spend_to_channel: See `CsvDataLoader`.
+      organic_reach_to_channel: See `CsvDataLoader`.
+      organic_frequency_to_channel: See `CsvDataLoader`.
+      chunksize: Number of rows of the CSV file read at a time.
+
+    Raises:
+      ValueError: If `chunksize` is not positive or a required `*_to_channel`
+        mapping is missing.
+    """
+    if chunksize <= 0:
+      raise ValueError(f'`chunksize` must be positive, but got {chunksize}.')
+    self.csv_path = csv_path
+    self.coord_to_columns = coord_to_columns
+    self.kpi_type = kpi_type
+    self.media_to_channel = media_to_channel
+    self.media_spend_to_channel = media_spend_to_channel
+    self.reach_to_channel = reach_to_channel
+    self.frequency_to_channel = frequency_to_channel
+    self.rf_spend_to_channel = rf_spend_to_channel
+    self.organic_reach_to_channel = organic_reach_to_channel
+    self.organic_frequency_to_channel = organic_frequency_to_channel
+    self.chunksize = chunksize
+
+    required_mappings = DataFrameDataLoader._required_mappings  # pylint: disable=protected-access
+    for coord_name, channel_dict in required_mappings.items():
+      if (
+          getattr(coord_to_columns, coord_name, None) is not None
+          and getattr(self, channel_dict, None) is None
+      ):
+        raise ValueError(
+            f"When {coord_name} data is provided, '{channel_dict}' is required."
+        )
+
+  def _read_chunks(
+      self, columns: Sequence[str], dtype: Mapping[str, str]
+  ) -> Iterator[pd.DataFrame]:
+    """Reads the given columns of the CSV file in chunks of rows."""
+    column_names = set(columns)
+    return pd.read_csv(
+        self.csv_path,
+        usecols=lambda column: column in column_names,
+        dtype={k: v for k, v in dtype.items() if k in column_names},
+        chunksize=self.chunksize,
+    )
+
+  def _read_geos_and_times(self, has_geo: bool) -> tuple[list[str], np.ndarray]:
+    """Returns the geos in order of first appearance and the sorted times."""
+    geo_column_name = self.coord_to_columns.geo
+    time_column_name = self.coord_to_columns.time
+    columns = [time_column_name]
+    if has_geo:
+      columns.append(geo_column_name)
+    geo_names = {}
+    time_names = set()
+    for chunk in self._read_chunks(columns, {time_column_name: 'str'}):
+      if has_geo:
+        for geo in chunk[geo_column_name].unique():
+          geo_names.setdefault(geo, len(geo_names))
+      time_names.update(chunk[time_column_name].unique())
+
+    for time in time_names:
+      try:
+        _ = dt.datetime.strptime(time, constants.DATE_FORMAT)
+      except (TypeError, ValueError) as exc:
+        raise ValueError(
+            f"Invalid time label: '{time}'. Expected format:"
+            f" '{constants.DATE_FORMAT}'"
+        ) from exc
+    return list(geo_names), np.array(sorted(time_names))
+
+  def load(self) -> input_data.InputData:
+    """Reads data from a CSV file and returns an `InputData` object."""
+    geo_column_name = self.coord_to_columns.geo
+    time_column_name = self.coord_to_columns.time
+    population_column_name = self.coord_to_columns.population
+
+    file_columns = pd.read_csv(self.csv_path, nrows=0).columns
+    column_names = [
+        column
+        for column in _get_column_names(self.coord_to_columns)
+        if column in file_columns
+        or column not in (geo_column_name, population_column_name)
+    ]
+    if any(column not in file_columns for column in column_names):
+      raise ValueError(
+          f'Values of the `coord_to_columns` object {sorted(column_names)}'
+          f' should map to the DataFrame column names {sorted(file_columns)}.'
+      )
+
+    has_geo = geo_column_name in file_columns
+    geo_names, media_times = self._read_geos_and_times(has_geo)
+    is_national = len(geo_names) <= 1
+    has_population = population_column_name in file_columns and not is_national
+    if is_national:
+      if population_column_name in file_columns:
+        warnings.warn(
+            'The `population` argument is ignored in a nationally aggregated'
+            ' model. It will be reset to [1, 1, ..., 1]'
+        )
+      geo_names = [constants.NATIONAL_MODEL_DEFAULT_GEO_NAME]
+      column_names = [
+          column
+          for column in column_names
+          if column not in (geo_column_name, population_column_name)
+      ]
+    n_geos, n_times = len(geo_names), len(media_times)
+    geo_index = pd.Index(geo_names)
+    time_index = pd.Index(media_times)
+
+    specs = _get_array_specs(
+        self.coord_to_columns,
+        media_to_channel=self.media_to_channel,
+        media_spend_to_channel=self.media_spend_to_channel,
+        reach_to_channel=self.reach_to_channel,
+        frequency_to_channel=self.frequency_to_channel,
+        rf_spend_to_channel=self.rf_spend_to_channel,
+        organic_reach_to_channel=self.organic_reach_to_channel,
+        organic_frequency_to_channel=self.organic_frequency_to_channel,
+    )
+    arrays = {
+        spec.name: np.full(
+            (n_geos, n_times)
+            + (() if spec.channels is None else (len(spec.channels),)),
+            np.nan,
+        )
+        for spec in specs
+    }
+    if has_population:
+      population = np.full((n_geos, n_times), np.nan)
+    validator = _LaggedPeriodValidator(n_times)
+    counts = np.zeros(n_geos * n_times, dtype=np.int64)
+
+    for chunk in self._read_chunks(
+        column_names, _get_column_dtypes(self.coord_to_columns)
+    ):
+      time_codes = time_index.get_indexer(chunk[time_column_name])
+      if is_national:
+        geo_codes = np.zeros(len(chunk), dtype=np.int64)
+      else:
+        geo_codes = geo_index.get_indexer(chunk[geo_column_name])
+      counts += np.bincount(
+          geo_codes * n_times + time_codes, minlength=n_geos * n_times
+      )
+      _update_lagged_period_validator(
+          validator,
+          chunk,
+          time_codes,
+          self.coord_to_columns,
+          include_population=has_population,
+      )
+      for spec in specs:
+        arrays[spec.name][geo_codes, time_codes] = chunk[
+            spec.columns
+        ].to_numpy()
+      if has_population:
+        population[geo_codes, time_codes] = chunk[
+            population_column_name
+        ].to_numpy()
+
+    if (counts > 1).any():
+      raise ValueError("Duplicate entries found in the 'time' column.")
+    if (counts == 0).any():
+      raise ValueError(
+          "Values in the 'time' column not consistent across different geos."
+      )
+    n_lagged = np.count_nonzero(validator.validate(media_times))
+
+    geo_names = np.asarray(geo_names)
+    if has_population:
+      population = np.nanmean(population[:, n_lagged:], axis=1)
+    else:
+      population = np.full(
+          n_geos, constants.NATIONAL_MODEL_DEFAULT_POPULATION_VALUE
+      )
+    data_vars = {
+        constants.POPULATION: xr.DataArray(
+            population,
+            coords={constants.GEO: geo_names},
+            dims=[constants.GEO],
+        ),
+    }
+    for spec in specs:
+      array, times = arrays.pop(spec.name), media_times
+      if spec.time_dim == constants.TIME:
+        array, times = array[:, n_lagged:], media_times[n_lagged:]
+      coords = {constants.GEO: geo_names, spec.time_dim: times}
+      if spec.channel_dim is not None:
+        coords[spec.channel_dim] = spec.channels
+      data_vars[spec.name] = xr.DataArray(
+          array, coords=coords, dims=list(coords)
+      )
+
+    # Arrays sharing a channel dimension are aligned by channel name.
+    dataset = xr.Dataset(data_vars)
+    return XrDatasetDataLoader(dataset, kpi_type=self.kpi_type).load()
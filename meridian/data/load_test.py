@@ -18,6 +18,8 @@ import dataclasses
 from datetime import datetime
 import os
 import warnings
+from unittest import mock
+from absl import flags
 from absl.testing import absltest
 from absl.testing import parameterized
 from meridian import constants
@@ -79,6 +81,10 @@ class InputDataLoaderTest(parameterized.TestCase):
 
   def setUp(self):
     super().setUp()
+    # The create_tempdir() method used by the file loader tests internally uses
+    # command line flag (--test_tmpdir) and such flags are not marked as parsed
+    # by default when running with pytest.
+    flags.FLAGS.mark_as_parsed()
 
     self._correct_coord_to_columns_media_only = (
         test_utils.sample_coord_to_columns(
@@ -969,6 +975,51 @@ class InputDataLoaderTest(parameterized.TestCase):
     self.assertIsNone(data.frequency)
     self.assertIsNone(data.rf_spend)
 
+  def test_dataframe_data_loader_loads_shuffled_rows(self):
+    n_media_channels = 3
+    n_controls = 2
+    dataset = test_utils.random_dataset(
+        n_geos=5,
+        n_times=20,
+        n_media_times=23,
+        n_media_channels=n_media_channels,
+        n_controls=n_controls,
+    )
+    df = test_utils.dataset_to_dataframe(
+        dataset,
+        controls_column_names=test_utils._sample_names('control_', n_controls),
+        media_column_names=test_utils._sample_names('media_', n_media_channels),
+        media_spend_column_names=test_utils._sample_names(
+            'media_spend_', n_media_channels
+        ),
+    ).sample(frac=1, random_state=0)
+    original_df = df.copy()
+    loader = load.DataFrameDataLoader(
+        df=df,
+        coord_to_columns=test_utils.sample_coord_to_columns(
+            n_controls=n_controls,
+            n_media_channels=n_media_channels,
+        ),
+        kpi_type=constants.NON_REVENUE,
+        media_to_channel={
+            f'media_{x}': f'ch_{x}' for x in range(n_media_channels)
+        },
+        media_spend_to_channel={
+            f'media_spend_{x}': f'ch_{x}' for x in range(n_media_channels)
+        },
+    )
+
+    data = loader.load()
+
+    # Geos are ordered by their first appearance in the rows.
+    expected = dataset.sel(geo=df[constants.GEO].unique())
+    xr.testing.assert_equal(data.kpi, expected[constants.KPI])
+    xr.testing.assert_equal(data.controls, expected[constants.CONTROLS])
+    xr.testing.assert_equal(data.population, expected[constants.POPULATION])
+    xr.testing.assert_equal(data.media, expected[constants.MEDIA])
+    xr.testing.assert_equal(data.media_spend, expected[constants.MEDIA_SPEND])
+    pd.testing.assert_frame_equal(loader.df, original_df)
+
   @parameterized.named_parameters(
       ('not_lagged', 50, 200, 200, 2, 5), ('lagged', 50, 200, 203, 2, 5)
   )
@@ -1587,6 +1638,30 @@ class InputDataLoaderTest(parameterized.TestCase):
           rf_spend_to_channel=self._correct_rf_spend_to_channel,
       )
 
+  def test_dataframe_data_loader_reports_all_na_violations(self):
+    df = copy.deepcopy(self.lagged_media_test_parameters['NA_in_media'])
+    df.loc[1, 'reach_1'] = None
+    df.loc[4, constants.KPI] = None
+
+    with self.assertRaisesWithLiteralMatch(
+        ValueError,
+        'NA values found in the media columns.\n'
+        'NA values found in the reach columns.\n'
+        'NA values found in non-media columns outside the lagged-media period'
+        " ['2021-01-04', '2021-01-11', '2021-01-18'] (continuous window of"
+        ' 100% NA values in all non-media columns).',
+    ):
+      load.DataFrameDataLoader(
+          df=df,
+          coord_to_columns=self._correct_coord_to_columns_media_and_rf,
+          kpi_type=constants.NON_REVENUE,
+          media_to_channel=self._correct_media_to_channel,
+          media_spend_to_channel=self._correct_media_spend_to_channel,
+          reach_to_channel=self._correct_reach_to_channel,
+          frequency_to_channel=self._correct_frequency_to_channel,
+          rf_spend_to_channel=self._correct_rf_spend_to_channel,
+      )
+
   def test_dataframe_data_loader_not_continuous_na_period_fails(self):
     with self.assertRaisesWithLiteralMatch(
         ValueError,
@@ -1829,6 +1904,254 @@ class InputDataLoaderTest(parameterized.TestCase):
     xr.testing.assert_allclose(data.rf_spend, dataset[constants.RF_SPEND])
     self.assertIsNone(data.revenue_per_kpi)
 
+  def test_csv_data_loader_skips_unreferenced_columns(self):
+    csv_file = os.path.join(
+        os.path.dirname(__file__), 'sample', 'sample_data_media_and_rf.csv'
+    )
+    # Read as strings so that the copy keeps the exact float representations.
+    df = pd.read_csv(csv_file, dtype=str)
+    # Not parsed as a float, since the column is not in `coord_to_columns`.
+    df['comment'] = 'not a number'
+    csv_file_with_comment = os.path.join(
+        self.create_tempdir().full_path, 'data.csv'
+    )
+    df.to_csv(csv_file_with_comment, index=False)
+
+    loader_kwargs = dict(
+        coord_to_columns=self._correct_coord_to_columns_media_and_rf,
+        kpi_type=constants.NON_REVENUE,
+        media_to_channel=self._correct_media_to_channel,
+        media_spend_to_channel=self._correct_media_spend_to_channel,
+        reach_to_channel=self._correct_reach_to_channel,
+        frequency_to_channel=self._correct_frequency_to_channel,
+        rf_spend_to_channel=self._correct_rf_spend_to_channel,
+    )
+    with mock.patch.object(pd, 'read_csv', wraps=pd.read_csv) as read_csv:
+      loader = load.CsvDataLoader(
+          csv_path=csv_file_with_comment, **loader_kwargs
+      )
+    usecols = read_csv.call_args.kwargs['usecols']
+    self.assertFalse(usecols('comment'))
+    self.assertTrue(usecols('kpi'))
+    self.assertNotIn('comment', loader._df_loader.df.columns)
+    data = loader.load()
+    expected_data = load.CsvDataLoader(
+        csv_path=csv_file, **loader_kwargs
+    ).load()
+
+    xr.testing.assert_equal(data.kpi, expected_data.kpi)
+    xr.testing.assert_equal(data.controls, expected_data.controls)
+    xr.testing.assert_equal(data.media, expected_data.media)
+    xr.testing.assert_equal(data.reach, expected_data.reach)
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name='parquet',
+          loader_class=load.ParquetDataLoader,
+          file_name='data.parquet',
+          write_method='to_parquet',
+      ),
+      dict(
+          testcase_name='arrow',
+          loader_class=load.ArrowDataLoader,
+          file_name='data.arrow',
+          write_method='to_feather',
+      ),
+  )
+  def test_columnar_data_loader_loads_all_arrays(
+      self, loader_class, file_name, write_method
+  ):
+    csv_file = os.path.join(
+        os.path.dirname(__file__),
+        'sample',
+        'lagged_sample_data_media_and_rf.csv',
+    )
+    df = pd.read_csv(csv_file)
+    df['comment'] = 'not referenced'
+    path = os.path.join(self.create_tempdir().full_path, file_name)
+    getattr(df, write_method)(path)
+
+    loader_kwargs = dict(
+        coord_to_columns=self._correct_coord_to_columns_media_and_rf,
+        kpi_type=constants.NON_REVENUE,
+        media_to_channel=self._correct_media_to_channel,
+        media_spend_to_channel=self._correct_media_spend_to_channel,
+        reach_to_channel=self._correct_reach_to_channel,
+        frequency_to_channel=self._correct_frequency_to_channel,
+        rf_spend_to_channel=self._correct_rf_spend_to_channel,
+    )
+    data = loader_class(path=path, **loader_kwargs).load()
+    expected_data = load.CsvDataLoader(
+        csv_path=csv_file, **loader_kwargs
+    ).load()
+
+    xr.testing.assert_equal(data.kpi, expected_data.kpi)
+    xr.testing.assert_equal(data.revenue_per_kpi, expected_data.revenue_per_kpi)
+    xr.testing.assert_equal(data.controls, expected_data.controls)
+    xr.testing.assert_equal(data.population, expected_data.population)
+    xr.testing.assert_equal(data.media, expected_data.media)
+    xr.testing.assert_equal(data.media_spend, expected_data.media_spend)
+    xr.testing.assert_equal(data.reach, expected_data.reach)
+    xr.testing.assert_equal(data.frequency, expected_data.frequency)
+    xr.testing.assert_equal(data.rf_spend, expected_data.rf_spend)
+
+  def test_parquet_data_loader_date_time_column(self):
+    csv_file = os.path.join(
+        os.path.dirname(__file__), 'sample', 'sample_data_media_only.csv'
+    )
+    df = pd.read_csv(csv_file)
+    path = os.path.join(self.create_tempdir().full_path, 'data.parquet')
+    df.assign(time=pd.to_datetime(df[constants.TIME])).to_parquet(path)
+
+    loader_kwargs = dict(
+        coord_to_columns=self._correct_coord_to_columns_media_only,
+        kpi_type=constants.NON_REVENUE,
+        media_to_channel=self._correct_media_to_channel,
+        media_spend_to_channel=self._correct_media_spend_to_channel,
+    )
+    data = load.ParquetDataLoader(path=path, **loader_kwargs).load()
+    expected_data = load.CsvDataLoader(
+        csv_path=csv_file, **loader_kwargs
+    ).load()
+
+    xr.testing.assert_equal(data.kpi, expected_data.kpi)
+    xr.testing.assert_equal(data.media, expected_data.media)
+
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name='media_only',
+          file_name='sample_data_media_only.csv',
+          n_media_channels=3,
+          n_rf_channels=None,
+      ),
+      dict(
+          testcase_name='lagged_rf_only',
+          file_name='lagged_sample_data_rf_only.csv',
+          n_media_channels=None,
+          n_rf_channels=2,
+      ),
+      dict(
+          testcase_name='lagged_media_and_rf',
+          file_name='lagged_sample_data_media_and_rf.csv',
+          n_media_channels=3,
+          n_rf_channels=2,
+      ),
+  )
+  def test_streaming_csv_data_loader_matches_csv_data_loader(
+      self, file_name: str, n_media_channels: int, n_rf_channels: int
+  ):
+    csv_file = os.path.join(os.path.dirname(__file__), 'sample', file_name)
+    if n_media_channels and n_rf_channels:
+      coord_to_columns = self._correct_coord_to_columns_media_and_rf
+    elif n_media_channels:
+      coord_to_columns = self._correct_coord_to_columns_media_only
+    else:
+      coord_to_columns = self._correct_coord_to_columns_rf_only
+    loader_kwargs = dict(
+        csv_path=csv_file,
+        coord_to_columns=coord_to_columns,
+        kpi_type=constants.NON_REVENUE,
+        media_to_channel=(
+            self._correct_media_to_channel if n_media_channels else None
+        ),
+        media_spend_to_channel=(
+            self._correct_media_spend_to_channel if n_media_channels else None
+        ),
+        reach_to_channel=(
+            self._correct_reach_to_channel if n_rf_channels else None
+        ),
+        frequency_to_channel=(
+            self._correct_frequency_to_channel if n_rf_channels else None
+        ),
+        rf_spend_to_channel=(
+            self._correct_rf_spend_to_channel if n_rf_channels else None
+        ),
+    )
+
+    # The chunks do not divide the rows of a geo evenly.
+    data = load.StreamingCsvDataLoader(chunksize=37, **loader_kwargs).load()
+    expected_data = load.CsvDataLoader(**loader_kwargs).load()
+
+    xr.testing.assert_identical(data.kpi, expected_data.kpi)
+    xr.testing.assert_identical(
+        data.revenue_per_kpi, expected_data.revenue_per_kpi
+    )
+    xr.testing.assert_identical(data.controls, expected_data.controls)
+    xr.testing.assert_identical(data.population, expected_data.population)
+    if n_media_channels:
+      xr.testing.assert_identical(data.media, expected_data.media)
+      xr.testing.assert_identical(data.media_spend, expected_data.media_spend)
+    if n_rf_channels:
+      xr.testing.assert_identical(data.reach, expected_data.reach)
+      xr.testing.assert_identical(data.frequency, expected_data.frequency)
+      xr.testing.assert_identical(data.rf_spend, expected_data.rf_spend)
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name='with_population_with_geo',
+          file_name='sample_national_data_w_population_w_geo.csv',
+          coord_to_columns=(
+              test_utils.NATIONAL_COORD_TO_COLUMNS_W_POPULATION_W_GEO
+          ),
+      ),
+      dict(
+          testcase_name='without_population_without_geo',
+          file_name='sample_national_data_wo_population_wo_geo.csv',
+          coord_to_columns=(
+              test_utils.NATIONAL_COORD_TO_COLUMNS_WO_POPULATION_WO_GEO
+          ),
+      ),
+  )
+  def test_national_streaming_csv_data_loader_loads(
+      self, file_name: str, coord_to_columns: load.CoordToColumns
+  ):
+    loader_kwargs = dict(
+        csv_path=os.path.join(os.path.dirname(__file__), 'sample', file_name),
+        coord_to_columns=coord_to_columns,
+        kpi_type=constants.NON_REVENUE,
+        media_to_channel=self._correct_media_to_channel,
+        media_spend_to_channel=self._correct_media_spend_to_channel,
+    )
+    data = load.StreamingCsvDataLoader(chunksize=10, **loader_kwargs).load()
+    expected_data = load.CsvDataLoader(**loader_kwargs).load()
+
+    xr.testing.assert_equal(data.kpi, expected_data.kpi)
+    xr.testing.assert_equal(data.media, expected_data.media)
+    xr.testing.assert_equal(data.controls, expected_data.controls)
+    xr.testing.assert_equal(data.population, expected_data.population)
+
+  def test_streaming_csv_data_loader_not_continuous_na_period_fails(self):
+    csv_file = os.path.join(self.create_tempdir().full_path, 'data.csv')
+    self._sample_df_not_continuous_na_period.to_csv(csv_file, index=False)
+    loader = load.StreamingCsvDataLoader(
+        csv_path=csv_file,
+        coord_to_columns=self._correct_coord_to_columns_media_only,
+        kpi_type=constants.NON_REVENUE,
+        media_to_channel=self._correct_media_to_channel,
+        media_spend_to_channel=self._correct_media_spend_to_channel,
+        chunksize=7,
+    )
+
+    with self.assertRaisesRegex(
+        ValueError,
+        'is not a continuous window starting from the earliest time period.',
+    ):
+      loader.load()
+
+  def test_streaming_csv_data_loader_invalid_chunksize_fails(self):
+    with self.assertRaisesWithLiteralMatch(
+        ValueError, '`chunksize` must be positive, but got 0.'
+    ):
+      load.StreamingCsvDataLoader(
+          csv_path='data.csv',
+          coord_to_columns=self._correct_coord_to_columns_media_only,
+          kpi_type=constants.NON_REVENUE,
+          media_to_channel=self._correct_media_to_channel,
+          media_spend_to_channel=self._correct_media_spend_to_channel,
+          chunksize=0,
+      )
+
 
 class NonPaidInputDataLoaderTest(parameterized.TestCase):
   _N_GEOS = 5
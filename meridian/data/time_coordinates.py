@@ -14,7 +14,7 @@
 
 """Deals with coordinate values in the time dimensions of input data."""
 
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 import dataclasses
 import datetime
 import functools
@@ -98,10 +98,6 @@ def normalize_date_interval(
   return (start, end)
 
 
-def _to_dates_list(times: pd.DatetimeIndex) -> list[datetime.date]:
-  return [dt.date() for dt in times]
-
-
 @dataclasses.dataclass(frozen=True)
 class TimeCoordinates:
   """A wrapper around time coordinates in Meridian's input data.
@@ -114,6 +110,9 @@ class TimeCoordinates:
   extracting values out of these time coordinates which are treated as numeric
   "date" values.
 
+  The dates and date strings of the time coordinates, and their positions, are
+  computed once and cached, so that looking up a date takes constant time.
+
   Attributes:
     datetime_index: The given time coordinates, parsed as indexable
       `DatetimeIndex`.
@@ -155,13 +154,62 @@ class TimeCoordinates:
 
   @property
   def all_dates(self) -> list[datetime.date]:
-    return _to_dates_list(self.datetime_index)
+    return list(self._dates)
 
   @property
   def all_dates_str(self) -> list[str]:
-    return [
-        time.strftime(constants.DATE_FORMAT) for time in self.datetime_index
-    ]
+    return list(self._dates_str)
+
+  @functools.cached_property
+  def _dates(self) -> tuple[datetime.date, ...]:
+    return tuple(time.date() for time in self.datetime_index)
+
+  @functools.cached_property
+  def _dates_str(self) -> tuple[str, ...]:
+    return tuple(self.datetime_index.strftime(constants.DATE_FORMAT))
+
+  @functools.cached_property
+  def _date_positions(self) -> Mapping[datetime.date, int]:
+    return {date: i for i, date in enumerate(self._dates)}
+
+  @functools.cached_property
+  def _date_str_positions(self) -> Mapping[str, int]:
+    return {date: i for i, date in enumerate(self._dates_str)}
+
+  def get_date_position(self, date: Date) -> int | None:
+    """Returns the position of `date` in the time coordinates.
+
+    Args:
+      date: A polymorphic date value.
+
+    Returns:
+      The position of `date` in `all_dates`, or `None` if it is not in the time
+      coordinates.
+    """
+    if isinstance(date, str) and date in self._date_str_positions:
+      return self._date_str_positions[date]
+    return self._date_positions.get(normalize_date(date))
+
+  def get_time_mask(self, dates: Sequence[Date]) -> np.ndarray:
+    """Returns a boolean mask of the given dates over the time coordinates.
+
+    Args:
+      dates: A sequence of polymorphic date values.
+
+    Returns:
+      A boolean array with one element per time coordinate, which is `True`
+      for the time coordinates in `dates`.
+
+    Raises:
+      ValueError: If a date is not in the time coordinates.
+    """
+    mask = np.zeros(len(self._dates), dtype=bool)
+    for date in dates:
+      position = self.get_date_position(date)
+      if position is None:
+        raise ValueError(f"Date ({date}) must be in the time coordinates!")
+      mask[position] = True
+    return mask
 
   @functools.cached_property
   def interval_days(self) -> int:
@@ -264,31 +312,55 @@ class TimeCoordinates:
     if start_date is None and end_date is None:
       return None
 
-    if start_date is None:
-      start_date = min(self.all_dates)
-    else:
-      start_date = normalize_date(start_date)
-      if start_date not in self.all_dates:
+    selected = self.get_selected_time_slice(start_date, end_date)
+    if selected == slice(0, len(self._dates)):
+      return None
+    return list(self._dates[selected])
+
+  def get_selected_time_slice(
+      self,
+      start_date: Date | None = None,
+      end_date: Date | None = None,
+  ) -> slice:
+    """Returns the slice of the time coordinates between the selected times.
+
+    Both `start_date` and `end_date` are inclusive, and must be present in the
+    time coordinates of the input data.
+
+    Args:
+      start_date: Start date of the selected time period. If `None`, implies the
+        earliest time dimension value in the input data.
+      end_date: End date of the selected time period. If `None`, implies the
+        latest time dimension value in the input data.
+
+    Returns:
+      A slice of the positions of the selected times in the time coordinates.
+
+    Raises:
+      `ValueError` if `start_date` or `end_date` is not in the input data's time
+      dimension coordinates, or if `start_date` is after `end_date`.
+    """
+    start = 0
+    if start_date is not None:
+      start = self.get_date_position(start_date)
+      if start is None:
         raise ValueError(
-            f"start_date ({start_date}) must be in the time coordinates!"
+            f"start_date ({normalize_date(start_date)}) must be in the time"
+            " coordinates!"
         )
 
-    if end_date is None:
-      end_date = max(self.all_dates)
-    else:
-      end_date = normalize_date(end_date)
-      if end_date not in self.all_dates:
+    end = len(self._dates) - 1
+    if end_date is not None:
+      end = self.get_date_position(end_date)
+      if end is None:
         raise ValueError(
-            f"end_date ({end_date}) must be in the time coordinates!"
+            f"end_date ({normalize_date(end_date)}) must be in the time"
+            " coordinates!"
         )
 
-    if start_date > end_date:
+    if start > end:
       raise ValueError(
-          f"start_date ({start_date}) must be less than or equal to end_date"
-          f" ({end_date})!"
+          f"start_date ({self._dates[start]}) must be less than or equal to"
+          f" end_date ({self._dates[end]})!"
       )
-
-    if start_date == min(self.all_dates) and end_date == max(self.all_dates):
-      return None
-
-    return [date for date in self.all_dates if start_date <= date <= end_date]
+    return slice(start, end + 1)
@@ -429,5 +429,80 @@ class TimeCoordinatesTest(parameterized.TestCase):
       self.coordinates.expand_selected_time_dims(start_date, end_date)
 
 
+  @parameterized.named_parameters(
+      dict(testcase_name="str", date="2024-01-15", expected_position=2),
+      dict(
+          testcase_name="datetime",
+          date=dt.datetime(2024, 2, 19),
+          expected_position=7,
+      ),
+      dict(
+          testcase_name="date",
+          date=dt.date(2024, 1, 1),
+          expected_position=0,
+      ),
+      dict(
+          testcase_name="datetime64",
+          date=np.datetime64("2024-01-22"),
+          expected_position=3,
+      ),
+      dict(
+          testcase_name="not_in_data",
+          date="2024-01-02",
+          expected_position=None,
+      ),
+  )
+  def test_get_date_position(self, date, expected_position):
+    self.assertEqual(
+        self.coordinates.get_date_position(date), expected_position
+    )
+
+  def test_get_time_mask(self):
+    np.testing.assert_array_equal(
+        self.coordinates.get_time_mask(
+            ["2024-02-05", dt.date(2024, 1, 8), "2024-01-01"]
+        ),
+        [True, True, False, False, False, True, False, False],
+    )
+
+  def test_get_time_mask_fails(self):
+    with self.assertRaisesRegex(
+        ValueError, r"Date \(2024-01-02\) must be in the time coordinates!"
+    ):
+      self.coordinates.get_time_mask(["2024-01-01", "2024-01-02"])
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="start_and_end",
+          start_date="2024-01-08",
+          end_date=dt.date(2024, 1, 29),
+          expected_slice=slice(1, 5),
+      ),
+      dict(
+          testcase_name="start_only",
+          start_date="2024-02-12",
+          end_date=None,
+          expected_slice=slice(6, 8),
+      ),
+      dict(
+          testcase_name="none",
+          start_date=None,
+          end_date=None,
+          expected_slice=slice(0, 8),
+      ),
+  )
+  def test_get_selected_time_slice(self, start_date, end_date, expected_slice):
+    self.assertEqual(
+        self.coordinates.get_selected_time_slice(start_date, end_date),
+        expected_slice,
+    )
+
+  def test_all_dates_returns_a_copy(self):
+    all_dates = self.coordinates.all_dates
+    all_dates.clear()
+    self.assertLen(self.coordinates.all_dates, len(_ALL_DATES))
+    self.assertEqual(self.coordinates.all_dates_str, _ALL_DATES)
+
+
 if __name__ == "__main__":
   absltest.main()
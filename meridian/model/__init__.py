@@ -15,6 +15,7 @@
 """The Meridian API module that models the data."""
 
 from meridian.model import adstock_hill
+from meridian.model import inference_data_cache
 from meridian.model import knots
 from meridian.model import media
 from meridian.model import model
@@ -55,6 +55,7 @@ def _adstock(
     alpha: tf.Tensor,
     max_lag: int,
     n_times_output: int,
+    memory_optimized: bool = False,
 ) -> tf.Tensor:
   """Computes the Adstock function."""
   _validate_arguments(
@@ -94,16 +95,28 @@ def _adstock(
     media = tf.concat([tf.zeros(pad_shape), media], axis=-2)
 
   # Adstock calculation.
-  window_list = [None] * window_size
-  for i in range(window_size):
-    window_list[i] = media[..., i:i+n_times_output, :]
-  windowed = tf.stack(window_list)
   l_range = tf.range(window_size - 1, -1, -1, dtype=tf.float32)
   weights = tf.expand_dims(alpha, -1) ** l_range
   normalization_factors = tf.expand_dims(
       (1 - alpha ** (window_size)) / (1 - alpha), -1
   )
   weights = tf.divide(weights, normalization_factors)
+  if memory_optimized:
+    # Accumulate the weighted, shifted media one lag at a time (a 1-D
+    # convolution over time), so that the stacked windows with dimensions
+    # `[window_size, ..., n_geos, n_times_output, n_channels]` are never
+    # materialized.
+    adstock = tf.zeros([], dtype=media.dtype)
+    for i in range(window_size):
+      adstock += (
+          weights[..., tf.newaxis, tf.newaxis, :, i]
+          * media[..., i:i+n_times_output, :]
+      )
+    return adstock
+  window_list = [None] * window_size
+  for i in range(window_size):
+    window_list[i] = media[..., i:i+n_times_output, :]
+  windowed = tf.stack(window_list)
   return tf.einsum('...mw,w...gtm->...gtm', weights, windowed)
 
 
@@ -146,7 +159,13 @@ class AdstockHillTransformer(metaclass=abc.ABCMeta):
 class AdstockTransformer(AdstockHillTransformer):
   """Computes the Adstock transformation of media."""
 
-  def __init__(self, alpha: tf.Tensor, max_lag: int, n_times_output: int):
+  def __init__(
+      self,
+      alpha: tf.Tensor,
+      max_lag: int,
+      n_times_output: int,
+      memory_optimized: bool = False,
+  ):
     """Initializes this transformer based on Adstock function parameters.
 
     Args:
@@ -164,10 +183,17 @@ class AdstockTransformer(AdstockHillTransformer):
         correspond to the most recent time periods of the media argument. For
         example, `media[..., -n_times_output:, :]` represents the media
         execution of the output weeks.
+      memory_optimized: Boolean. If `True`, the Adstock is accumulated one lag
+        at a time instead of stacking all lagged copies of the media tensor
+        and contracting them in a single `einsum`. This avoids materializing a
+        tensor `max_lag + 1` times the size of the output, at the cost of
+        `max_lag + 1` separate multiply-add operations. The output is
+        numerically equivalent.
     """
     self._alpha = alpha
     self._max_lag = max_lag
     self._n_times_output = n_times_output
+    self._memory_optimized = memory_optimized
 
   def forward(self, media: tf.Tensor) -> tf.Tensor:
     """Computes the Adstock transformation of a given `media` tensor.
@@ -196,6 +222,7 @@ class AdstockTransformer(AdstockHillTransformer):
         alpha=self._alpha,
         max_lag=self._max_lag,
         n_times_output=self._n_times_output,
+        memory_optimized=self._memory_optimized,
     )
 
 
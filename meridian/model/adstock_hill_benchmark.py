@@ -0,0 +1,155 @@
+# Copyright 2024 The Meridian Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark comparing the Adstock kernels in `adstock_hill`.
+
+Compares the wall time and peak memory of the default Adstock kernel, which
+stacks `max_lag + 1` shifted copies of the media tensor, against the memory
+optimized kernel, which accumulates the shifted copies one at a time.
+
+Each kernel runs in a freshly spawned process so that the peak memory of one
+kernel does not mask the other. On GPU the peak is read from the device memory
+stats; on CPU it is the increase of the process maximum resident set size.
+
+Usage:
+
+  python -m meridian.model.adstock_hill_benchmark --n_geos=500 --max_lag=20
+"""
+
+import argparse
+from collections.abc import Mapping, Sequence
+import multiprocessing
+import resource
+import sys
+import time
+
+
+_KERNELS = {
+    'adstock_speed_optimized': False,
+    'adstock_memory_optimized': True,
+}
+
+
+def _run_kernel(
+    kernel: str,
+    shapes: Mapping[str, int],
+    n_iterations: int,
+    queue: multiprocessing.Queue,
+) -> None:
+  """Times a single Adstock kernel and reports its peak memory to `queue`."""
+  # pylint: disable=g-import-not-at-top
+  import tensorflow as tf
+  from meridian.model import adstock_hill
+  # pylint: enable=g-import-not-at-top
+
+  gpus = tf.config.list_physical_devices('GPU')
+  media = tf.random.uniform(
+      [
+          shapes['n_draws'],
+          shapes['n_geos'],
+          shapes['n_media_times'],
+          shapes['n_channels'],
+      ],
+      seed=0,
+  )
+  alpha = tf.random.uniform([shapes['n_draws'], shapes['n_channels']], seed=1)
+  transformer = adstock_hill.AdstockTransformer(
+      alpha=alpha,
+      max_lag=shapes['max_lag'],
+      n_times_output=shapes['n_times'],
+      memory_optimized=_KERNELS[kernel],
+  )
+
+  if gpus:
+    tf.config.experimental.reset_memory_stats('GPU:0')
+  rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  start = time.perf_counter()
+  for _ in range(n_iterations):
+    transformer.forward(media).numpy()
+  elapsed = (time.perf_counter() - start) / n_iterations
+  if gpus:
+    peak_bytes = tf.config.experimental.get_memory_info('GPU:0')['peak']
+  else:
+    # `ru_maxrss` is reported in kilobytes on Linux and in bytes on macOS.
+    scale = 1 if sys.platform == 'darwin' else 1024
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_bytes = (rss_after - rss_before) * scale
+  queue.put((elapsed, peak_bytes))
+
+
+def run_benchmark(
+    shapes: Mapping[str, int],
+    n_iterations: int = 3,
+    kernels: Sequence[str] = tuple(_KERNELS),
+) -> dict[str, tuple[float, int]]:
+  """Benchmarks the Adstock kernels.
+
+  Args:
+    shapes: Mapping with the `n_draws`, `n_geos`, `n_media_times`, `n_times`,
+      `n_channels` and `max_lag` of the benchmarked problem.
+    n_iterations: Number of timed calls of each kernel.
+    kernels: Names of the kernels to benchmark. Each name must be one of
+      `adstock_speed_optimized` or `adstock_memory_optimized`.
+
+  Returns:
+    A dictionary mapping each kernel name to a tuple of the mean wall time in
+    seconds and the peak memory in bytes.
+  """
+  for kernel in kernels:
+    if kernel not in _KERNELS:
+      raise ValueError(
+          f'Unknown Adstock kernel: {kernel}. Expected one of'
+          f' {sorted(_KERNELS)}.'
+      )
+
+  context = multiprocessing.get_context('spawn')
+  results = {}
+  for kernel in kernels:
+    queue = context.Queue()
+    process = context.Process(
+        target=_run_kernel, args=(kernel, dict(shapes), n_iterations, queue)
+    )
+    process.start()
+    results[kernel] = queue.get()
+    process.join()
+  return results
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument('--n_draws', type=int, default=100)
+  parser.add_argument('--n_geos', type=int, default=200)
+  parser.add_argument('--n_media_times', type=int, default=156)
+  parser.add_argument('--n_times', type=int, default=143)
+  parser.add_argument('--n_channels', type=int, default=10)
+  parser.add_argument('--max_lag', type=int, default=13)
+  parser.add_argument('--n_iterations', type=int, default=3)
+  args = parser.parse_args(argv)
+
+  shapes = {
+      'n_draws': args.n_draws,
+      'n_geos': args.n_geos,
+      'n_media_times': args.n_media_times,
+      'n_times': args.n_times,
+      'n_channels': args.n_channels,
+      'max_lag': args.max_lag,
+  }
+  results = run_benchmark(shapes, n_iterations=args.n_iterations)
+  print(f'{"kernel":<28}{"wall time (s)":>16}{"peak memory (MiB)":>20}')
+  for kernel, (elapsed, peak_bytes) in results.items():
+    print(f'{kernel:<28}{elapsed:>16.4f}{peak_bytes / 2**20:>20.1f}')
+
+
+if __name__ == '__main__':
+  main()
@@ -120,6 +120,53 @@ class TestAdstock(parameterized.TestCase):
     tf.debugging.assert_all_finite(media_transformed, message=msg)
     tf.debugging.assert_non_negative(media_transformed, message=msg)
 
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="basic",
+          media=_MEDIA,
+          n_time_output=_N_MEDIA_TIMES,
+          max_lag=_MAX_LAG,
+      ),
+      dict(
+          testcase_name="no media batch dims",
+          media=_MEDIA[0, 0, ...],
+          n_time_output=_N_MEDIA_TIMES,
+          max_lag=_MAX_LAG,
+      ),
+      dict(
+          testcase_name="excess lagged media history available",
+          media=_MEDIA,
+          n_time_output=_N_MEDIA_TIMES - _MAX_LAG - 1,
+          max_lag=_MAX_LAG,
+      ),
+      dict(
+          testcase_name="max_lag > n_media_times",
+          media=_MEDIA,
+          n_time_output=_N_MEDIA_TIMES,
+          max_lag=_N_MEDIA_TIMES + 5,
+      ),
+      dict(
+          testcase_name="max_lag zero",
+          media=_MEDIA,
+          n_time_output=_N_MEDIA_TIMES,
+          max_lag=0,
+      ),
+  )
+  def test_memory_optimized_matches_default(
+      self, media, n_time_output, max_lag
+  ):
+    expected = adstock_hill.AdstockTransformer(
+        alpha=self._ALPHA, max_lag=max_lag, n_times_output=n_time_output
+    ).forward(media)
+    media_transformed = adstock_hill.AdstockTransformer(
+        alpha=self._ALPHA,
+        max_lag=max_lag,
+        n_times_output=n_time_output,
+        memory_optimized=True,
+    ).forward(media)
+    tf.debugging.assert_equal(media_transformed.shape, expected.shape)
+    tf.debugging.assert_near(media_transformed, expected, rtol=1e-6)
+
   def test_max_lag_zero(self):
     media_transformed = adstock_hill.AdstockTransformer(
         alpha=self._ALPHA,
@@ -0,0 +1,229 @@
+# Copyright 2024 The Meridian Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for lazily loading the inference data of a saved Meridian model."""
+
+import collections
+from collections.abc import Callable, Hashable
+import hashlib
+
+import arviz as az
+import numpy as np
+import xarray as xr
+from xarray import backends
+from xarray.core import indexing
+
+
+__all__ = [
+    "ParameterCache",
+    "get_draws_fingerprint",
+    "open_inference_data",
+]
+
+# Attribute of a group of draws holding its `get_draws_fingerprint()`.
+_DRAWS_FINGERPRINT_ATTR = "draws_fingerprint"
+
+
+def get_draws_fingerprint(draws: xr.Dataset) -> str:
+  """Returns a hash identifying a group of draws, such as the posterior.
+
+  The hash of the parameter arrays is computed on the first call and stored in
+  the attributes of `draws`, which are saved with the inference data. Later
+  calls, including on the draws of a model opened with `open_inference_data()`,
+  read the stored hash instead of the parameter arrays.
+
+  Args:
+    draws: The dataset of parameter draws.
+
+  Returns:
+    The hexadecimal SHA-256 hash of the parameter arrays.
+  """
+  fingerprint = draws.attrs.get(_DRAWS_FINGERPRINT_ATTR)
+  if fingerprint is None:
+    hasher = hashlib.sha256()
+    for name in sorted(draws.data_vars):
+      values = np.ascontiguousarray(draws[name].values)
+      hasher.update(f"{name}/{values.dtype.str}/{values.shape}".encode())
+      hasher.update(values.tobytes())
+    fingerprint = hasher.hexdigest()
+    draws.attrs[_DRAWS_FINGERPRINT_ATTR] = fingerprint
+  return fingerprint
+
+
+class ParameterCache:
+  """Least recently used cache of parameter arrays with a memory budget.
+
+  Arrays are loaded by the caller-provided function on first access and are
+  kept until the total size of the cached arrays exceeds `max_bytes`, at which
+  point the least recently used arrays are evicted. Cached arrays are
+  read-only, so that views of them handed out to callers can not modify the
+  cache.
+  """
+
+  def __init__(self, max_bytes: int | None = None):
+    """Initializes the cache.
+
+    Args:
+      max_bytes: Maximum total size in bytes of the cached arrays. If `None`,
+        arrays are never evicted.
+
+    Raises:
+      ValueError: If `max_bytes` is negative.
+    """
+    if max_bytes is not None and max_bytes < 0:
+      raise ValueError(
+          f"`max_bytes` must be non-negative, but got {max_bytes}."
+      )
+    self._max_bytes = max_bytes
+    self._arrays: collections.OrderedDict[Hashable, np.ndarray] = (
+        collections.OrderedDict()
+    )
+    self._nbytes = 0
+
+  @property
+  def max_bytes(self) -> int | None:
+    return self._max_bytes
+
+  @property
+  def nbytes(self) -> int:
+    """Total size in bytes of the cached arrays."""
+    return self._nbytes
+
+  @property
+  def keys(self) -> list[Hashable]:
+    """Keys of the cached arrays, from least to most recently used."""
+    return list(self._arrays)
+
+  def fits(self, nbytes: int) -> bool:
+    """Returns whether an array of `nbytes` bytes can be cached at all."""
+    return self._max_bytes is None or nbytes <= self._max_bytes
+
+  def get(self, key: Hashable, load_fn: Callable[[], np.ndarray]) -> np.ndarray:
+    """Returns the cached array for `key`, loading it with `load_fn` if needed.
+
+    Args:
+      key: Key identifying the array.
+      load_fn: Function that loads the array. It is only called if `key` is not
+        cached.
+
+    Returns:
+      The read-only array for `key`. It is cached only if it fits in the memory
+      budget.
+    """
+    if key in self._arrays:
+      self._arrays.move_to_end(key)
+      return self._arrays[key]
+
+    array = np.asarray(load_fn())
+    array.flags.writeable = False
+    if not self.fits(array.nbytes):
+      return array
+    self._arrays[key] = array
+    self._nbytes += array.nbytes
+    while self._max_bytes is not None and self._nbytes > self._max_bytes:
+      _, evicted = self._arrays.popitem(last=False)
+      self._nbytes -= evicted.nbytes
+    return array
+
+  def clear(self):
+    """Evicts all cached arrays."""
+    self._arrays.clear()
+    self._nbytes = 0
+
+
+class _CachedParameterArray(backends.BackendArray):
+  """Array of a lazily opened variable that is read through a cache.
+
+  The whole variable is read and cached on first access. Variables larger than
+  the memory budget of the cache are not cached; only the indexed slice of them
+  is read.
+  """
+
+  def __init__(
+      self,
+      variable: xr.Variable,
+      key: Hashable,
+      cache: ParameterCache,
+  ):
+    self._variable = variable
+    self._key = key
+    self._cache = cache
+    self.shape = variable.shape
+    self.dtype = variable.dtype
+
+  def __getitem__(self, key: indexing.ExplicitIndexer) -> np.ndarray:
+    return indexing.explicit_indexing_adapter(
+        key, self.shape, indexing.IndexingSupport.BASIC, self._getitem
+    )
+
+  def _getitem(self, key: tuple[int | slice, ...]) -> np.ndarray:
+    if not self._cache.fits(self._variable.size * self.dtype.itemsize):
+      return self._variable[key].values
+    return self._cache.get(self._key, lambda: self._variable.values)[key]
+
+
+def _wrap_dataset(
+    group: str, dataset: xr.Dataset, cache: ParameterCache
+) -> xr.Dataset:
+  """Returns `dataset` with its data variables read through `cache`."""
+  data_vars = {}
+  for name in dataset.data_vars:
+    variable = dataset.variables[name]
+    data_vars[name] = xr.Variable(
+        variable.dims,
+        indexing.LazilyIndexedArray(
+            _CachedParameterArray(variable, (group, name), cache)
+        ),
+        attrs=variable.attrs,
+        encoding=variable.encoding,
+    )
+  return xr.Dataset(data_vars, coords=dataset.coords, attrs=dataset.attrs)
+
+
+def open_inference_data(
+    file_path: str,
+    cache: ParameterCache | None = None,
+    engine: str = "h5netcdf",
+) -> az.InferenceData:
+  """Lazily opens inference data saved to a NetCDF file.
+
+  Only the coordinates are read when the file is opened. Each parameter array
+  is read from disk on first access and kept in `cache`, which evicts the least
+  recently used arrays when its memory budget is exceeded. Parameters that are
+  never accessed, for example `gamma_gc` when only computing ROI, are never
+  read.
+
+  Args:
+    file_path: Path of the NetCDF file written by `InferenceData.to_netcdf()`.
+    cache: Cache holding the loaded parameter arrays of all groups. If `None`,
+      a cache without a memory budget is used.
+    engine: NetCDF engine used to read the file.
+
+  Returns:
+    An `InferenceData` whose groups read their parameter arrays through
+    `cache`.
+  """
+  cache = cache if cache is not None else ParameterCache()
+  with az.rc_context({"data.load": "lazy"}):
+    source = az.from_netcdf(
+        file_path,
+        engine=engine,
+        group_kwargs={".*": {"cache": False}},
+        regex=True,
+    )
+  groups = {
+      group: _wrap_dataset(group, source[group], cache)
+      for group in source.groups()
+  }
+  return az.InferenceData(attrs=source.attrs, **groups)
@@ -0,0 +1,190 @@
+# Copyright 2024 The Meridian Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from unittest import mock
+
+from absl import flags
+from absl.testing import absltest
+import arviz as az
+from meridian import constants
+from meridian.model import inference_data_cache
+import numpy as np
+import xarray as xr
+
+
+def _sample_dataset(seed: int) -> xr.Dataset:
+  rng = np.random.default_rng(seed)
+  return xr.Dataset(
+      data_vars={
+          constants.ALPHA_M: (
+              [constants.CHAIN, constants.DRAW, constants.MEDIA_CHANNEL],
+              rng.random((2, 10, 3), dtype=np.float32),
+          ),
+          constants.GAMMA_GC: (
+              [
+                  constants.CHAIN,
+                  constants.DRAW,
+                  constants.GEO,
+                  constants.CONTROL_VARIABLE,
+              ],
+              rng.random((2, 10, 4, 2), dtype=np.float32),
+          ),
+      },
+      coords={
+          constants.CHAIN: np.arange(2),
+          constants.DRAW: np.arange(10),
+          constants.MEDIA_CHANNEL: ["ch_0", "ch_1", "ch_2"],
+          constants.GEO: ["geo_0", "geo_1", "geo_2", "geo_3"],
+          constants.CONTROL_VARIABLE: ["control_0", "control_1"],
+      },
+  )
+
+
+class ParameterCacheTest(absltest.TestCase):
+
+  def test_negative_max_bytes_raises(self):
+    with self.assertRaisesRegex(ValueError, "must be non-negative"):
+      inference_data_cache.ParameterCache(max_bytes=-1)
+
+  def test_get_loads_once(self):
+    cache = inference_data_cache.ParameterCache()
+    load_fn = mock.Mock(return_value=np.ones(4))
+
+    first = cache.get("a", load_fn)
+    second = cache.get("a", load_fn)
+
+    load_fn.assert_called_once()
+    self.assertIs(first, second)
+    self.assertFalse(first.flags.writeable)
+    self.assertEqual(cache.nbytes, 32)
+
+  def test_get_evicts_least_recently_used(self):
+    cache = inference_data_cache.ParameterCache(max_bytes=64)
+
+    cache.get("a", lambda: np.ones(4))
+    cache.get("b", lambda: np.ones(4))
+    cache.get("a", lambda: np.ones(4))
+    cache.get("c", lambda: np.ones(4))
+
+    self.assertEqual(cache.keys, ["a", "c"])
+    self.assertEqual(cache.nbytes, 64)
+
+  def test_get_does_not_cache_array_larger_than_budget(self):
+    cache = inference_data_cache.ParameterCache(max_bytes=16)
+    cache.get("a", lambda: np.ones(2))
+
+    array = cache.get("b", lambda: np.ones(4))
+
+    np.testing.assert_array_equal(array, np.ones(4))
+    self.assertEqual(cache.keys, ["a"])
+
+  def test_clear(self):
+    cache = inference_data_cache.ParameterCache()
+    cache.get("a", lambda: np.ones(4))
+
+    cache.clear()
+
+    self.assertEmpty(cache.keys)
+    self.assertEqual(cache.nbytes, 0)
+
+
+class OpenInferenceDataTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    flags.FLAGS.mark_as_parsed()
+    self.posterior = _sample_dataset(seed=0)
+    self.prior = _sample_dataset(seed=1)
+    self.file_path = os.path.join(
+        self.create_tempdir().full_path, "inference_data.nc"
+    )
+    az.InferenceData(posterior=self.posterior, prior=self.prior).to_netcdf(
+        self.file_path
+    )
+
+  def test_open_reads_no_parameters(self):
+    cache = inference_data_cache.ParameterCache()
+
+    inference_data = inference_data_cache.open_inference_data(
+        self.file_path, cache=cache
+    )
+
+    self.assertCountEqual(
+        inference_data.groups(), [constants.POSTERIOR, constants.PRIOR]
+    )
+    self.assertEmpty(cache.keys)
+    self.assertFalse(
+        inference_data.posterior[constants.ALPHA_M].variable._in_memory
+    )
+
+  def test_indexing_reads_only_accessed_parameter(self):
+    cache = inference_data_cache.ParameterCache()
+    inference_data = inference_data_cache.open_inference_data(
+        self.file_path, cache=cache
+    )
+
+    draws = inference_data.posterior[constants.ALPHA_M][:, 2:5, ...]
+
+    np.testing.assert_array_equal(
+        draws.values, self.posterior[constants.ALPHA_M].values[:, 2:5, ...]
+    )
+    self.assertEqual(cache.keys, [(constants.POSTERIOR, constants.ALPHA_M)])
+
+  def test_groups_match_saved_inference_data(self):
+    inference_data = inference_data_cache.open_inference_data(self.file_path)
+
+    xr.testing.assert_identical(inference_data.posterior, self.posterior)
+    xr.testing.assert_identical(inference_data.prior, self.prior)
+
+  def test_parameter_larger_than_budget_is_read_by_slice(self):
+    cache = inference_data_cache.ParameterCache(max_bytes=100)
+    inference_data = inference_data_cache.open_inference_data(
+        self.file_path, cache=cache
+    )
+
+    draws = inference_data.posterior[constants.GAMMA_GC][:, :2, ...]
+
+    np.testing.assert_array_equal(
+        draws.values, self.posterior[constants.GAMMA_GC].values[:, :2, ...]
+    )
+    self.assertEmpty(cache.keys)
+
+  def test_draws_fingerprint_is_read_without_loading_parameters(self):
+    posterior = _sample_dataset(seed=0)
+    fingerprint = inference_data_cache.get_draws_fingerprint(posterior)
+    file_path = os.path.join(
+        self.create_tempdir().full_path, "inference_data.nc"
+    )
+    az.InferenceData(posterior=posterior).to_netcdf(file_path)
+    cache = inference_data_cache.ParameterCache()
+    inference_data = inference_data_cache.open_inference_data(
+        file_path, cache=cache
+    )
+
+    self.assertEqual(
+        inference_data_cache.get_draws_fingerprint(inference_data.posterior),
+        fingerprint,
+    )
+    self.assertEmpty(cache.keys)
+
+  def test_draws_fingerprint_depends_on_draws(self):
+    self.assertNotEqual(
+        inference_data_cache.get_draws_fingerprint(self.posterior),
+        inference_data_cache.get_draws_fingerprint(self.prior),
+    )
+
+
+if __name__ == "__main__":
+  absltest.main()
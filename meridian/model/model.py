@@ -15,16 +15,25 @@
 """Meridian module for the geo-level Bayesian hierarchical media mix model."""
 
 from collections.abc import Mapping, Sequence
+import dataclasses
 import functools
+import importlib
+import inspect
+import json
 import os
+import shutil
+import tempfile
+from typing import Any
 import warnings
 
 import arviz as az
 import joblib
+import meridian
 from meridian import constants
 from meridian.data import input_data as data
 from meridian.data import time_coordinates as tc
 from meridian.model import adstock_hill
+from meridian.model import inference_data_cache
 from meridian.model import knots
 from meridian.model import media
 from meridian.model import posterior_sampler
@@ -34,6 +43,8 @@ from meridian.model import spec
 from meridian.model import transformers
 import numpy as np
 import tensorflow as tf
+import tensorflow_probability as tfp
+import xarray as xr
 
 
 __all__ = [
@@ -43,6 +54,8 @@ __all__ = [
     "NotFittedModelError",
     "save_mmm",
     "load_mmm",
+    "save_mmm_to_dir",
+    "load_mmm_from_dir",
 ]
 
 
@@ -53,6 +66,24 @@ class NotFittedModelError(Exception):
 MCMCSamplingError = posterior_sampler.MCMCSamplingError
 MCMCOOMError = posterior_sampler.MCMCOOMError
 
+# Layout of the directory written by `save_mmm_to_dir()`. Increment the format
+# version whenever the layout changes in a way that older versions cannot read.
+_FORMAT_VERSION = 1
+_FORMAT_VERSION_ATTR = "meridian_format_version"
+_MERIDIAN_VERSION_ATTR = "meridian_version"
+_KPI_TYPE_ATTR = "kpi_type"
+_METADATA_FILE_NAME = "metadata.json"
+_INPUT_DATA_FILE_NAME = "input_data.nc"
+_INFERENCE_DATA_FILE_NAME = "inference_data.nc"
+_MODEL_SPEC_FILE_NAME = "model_spec.json"
+_NETCDF_ENGINE = "h5netcdf"
+# Keys of the JSON representation of a `ModelSpec`.
+_PRIOR_FIELD = "prior"
+_CLASS_KEY = "class"
+_PARAMETERS_KEY = "parameters"
+_ARRAY_KEY = "array"
+_DTYPE_KEY = "dtype"
+
 
 def _warn_setting_national_args(**kwargs):
   """Raises a warning if a geo argument is found in kwargs."""
@@ -863,6 +894,7 @@ class Meridian:
         alpha=alpha,
         max_lag=self.model_spec.max_lag,
         n_times_output=n_times_output,
+        memory_optimized=self.model_spec.adstock_memory_optimized,
     )
     hill_transformer = adstock_hill.HillTransformer(
         ec=ec,
@@ -922,6 +954,7 @@ class Meridian:
         alpha=alpha,
         max_lag=self.model_spec.max_lag,
         n_times_output=n_times_output,
+        memory_optimized=self.model_spec.adstock_memory_optimized,
     )
     adj_frequency = hill_transformer.forward(frequency)
     rf_out = adstock_transformer.forward(reach * adj_frequency)
@@ -1016,6 +1049,8 @@ class Meridian:
     """
     prior_inference_data = self.prior_sampler_callable(n_draws, seed)
     self.inference_data.extend(prior_inference_data, join="right")
+    # Hashes the draws while they are in memory, for `save_mmm_to_dir()`.
+    inference_data_cache.get_draws_fingerprint(self.inference_data.prior)
 
   def sample_posterior(
       self,
@@ -1031,6 +1066,10 @@ class Meridian:
       unrolled_leapfrog_steps: int = 1,
       parallel_iterations: int = 10,
       seed: Sequence[int] | None = None,
+      checkpoint_dir: str | None = None,
+      warm_start: bool = False,
+      n_workers: int = 1,
+      threads_per_worker: int | None = None,
       **pins,
   ):
     """Runs Markov Chain Monte Carlo (MCMC) sampling of posterior distributions.
@@ -1083,6 +1122,22 @@ class Meridian:
       seed: Used to set the seed for reproducible results. For more information,
         see [PRNGS and seeds]
         (https://github.com/tensorflow/probability/blob/main/PRNGS.md).
+      checkpoint_dir: Optional directory in which the states and trace of each
+        `n_chains` batch are saved as soon as the batch finishes sampling. If
+        the directory already holds the checkpoint of a batch, that batch is
+        loaded instead of sampled again. A preempted or failed run can thus be
+        resumed by calling this method again with the same arguments and
+        `checkpoint_dir`.
+      warm_start: If `True`, each batch that is sampled after another batch
+        has finished (or was loaded from `checkpoint_dir`) starts from the
+        last draw and the final adapted step size of that batch. The mass
+        matrix is still adapted from scratch over `n_adapt` steps.
+      n_workers: Number of worker processes that sample the `n_chains` batches
+        in parallel. With the default of `1`, the batches are sampled serially
+        in the current process. With more workers, each batch gets its own seed
+        derived from `seed`. Cannot be combined with `warm_start`.
+      threads_per_worker: Number of TensorFlow threads of each worker process.
+        Defaults to the number of CPUs divided by `n_workers`.
       **pins: These are used to condition the provided joint distribution, and
         are passed directly to `joint_dist.experimental_pin(**pins)`.
 
@@ -1106,9 +1161,152 @@ class Meridian:
         unrolled_leapfrog_steps,
         parallel_iterations,
         seed,
+        checkpoint_dir=checkpoint_dir,
+        warm_start=warm_start,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
         **pins,
     )
     self.inference_data.extend(posterior_inference_data, join="right")
+    # Hashes the draws while they are in memory, for `save_mmm_to_dir()`.
+    inference_data_cache.get_draws_fingerprint(self.inference_data.posterior)
+
+
+def _write_input_data(input_data: data.InputData, path: str):
+  """Writes the `InputData` arrays to a NetCDF file, one variable per field."""
+  arrays = {
+      field.name: getattr(input_data, field.name)
+      for field in dataclasses.fields(input_data)
+      if isinstance(getattr(input_data, field.name), xr.DataArray)
+  }
+  dataset = xr.Dataset(
+      arrays,
+      attrs={
+          _KPI_TYPE_ATTR: input_data.kpi_type,
+          _FORMAT_VERSION_ATTR: _FORMAT_VERSION,
+          _MERIDIAN_VERSION_ATTR: meridian.__version__,
+      },
+  )
+  dataset.to_netcdf(path, engine=_NETCDF_ENGINE)
+
+
+def _check_format_version(attrs: Mapping[str, Any], path: str):
+  """Raises an error if `attrs` were written in another format version."""
+  format_version = attrs.get(_FORMAT_VERSION_ATTR)
+  if format_version != _FORMAT_VERSION:
+    raise ValueError(
+        f"Unsupported model format version {format_version} in {path}."
+        f" Expected version {_FORMAT_VERSION}, written by Meridian"
+        f" {attrs.get(_MERIDIAN_VERSION_ATTR)}."
+    )
+
+
+def _read_input_data(path: str) -> data.InputData:
+  """Reads the `InputData` written by `_write_input_data()`."""
+  with xr.open_dataset(path, engine=_NETCDF_ENGINE) as dataset:
+    dataset = dataset.load()
+  _check_format_version(dataset.attrs, path)
+  return data.InputData(
+      kpi_type=dataset.attrs[_KPI_TYPE_ATTR],
+      **{name: dataset[name] for name in dataset.data_vars},
+  )
+
+
+def _encode_model_spec_value(value: Any) -> Any:
+  """Encodes a value of a `ModelSpec` field as a JSON-serializable value.
+
+  Distributions and bijectors are encoded as their class and the parameters
+  they were constructed with. Parameters equal to the default of the
+  constructor, such as functions, are omitted.
+
+  Args:
+    value: The value to encode.
+
+  Returns:
+    The JSON-serializable value.
+
+  Raises:
+    ValueError: If the value has no JSON representation.
+  """
+  if isinstance(
+      value, (tfp.distributions.Distribution, tfp.bijectors.Bijector)
+  ):
+    cls = type(value)
+    signature = inspect.signature(cls.__init__).parameters
+    return {
+        _CLASS_KEY: f"{cls.__module__}.{cls.__qualname__}",
+        _PARAMETERS_KEY: {
+            name: _encode_model_spec_value(param)
+            for name, param in value.parameters.items()
+            if name not in signature or param is not signature[name].default
+        },
+    }
+  if isinstance(value, (tf.Tensor, tf.Variable, np.ndarray, np.generic)):
+    array = np.asarray(value)
+    return {_ARRAY_KEY: array.tolist(), _DTYPE_KEY: array.dtype.name}
+  if isinstance(value, (list, tuple)):
+    return [_encode_model_spec_value(v) for v in value]
+  if value is None or isinstance(value, (bool, int, float, str)):
+    return value
+  raise ValueError(
+      f"A `ModelSpec` value of type {type(value).__name__} cannot be saved."
+  )
+
+
+def _decode_model_spec_value(value: Any) -> Any:
+  """Decodes a value encoded by `_encode_model_spec_value()`."""
+  if isinstance(value, list):
+    return [_decode_model_spec_value(v) for v in value]
+  if not isinstance(value, dict):
+    return value
+  if _ARRAY_KEY in value:
+    return np.asarray(value[_ARRAY_KEY], dtype=value[_DTYPE_KEY])[()]
+  module_name, _, class_name = value[_CLASS_KEY].rpartition(".")
+  cls = getattr(importlib.import_module(module_name), class_name, None)
+  if not isinstance(cls, type) or not issubclass(
+      cls, (tfp.distributions.Distribution, tfp.bijectors.Bijector)
+  ):
+    raise ValueError(
+        f"{value[_CLASS_KEY]} is not a distribution or a bijector."
+    )
+  return cls(**{
+      name: _decode_model_spec_value(param)
+      for name, param in value[_PARAMETERS_KEY].items()
+  })
+
+
+def _write_model_spec(model_spec: spec.ModelSpec, path: str):
+  """Writes the `ModelSpec` to a JSON file."""
+  fields = {
+      field.name: _encode_model_spec_value(getattr(model_spec, field.name))
+      for field in dataclasses.fields(model_spec)
+      if field.name != _PRIOR_FIELD
+  }
+  fields[_PRIOR_FIELD] = {
+      field.name: _encode_model_spec_value(
+          getattr(model_spec.prior, field.name)
+      )
+      for field in dataclasses.fields(model_spec.prior)
+  }
+  with open(path, "w") as f:
+    json.dump(fields, f)
+
+
+def _read_model_spec(path: str) -> spec.ModelSpec:
+  """Reads the `ModelSpec` written by `_write_model_spec()`."""
+  with open(path) as f:
+    fields = json.load(f)
+  prior = prior_distribution.PriorDistribution(**{
+      name: _decode_model_spec_value(value)
+      for name, value in fields.pop(_PRIOR_FIELD).items()
+  })
+  return spec.ModelSpec(
+      prior=prior,
+      **{
+          name: _decode_model_spec_value(value)
+          for name, value in fields.items()
+      },
+  )
 
 
 def save_mmm(mmm: Meridian, file_path: str):
@@ -1116,7 +1314,9 @@ def save_mmm(mmm: Meridian, file_path: str):
 
   WARNING: There is no guarantee for future compatibility of the binary file
   output of this function. We recommend using `load_mmm()` with the same
-  version of the library that was used to save the model.
+  version of the library that was used to save the model. Use
+  `save_mmm_to_dir()` to save the model in a format that does not depend on
+  pickling.
 
   Args:
     mmm: Model object to save.
@@ -1151,3 +1351,158 @@ def load_mmm(file_path: str) -> Meridian:
     return mmm
   except FileNotFoundError:
     raise FileNotFoundError(f"No such file or directory: {file_path}") from None
+
+
+def _is_replaceable_dir(dir_path: str) -> bool:
+  """Returns whether `save_mmm_to_dir()` may replace an existing directory.
+
+  Only empty directories and directories with the `metadata.json` of a saved
+  model can be replaced, so that a mistyped path never deletes other files.
+  """
+  if not os.listdir(dir_path):
+    return True
+  try:
+    with open(os.path.join(dir_path, _METADATA_FILE_NAME)) as f:
+      metadata = json.load(f)
+  except (OSError, ValueError):
+    return False
+  return isinstance(metadata, dict) and _FORMAT_VERSION_ATTR in metadata
+
+
+def save_mmm_to_dir(mmm: Meridian, dir_path: str):
+  """Saves the model object to a directory.
+
+  The model is saved as a directory with the following files:
+
+  * `metadata.json`: The format version of the directory and the version of
+    Meridian that wrote it.
+  * `input_data.nc`: The `InputData` arrays in NetCDF format.
+  * `inference_data.nc`: The groups of `Meridian.inference_data`, such as the
+    prior, the posterior and the sampling trace, in uncompressed NetCDF format.
+    It is omitted if the model has no inference data.
+  * `model_spec.json`: The `ModelSpec`. The prior distributions are saved as
+    their class and the parameters they were constructed with.
+
+  Tensors derived from the input data are not saved. They are rebuilt when they
+  are first used after loading.
+
+  The files are written to a temporary directory next to `dir_path`, which then
+  replaces `dir_path`, so that an interrupted save never leaves a directory
+  with files of different models. A posterior that is still lazily loaded from
+  a replaced directory keeps reading the old files. An existing `dir_path` is
+  only replaced if it is empty or holds a model saved by this function.
+
+  Args:
+    mmm: Model object to save.
+    dir_path: Path of the directory to save the model to.
+
+  Raises:
+    ValueError: If `dir_path` is an existing file, such as a pickled model, or
+      an existing directory that is neither empty nor a saved model.
+  """
+  if os.path.isfile(dir_path):
+    raise ValueError(
+        f"{dir_path} is a file. `save_mmm_to_dir()` saves to a directory."
+    )
+  if os.path.isdir(dir_path) and not _is_replaceable_dir(dir_path):
+    raise ValueError(
+        f"{dir_path} is a directory that is neither empty nor a model saved by"
+        " `save_mmm_to_dir()`, and would be replaced. Save the model to a new"
+        " directory."
+    )
+  dir_path = os.path.abspath(dir_path)
+  parent_path = os.path.dirname(dir_path)
+  os.makedirs(parent_path, exist_ok=True)
+  tmp_path = tempfile.mkdtemp(
+      prefix=f".{os.path.basename(dir_path)}.", dir=parent_path
+  )
+  try:
+    with open(os.path.join(tmp_path, _METADATA_FILE_NAME), "w") as f:
+      json.dump(
+          {
+              _FORMAT_VERSION_ATTR: _FORMAT_VERSION,
+              _MERIDIAN_VERSION_ATTR: meridian.__version__,
+          },
+          f,
+      )
+    _write_input_data(
+        mmm.input_data, os.path.join(tmp_path, _INPUT_DATA_FILE_NAME)
+    )
+    if mmm.inference_data.groups():
+      # Saves the fingerprint of the draws, so that it is not computed from
+      # the lazily loaded parameters.
+      for group in (constants.PRIOR, constants.POSTERIOR):
+        if group in mmm.inference_data.groups():
+          inference_data_cache.get_draws_fingerprint(
+              getattr(mmm.inference_data, group)
+          )
+      mmm.inference_data.to_netcdf(
+          os.path.join(tmp_path, _INFERENCE_DATA_FILE_NAME),
+          compress=False,
+          engine=_NETCDF_ENGINE,
+      )
+    _write_model_spec(
+        mmm.model_spec, os.path.join(tmp_path, _MODEL_SPEC_FILE_NAME)
+    )
+  except BaseException:
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    raise
+
+  if os.path.exists(dir_path):
+    old_path = tmp_path + ".old"
+    os.rename(dir_path, old_path)
+    os.rename(tmp_path, dir_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+  else:
+    os.rename(tmp_path, dir_path)
+
+
+def load_mmm_from_dir(
+    dir_path: str, max_cache_bytes: int | None = None
+) -> Meridian:
+  """Loads the model object from a directory saved by `save_mmm_to_dir()`.
+
+  The input data and the model specification are loaded eagerly. The groups of
+  the inference data are opened lazily: each parameter array is read from disk
+  when it is first used and kept in a cache bounded by `max_cache_bytes`.
+  Parameters that an analysis does not use are never read, and several
+  processes analyzing the same model share one page-cached copy of the
+  posterior.
+
+  Args:
+    dir_path: Path of the directory to load the model from.
+    max_cache_bytes: Maximum total size in bytes of the parameter arrays kept in
+      memory. The least recently used arrays are evicted when it is exceeded,
+      and arrays larger than it are read slice by slice as they are indexed.
+      If `None`, the loaded arrays are never evicted.
+
+  Returns:
+    mmm: Model object loaded from the directory.
+
+  Raises:
+      FileNotFoundError: If `dir_path` is not a directory.
+      ValueError: If the model was saved in an unsupported format version.
+  """
+  if not os.path.isdir(dir_path):
+    raise FileNotFoundError(f"No such directory: {dir_path}")
+  metadata_path = os.path.join(dir_path, _METADATA_FILE_NAME)
+  with open(metadata_path) as f:
+    _check_format_version(json.load(f), metadata_path)
+
+  input_data = _read_input_data(os.path.join(dir_path, _INPUT_DATA_FILE_NAME))
+  model_spec = _read_model_spec(os.path.join(dir_path, _MODEL_SPEC_FILE_NAME))
+  inference_data_path = os.path.join(dir_path, _INFERENCE_DATA_FILE_NAME)
+  inference_data = (
+      inference_data_cache.open_inference_data(
+          inference_data_path,
+          cache=inference_data_cache.ParameterCache(max_cache_bytes),
+          engine=_NETCDF_ENGINE,
+      )
+      if os.path.exists(inference_data_path)
+      else None
+  )
+  return Meridian(
+      input_data=input_data,
+      model_spec=model_spec,
+      inference_data=inference_data,
+  )
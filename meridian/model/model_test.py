@@ -13,6 +13,8 @@
 # limitations under the License.
 
 from collections.abc import Collection, Mapping, Sequence
+import dataclasses
+import json
 import os
 from unittest import mock
 import warnings
@@ -971,6 +973,45 @@ class ModelTest(
       _, mock_kwargs = calls[0]
       self.assertEqual(mock_kwargs["n_times_output"], 8)
 
+  @parameterized.named_parameters(
+      dict(testcase_name="default", adstock_memory_optimized=False),
+      dict(testcase_name="memory_optimized", adstock_memory_optimized=True),
+  )
+  def test_adstock_hill_memory_optimized_passed_to_transformer(
+      self, adstock_memory_optimized
+  ):
+    with mock.patch.object(
+        adstock_hill, "AdstockTransformer", autospec=True
+    ) as mock_adstock_cls:
+      mock_adstock_cls.return_value.forward.return_value = (
+          self.input_data_with_media_and_rf.media
+      )
+      meridian = model.Meridian(
+          input_data=self.input_data_with_media_and_rf,
+          model_spec=spec.ModelSpec(
+              adstock_memory_optimized=adstock_memory_optimized
+          ),
+      )
+      meridian.adstock_hill_media(
+          media=meridian.media_tensors.media,
+          alpha=np.ones(shape=(self._N_MEDIA_CHANNELS,)),
+          ec=np.ones(shape=(self._N_MEDIA_CHANNELS,)),
+          slope=np.ones(shape=(self._N_MEDIA_CHANNELS,)),
+      )
+      meridian.adstock_hill_rf(
+          reach=meridian.rf_tensors.reach,
+          frequency=meridian.rf_tensors.frequency,
+          alpha=np.ones(shape=(self._N_RF_CHANNELS,)),
+          ec=np.ones(shape=(self._N_RF_CHANNELS,)),
+          slope=np.ones(shape=(self._N_RF_CHANNELS,)),
+      )
+
+      self.assertLen(mock_adstock_cls.call_args_list, 2)
+      for _, mock_kwargs in mock_adstock_cls.call_args_list:
+        self.assertEqual(
+            mock_kwargs["memory_optimized"], adstock_memory_optimized
+        )
+
   # TODO Move this test to a higher-level public API unit test.
   @parameterized.named_parameters(
       dict(
@@ -1124,7 +1165,7 @@ class ModelTest(
     file_path = os.path.join(self.create_tempdir().full_path, "joblib")
     mmm = model.Meridian(input_data=self.input_data_with_media_and_rf)
     model.save_mmm(mmm, str(file_path))
-    self.assertTrue(os.path.exists(file_path))
+    self.assertTrue(os.path.isfile(file_path))
     new_mmm = model.load_mmm(file_path)
     for attr in dir(mmm):
       if isinstance(getattr(mmm, attr), (int, bool)):
@@ -1134,6 +1175,174 @@ class ModelTest(
         with self.subTest(name=attr):
           self.assertAllClose(getattr(mmm, attr), getattr(new_mmm, attr))
 
+  def test_save_and_load_dir_with_inference_data(self):
+    flags.FLAGS.mark_as_parsed()
+    dir_path = os.path.join(self.create_tempdir().full_path, "mmm")
+    mmm = model.Meridian(
+        input_data=self.input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(max_lag=5, hill_before_adstock=True),
+    )
+    mmm.sample_prior(n_draws=5, seed=1)
+    # Reuse the prior draws as posterior draws to avoid running MCMC.
+    mmm.inference_data.add_groups(
+        {constants.POSTERIOR: mmm.inference_data.prior}
+    )
+    model.save_mmm_to_dir(mmm, dir_path)
+
+    new_mmm = model.load_mmm_from_dir(dir_path)
+
+    xr.testing.assert_identical(
+        new_mmm.input_data.as_dataset(), mmm.input_data.as_dataset()
+    )
+    self.assertEqual(new_mmm.input_data.kpi_type, mmm.input_data.kpi_type)
+    self.assertEqual(new_mmm.model_spec.max_lag, 5)
+    self.assertTrue(new_mmm.model_spec.hill_before_adstock)
+    self.assertCountEqual(
+        new_mmm.inference_data.groups(), mmm.inference_data.groups()
+    )
+    posterior = new_mmm.inference_data.posterior
+    self.assertFalse(posterior[constants.ALPHA_M].variable._in_memory)
+    xr.testing.assert_allclose(posterior, mmm.inference_data.posterior)
+    self.assertAllClose(new_mmm.media_tensors.media, mmm.media_tensors.media)
+
+  def test_save_and_load_dir_without_inference_data(self):
+    flags.FLAGS.mark_as_parsed()
+    dir_path = os.path.join(self.create_tempdir().full_path, "mmm")
+    mmm = model.Meridian(input_data=self.input_data_with_media_and_rf)
+    model.save_mmm_to_dir(mmm, dir_path)
+
+    new_mmm = model.load_mmm_from_dir(dir_path)
+
+    self.assertEmpty(new_mmm.inference_data.groups())
+    self.assertCountEqual(
+        os.listdir(dir_path),
+        ["metadata.json", "input_data.nc", "model_spec.json"],
+    )
+
+  def test_save_and_load_dir_model_spec(self):
+    flags.FLAGS.mark_as_parsed()
+    dir_path = os.path.join(self.create_tempdir().full_path, "mmm")
+    model_spec = spec.ModelSpec(
+        prior=prior_distribution.PriorDistribution(
+            roi_m=tfp.distributions.LogNormal(0.1, 0.2, name=constants.ROI_M)
+        ),
+        max_lag=3,
+        knots=[0, 100],
+        holdout_id=np.random.default_rng(0).choice(
+            [True, False], size=(self._N_GEOS, self._N_TIMES)
+        ),
+    )
+    mmm = model.Meridian(
+        input_data=self.input_data_with_media_and_rf, model_spec=model_spec
+    )
+    model.save_mmm_to_dir(mmm, dir_path)
+
+    new_model_spec = model.load_mmm_from_dir(dir_path).model_spec
+
+    self.assertEqual(new_model_spec.max_lag, 3)
+    self.assertEqual(new_model_spec.knots, [0, 100])
+    np.testing.assert_array_equal(
+        new_model_spec.holdout_id, model_spec.holdout_id
+    )
+    for field in dataclasses.fields(model_spec.prior):
+      with self.subTest(name=field.name):
+        self.assertTrue(
+            prior_distribution.distributions_are_equal(
+                getattr(new_model_spec.prior, field.name),
+                getattr(model_spec.prior, field.name),
+            )
+        )
+
+  def test_save_dir_replaces_model_atomically(self):
+    flags.FLAGS.mark_as_parsed()
+    parent_path = self.create_tempdir().full_path
+    dir_path = os.path.join(parent_path, "mmm")
+    mmm = model.Meridian(
+        input_data=self.input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(max_lag=5),
+    )
+    model.save_mmm_to_dir(mmm, dir_path)
+    new_mmm = model.Meridian(
+        input_data=self.input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(max_lag=3),
+    )
+
+    with mock.patch.object(
+        model, "_write_model_spec", side_effect=RuntimeError("interrupted")
+    ):
+      with self.assertRaisesRegex(RuntimeError, "interrupted"):
+        model.save_mmm_to_dir(new_mmm, dir_path)
+    self.assertEqual(os.listdir(parent_path), ["mmm"])
+    self.assertEqual(model.load_mmm_from_dir(dir_path).model_spec.max_lag, 5)
+
+    model.save_mmm_to_dir(new_mmm, dir_path)
+    self.assertEqual(os.listdir(parent_path), ["mmm"])
+    self.assertEqual(model.load_mmm_from_dir(dir_path).model_spec.max_lag, 3)
+
+  def test_save_dir_to_file_raises(self):
+    flags.FLAGS.mark_as_parsed()
+    file_path = self.create_tempfile().full_path
+    mmm = model.Meridian(input_data=self.input_data_with_media_and_rf)
+    with self.assertRaisesRegex(ValueError, "is a file"):
+      model.save_mmm_to_dir(mmm, file_path)
+
+  @parameterized.named_parameters(
+      dict(testcase_name="other_files", file_name="notes.txt"),
+      dict(testcase_name="other_metadata", file_name="metadata.json"),
+  )
+  def test_save_dir_over_other_directory_raises(self, file_name):
+    flags.FLAGS.mark_as_parsed()
+    dir_path = self.create_tempdir().full_path
+    file_path = os.path.join(dir_path, file_name)
+    with open(file_path, "w") as f:
+      f.write("{}")
+    mmm = model.Meridian(input_data=self.input_data_with_media_and_rf)
+
+    with self.assertRaisesRegex(ValueError, "neither empty nor a model"):
+      model.save_mmm_to_dir(mmm, dir_path)
+    self.assertEqual(os.listdir(dir_path), [file_name])
+    with open(file_path) as f:
+      self.assertEqual(f.read(), "{}")
+
+  def test_save_dir_to_empty_directory(self):
+    flags.FLAGS.mark_as_parsed()
+    dir_path = self.create_tempdir().full_path
+    mmm = model.Meridian(
+        input_data=self.input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(max_lag=3),
+    )
+
+    model.save_mmm_to_dir(mmm, dir_path)
+
+    self.assertEqual(model.load_mmm_from_dir(dir_path).model_spec.max_lag, 3)
+
+  @parameterized.named_parameters(
+      dict(testcase_name="metadata", file_name="metadata.json"),
+      dict(testcase_name="input_data", file_name="input_data.nc"),
+  )
+  def test_load_dir_unsupported_format_version_raises(self, file_name):
+    flags.FLAGS.mark_as_parsed()
+    dir_path = os.path.join(self.create_tempdir().full_path, "mmm")
+    mmm = model.Meridian(input_data=self.input_data_with_media_and_rf)
+    model.save_mmm_to_dir(mmm, dir_path)
+    path = os.path.join(dir_path, file_name)
+    if file_name.endswith(".json"):
+      with open(path) as f:
+        metadata = json.load(f)
+      metadata["meridian_format_version"] = 99
+      with open(path, "w") as f:
+        json.dump(metadata, f)
+    else:
+      with xr.open_dataset(path) as dataset:
+        dataset = dataset.load()
+      dataset.attrs["meridian_format_version"] = 99
+      dataset.to_netcdf(path)
+
+    with self.assertRaisesRegex(
+        ValueError, "Unsupported model format version 99"
+    ):
+      model.load_mmm_from_dir(dir_path)
+
   def test_load_error(self):
     with self.assertRaisesWithLiteralMatch(
         FileNotFoundError, "No such file or directory: this/path/does/not/exist"
@@ -15,7 +15,12 @@
 """Module for MCMC sampling of posterior distributions in a Meridian model."""
 
 from collections.abc import Mapping, Sequence
-from typing import TYPE_CHECKING
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+from typing import Any, TYPE_CHECKING
+import warnings
 
 import arviz as az
 from meridian import constants
@@ -79,6 +84,209 @@ def _xla_windowed_adaptive_nuts(**kwargs):
   return tfp.experimental.mcmc.windowed_adaptive_nuts(**kwargs)
 
 
+_CHECKPOINT_FILE_NAME = "chain_batch_{}.npz"
+_CHECKPOINT_STATE_PREFIX = "state/"
+_CHECKPOINT_TRACE_PREFIX = "trace/"
+_CHECKPOINT_CONFIG_PREFIX = "config/"
+
+
+def _get_checkpoint_path(checkpoint_dir: str, batch_index: int) -> str:
+  return os.path.join(
+      checkpoint_dir, _CHECKPOINT_FILE_NAME.format(batch_index)
+  )
+
+
+def _get_value_fingerprint(value: Any) -> str:
+  """Returns a hash of a nested structure of arrays, or `""` for `None`.
+
+  Args:
+    value: A nested structure, such as a mapping or a namedtuple, whose leaves
+      can be converted to NumPy arrays.
+
+  Returns:
+    The hexadecimal SHA-256 hash of the paths, shapes, dtypes and values of the
+    leaves of `value`.
+  """
+  if value is None:
+    return ""
+  hasher = hashlib.sha256()
+  for path, leaf in tf.nest.flatten_with_joined_string_paths(value):
+    array = np.asarray(leaf)
+    hasher.update(f"{path}/{array.dtype.str}/{array.shape}".encode())
+    hasher.update(np.ascontiguousarray(array).tobytes())
+  return hasher.hexdigest()
+
+
+def _seed_to_str(seed: Any) -> str:
+  """Returns a seed as a string of comma-separated integers, or `""`."""
+  if seed is None:
+    return ""
+  return ",".join(str(s) for s in np.asarray(seed).ravel())
+
+
+def _save_chain_batch(
+    checkpoint_path: str,
+    config: Mapping[str, int | str],
+    states: Mapping[str, tf.Tensor],
+    trace: Mapping[str, Any],
+) -> None:
+  """Saves the MCMC states and trace of a batch of chains to a `.npz` file.
+
+  Structured trace metrics, such as the adapted `variance_scaling`, are
+  flattened and saved part by part. The file is first written under a
+  temporary name and then renamed, so that an interrupted write never leaves a
+  partial checkpoint behind.
+
+  Args:
+    checkpoint_path: Path of the `.npz` checkpoint file.
+    config: Sampling configuration of the batch, used to validate the
+      checkpoint when sampling is resumed.
+    states: Mapping of parameter names to MCMC states of shape `(n_draws,
+      n_chains, ...)`.
+    trace: Mapping of trace metric names to MCMC trace tensors.
+  """
+  arrays = {
+      _CHECKPOINT_CONFIG_PREFIX + k: np.asarray(v) for k, v in config.items()
+  }
+  for k, v in states.items():
+    arrays[_CHECKPOINT_STATE_PREFIX + k] = np.asarray(v)
+  for k, v in trace.items():
+    if tf.nest.is_nested(v):
+      for i, part in enumerate(tf.nest.flatten(v)):
+        arrays[f"{_CHECKPOINT_TRACE_PREFIX}{k}/{i}"] = np.asarray(part)
+    else:
+      arrays[_CHECKPOINT_TRACE_PREFIX + k] = np.asarray(v)
+
+  temp_path = checkpoint_path + ".tmp"
+  with open(temp_path, "wb") as f:
+    np.savez(f, **arrays)
+  os.replace(temp_path, checkpoint_path)
+
+
+def _load_chain_batch(
+    checkpoint_path: str, config: Mapping[str, int | str]
+) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+  """Loads the MCMC states and trace saved by `_save_chain_batch()`.
+
+  Args:
+    checkpoint_path: Path of the `.npz` checkpoint file.
+    config: Sampling configuration of the current call. It must match the
+      configuration the checkpoint was saved with.
+
+  Returns:
+    A tuple of the states and trace mappings. Structured trace metrics are
+    returned as lists of their flattened parts.
+
+  Raises:
+    ValueError: If the checkpoint was saved with a different sampling
+      configuration.
+  """
+  states = {}
+  trace = {}
+  saved_config = {}
+  with np.load(checkpoint_path) as checkpoint:
+    for name in checkpoint.files:
+      if name.startswith(_CHECKPOINT_CONFIG_PREFIX):
+        key = name.removeprefix(_CHECKPOINT_CONFIG_PREFIX)
+        saved_config[key] = checkpoint[name].item()
+      elif name.startswith(_CHECKPOINT_STATE_PREFIX):
+        states[name.removeprefix(_CHECKPOINT_STATE_PREFIX)] = checkpoint[name]
+      else:
+        key = name.removeprefix(_CHECKPOINT_TRACE_PREFIX)
+        if "/" in key:
+          key, index = key.split("/")
+          trace.setdefault(key, {})[int(index)] = checkpoint[name]
+        else:
+          trace[key] = checkpoint[name]
+
+  if saved_config != dict(config):
+    raise ValueError(
+        f"The checkpoint at {checkpoint_path} was saved with the sampling"
+        f" configuration {saved_config}, which does not match the current"
+        f" configuration {dict(config)}. Use a new `checkpoint_dir` or the"
+        " original sampling arguments."
+    )
+  for k, v in trace.items():
+    if isinstance(v, dict):
+      trace[k] = [v[i] for i in sorted(v)]
+  return states, trace
+
+
+def _get_warm_start_state(
+    joint_dist: tfp.distributions.Distribution,
+    states: Mapping[str, tf.Tensor],
+    n_chains: int,
+) -> Any:
+  """Returns the last draw of a finished batch as a new initial state.
+
+  Args:
+    joint_dist: The pinned joint distribution that is sampled.
+    states: Mapping of parameter names to MCMC states of shape `(n_draws,
+      n_chains_prev, ...)` of a finished batch of chains.
+    n_chains: Number of chains of the batch to initialize. Chains of the
+      finished batch are reused cyclically if `n_chains` is larger than
+      `n_chains_prev`.
+
+  Returns:
+    A structure of the same type as `joint_dist.sample(n_chains)` holding the
+    initial state of each chain.
+  """
+  state_type = type(joint_dist.dtype)
+  last_draw = {}
+  for k in state_type._fields:
+    last_state = tf.convert_to_tensor(states[k])[-1]
+    chain_idx = tf.range(n_chains) % last_state.shape[0]
+    last_draw[k] = tf.gather(last_state, chain_idx, axis=0)
+  return state_type(**last_draw)
+
+
+def _init_worker(n_threads: int) -> None:
+  """Pins the TensorFlow thread pools of a worker process."""
+  try:
+    tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(n_threads)
+  except RuntimeError:
+    # The runtime was already initialized while the worker imported the main
+    # module, e.g. by a script that creates tensors at import time.
+    warnings.warn(
+        "Could not pin the TensorFlow thread pools of a sampling worker to"
+        f" {n_threads} threads, since TensorFlow was already initialized. Move"
+        " the code that creates tensors under `if __name__ == '__main__':`."
+    )
+
+
+def _create_worker_pool(
+    n_workers: int, n_threads: int
+) -> concurrent.futures.Executor:
+  """Returns a pool of worker processes for sampling chain batches.
+
+  The workers are spawned rather than forked, since a forked TensorFlow
+  runtime is not safe to use. Each worker pins its thread pools to `n_threads`
+  before the runtime is initialized.
+
+  Args:
+    n_workers: Number of worker processes.
+    n_threads: Number of TensorFlow threads of each worker process.
+  """
+  return concurrent.futures.ProcessPoolExecutor(
+      max_workers=n_workers,
+      mp_context=multiprocessing.get_context("spawn"),
+      initializer=_init_worker,
+      initargs=(n_threads,),
+  )
+
+
+def _sample_chain_batch_in_worker(
+    sampler: "PosteriorMCMCSampler", **kwargs
+) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+  """Samples a batch of chains and returns the results as NumPy arrays."""
+  states, trace = sampler._sample_chain_batch(**kwargs)  # pylint: disable=protected-access
+  return (
+      {k: np.asarray(v) for k, v in states.items()},
+      tf.nest.map_structure(np.asarray, trace),
+  )
+
+
 class PosteriorMCMCSampler:
   """A callable that samples from posterior distributions using MCMC."""
 
@@ -380,6 +588,33 @@ class PosteriorMCMCSampler:
     )
     return self._get_joint_dist_unpinned().experimental_pin(y=y)
 
+  def _sample_chain_batch(
+      self, **kwargs
+  ) -> tuple[dict[str, tf.Tensor], dict[str, Any]]:
+    """Runs `windowed_adaptive_nuts` for a single batch of chains.
+
+    Args:
+      **kwargs: Arguments passed to `windowed_adaptive_nuts`, except
+        `joint_dist`.
+
+    Returns:
+      A tuple of the MCMC states, keyed by parameter name, and the MCMC trace.
+
+    Raises:
+      MCMCOOMError: If the model is out of memory.
+    """
+    try:
+      mcmc = _xla_windowed_adaptive_nuts(
+          joint_dist=self._get_joint_dist(), **kwargs
+      )
+    except tf.errors.ResourceExhaustedError as error:
+      raise MCMCOOMError(
+          "ERROR: Out of memory. Try reducing `n_keep` or pass a list of"
+          " integers as `n_chains` to sample chains serially (see"
+          " https://developers.google.com/meridian/docs/advanced-modeling/model-debugging#gpu-oom-error)"
+      ) from error
+    return mcmc.all_states._asdict(), mcmc.trace
+
   def __call__(
       self,
       n_chains: Sequence[int] | int,
@@ -394,6 +629,10 @@ class PosteriorMCMCSampler:
       unrolled_leapfrog_steps: int = 1,
       parallel_iterations: int = 10,
       seed: Sequence[int] | None = None,
+      checkpoint_dir: str | None = None,
+      warm_start: bool = False,
+      n_workers: int = 1,
+      threads_per_worker: int | None = None,
       **pins,
   ) -> az.InferenceData:
     """Runs Markov Chain Monte Carlo (MCMC) sampling of posterior distributions.
@@ -444,6 +683,37 @@ class PosteriorMCMCSampler:
       seed: Used to set the seed for reproducible results. For more information,
         see [PRNGS and seeds]
         (https://github.com/tensorflow/probability/blob/main/PRNGS.md).
+      checkpoint_dir: Optional directory in which the states and trace of each
+        `n_chains` batch are saved as soon as the batch finishes sampling. If
+        the directory already holds the checkpoint of a batch, that batch is
+        loaded instead of sampled again. A preempted or failed run can thus be
+        resumed by calling this method again with the same arguments and
+        `checkpoint_dir`. A `ValueError` is raised if a checkpoint was saved
+        with a different `n_chains` batch, `n_adapt`, `n_burnin`, `n_keep`,
+        `current_state`, `init_step_size`, `dual_averaging_kwargs`,
+        `max_tree_depth`, `max_energy_diff`, `unrolled_leapfrog_steps`,
+        `warm_start`, `pins` or batch seed, or for a model with different input
+        data. The batch seeds depend on `seed` and on whether `n_workers` is
+        `1`, so a run must be resumed either serially or in parallel, as it was
+        started.
+      warm_start: If `True`, each batch that is sampled after another batch
+        has finished (or was loaded from `checkpoint_dir`) starts from the
+        last draw of that batch, and its leapfrog step size starts at the mean
+        of that batch's final adapted step sizes. The adapted
+        `variance_scaling` is not carried over, since `windowed_adaptive_nuts`
+        has no argument for an initial mass matrix, so each batch still adapts
+        it from scratch over `n_adapt` steps. `current_state` and
+        `init_step_size` take precedence over the warm start values when they
+        are given.
+      n_workers: Number of worker processes that sample the `n_chains` batches
+        in parallel. With the default of `1`, the batches are sampled serially
+        in the current process. With more workers, each batch is sampled in a
+        separate process with its own seed derived from `seed`, so the draws
+        differ from the serial ones. The model must be picklable. Cannot be
+        combined with `warm_start`.
+      threads_per_worker: Number of TensorFlow intra-op and inter-op threads
+        of each worker process. Defaults to the number of CPUs divided by
+        `n_workers`. Ignored if `n_workers` is `1`.
       **pins: These are used to condition the provided joint distribution, and
         are passed directly to `joint_dist.experimental_pin(**pins)`.
 
@@ -460,34 +730,146 @@ class PosteriorMCMCSampler:
     seed = tfp.random.sanitize_seed(seed) if seed else None
     n_chains_list = [n_chains] if isinstance(n_chains, int) else n_chains
     total_chains = np.sum(n_chains_list)
+    if n_workers < 1:
+      raise ValueError("`n_workers` must be positive.")
+    if threads_per_worker is not None and threads_per_worker < 1:
+      raise ValueError("`threads_per_worker` must be positive.")
+    if warm_start and n_workers > 1:
+      raise ValueError(
+          "`warm_start` requires the chain batches to be sampled serially,"
+          " with `n_workers=1`."
+      )
+
+    if checkpoint_dir is not None and not os.path.exists(checkpoint_dir):
+      os.makedirs(checkpoint_dir)
+
+    nuts_kwargs = dict(
+        n_draws=n_burnin + n_keep,
+        num_adaptation_steps=n_adapt,
+        dual_averaging_kwargs=dual_averaging_kwargs,
+        max_tree_depth=max_tree_depth,
+        max_energy_diff=max_energy_diff,
+        unrolled_leapfrog_steps=unrolled_leapfrog_steps,
+        parallel_iterations=parallel_iterations,
+        **pins,
+    )
+
+    if n_workers == 1:
+      batch_seeds = [seed] * len(n_chains_list)
+    else:
+      # Each batch gets its own seed so that batches of the same size do not
+      # produce identical chains in different workers.
+      batch_seeds = (
+          [s.numpy() for s in tfp.random.split_seed(seed, n=len(n_chains_list))]
+          if seed is not None
+          else [None] * len(n_chains_list)
+      )
 
-    states = []
-    traces = []
-    for n_chains_batch in n_chains_list:
-      try:
-        mcmc = _xla_windowed_adaptive_nuts(
-            n_draws=n_burnin + n_keep,
-            joint_dist=self._get_joint_dist(),
-            n_chains=n_chains_batch,
-            num_adaptation_steps=n_adapt,
-            current_state=current_state,
-            init_step_size=init_step_size,
-            dual_averaging_kwargs=dual_averaging_kwargs,
-            max_tree_depth=max_tree_depth,
-            max_energy_diff=max_energy_diff,
-            unrolled_leapfrog_steps=unrolled_leapfrog_steps,
-            parallel_iterations=parallel_iterations,
-            seed=seed,
-            **pins,
+    # Finished batches, keyed by batch index in the order they finished.
+    batch_states = {}
+    batch_traces = {}
+    checkpoint_paths = {}
+    checkpoint_configs = {}
+    pending_batches = []
+    if checkpoint_dir is not None:
+      # Sampling arguments that the draws depend on, other than the batch size
+      # and seed.
+      base_config = {
+          "n_adapt": n_adapt,
+          "n_burnin": n_burnin,
+          "n_keep": n_keep,
+          "current_state": _get_value_fingerprint(current_state),
+          "init_step_size": _get_value_fingerprint(init_step_size),
+          "dual_averaging_kwargs": _get_value_fingerprint(
+              dual_averaging_kwargs
+          ),
+          "max_tree_depth": max_tree_depth,
+          "max_energy_diff": max_energy_diff,
+          "unrolled_leapfrog_steps": unrolled_leapfrog_steps,
+          "warm_start": warm_start,
+          "pins": _get_value_fingerprint(dict(pins)),
+          "data_fingerprint": self._meridian.input_data.fingerprint(),
+      }
+    for batch_index, n_chains_batch in enumerate(n_chains_list):
+      if checkpoint_dir is not None:
+        checkpoint_paths[batch_index] = _get_checkpoint_path(
+            checkpoint_dir, batch_index
+        )
+        checkpoint_configs[batch_index] = base_config | {
+            "n_chains": n_chains_batch,
+            "seed": _seed_to_str(batch_seeds[batch_index]),
+        }
+        if os.path.exists(checkpoint_paths[batch_index]):
+          batch_states[batch_index], batch_traces[batch_index] = (
+              _load_chain_batch(
+                  checkpoint_paths[batch_index],
+                  checkpoint_configs[batch_index],
+              )
+          )
+          continue
+      pending_batches.append(batch_index)
+
+    def _finish_batch(batch_index, states, trace):
+      if checkpoint_dir is not None:
+        _save_chain_batch(
+            checkpoint_paths[batch_index],
+            checkpoint_configs[batch_index],
+            states,
+            trace,
+        )
+      batch_states[batch_index] = states
+      batch_traces[batch_index] = trace
+
+    if n_workers == 1:
+      for batch_index in pending_batches:
+        n_chains_batch = n_chains_list[batch_index]
+        batch_current_state = current_state
+        batch_init_step_size = init_step_size
+        if warm_start and batch_states:
+          last_batch_index = next(reversed(batch_states))
+          if batch_current_state is None:
+            batch_current_state = _get_warm_start_state(
+                self._get_joint_dist(),
+                batch_states[last_batch_index],
+                n_chains_batch,
+            )
+          if batch_init_step_size is None:
+            batch_init_step_size = tf.reduce_mean(
+                batch_traces[last_batch_index][constants.STEP_SIZE][-1]
+            )
+        _finish_batch(
+            batch_index,
+            *self._sample_chain_batch(
+                n_chains=n_chains_batch,
+                current_state=batch_current_state,
+                init_step_size=batch_init_step_size,
+                seed=batch_seeds[batch_index],
+                **nuts_kwargs,
+            ),
         )
-      except tf.errors.ResourceExhaustedError as error:
-        raise MCMCOOMError(
-            "ERROR: Out of memory. Try reducing `n_keep` or pass a list of"
-            " integers as `n_chains` to sample chains serially (see"
-            " https://developers.google.com/meridian/docs/advanced-modeling/model-debugging#gpu-oom-error)"
-        ) from error
-      states.append(mcmc.all_states._asdict())
-      traces.append(mcmc.trace)
+    elif pending_batches:
+      if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // n_workers)
+      with _create_worker_pool(
+          min(n_workers, len(pending_batches)), threads_per_worker
+      ) as pool:
+        futures = {
+            pool.submit(
+                _sample_chain_batch_in_worker,
+                self,
+                n_chains=n_chains_list[batch_index],
+                current_state=current_state,
+                init_step_size=init_step_size,
+                seed=batch_seeds[batch_index],
+                **nuts_kwargs,
+            ): batch_index
+            for batch_index in pending_batches
+        }
+        for future in concurrent.futures.as_completed(futures):
+          _finish_batch(futures[future], *future.result())
+
+    states = [batch_states[i] for i in range(len(n_chains_list))]
+    traces = [batch_traces[i] for i in range(len(n_chains_list))]
 
     mcmc_states = {
         k: tf.einsum(
@@ -13,8 +13,11 @@
 # limitations under the License.
 
 import collections
+import concurrent.futures
+import os
 from unittest import mock
 
+from absl import flags
 from absl.testing import absltest
 from absl.testing import parameterized
 import arviz as az
@@ -27,6 +30,7 @@ from meridian.model import spec
 import numpy as np
 import tensorflow as tf
 import tensorflow_probability as tfp
+import xarray as xr
 
 
 class PosteriorMCMCSamplerTest(
@@ -40,6 +44,10 @@ class PosteriorMCMCSamplerTest(
   def setUp(self):
     super().setUp()
     model_test_data.WithInputDataSamples.setup(self)
+    # The create_tempdir() method used by the checkpoint tests internally uses
+    # command line flag (--test_tmpdir) and such flags are not marked as parsed
+    # by default when running with pytest.
+    flags.FLAGS.mark_as_parsed()
 
   def test_get_joint_dist_zeros(self):
     model_spec = spec.ModelSpec(
@@ -1053,6 +1061,364 @@ class PosteriorMCMCSamplerTest(
           n_keep=self._N_KEEP,
       )
 
+  def test_sample_posterior_checkpoint_resumes_finished_batches(self):
+    checkpoint_dir = self.create_tempdir().full_path
+    mcmc_output = collections.namedtuple(
+        "StatesAndTrace", ["all_states", "trace"]
+    )(
+        all_states=self.test_posterior_states_media_and_rf,
+        trace=self.test_trace,
+    )
+    meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+    with mock.patch.object(
+        posterior_sampler,
+        "_xla_windowed_adaptive_nuts",
+        autospec=True,
+        return_value=mcmc_output,
+    ) as mock_sample_posterior:
+      meridian.sample_posterior(
+          n_chains=[self._N_CHAINS, self._N_CHAINS],
+          n_adapt=self._N_ADAPT,
+          n_burnin=self._N_BURNIN,
+          n_keep=self._N_KEEP,
+          checkpoint_dir=checkpoint_dir,
+      )
+      self.assertEqual(mock_sample_posterior.call_count, 2)
+
+    self.assertCountEqual(
+        os.listdir(checkpoint_dir), ["chain_batch_0.npz", "chain_batch_1.npz"]
+    )
+
+    resumed_meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+    with mock.patch.object(
+        posterior_sampler, "_xla_windowed_adaptive_nuts", autospec=True
+    ) as mock_sample_posterior:
+      resumed_meridian.sample_posterior(
+          n_chains=[self._N_CHAINS, self._N_CHAINS],
+          n_adapt=self._N_ADAPT,
+          n_burnin=self._N_BURNIN,
+          n_keep=self._N_KEEP,
+          checkpoint_dir=checkpoint_dir,
+      )
+      mock_sample_posterior.assert_not_called()
+
+    for group in [constants.POSTERIOR, "trace", "sample_stats"]:
+      xr.testing.assert_allclose(
+          resumed_meridian.inference_data[group],
+          meridian.inference_data[group],
+      )
+
+  def test_sample_posterior_checkpoint_warm_starts_unfinished_batches(self):
+    checkpoint_dir = self.create_tempdir().full_path
+    meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+    # The pinned joint distribution also samples the non-centered parameters
+    # that are not saved in the posterior, so the mocked states include them.
+    states = self.test_posterior_states_media_and_rf._asdict()
+    n_draws = self._N_BURNIN + self._N_KEEP
+    geo_shape = (n_draws, self._N_CHAINS, self._N_GEOS)
+    states[constants.TAU_G_EXCL_BASELINE] = tf.zeros(
+        (n_draws, self._N_CHAINS, self._N_GEOS - 1)
+    )
+    states[constants.BETA_GM_DEV] = tf.zeros(
+        geo_shape + (self._N_MEDIA_CHANNELS,)
+    )
+    states[constants.BETA_GRF_DEV] = tf.zeros(
+        geo_shape + (self._N_RF_CHANNELS,)
+    )
+    states[constants.GAMMA_GC_DEV] = tf.zeros(geo_shape + (self._N_CONTROLS,))
+    mcmc_output = collections.namedtuple(
+        "StatesAndTrace", ["all_states", "trace"]
+    )(
+        all_states=collections.namedtuple("StructTuple", states)(**states),
+        trace=self.test_trace,
+    )
+    with mock.patch.object(
+        posterior_sampler,
+        "_xla_windowed_adaptive_nuts",
+        autospec=True,
+        return_value=mcmc_output,
+    ):
+      meridian.sample_posterior(
+          n_chains=[self._N_CHAINS],
+          n_adapt=self._N_ADAPT,
+          n_burnin=self._N_BURNIN,
+          n_keep=self._N_KEEP,
+          checkpoint_dir=checkpoint_dir,
+      )
+
+    with mock.patch.object(
+        posterior_sampler,
+        "_xla_windowed_adaptive_nuts",
+        autospec=True,
+        return_value=mcmc_output,
+    ) as mock_sample_posterior:
+      meridian.sample_posterior(
+          n_chains=[self._N_CHAINS, self._N_CHAINS],
+          n_adapt=self._N_ADAPT,
+          n_burnin=self._N_BURNIN,
+          n_keep=self._N_KEEP,
+          checkpoint_dir=checkpoint_dir,
+          warm_start=True,
+      )
+      mock_sample_posterior.assert_called_once()
+      _, mock_kwargs = mock_sample_posterior.call_args
+
+    self.assertAllClose(
+        mock_kwargs["init_step_size"],
+        np.mean(self.test_trace[constants.STEP_SIZE][-1]),
+    )
+    current_state = mock_kwargs["current_state"]._asdict()
+    self.assertCountEqual(current_state.keys(), states.keys())
+    for k, v in current_state.items():
+      self.assertAllClose(v, states[k][-1], msg=k)
+
+  def test_sample_posterior_parallel_matches_serial(self):
+    mcmc_output = collections.namedtuple(
+        "StatesAndTrace", ["all_states", "trace"]
+    )(
+        all_states=self.test_posterior_states_media_and_rf,
+        trace=self.test_trace,
+    )
+    mock_sample_posterior = self.enter_context(
+        mock.patch.object(
+            posterior_sampler,
+            "_xla_windowed_adaptive_nuts",
+            autospec=True,
+            return_value=mcmc_output,
+        )
+    )
+    serial_meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+    serial_meridian.sample_posterior(
+        n_chains=[self._N_CHAINS, self._N_CHAINS],
+        n_adapt=self._N_ADAPT,
+        n_burnin=self._N_BURNIN,
+        n_keep=self._N_KEEP,
+        seed=[1, 2],
+    )
+
+    # Worker threads share the mocked sampling function with the test.
+    mock_create_worker_pool = self.enter_context(
+        mock.patch.object(
+            posterior_sampler,
+            "_create_worker_pool",
+            autospec=True,
+            side_effect=lambda n_workers, n_threads: (
+                concurrent.futures.ThreadPoolExecutor(n_workers)
+            ),
+        )
+    )
+    mock_sample_posterior.reset_mock()
+    parallel_meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+    parallel_meridian.sample_posterior(
+        n_chains=[self._N_CHAINS, self._N_CHAINS],
+        n_adapt=self._N_ADAPT,
+        n_burnin=self._N_BURNIN,
+        n_keep=self._N_KEEP,
+        seed=[1, 2],
+        n_workers=4,
+        threads_per_worker=3,
+    )
+
+    mock_create_worker_pool.assert_called_once_with(2, 3)
+    self.assertEqual(mock_sample_posterior.call_count, 2)
+    seeds = [
+        tuple(mock_kwargs["seed"])
+        for _, mock_kwargs in mock_sample_posterior.call_args_list
+    ]
+    self.assertLen(set(seeds), 2)
+    for group in [constants.POSTERIOR, "trace", "sample_stats"]:
+      xr.testing.assert_allclose(
+          parallel_meridian.inference_data[group],
+          serial_meridian.inference_data[group],
+      )
+
+  def test_sample_posterior_in_spawned_worker_processes(self):
+    # Unlike the other sampling tests, the chains are actually sampled, since
+    # mocks do not carry over to the spawned worker processes.
+    meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+
+    meridian.sample_posterior(
+        n_chains=[1, 1],
+        n_adapt=2,
+        n_burnin=1,
+        n_keep=2,
+        seed=[1, 2],
+        n_workers=2,
+        threads_per_worker=1,
+    )
+
+    posterior = meridian.inference_data.posterior
+    self.assertEqual(posterior.sizes[constants.CHAIN], 2)
+    self.assertEqual(posterior.sizes[constants.DRAW], 2)
+    sigma = posterior[constants.SIGMA].values
+    self.assertTrue(np.isfinite(sigma).all())
+    # Each batch is sampled with its own seed.
+    self.assertNotAllClose(sigma[0], sigma[1])
+
+  @parameterized.named_parameters(
+      dict(
+          testcase_name="non_positive_workers",
+          kwargs={"n_workers": 0},
+          error_msg="`n_workers` must be positive.",
+      ),
+      dict(
+          testcase_name="non_positive_threads",
+          kwargs={"n_workers": 2, "threads_per_worker": 0},
+          error_msg="`threads_per_worker` must be positive.",
+      ),
+      dict(
+          testcase_name="parallel_warm_start",
+          kwargs={"n_workers": 2, "warm_start": True},
+          error_msg="`warm_start` requires the chain batches to be sampled",
+      ),
+  )
+  def test_sample_posterior_parallel_wrong_arguments_raises(
+      self, kwargs, error_msg
+  ):
+    meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+    with self.assertRaisesRegex(ValueError, error_msg):
+      meridian.sample_posterior(
+          n_chains=[self._N_CHAINS, self._N_CHAINS],
+          n_adapt=self._N_ADAPT,
+          n_burnin=self._N_BURNIN,
+          n_keep=self._N_KEEP,
+          **kwargs,
+      )
+
+  def test_init_worker_pins_thread_pools(self):
+    with mock.patch.object(
+        tf.config.threading, "set_intra_op_parallelism_threads"
+    ) as mock_intra_op, mock.patch.object(
+        tf.config.threading, "set_inter_op_parallelism_threads"
+    ) as mock_inter_op:
+      posterior_sampler._init_worker(3)
+    mock_intra_op.assert_called_once_with(3)
+    mock_inter_op.assert_called_once_with(3)
+
+  def test_init_worker_initialized_runtime_warns(self):
+    with mock.patch.object(
+        tf.config.threading,
+        "set_intra_op_parallelism_threads",
+        side_effect=RuntimeError("Already initialized."),
+    ):
+      with self.assertWarnsRegex(
+          UserWarning, "Could not pin the TensorFlow thread pools"
+      ):
+        posterior_sampler._init_worker(3)
+
+  def test_get_warm_start_state_reuses_chains_cyclically(self):
+    state_type = collections.namedtuple("StructTuple", ["a", "b"])
+    joint_dist = mock.Mock(dtype=state_type(a=tf.float32, b=tf.float32))
+    states = {
+        "a": np.arange(6, dtype=np.float32).reshape(3, 2),
+        "b": np.arange(12, dtype=np.float32).reshape(3, 2, 2),
+        "y": np.zeros((3, 2), dtype=np.float32),
+    }
+
+    warm_start_state = posterior_sampler._get_warm_start_state(
+        joint_dist, states, n_chains=3
+    )
+
+    self.assertIsInstance(warm_start_state, state_type)
+    self.assertAllEqual(warm_start_state.a, [4, 5, 4])
+    self.assertAllEqual(warm_start_state.b, [[8, 9], [10, 11], [8, 9]])
+
+  @parameterized.named_parameters(
+      dict(testcase_name="n_adapt", kwargs={"n_adapt": 3}),
+      dict(testcase_name="seed", kwargs={"seed": [1, 2]}),
+      dict(
+          testcase_name="current_state",
+          kwargs={"current_state": {constants.SIGMA: np.ones(2)}},
+      ),
+      dict(testcase_name="init_step_size", kwargs={"init_step_size": 0.1}),
+      dict(
+          testcase_name="dual_averaging_kwargs",
+          kwargs={"dual_averaging_kwargs": {"target_accept_prob": 0.9}},
+      ),
+      dict(testcase_name="max_tree_depth", kwargs={"max_tree_depth": 5}),
+      dict(testcase_name="max_energy_diff", kwargs={"max_energy_diff": 100.0}),
+      dict(
+          testcase_name="unrolled_leapfrog_steps",
+          kwargs={"unrolled_leapfrog_steps": 2},
+      ),
+      dict(testcase_name="warm_start", kwargs={"warm_start": True}),
+      dict(testcase_name="pins", kwargs={constants.SIGMA: 1.0}),
+      dict(
+          testcase_name="parallel_batch_seeds",
+          kwargs={"seed": [1, 2], "n_workers": 2},
+          initial_kwargs={"seed": [1, 2]},
+      ),
+      dict(testcase_name="input_data", kwargs={}, use_other_input_data=True),
+  )
+  def test_sample_posterior_checkpoint_config_mismatch_raises(
+      self,
+      kwargs,
+      initial_kwargs=None,
+      use_other_input_data=False,
+  ):
+    checkpoint_dir = self.create_tempdir().full_path
+    meridian = model.Meridian(
+        input_data=self.short_input_data_with_media_and_rf,
+        model_spec=spec.ModelSpec(),
+    )
+    with mock.patch.object(
+        posterior_sampler,
+        "_xla_windowed_adaptive_nuts",
+        autospec=True,
+        return_value=collections.namedtuple(
+            "StatesAndTrace", ["all_states", "trace"]
+        )(
+            all_states=self.test_posterior_states_media_and_rf,
+            trace=self.test_trace,
+        ),
+    ):
+      meridian.sample_posterior(
+          n_chains=self._N_CHAINS,
+          n_adapt=self._N_ADAPT,
+          n_burnin=self._N_BURNIN,
+          n_keep=self._N_KEEP,
+          checkpoint_dir=checkpoint_dir,
+          **(initial_kwargs or {}),
+      )
+
+    if use_other_input_data:
+      meridian = model.Meridian(
+          input_data=self.short_input_data_with_media_only,
+          model_spec=spec.ModelSpec(),
+      )
+    resume_kwargs = {
+        "n_chains": self._N_CHAINS,
+        "n_adapt": self._N_ADAPT,
+        "n_burnin": self._N_BURNIN,
+        "n_keep": self._N_KEEP,
+        "checkpoint_dir": checkpoint_dir,
+    }
+    with self.assertRaisesRegex(
+        ValueError, "does not match the current configuration"
+    ):
+      meridian.sample_posterior(**(resume_kwargs | kwargs))
+
   def test_injected_sample_posterior_media_and_rf_returns_correct_shape(self):
     """Checks validation passes with correct shapes."""
     self.enter_context(
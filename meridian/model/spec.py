@@ -125,6 +125,13 @@ class ModelSpec:
       `(n_non_media_channels,)` indicating the non-media variables for which the
       non-media value will be scaled by population. If `None`, then no non-media
       variables are scaled by population. Default: `None`.
+    adstock_memory_optimized: A boolean indicating whether to compute the
+      Adstock function by accumulating one lag period at a time, instead of
+      stacking all `max_lag + 1` lagged copies of the media tensor. This
+      reduces the peak memory of the Adstock calculation by a factor of up to
+      `max_lag + 1` and gives numerically equivalent results, but it can be
+      slower for small models. Consider setting it to `True` for models with a
+      large `max_lag` or many geos. Default: `False`.
   """
 
   prior: prior_distribution.PriorDistribution = dataclasses.field(
@@ -142,6 +149,7 @@ class ModelSpec:
   holdout_id: np.ndarray | None = None
   control_population_scaling_id: np.ndarray | None = None
   non_media_population_scaling_id: np.ndarray | None = None
+  adstock_memory_optimized: bool = False
 
   def __post_init__(self):
     # Validate media_effects_dist.
@@ -29,6 +29,7 @@ class ModelSpecTest(parameterized.TestCase):
     self.assertEqual(model_spec.media_effects_dist, "log_normal")
     self.assertFalse(model_spec.hill_before_adstock)
     self.assertEqual(model_spec.max_lag, 8)
+    self.assertFalse(model_spec.adstock_memory_optimized)
     self.assertFalse(model_spec.unique_sigma_for_each_geo)
     self.assertEqual(model_spec.paid_media_prior_type, "roi")
     self.assertIsNone(model_spec.roi_calibration_period)